@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import GeneratedDeck, UserPrompt, Deck, PartOfSpeechCache, Token, TokenTransaction, Card
+from .models import GeneratedDeck, CardGenerationJob, UserPrompt, Deck, PartOfSpeechCache, TTSCacheEntry, MediaBlob, Token, TokenTransaction, Card
 
 
 @admin.register(GeneratedDeck)
@@ -23,6 +23,15 @@ class GeneratedDeckAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(CardGenerationJob)
+class CardGenerationJobAdmin(admin.ModelAdmin):
+    """Административная панель для модели CardGenerationJob"""
+    list_display = ['deck_name', 'user', 'status', 'stage', 'progress', 'attempts', 'created_at']
+    list_filter = ['status', 'stage', 'created_at']
+    search_fields = ['deck_name', 'user__username']
+    readonly_fields = ['id', 'heartbeat_at', 'created_at', 'updated_at']
+
+
 @admin.register(UserPrompt)
 class UserPromptAdmin(admin.ModelAdmin):
     """Административная панель для модели UserPrompt"""
@@ -130,6 +139,32 @@ class TokenAdmin(admin.ModelAdmin):
         self.message_user(request, f'Начислено 500 токенов {queryset.count()} пользователям')
 
 
+@admin.register(TTSCacheEntry)
+class TTSCacheEntryAdmin(admin.ModelAdmin):
+    """Административная панель для кэша синтеза речи"""
+    list_display = ['text', 'language', 'provider', 'voice', 'hits', 'size_bytes', 'last_used_at']
+    list_filter = ['provider', 'language']
+    search_fields = ['text', 'file_path']
+    readonly_fields = [
+        'key', 'provider', 'voice', 'language', 'text', 'file_path',
+        'size_bytes', 'hits', 'created_at', 'last_used_at',
+    ]
+    
+    def has_add_permission(self, request):
+        return False  # Записи создаются только при синтезе
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    """Административная панель для хранилища медиафайлов"""
+    list_display = ['path', 'ref_count', 'size_bytes', 'updated_at']
+    search_fields = ['path', 'sha256']
+    readonly_fields = ['sha256', 'path', 'size_bytes', 'ref_count', 'created_at', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False  # Записи создаются при первой ссылке на файл
+
+
 @admin.register(TokenTransaction)
 class TokenTransactionAdmin(admin.ModelAdmin):
     """Административная панель для истории транзакций токенов"""
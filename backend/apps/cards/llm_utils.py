@@ -3,16 +3,18 @@
 """
 import os
 import json
+import hashlib
 import re
-import uuid
 import io
 import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Optional, Tuple, List
 from PIL import Image
 from openai import OpenAI
 from django.conf import settings
+from . import media_store, tts_cache
 from .prompt_utils import get_user_prompt, format_prompt
 from .default_prompts import get_image_prompt_for_style, get_default_prompt, get_image_prompt_generation_for_style
 
@@ -20,6 +22,7 @@ logger = logging.getLogger(__name__)
 
 # Re-export from core for backwards compatibility
 from apps.core.llm.clients import get_openai_client, get_gemini_client, GEMINI_AVAILABLE  # noqa: F401
+from apps.core.llm.rate_limit import call_with_retry, get_bucket, get_limits
 if GEMINI_AVAILABLE:
     import google.generativeai as genai  # noqa: F401
 
@@ -350,19 +353,8 @@ def generate_image_with_dalle(
         if image.mode != 'RGB':
             image = image.convert('RGB')
         
-        # Генерируем уникальное имя файла
-        file_id = str(uuid.uuid4())
-        filename = f"{file_id}.jpg"
-        
-        # Сохраняем изображение
-        media_root = Path(settings.MEDIA_ROOT)
-        images_dir = media_root / "images"
-        images_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = images_dir / filename
-        
-        # Сохраняем изображение
-        image.save(file_path, "JPEG", quality=95)
+        # Сохраняем изображение под хешем содержимого (повтор не занимает места)
+        file_path = Path(settings.MEDIA_ROOT) / media_store.save_image(image, "images")
         
         return file_path, prompt
         
@@ -455,17 +447,8 @@ def edit_image_with_gemini(
         if result_image.mode != 'RGB':
             result_image = result_image.convert('RGB')
         
-        # Генерируем уникальное имя файла
-        file_id = str(uuid.uuid4())
-        filename = f"{file_id}.jpg"
-        
-        # Сохраняем изображение
-        media_root = Path(settings.MEDIA_ROOT)
-        images_dir = media_root / "images"
-        images_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = images_dir / filename
-        result_image.save(file_path, "JPEG", quality=95)
+        # Сохраняем изображение под хешем содержимого
+        file_path = Path(settings.MEDIA_ROOT) / media_store.save_image(result_image, "images")
         
         logger.info(f"[Gemini Edit] Результат сохранен: {file_path}")
         
@@ -589,19 +572,8 @@ def generate_image_with_gemini(
         if image.mode != 'RGB':
             image = image.convert('RGB')
         
-        # Генерируем уникальное имя файла
-        file_id = str(uuid.uuid4())
-        filename = f"{file_id}.jpg"
-        
-        # Сохраняем изображение
-        media_root = Path(settings.MEDIA_ROOT)
-        images_dir = media_root / "images"
-        images_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = images_dir / filename
-        
-        # Сохраняем изображение
-        image.save(file_path, "JPEG", quality=95)
+        # Сохраняем изображение под хешем содержимого (повтор не занимает места)
+        file_path = Path(settings.MEDIA_ROOT) / media_store.save_image(image, "images")
         
         return file_path, prompt
         
@@ -699,11 +671,19 @@ def generate_images_batch(
     image_style: str = 'balanced',
     provider: str = 'openai',
     gemini_model: str = None,
-    use_two_stage: bool = True
-) -> Dict[str, Tuple[Path, str]]:
+    use_two_stage: bool = True,
+    max_workers: int = None
+) -> Dict[str, Optional[Tuple[Path, str]]]:
     """
     Batch генерация изображений для нескольких слов с двухэтапным подходом
     
+    Промпты создаются одним запросом, изображения — параллельно в пуле
+    потоков. Запросы к провайдеру ограничены token bucket из
+    settings.LLM_RATE_LIMITS, ответы 429 повторяются с паузой, поэтому
+    время пакета определяется числом потоков, а не числом слов.
+    Потоки не обращаются к БД: списание токенов — в вызывающем коде
+    (media_service.generate_images_for_words).
+    
     Args:
         words_data: Список словарей [{'word': 'Haus', 'translation': 'дом', 'language': 'de'}, ...]
         user: Пользователь
@@ -712,11 +692,14 @@ def generate_images_batch(
         provider: Провайдер ('openai' или 'gemini')
         gemini_model: Модель Gemini
         use_two_stage: Использовать двухэтапную генерацию
+        max_workers: Число параллельных запросов (по умолчанию concurrency провайдера)
     
     Returns:
-        Словарь {word: (Path, prompt)} с результатами генерации
+        Словарь {word: (Path, prompt) или None при ошибке} с результатами генерации
     """
     results = {}
+    if not words_data:
+        return results
     
     # Первый этап: генерируем промпты для всех слов сразу
     prompts_map = {}
@@ -732,96 +715,164 @@ def generate_images_batch(
         except Exception as e:
             logger.error(f"[Batch Two-Stage] Ошибка при генерации промптов: {str(e)}, используем fallback")
     
-    # Второй этап: генерируем изображения для каждого слова
-    for item in words_data:
+    # Второй этап: генерируем изображения параллельно с лимитом провайдера
+    if user and hasattr(user, 'image_provider'):
+        provider = provider or user.image_provider
+    provider = provider or 'openai'
+    limits_name = 'gemini_image' if provider == 'gemini' else 'openai_image'
+    bucket = get_bucket(limits_name)
+    max_workers = max_workers or get_limits(limits_name)['concurrency']
+    
+    def generate_one(item):
         word = item['word']
-        translation = item['translation']
-        language = item.get('language', 'de')
-        
-        custom_prompt = prompts_map.get(word) if use_two_stage and prompts_map else None
-        
-        try:
-            result = generate_image(
-                word=word,
-                translation=translation,
-                language=language,
-                user=user,
-                native_language=native_language,
-                image_style=image_style,
-                provider=provider,
-                gemini_model=gemini_model,
-                use_two_stage=False,  # Промпт уже готов
-                custom_prompt=custom_prompt
-            )
-            results[word] = result
-        except Exception as e:
-            logger.error(f"[Batch] Ошибка при генерации изображения для '{word}': {str(e)}")
-            results[word] = None
+        return call_with_retry(lambda: generate_image(
+            word=word,
+            translation=item['translation'],
+            language=item.get('language', 'de'),
+            user=user,
+            native_language=native_language,
+            image_style=image_style,
+            provider=provider,
+            gemini_model=gemini_model,
+            use_two_stage=False,  # Промпт уже готов
+            custom_prompt=prompts_map.get(word)
+        ), bucket)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(words_data)))) as executor:
+        futures = {executor.submit(generate_one, item): item['word'] for item in words_data}
+        for future in as_completed(futures):
+            word = futures[future]
+            try:
+                results[word] = future.result()
+            except Exception as e:
+                logger.error(f"[Batch] Ошибка при генерации изображения для '{word}': {str(e)}")
+                results[word] = None
     
     return results
 
 
+# Голоса OpenAI TTS: женские (nova, shimmer), мужские (onyx, echo), универсальные (alloy, fable)
+OPENAI_TTS_VOICES = ['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer']
+OPENAI_TTS_LANGUAGE_VOICES = {
+    'ru': 'alloy',   # Универсальный голос для русского
+    'en': 'alloy',   # Универсальный голос для английского
+    'pt': 'nova',    # Мягкий голос для португальского
+    'de': 'onyx',    # Четкий голос для немецкого
+    'es': 'nova',    # Мягкий голос для испанского
+    'fr': 'shimmer', # Женский голос для французского
+    'it': 'fable',   # Универсальный голос для итальянского
+    'tr': 'nova',    # Мягкий голос для турецкого
+}
+
+# Маппинг языков для gTTS
+GTTS_LANGUAGES = {
+    'ru': 'ru',
+    'en': 'en',
+    'pt': 'pt',  # Португальский (tld определяет диалект)
+    'de': 'de',
+    'es': 'es',
+    'fr': 'fr',
+    'it': 'it',
+    'tr': 'tr',
+}
+
+
+def _resolve_audio_provider(language: str, user=None, provider: str = 'openai') -> str:
+    """Провайдер озвучки: явный, из профиля; для португальского по умолчанию gTTS"""
+    if user and hasattr(user, 'audio_provider'):
+        provider = provider or user.audio_provider
+    else:
+        provider = provider or 'openai'
+    
+    if language == 'pt' and provider == 'openai':
+        # Если пользователь не указал явно, используем gTTS для португальского
+        if not hasattr(user, 'audio_provider') or user.audio_provider == 'openai':
+            logger.info(f"[Audio] Для португальского языка используем gTTS (лучшее качество)")
+            provider = 'gtts'
+    return provider
+
+
+def _openai_tts_voice(word: str, language: str, use_voice_variety: bool = True) -> str:
+    """
+    Голос OpenAI TTS для слова
+    
+    При разнообразии голосов голос выбирается по хэшу слова, а не случайно:
+    разные слова звучат разными голосами, а одно и то же слово всегда
+    одним, поэтому его аудио берется из кэша (tts_cache).
+    """
+    if use_voice_variety:
+        digest = hashlib.sha256(tts_cache.normalize_text(word).encode('utf-8')).digest()
+        return OPENAI_TTS_VOICES[digest[0] % len(OPENAI_TTS_VOICES)]
+    return OPENAI_TTS_LANGUAGE_VOICES.get(language, 'alloy')
+
+
+def _gtts_tld(language: str) -> str:
+    # Для португальского используем tld='pt' для европейского варианта,
+    # для остальных языков — tld='com'
+    return 'pt' if language == 'pt' else 'com'
+
+
+def find_cached_audio(
+    word: str,
+    language: str,
+    user=None,
+    provider: str = 'openai',
+    use_voice_variety: bool = True
+) -> Optional[Path]:
+    """
+    Ищет в кэше аудио, которое вернул бы generate_audio_with_tts
+    
+    Позволяет не требовать токенов на балансе, если синтез не понадобится.
+    
+    Returns:
+        Path к аудиофайлу или None
+    """
+    provider = _resolve_audio_provider(language, user, provider)
+    if provider == 'gtts':
+        relative_path = tts_cache.lookup(word, language, _gtts_tld(language), 'gtts')
+    else:
+        relative_path = tts_cache.lookup(
+            word, language, _openai_tts_voice(word, language, use_voice_variety), 'openai:tts-1-hd')
+    return Path(settings.MEDIA_ROOT) / relative_path if relative_path else None
+
+
 def generate_audio_with_gtts(
     word: str,
     language: str,
     user=None
-) -> Path:
+) -> Tuple[Path, bool]:
     """
     Генерирует аудио для слова через Google TTS (gTTS)
     
+    Одинаковый текст синтезируется один раз (tts_cache).
+    
     Args:
         word: Исходное слово
         language: Язык слова (ru, en, pt, de, es, fr, it)
         user: Пользователь (не используется, оставлен для совместимости)
     
     Returns:
-        Path к сохраненному аудиофайлу
+        (Path к сохраненному аудиофайлу, было ли попадание в кэш)
     """
     try:
         from gtts import gTTS
     except ImportError:
         raise Exception("gTTS не установлен. Установите: pip install gtts")
     
-    # Маппинг языков для gTTS
-    # Для португальского используем 'pt' с tld='pt' для европейского варианта
-    lang_map = {
-        'ru': 'ru',
-        'en': 'en',
-        'pt': 'pt',  # Португальский (tld определяет диалект)
-        'de': 'de',
-        'es': 'es',
-        'fr': 'fr',
-        'it': 'it',
-        'tr': 'tr',
-    }
-    
-    gtts_lang = lang_map.get(language, language)
-    
-    # Для португальского используем tld='pt' для европейского варианта
-    # Для остальных языков используем tld='com'
-    tld = 'pt' if language == 'pt' else 'com'
+    gtts_lang = GTTS_LANGUAGES.get(language, language)
+    tld = _gtts_tld(language)
     
-    try:
-        # Создаем объект gTTS
+    def synthesize():
         tts = gTTS(text=word, lang=gtts_lang, tld=tld, slow=False)
-        
-        # Генерируем уникальное имя файла
-        file_id = str(uuid.uuid4())
-        filename = f"{file_id}.mp3"
-        
-        # Сохраняем аудио
-        media_root = Path(settings.MEDIA_ROOT)
-        audio_dir = media_root / "audio"
-        audio_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = audio_dir / filename
-        
-        # Сохраняем аудиофайл
-        tts.save(str(file_path))
-        
+        buf = io.BytesIO()
+        tts.write_to_fp(buf)
         logger.info(f"[gTTS] Сгенерировано аудио для '{word}' (язык: {gtts_lang}, tld: {tld})")
-        
-        return file_path
+        return buf.getvalue()
+    
+    try:
+        relative_path, cache_hit = tts_cache.get_or_synthesize(
+            word, language, voice=tld, provider='gtts', synthesize=synthesize, subdir='audio')
+        return Path(settings.MEDIA_ROOT) / relative_path, cache_hit
         
     except Exception as e:
         raise Exception(f"Ошибка при генерации аудио через gTTS: {str(e)}")
@@ -833,7 +884,7 @@ def generate_audio_with_tts(
     user=None,
     use_voice_variety: bool = True,
     provider: str = 'openai'
-) -> Path:
+) -> Tuple[Path, bool]:
     """
     Генерирует аудио для слова через выбранный провайдер (OpenAI TTS или gTTS)
     
@@ -845,20 +896,9 @@ def generate_audio_with_tts(
         provider: Провайдер ('openai' или 'gtts'). Если не указан, берется из user.audio_provider
     
     Returns:
-        Path к сохраненному аудиофайлу
+        (Path к сохраненному аудиофайлу, было ли попадание в кэш)
     """
-    # Определяем провайдер
-    if user and hasattr(user, 'audio_provider'):
-        provider = provider or user.audio_provider
-    else:
-        provider = provider or 'openai'
-    
-    # Для португальского по умолчанию используем gTTS
-    if language == 'pt' and provider == 'openai':
-        # Если пользователь не указал явно, используем gTTS для португальского
-        if not hasattr(user, 'audio_provider') or user.audio_provider == 'openai':
-            logger.info(f"[Audio] Для португальского языка используем gTTS (лучшее качество)")
-            provider = 'gtts'
+    provider = _resolve_audio_provider(language, user, provider)
     
     # Вызываем соответствующую функцию
     if provider == 'gtts':
@@ -881,10 +921,12 @@ def generate_audio_with_openai_tts(
     language: str,
     user=None,
     use_voice_variety: bool = True
-) -> Path:
+) -> Tuple[Path, bool]:
     """
     Генерирует аудио для слова через OpenAI TTS-1-HD
     
+    Одинаковый текст одним голосом синтезируется один раз (tts_cache).
+    
     Args:
         word: Исходное слово
         language: Язык слова (ru, en, pt, de, es, fr, it)
@@ -892,58 +934,24 @@ def generate_audio_with_openai_tts(
         use_voice_variety: Использовать разнообразие голосов
     
     Returns:
-        Path к сохраненному аудиофайлу
+        (Path к сохраненному аудиофайлу, было ли попадание в кэш)
     """
-    client = get_openai_client()
-    
-    # Определяем голос в зависимости от языка и разнообразия
-    import random
-    
-    if use_voice_variety:
-        # Разнообразие голосов: женские (nova, shimmer), мужские (onyx, echo), универсальные (alloy, fable)
-        all_voices = ['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer']
-        voice = random.choice(all_voices)
-    else:
-        # Стандартное поведение: голос зависит от языка
-        voice_map = {
-            'ru': 'alloy',   # Универсальный голос для русского
-            'en': 'alloy',   # Универсальный голос для английского
-            'pt': 'nova',    # Мягкий голос для португальского
-            'de': 'onyx',    # Четкий голос для немецкого
-            'es': 'nova',    # Мягкий голос для испанского
-            'fr': 'shimmer', # Женский голос для французского
-            'it': 'fable',   # Универсальный голос для итальянского
-            'tr': 'nova',    # Мягкий голос для турецкого
-        }
-        voice = voice_map.get(language, 'alloy')
+    voice = _openai_tts_voice(word, language, use_voice_variety)
     
-    try:
-        # Вызываем TTS API
+    def synthesize():
+        client = get_openai_client()
         response = client.audio.speech.create(
             model="tts-1-hd",
             voice=voice,
             input=word,
         )
-        
-        # Получаем аудио данные
-        audio_data = response.content
-        
-        # Генерируем уникальное имя файла
-        file_id = str(uuid.uuid4())
-        filename = f"{file_id}.mp3"
-        
-        # Сохраняем аудио
-        media_root = Path(settings.MEDIA_ROOT)
-        audio_dir = media_root / "audio"
-        audio_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = audio_dir / filename
-        
-        # Сохраняем аудиофайл
-        with open(file_path, 'wb') as f:
-            f.write(audio_data)
-        
-        return file_path
+        return response.content
+    
+    try:
+        relative_path, cache_hit = tts_cache.get_or_synthesize(
+            word, language, voice=voice, provider='openai:tts-1-hd',
+            synthesize=synthesize, subdir='audio')
+        return Path(settings.MEDIA_ROOT) / relative_path, cache_hit
         
     except Exception as e:
         raise Exception(f"Ошибка при генерации аудио через TTS-1-HD: {str(e)}")
@@ -4,7 +4,8 @@
 Копирует:
 - Категории (со структурой parent/child)
 - Слова (с AI-контентом)
-- Медиа-файлы слов (image/audio/hint_audio) как независимые копии
+- Медиа-файлы слов (image/audio/hint_audio) и обложки колод — общие с источником:
+  файл не копируется, в хранилище (apps/cards/media_store.py) растет счетчик ссылок
 - Связи слов (синонимы/антонимы)
 - Колоды и связи deck.words
 - Карточки (normal/inverted/empty/cloze) с reset прогресса
@@ -16,13 +17,7 @@
   python manage.py clone_user_data --source admin --target Liudmila --target-password Liudmila --apply
 """
 
-import os
-import uuid
-from typing import Optional
-
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
@@ -33,27 +28,6 @@ from apps.words.models import Category, Word, WordRelation
 User = get_user_model()
 
 
-def _copy_filefield(source_field, target_prefix: str) -> Optional[str]:
-    """
-    Создаёт независимую копию файла в хранилище и возвращает новый путь.
-    """
-    if not source_field:
-        return None
-    source_name = getattr(source_field, "name", None)
-    if not source_name:
-        return None
-    if not default_storage.exists(source_name):
-        return None
-
-    _, ext = os.path.splitext(source_name)
-    filename = f"{target_prefix}/{uuid.uuid4().hex}{ext.lower()}"
-
-    with default_storage.open(source_name, "rb") as src:
-        content = src.read()
-    saved_name = default_storage.save(filename, ContentFile(content))
-    return saved_name
-
-
 class Command(BaseCommand):
     help = "Clone all user data (decks/words/cards/media) from source user to target user"
 
@@ -134,10 +108,10 @@ class Command(BaseCommand):
 
         created_categories = 0
         created_words = 0
-        copied_word_media = 0
+        shared_word_media = 0
         created_relations = 0
         created_decks = 0
-        copied_deck_covers = 0
+        shared_deck_covers = 0
         created_cards = 0
 
         with transaction.atomic():
@@ -215,29 +189,17 @@ class Command(BaseCommand):
                     part_of_speech=src_word.part_of_speech,
                     stickers=src_word.stickers,
                     learning_status="new",
+                    # Same files as the source: post_save increments their ref_count
+                    image_file=src_word.image_file.name,
+                    audio_file=src_word.audio_file.name,
+                    hint_audio=src_word.hint_audio.name,
                 )
                 # Avoid auto AI generation signal during cloning
                 setattr(new_word, "_skip_etymology_generation", True)
                 new_word.save()
-
-                image_name = _copy_filefield(src_word.image_file, "images")
-                audio_name = _copy_filefield(src_word.audio_file, "audio")
-                hint_audio_name = _copy_filefield(src_word.hint_audio, "hints")
-                changed_fields = []
-                if image_name:
-                    new_word.image_file = image_name
-                    changed_fields.append("image_file")
-                    copied_word_media += 1
-                if audio_name:
-                    new_word.audio_file = audio_name
-                    changed_fields.append("audio_file")
-                    copied_word_media += 1
-                if hint_audio_name:
-                    new_word.hint_audio = hint_audio_name
-                    changed_fields.append("hint_audio")
-                    copied_word_media += 1
-                if changed_fields:
-                    new_word.save(update_fields=changed_fields + ["updated_at"])
+                shared_word_media += sum(
+                    1 for field in (src_word.image_file, src_word.audio_file, src_word.hint_audio) if field
+                )
 
                 mapped_categories = [
                     category_map[c.id].id
@@ -273,13 +235,10 @@ class Command(BaseCommand):
                     target_lang=src_deck.target_lang,
                     source_lang=src_deck.source_lang,
                     is_learning_active=src_deck.is_learning_active,
+                    cover=src_deck.cover.name,
                 )
-
-                cover_name = _copy_filefield(src_deck.cover, "deck_covers")
-                if cover_name:
-                    new_deck.cover = cover_name
-                    new_deck.save(update_fields=["cover", "updated_at"])
-                    copied_deck_covers += 1
+                if src_deck.cover:
+                    shared_deck_covers += 1
 
                 mapped_word_ids = [
                     word_map[w.id].id
@@ -332,8 +291,8 @@ class Command(BaseCommand):
         self.stdout.write(f"Target user id: {target_user.id}")
         self.stdout.write(f"Categories created: {created_categories}")
         self.stdout.write(f"Words created: {created_words}")
-        self.stdout.write(f"Word media copied (files): {copied_word_media}")
+        self.stdout.write(f"Word media shared (files): {shared_word_media}")
         self.stdout.write(f"Word relations created: {created_relations}")
         self.stdout.write(f"Decks created: {created_decks}")
-        self.stdout.write(f"Deck covers copied: {copied_deck_covers}")
+        self.stdout.write(f"Deck covers shared: {shared_deck_covers}")
         self.stdout.write(f"Cards created (progress reset): {created_cards}")
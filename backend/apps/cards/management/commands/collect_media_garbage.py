@@ -0,0 +1,58 @@
+"""
+Сборка мусора контентно-адресуемого хранилища медиафайлов (apps/cards/media_store.py).
+
+Удаляет файлы, на которые не ссылается ни одна модель и которые не менялись
+дольше grace-периода. Перед удалением каждый кандидат проверяется по всем
+FileField всех моделей, поэтому отставший счетчик не приводит к потере файла.
+--recount сначала пересчитывает ref_count по БД (после ручных правок,
+загрузки дампа и т.п.).
+
+Примеры:
+    python manage.py collect_media_garbage --dry-run
+    python manage.py collect_media_garbage --recount
+    python manage.py collect_media_garbage --grace-hours 72
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cards import media_store
+
+
+class Command(BaseCommand):
+    help = "Delete unreferenced files from the content-addressed media store"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be deleted",
+        )
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Rebuild reference counts from the database first",
+        )
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=media_store.GC_GRACE_PERIOD.total_seconds() / 3600,
+            help="Keep files written or referenced within this many hours (default: 24)",
+        )
+
+    def handle(self, *args, **options):
+        if options["grace_hours"] < 0:
+            raise CommandError("--grace-hours must not be negative")
+
+        if options["recount"]:
+            fixed = media_store.recount()
+            self.stdout.write(f"Reference counts fixed: {fixed}")
+
+        stats = media_store.collect_garbage(
+            grace=timedelta(hours=options["grace_hours"]),
+            dry_run=options["dry_run"],
+        )
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stats['deleted']} files, {stats['freed_bytes'] / 1024 / 1024:.1f} MB"
+        ))
@@ -0,0 +1,42 @@
+"""
+Вытеснение из кэша синтеза речи (apps/cards/tts_cache.py).
+
+Пока суммарный размер кэша больше settings.TTS_CACHE_MAX_BYTES, удаляет
+давно не использованные записи вместе с файлами, если на файл не ссылаются
+слова и литературный контекст. Предназначена для периодического запуска
+(cron), например раз в час; --max-chunks ограничивает работу одного запуска.
+
+Примеры:
+    python manage.py prune_tts_cache
+    python manage.py prune_tts_cache --max-mb 1024
+    python manage.py prune_tts_cache --max-chunks 20
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cards import tts_cache
+
+
+class Command(BaseCommand):
+    help = "Evict least recently used unreferenced entries from the TTS cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-mb",
+            type=int,
+            help="Cache size limit in MB (default: settings.TTS_CACHE_MAX_BYTES)",
+        )
+        parser.add_argument(
+            "--max-chunks",
+            type=int,
+            help=f"Scan at most this many chunks of {tts_cache.EVICTION_CHUNK} entries (default: no limit)",
+        )
+
+    def handle(self, *args, **options):
+        if options["max_mb"] is not None and options["max_mb"] < 0:
+            raise CommandError("--max-mb must not be negative")
+        if options["max_chunks"] is not None and options["max_chunks"] < 1:
+            raise CommandError("--max-chunks must be positive")
+
+        max_bytes = options["max_mb"] * 1024 * 1024 if options["max_mb"] is not None else None
+        evicted = tts_cache.evict(max_bytes=max_bytes, max_chunks=options["max_chunks"])
+        self.stdout.write(self.style.SUCCESS(f"TTS cache entries evicted: {evicted}"))
@@ -0,0 +1,108 @@
+"""
+Воркер фоновых задач (apps.core.jobs).
+
+Обрабатывает все очереди, зарегистрированные в tasks.py приложений:
+сборка колод (CardGenerationJob), литературный контекст колоды
+(DeckContextJob), этимология новых слов. Задачи хранятся в БД и берутся
+через SELECT ... FOR UPDATE SKIP LOCKED, поэтому воркеров можно запускать
+сколько угодно; задача упавшего воркера (нет heartbeat) берётся снова.
+--concurrency N запускает N дочерних процессов (GIL не ограничивает
+сборку .apkg); завершившийся процесс перезапускается.
+
+Примеры:
+    python manage.py run_workers
+    python manage.py run_workers --concurrency 4
+    python manage.py run_workers --queue cards.CardGenerationJob --once
+"""
+import multiprocessing
+import signal
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from apps.core import jobs
+
+
+class Command(BaseCommand):
+    help = "Run background job workers for all registered queues"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            help="Queue to process, may be repeated (default: all registered queues)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Worker processes to run (default: 1, in this process)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Give every queue one turn and exit (default: run until interrupted)",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when all queues are empty (default: 2)",
+        )
+
+    def handle(self, *args, **options):
+        jobs.autodiscover()
+        queues = options["queues"] or jobs.queue_names()
+        unknown = set(queues) - set(jobs.queue_names())
+        if unknown:
+            raise CommandError(
+                f"Unknown queue(s): {', '.join(sorted(unknown))}. "
+                f"Registered: {', '.join(jobs.queue_names())}"
+            )
+
+        if options["once"]:
+            busy = jobs.run_once(queues)
+            self.stdout.write(self.style.SUCCESS(f"Queues with work: {busy}/{len(queues)}."))
+            return
+
+        self.stdout.write(f"Processing queues: {', '.join(queues)}")
+        if options["concurrency"] <= 1:
+            self._loop(queues, options["sleep"])
+        else:
+            self._supervise(queues, options["sleep"], options["concurrency"])
+
+    def _supervise(self, queues, sleep, concurrency):
+        # Дочерние процессы не должны наследовать открытые соединения с БД;
+        # SIGTERM (docker stop) завершает и родителя, и воркеров через finally
+        connections.close_all()
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        context = multiprocessing.get_context("fork")
+        processes = [None] * concurrency
+        try:
+            while True:
+                for i, process in enumerate(processes):
+                    if process is not None and process.is_alive():
+                        continue
+                    if process is not None:
+                        self.stderr.write(f"Worker {process.pid} exited with code {process.exitcode}, restarting")
+                    processes[i] = context.Process(target=self._loop, args=(queues, sleep), daemon=True)
+                    processes[i].start()
+                time.sleep(1)
+        finally:
+            for process in processes:
+                if process is not None and process.is_alive():
+                    process.terminate()
+            for process in processes:
+                if process is not None:
+                    process.join()
+
+    def _loop(self, queues, sleep):
+        try:
+            while True:
+                if not jobs.run_once(queues):
+                    time.sleep(sleep)
+        finally:
+            connection.close()
@@ -0,0 +1,381 @@
+"""
+Контентно-адресуемое хранилище медиафайлов (MediaBlob)
+
+Загрузки и сгенерированные изображения сохраняются под именем SHA-256
+содержимого (images/ab/ab12….jpg). Одинаковое содержимое хранится один
+раз: повторное сохранение возвращает путь существующего файла.
+
+Запись файла не обращается к БД (ее вызывают и потоки пакетной
+генерации). Строка MediaBlob появляется с первой ссылкой, счетчик
+ref_count ведут сигналы post_init/post_save/post_delete моделей из
+TRACKED_FIELDS: новый файл поля +1, прежний -1. Копия слова (clone_user_data) — это инкремент
+счетчика, а не копия файла. Места, где модели сохраняются без сигналов
+(bulk_create/bulk_update), вызывают sync_references() сами; recount()
+пересчитывает счетчики по БД целиком.
+
+Сборка мусора (collect_garbage, manage.py collect_media_garbage) удаляет
+файлы без ссылок, не менявшиеся дольше GC_GRACE_PERIOD (в том числе
+записанные, но так и не сохраненные в модели), и перед
+удалением проверяет все FileField всех моделей — счетчик может
+отставать, но используемый файл не удаляется.
+
+Использование:
+    relative_path = save_bytes(audio_bytes, 'audio', '.mp3')
+    relative_path = save_image(pil_image, 'images')
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import uuid
+from collections import Counter, defaultdict
+from datetime import timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from .models import MediaBlob
+
+logger = logging.getLogger(__name__)
+
+# Модель -> поля, ссылки из которых учитываются в ref_count
+TRACKED_FIELDS = {
+    'words.Word': ('image_file', 'audio_file', 'hint_audio'),
+    'literary_context.SceneAnchor': ('image_file',),
+    'literary_context.WordContextMedia': ('hint_audio', 'audio_file'),
+    'cards.Deck': ('cover',),
+}
+GC_GRACE_PERIOD = timedelta(hours=24)
+GC_CHUNK = 500
+BLOB_PATH_RE = re.compile(r'^[\w-]+/[0-9a-f]{2}/([0-9a-f]{64})\.\w+$')
+
+
+def blob_path(sha256: str, subdir: str, ext: str) -> str:
+    """Путь файла относительно MEDIA_ROOT: subdir/ab/ab12….ext"""
+    return f'{subdir}/{sha256[:2]}/{sha256}{ext.lower()}'
+
+
+def parse_blob_path(path: str) -> Optional[str]:
+    """SHA-256 из пути файла хранилища; None для прочих файлов (старые UUID, кэш TTS)"""
+    match = BLOB_PATH_RE.match(path or '')
+    return match.group(1) if match else None
+
+
+def _commit(tmp_path: Path, sha256: str, subdir: str, ext: str) -> str:
+    """Переносит временный файл на место или удаляет его, если такой файл уже есть"""
+    relative_path = blob_path(sha256, subdir, ext)
+    target = Path(settings.MEDIA_ROOT) / relative_path
+    if target.exists():
+        tmp_path.unlink(missing_ok=True)
+        # Свежий mtime защищает файл от сборки мусора, пока ссылку не сохранят
+        os.utime(target)
+    else:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, target)
+    return relative_path
+
+
+def _tmp_path(subdir: str) -> Path:
+    tmp_dir = Path(settings.MEDIA_ROOT) / subdir
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    return tmp_dir / f'.{uuid.uuid4().hex}.tmp'
+
+
+def save_bytes(data: bytes, subdir: str, ext: str) -> str:
+    """
+    Сохраняет содержимое в хранилище
+
+    Returns:
+        Путь относительно MEDIA_ROOT
+    """
+    tmp_path = _tmp_path(subdir)
+    tmp_path.write_bytes(data)
+    return _commit(tmp_path, hashlib.sha256(data).hexdigest(), subdir, ext)
+
+
+def save_file(uploaded_file, subdir: str, ext: str) -> str:
+    """
+    Сохраняет загруженный файл (Django UploadedFile) потоково, без чтения в память
+
+    Returns:
+        Путь относительно MEDIA_ROOT
+    """
+    tmp_path = _tmp_path(subdir)
+    digest = hashlib.sha256()
+    with open(tmp_path, 'wb') as f:
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+            f.write(chunk)
+    return _commit(tmp_path, digest.hexdigest(), subdir, ext)
+
+
+def save_image(image, subdir: str, quality: int = 95) -> str:
+    """
+    Сохраняет PIL-изображение как JPEG
+
+    Returns:
+        Путь относительно MEDIA_ROOT
+    """
+    buf = io.BytesIO()
+    image.save(buf, 'JPEG', quality=quality)
+    return save_bytes(buf.getvalue(), subdir, '.jpg')
+
+
+# ---------- Ссылки ----------
+
+def _file_name(value) -> str:
+    return getattr(value, 'name', value) or ''
+
+
+def _ensure_blobs(paths: Iterable[str]):
+    """Создает строки MediaBlob для файлов хранилища, на которые появилась первая ссылка"""
+    media_root = Path(settings.MEDIA_ROOT)
+    paths = [path for path in paths if parse_blob_path(path)]
+    existing = set(MediaBlob.objects.filter(path__in=paths).values_list('path', flat=True))
+    new_blobs = []
+    for path in set(paths) - existing:
+        file_path = media_root / path
+        new_blobs.append(MediaBlob(
+            sha256=parse_blob_path(path),
+            path=path,
+            size_bytes=file_path.stat().st_size if file_path.exists() else 0,
+        ))
+    MediaBlob.objects.bulk_create(new_blobs, ignore_conflicts=True)
+
+
+def _change_refs(delta: Counter):
+    """Применяет изменения счетчиков: одно UPDATE на каждое значение изменения"""
+    by_delta = defaultdict(list)
+    for path, change in delta.items():
+        if path and change:
+            by_delta[change].append(path)
+    if not by_delta:
+        return
+    _ensure_blobs(path for change, paths in by_delta.items() if change > 0 for path in paths)
+    now = timezone.now()
+    for change, paths in by_delta.items():
+        MediaBlob.objects.filter(path__in=paths).update(
+            ref_count=F('ref_count') + change,
+            updated_at=now,
+        )
+
+
+def add_refs(paths: Iterable[str]):
+    """Увеличивает счетчики ссылок файлов (пути вне хранилища пропускаются)"""
+    _change_refs(Counter(path for path in paths if path))
+
+
+def release_refs(paths: Iterable[str]):
+    """Уменьшает счетчики ссылок файлов"""
+    _change_refs(Counter({path: -count for path, count in Counter(paths).items() if path}))
+
+
+def _current_names(instance) -> dict:
+    # Через __dict__: отложенные (.only/.defer) поля не загружаются
+    return {
+        field: _file_name(instance.__dict__[field])
+        for field in TRACKED_FIELDS.get(instance._meta.label, ())
+        if field in instance.__dict__
+    }
+
+
+def _reference_delta(instance, created=False, update_fields=None) -> Counter:
+    old = {} if created else getattr(instance, '_media_refs', {})
+    new = _current_names(instance)
+    delta = Counter()
+    for field, name in new.items():
+        if update_fields is not None and field not in update_fields:
+            continue
+        if not created and field not in old:
+            # Поле не было загружено: прежнее значение неизвестно, поправит recount()
+            continue
+        before = old.get(field, '')
+        if before != name:
+            delta[before] -= 1
+            delta[name] += 1
+    instance._media_refs = {**getattr(instance, '_media_refs', {}), **new}
+    return delta
+
+
+def sync_references(instances: Iterable, created: bool = False, update_fields=None):
+    """
+    Учитывает ссылки моделей, сохраненных без сигналов (bulk_create/bulk_update)
+
+    Args:
+        created: Объекты только что созданы (bulk_create)
+        update_fields: Сохраненные поля (как в bulk_update)
+    """
+    delta = Counter()
+    for instance in instances:
+        delta.update(_reference_delta(instance, created=created, update_fields=update_fields))
+    _change_refs(delta)
+
+
+def _on_init(sender, instance, **kwargs):
+    instance._media_refs = _current_names(instance)
+
+
+def _on_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    _change_refs(_reference_delta(instance, created=created, update_fields=update_fields))
+
+
+def _on_delete(sender, instance, **kwargs):
+    names = {**_current_names(instance), **getattr(instance, '_media_refs', {})}
+    release_refs(names.values())
+
+
+def connect_signals():
+    """Подключает учет ссылок к моделям из TRACKED_FIELDS (вызывается из cards/signals.py)"""
+    for label in TRACKED_FIELDS:
+        model = apps.get_model(label)
+        post_init.connect(_on_init, sender=model, dispatch_uid=f'media_store_init_{label}')
+        post_save.connect(_on_save, sender=model, dispatch_uid=f'media_store_save_{label}')
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f'media_store_delete_{label}')
+
+
+def recount() -> int:
+    """
+    Пересчитывает ref_count всех файлов по текущим ссылкам в БД
+
+    Returns:
+        Количество исправленных счетчиков
+    """
+    counts = Counter()
+    for label, fields in TRACKED_FIELDS.items():
+        model = apps.get_model(label)
+        for field in fields:
+            rows = (
+                model.objects.exclude(**{f'{field}__isnull': True})
+                .exclude(**{field: ''})
+                .order_by()
+                .values(field)
+                .annotate(n=Count('pk'))
+                .values_list(field, 'n')
+            )
+            counts.update(dict(rows))
+
+    _ensure_blobs(counts)
+    changed = []
+    for blob in MediaBlob.objects.only('id', 'path', 'ref_count').iterator(chunk_size=2000):
+        actual = counts.get(blob.path, 0)
+        if blob.ref_count != actual:
+            blob.ref_count = actual
+            changed.append(blob)
+    MediaBlob.objects.bulk_update(changed, ['ref_count'], batch_size=500)
+    return len(changed)
+
+
+# ---------- Сборка мусора ----------
+
+def _referenced_paths(paths: list[str]) -> set[str]:
+    """Пути из списка, на которые ссылается любой FileField любой модели"""
+    referenced = set()
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                referenced.update(
+                    model.objects.filter(**{f'{field.name}__in': paths})
+                    .values_list(field.name, flat=True)
+                )
+    return referenced
+
+
+def _is_fresh(file_path: Path, cutoff) -> bool:
+    """Файл записан или переиспользован позже cutoff (ссылку на него могут еще не сохранить)"""
+    try:
+        mtime = file_path.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return mtime > cutoff.timestamp()
+
+
+def _orphan_files(media_root: Path, cutoff):
+    """Файлы хранилища без строки MediaBlob (записаны, но ссылка так и не появилась)"""
+    for file_path in media_root.glob('*/??/*'):
+        relative_path = file_path.relative_to(media_root).as_posix()
+        if parse_blob_path(relative_path) and not _is_fresh(file_path, cutoff):
+            yield relative_path
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def collect_garbage(grace: timedelta = GC_GRACE_PERIOD, dry_run: bool = False) -> dict:
+    """
+    Удаляет файлы без ссылок
+
+    Кандидаты — строки с ref_count <= 0 без изменений дольше grace и файлы
+    хранилища, для которых строка так и не появилась. Файл, записанный
+    или переиспользованный позже grace, или на который все же ссылается
+    какая-либо модель, не удаляется. Строка блокируется и перепроверяется;
+    файл удаляется после коммита.
+
+    Returns:
+        dict с deleted (количество файлов) и freed_bytes
+    """
+    cutoff = timezone.now() - grace
+    candidates = MediaBlob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff).order_by('id')
+    media_root = Path(settings.MEDIA_ROOT)
+    stats = {'deleted': 0, 'freed_bytes': 0}
+    removed = set()
+
+    last_id = 0
+    while True:
+        chunk = list(candidates.filter(id__gt=last_id).values_list('id', 'path')[:GC_CHUNK])
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        referenced = _referenced_paths([path for _, path in chunk])
+        ids = [blob_id for blob_id, path in chunk if path not in referenced]
+
+        with transaction.atomic():
+            blobs = [
+                blob for blob in (
+                    candidates.select_for_update(skip_locked=True)
+                    .filter(id__in=ids)
+                    .only('id', 'path', 'size_bytes')
+                )
+                if not _is_fresh(media_root / blob.path, cutoff)
+            ]
+            stats['deleted'] += len(blobs)
+            stats['freed_bytes'] += sum(blob.size_bytes for blob in blobs)
+            removed.update(blob.path for blob in blobs)
+            if dry_run or not blobs:
+                continue
+            MediaBlob.objects.filter(id__in=[blob.id for blob in blobs]).delete()
+            paths = [media_root / blob.path for blob in blobs]
+            transaction.on_commit(lambda paths=paths: [path.unlink(missing_ok=True) for path in paths])
+
+    for chunk in _chunks(_orphan_files(media_root, cutoff), GC_CHUNK):
+        known = set(MediaBlob.objects.filter(path__in=chunk).values_list('path', flat=True))
+        candidates_paths = [path for path in chunk if path not in known and path not in removed]
+        referenced = _referenced_paths(candidates_paths)
+        for path in candidates_paths:
+            if path in referenced:
+                continue
+            file_path = media_root / path
+            stats['deleted'] += 1
+            stats['freed_bytes'] += file_path.stat().st_size
+            if not dry_run:
+                file_path.unlink(missing_ok=True)
+
+    if stats['deleted'] and not dry_run:
+        logger.info(f"[Media GC] Удалено файлов: {stats['deleted']}, освобождено байт: {stats['freed_bytes']}")
+    return stats
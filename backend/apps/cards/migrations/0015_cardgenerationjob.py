@@ -0,0 +1,45 @@
+# Generated by Django 4.2.17 on 2026-10-17 05:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('literary_context', '0004_add_deck_context_job'),
+        ('cards', '0014_alter_deck_source_lang_alter_deck_target_lang'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CardGenerationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('deck_name', models.CharField(max_length=200, verbose_name='Название колоды')),
+                ('words_data', models.JSONField(default=list, help_text='[{word_id, original_word, translation, audio_file, image_file}]', verbose_name='Данные слов')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('completed', 'Готово'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('stage', models.CharField(choices=[('queued', 'В очереди'), ('context', 'Литературный контекст'), ('packaging', 'Сборка .apkg'), ('anki_import', 'Импорт в Anki'), ('done', 'Готово')], default='queued', max_length=20, verbose_name='Этап')),
+                ('progress', models.IntegerField(default=0, help_text='0-100 процентов', verbose_name='Прогресс')),
+                ('current_word', models.CharField(blank=True, default='', max_length=200, verbose_name='Текущее слово')),
+                ('result', models.JSONField(blank=True, default=dict, help_text='file_id, download_url, cards_count, ... после завершения', verbose_name='Результат')),
+                ('error_message', models.TextField(blank=True, default='', verbose_name='Ошибка')),
+                ('attempts', models.IntegerField(default=0, verbose_name='Попытки')),
+                ('heartbeat_at', models.DateTimeField(blank=True, help_text='Обновляется воркером; без обновлений задача считается брошенной', null=True, verbose_name='Последний heartbeat')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('deck', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generation_jobs', to='cards.deck', verbose_name='Колода')),
+                ('literary_source', models.ForeignKey(blank=True, help_text='Если указан — слова обогащаются литературным контекстом', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generation_jobs', to='literary_context.literarysource', verbose_name='Литературный источник')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='generation_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Задача генерации карточек',
+                'verbose_name_plural': 'Задачи генерации карточек',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='cards_cardg_status_40ab68_idx')],
+            },
+        ),
+    ]
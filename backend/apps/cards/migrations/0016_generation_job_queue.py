@@ -0,0 +1,44 @@
+# Generated by Django 4.2.17 on 2026-10-17 05:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cards', '0015_cardgenerationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cardgenerationjob',
+            name='available_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Not claimed before this time (retry backoff)'),
+        ),
+        migrations.AlterField(
+            model_name='cardgenerationjob',
+            name='attempts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='cardgenerationjob',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='cardgenerationjob',
+            name='error_message',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AlterField(
+            model_name='cardgenerationjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Touched by the worker while the job runs', null=True),
+        ),
+        migrations.AlterField(
+            model_name='cardgenerationjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
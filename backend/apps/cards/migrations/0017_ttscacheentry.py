@@ -0,0 +1,34 @@
+# Generated by Django 4.2.17 on 2026-10-17 05:46
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cards', '0016_generation_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TTSCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='SHA-256 нормализованных (provider, voice, language, text)', max_length=64, unique=True, verbose_name='Ключ')),
+                ('provider', models.CharField(max_length=50, verbose_name='Провайдер')),
+                ('voice', models.CharField(blank=True, default='', max_length=100, verbose_name='Голос')),
+                ('language', models.CharField(max_length=10, verbose_name='Язык')),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('file_path', models.CharField(help_text='Путь относительно MEDIA_ROOT', max_length=255, verbose_name='Файл')),
+                ('size_bytes', models.PositiveIntegerField(default=0, verbose_name='Размер (байт)')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Попадания')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Последнее использование')),
+            ],
+            options={
+                'verbose_name': 'Кэш синтеза речи',
+                'verbose_name_plural': 'Кэш синтеза речи',
+            },
+        ),
+    ]
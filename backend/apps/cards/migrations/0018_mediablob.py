@@ -0,0 +1,30 @@
+# Generated by Django 4.2.17 on 2026-10-17 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cards', '0017_ttscacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('path', models.CharField(help_text='Путь относительно MEDIA_ROOT', max_length=255, unique=True, verbose_name='Файл')),
+                ('size_bytes', models.PositiveBigIntegerField(default=0, verbose_name='Размер (байт)')),
+                ('ref_count', models.IntegerField(default=0, verbose_name='Ссылки')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Последнее сохранение или изменение ссылок; сборка мусора ждет grace-период', verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Медиафайл',
+                'verbose_name_plural': 'Медиафайлы',
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='cards_media_ref_cou_cde720_idx')],
+            },
+        ),
+    ]
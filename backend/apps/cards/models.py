@@ -5,6 +5,7 @@ from django.utils import timezone
 import uuid
 
 from apps.core.constants import LANGUAGE_CHOICES, CARD_TYPE_CHOICES
+from apps.core.jobs import QueuedJob
 
 
 class GeneratedDeck(models.Model):
@@ -45,6 +46,107 @@ class GeneratedDeck(models.Model):
         return f"{self.deck_name} ({self.user.username})"
 
 
+GENERATION_JOB_STATUS_CHOICES = [
+    ('pending', 'В очереди'),
+    ('running', 'Выполняется'),
+    ('completed', 'Готово'),
+    ('failed', 'Ошибка'),
+]
+
+GENERATION_JOB_STAGE_CHOICES = [
+    ('queued', 'В очереди'),
+    ('context', 'Литературный контекст'),
+    ('packaging', 'Сборка .apkg'),
+    ('anki_import', 'Импорт в Anki'),
+    ('done', 'Готово'),
+]
+
+
+class CardGenerationJob(QueuedJob):
+    """
+    Фоновая генерация колоды .apkg.
+    
+    Слова, карточки и колода создаются сразу в запросе; литературный
+    контекст, сборка .apkg и импорт в Anki выполняются воркером
+    (manage.py run_workers, обработчик в apps/cards/tasks.py). Очередь,
+    повторы и heartbeat — apps.core.jobs.QueuedJob.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='generation_jobs',
+        verbose_name='Пользователь'
+    )
+    deck = models.ForeignKey(
+        'Deck',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='generation_jobs',
+        verbose_name='Колода'
+    )
+    literary_source = models.ForeignKey(
+        'literary_context.LiterarySource',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='generation_jobs',
+        verbose_name='Литературный источник',
+        help_text='Если указан — слова обогащаются литературным контекстом'
+    )
+    deck_name = models.CharField(
+        max_length=200,
+        verbose_name='Название колоды'
+    )
+    words_data = models.JSONField(
+        default=list,
+        verbose_name='Данные слов',
+        help_text='[{word_id, original_word, translation, audio_file, image_file}]'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=GENERATION_JOB_STATUS_CHOICES,
+        default='pending',
+        verbose_name='Статус'
+    )
+    stage = models.CharField(
+        max_length=20,
+        choices=GENERATION_JOB_STAGE_CHOICES,
+        default='queued',
+        verbose_name='Этап'
+    )
+    progress = models.IntegerField(
+        default=0,
+        verbose_name='Прогресс',
+        help_text='0-100 процентов'
+    )
+    current_word = models.CharField(
+        max_length=200,
+        blank=True,
+        default='',
+        verbose_name='Текущее слово'
+    )
+    result = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Результат',
+        help_text='file_id, download_url, cards_count, ... после завершения'
+    )
+    
+    class Meta:
+        verbose_name = 'Задача генерации карточек'
+        verbose_name_plural = 'Задачи генерации карточек'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.deck_name} [{self.status}] ({self.user.username})"
+
+
 class UserPrompt(models.Model):
     """Модель для хранения пользовательских промптов"""
     
@@ -158,6 +260,122 @@ class PartOfSpeechCache(models.Model):
         return f"{self.word} ({self.language}): {self.part_of_speech}{article_str}"
 
 
+class TTSCacheEntry(models.Model):
+    """
+    Кэш синтеза речи: один аудиофайл на нормализованный
+    (текст, язык, голос, провайдер), общий для всех пользователей.
+    
+    Используется аудио слов, аудио подсказок и литературным аудио
+    (apps/cards/tts_cache.py). Записи, на файлы которых не ссылаются
+    слова и литературный контекст, вытесняются по давности использования,
+    когда кэш превышает settings.TTS_CACHE_MAX_BYTES.
+    """
+    
+    key = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='Ключ',
+        help_text='SHA-256 нормализованных (provider, voice, language, text)'
+    )
+    provider = models.CharField(
+        max_length=50,
+        verbose_name='Провайдер'
+    )
+    voice = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        verbose_name='Голос'
+    )
+    language = models.CharField(
+        max_length=10,
+        verbose_name='Язык'
+    )
+    text = models.TextField(
+        verbose_name='Текст'
+    )
+    file_path = models.CharField(
+        max_length=255,
+        verbose_name='Файл',
+        help_text='Путь относительно MEDIA_ROOT'
+    )
+    size_bytes = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Размер (байт)'
+    )
+    hits = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Попадания'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    last_used_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name='Последнее использование'
+    )
+    
+    class Meta:
+        verbose_name = 'Кэш синтеза речи'
+        verbose_name_plural = 'Кэш синтеза речи'
+    
+    def __str__(self):
+        return f"{self.text[:50]} ({self.language}, {self.provider}/{self.voice})"
+
+
+class MediaBlob(models.Model):
+    """
+    Медиафайл в контентно-адресуемом хранилище (apps/cards/media_store.py).
+    
+    Файл называется SHA-256 своего содержимого, поэтому одинаковые
+    загрузки и результаты генерации хранятся один раз. ref_count — число
+    ссылок из Word, SceneAnchor, WordContextMedia и обложек колод
+    (строка создается при первой ссылке на файл);
+    файлы без ссылок удаляет manage.py collect_media_garbage.
+    """
+    
+    sha256 = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='SHA-256'
+    )
+    path = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Файл',
+        help_text='Путь относительно MEDIA_ROOT'
+    )
+    size_bytes = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Размер (байт)'
+    )
+    ref_count = models.IntegerField(
+        default=0,
+        verbose_name='Ссылки'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата обновления',
+        help_text='Последнее сохранение или изменение ссылок; сборка мусора ждет grace-период'
+    )
+    
+    class Meta:
+        verbose_name = 'Медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.path} (ссылок: {self.ref_count})"
+
+
 class Deck(models.Model):
     """Модель колоды карточек"""
 
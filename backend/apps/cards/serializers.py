@@ -183,6 +183,56 @@ class ImageGenerationSerializer(serializers.Serializer):
     )
 
 
+class ImageBatchItemSerializer(serializers.Serializer):
+    """Слово для пакетной генерации изображений"""
+    
+    word = serializers.CharField(required=True, max_length=200)
+    translation = serializers.CharField(required=True, max_length=200)
+    language = serializers.ChoiceField(
+        choices=LANGUAGE_CHOICES,
+        required=True
+    )
+    word_id = serializers.IntegerField(
+        required=False,
+        help_text="ID слова (опционально, для обновления существующего слова)"
+    )
+
+
+class ImageBatchGenerationSerializer(serializers.Serializer):
+    """Сериализатор для пакетной генерации изображений (параллельно, одним запросом)"""
+    
+    words = serializers.ListField(
+        child=ImageBatchItemSerializer(),
+        required=True,
+        min_length=1,
+        max_length=50,
+        help_text="Список слов для генерации изображений"
+    )
+    image_style = serializers.ChoiceField(
+        choices=[('minimalistic', 'Минималистичный'), ('balanced', 'Сбалансированный'), ('creative', 'Творческий')],
+        required=False,
+        default='balanced',
+        help_text="Стиль генерации изображения"
+    )
+    provider = serializers.ChoiceField(
+        choices=[('auto', 'Авто (из настроек)'), ('openai', 'OpenAI DALL-E 3'), ('gemini', 'Google Gemini')],
+        required=False,
+        allow_null=True,
+        allow_blank=True,
+        help_text="Провайдер для генерации изображения (auto = из настроек пользователя)"
+    )
+    gemini_model = serializers.ChoiceField(
+        choices=[
+            ('gemini-2.5-flash-image', 'Gemini Flash (быстрая, 0.5 токена)'),
+            ('gemini-3.1-flash-image-preview', 'NanoBanana-2 (новая, 1 токен)')
+        ],
+        required=False,
+        allow_null=True,
+        allow_blank=True,
+        help_text="Модель Gemini для генерации (по умолчанию берется из настроек пользователя)"
+    )
+
+
 class AudioGenerationSerializer(serializers.Serializer):
     """Сериализатор для генерации аудио через OpenAI TTS или gTTS"""
     
@@ -751,7 +801,15 @@ class CardSerializer(serializers.ModelSerializer):
 
 
 class CardListSerializer(serializers.ModelSerializer):
-    """Сокращённое представление для списков"""
+    """
+    Сокращённое представление для списков.
+    
+    Необязательные аргументы:
+    - fields: имена полей для ответа (sparse fieldset), остальные отбрасываются
+    - compact: без URL медиа (MEDIA_FIELDS)
+    """
+    
+    MEDIA_FIELDS = ('image_file', 'audio_file')
     
     word_id = serializers.IntegerField(source='word.id', read_only=True)
     word_text = serializers.CharField(source='word.original_word', read_only=True)
@@ -780,6 +838,14 @@ class CardListSerializer(serializers.ModelSerializer):
             'is_due',
         ]
     
+    def __init__(self, *args, fields=None, compact=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        dropped = set(self.MEDIA_FIELDS) if compact else set()
+        if fields is not None:
+            dropped |= set(self.fields) - set(fields)
+        for name in dropped:
+            self.fields.pop(name, None)
+    
     def get_image_file(self, obj):
         """Возвращает полный URL изображения слова"""
         if obj.word and obj.word.image_file:
@@ -4,17 +4,49 @@ Deck service: CRUD, merge, word management, invert, empty cards.
 import logging
 
 from django.db import transaction
+from django.utils import timezone
 
+from apps.core import user_cache
 from apps.words.models import Word
+from apps.words.search import build_search_text
+from apps.words.utils import bulk_get_or_create_words, schedule_word_status_update
+from apps.cards import media_store
 from apps.cards.models import Deck, Card
 
 logger = logging.getLogger(__name__)
 
 
+def _media_name(url: str) -> str:
+    """Относительный путь файла в MEDIA_ROOT из URL /media/..."""
+    return url.replace('/media/', '') if url.startswith('/media/') else url
+
+
+def _ensure_normal_cards(user, words) -> None:
+    """Create missing normal cards for the given words with one bulk_create."""
+    word_ids = {word.id for word in words}
+    with_card = set(
+        Card.objects.filter(word_id__in=word_ids, card_type='normal').values_list('word_id', flat=True)
+    )
+    missing = [word for word in {word.id: word for word in words}.values() if word.id not in with_card]
+    if missing:
+        Card.objects.bulk_create([
+            Card(user=user, word=word, card_type='normal', ease_factor=2.5,
+                 is_in_learning_mode=True, is_auxiliary=False)
+            for word in missing
+        ])
+        schedule_word_status_update([word.id for word in missing])
+
+
+@transaction.atomic
 def add_words_to_deck(user, deck: Deck, words_data: list[dict]) -> tuple[list[int], list[dict]]:
     """
     Add words to a deck. Supports existing word_id or creating new words.
 
+    Works in a fixed number of queries regardless of the number of words:
+    one lookup for word ids, bulk get-or-create for new words, one
+    bulk_update for changed existing words, one bulk_create for missing
+    cards and one m2m insert.
+
     Args:
         user: The requesting user.
         deck: The Deck instance.
@@ -25,62 +57,82 @@ def add_words_to_deck(user, deck: Deck, words_data: list[dict]) -> tuple[list[in
     """
     from apps.cards.serializers import DeckWordAddSerializer
 
-    added_words = []
     errors = []
+    by_id = []
+    to_create = []
 
     for word_data in words_data:
         serializer = DeckWordAddSerializer(data=word_data)
         if not serializer.is_valid():
             errors.append(serializer.errors)
             continue
-
-        word_id = serializer.validated_data.get('word_id')
-
-        if word_id:
-            try:
-                word = Word.objects.get(id=word_id, user=user)
-                if word not in deck.words.all():
-                    deck.words.add(word)
-                    added_words.append(word.id)
-                # Ensure Card exists (signal only fires on Word creation)
-                Card.create_from_word(word, 'normal')
-            except Word.DoesNotExist:
-                errors.append({'word_id': f'Word with ID {word_id} not found'})
+        if serializer.validated_data.get('word_id'):
+            by_id.append(serializer.validated_data)
         else:
-            original_word = serializer.validated_data['original_word']
-            translation = serializer.validated_data['translation']
-            language = serializer.validated_data['language']
-            image_url = serializer.validated_data.get('image_url', '')
-            audio_url = serializer.validated_data.get('audio_url', '')
-
-            word, created = Word.objects.get_or_create(
-                user=user,
-                original_word=original_word,
-                language=language,
-                defaults={'translation': translation},
-            )
-
-            if not created:
-                word.translation = translation
+            to_create.append(serializer.validated_data)
 
-            if image_url:
-                relative_path = image_url.replace('/media/', '') if image_url.startswith('/media/') else image_url
-                word.image_file.name = relative_path
+    words = []
 
-            if audio_url:
-                relative_path = audio_url.replace('/media/', '') if audio_url.startswith('/media/') else audio_url
-                word.audio_file.name = relative_path
-
-            word.save()
+    found = Word.objects.filter(
+        user=user, id__in=[data['word_id'] for data in by_id]
+    ).in_bulk()
+    for data in by_id:
+        word = found.get(data['word_id'])
+        if word is None:
+            errors.append({'word_id': f'Word with ID {data["word_id"]} not found'})
+        else:
+            words.append(word)
+
+    items = []
+    for data in to_create:
+        item = {
+            'original_word': data['original_word'],
+            'language': data['language'],
+            'translation': data['translation'],
+        }
+        if data.get('image_url'):
+            item['image_file'] = _media_name(data['image_url'])
+        if data.get('audio_url'):
+            item['audio_file'] = _media_name(data['audio_url'])
+        items.append(item)
+
+    changed = []
+    for data, (word, created) in zip(to_create, bulk_get_or_create_words(user, items)):
+        if not created:
+            word.translation = data['translation']
+            if data.get('image_url'):
+                word.image_file.name = _media_name(data['image_url'])
+            if data.get('audio_url'):
+                word.audio_file.name = _media_name(data['audio_url'])
+            changed.append(word)
+        words.append(word)
+
+    if changed:
+        # bulk_update не обновляет auto_now и search_text
+        now = timezone.now()
+        for word in changed:
+            word.search_text = build_search_text(word)
+            word.updated_at = now
+        changed = list({word.id: word for word in changed}.values())
+        Word.objects.bulk_update(
+            changed,
+            ['translation', 'image_file', 'audio_file', 'search_text', 'updated_at'],
+        )
+        media_store.sync_references(changed, update_fields=['image_file', 'audio_file'])
+        user_cache.bump_version(user.id)
 
-            # Ensure Card exists (signal only fires on Word creation)
-            Card.create_from_word(word, 'normal')
+    # Ensure Card exists (signal only fires on Word creation)
+    _ensure_normal_cards(user, words)
 
-            if word not in deck.words.all():
-                deck.words.add(word)
-                added_words.append(word.id)
+    in_deck = set(deck.words.filter(id__in=[word.id for word in words]).values_list('id', flat=True))
+    added_words = []
+    for word in words:
+        if word.id not in in_deck:
+            in_deck.add(word.id)
+            added_words.append(word.id)
 
     if added_words:
+        deck.words.add(*added_words)
         deck.save()
 
     return added_words, errors
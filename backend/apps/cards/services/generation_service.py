@@ -8,8 +8,10 @@ from pathlib import Path
 from django.conf import settings
 from django.db import transaction
 
+from apps.core import user_cache
 from apps.words.models import Word
-from apps.cards.models import GeneratedDeck, Deck, Card
+from apps.cards import media_store
+from apps.cards.models import CardGenerationJob, GeneratedDeck, Deck
 from apps.cards.utils import generate_apkg
 from apps.cards.llm_utils import (
     translate_words,
@@ -33,13 +35,22 @@ def _find_translation(word: str, translations: dict) -> str:
     return translation
 
 
+# Job progress (percent) reached at the end of the context and packaging stages
+CONTEXT_PROGRESS = 80
+PACKAGING_PROGRESS = 95
+
+
 @transaction.atomic
-def generate_cards(user, words_list: list[str], language: str,
-                   translations: dict, audio_files: dict, image_files: dict,
-                   deck_name: str, image_style: str = 'balanced',
-                   save_to_decks: bool = True) -> dict:
+def create_generation_job(user, words_list: list[str], language: str,
+                          translations: dict, audio_files: dict, image_files: dict,
+                          deck_name: str, save_to_decks: bool = True) -> CardGenerationJob:
     """
-    Generate Anki cards: create/update Words, generate .apkg, optionally save as Deck.
+    Fast part of card generation, done inside the request: create/update Words,
+    attach media, optionally save the Deck with normal cards, and queue a
+    CardGenerationJob for the slow part (run_generation_job).
+
+    Query count does not depend on the number of words, except for words whose
+    translation changes.
 
     Args:
         user: The requesting user.
@@ -49,31 +60,29 @@ def generate_cards(user, words_list: list[str], language: str,
         audio_files: Dict of {word: audio_path_string}.
         image_files: Dict of {word: image_path_string}.
         deck_name: Name for the deck.
-        image_style: Image style preset.
         save_to_decks: Whether to save as a Deck in the app.
 
     Returns:
-        Dict with file_id, download_url, deck_name, cards_count, deck_id (optional).
+        The pending CardGenerationJob.
     """
-    words_data = []
-    media_files = []
-
-    for word in words_list:
-        translation = _find_translation(word, translations)
+    from apps.words.utils import bulk_get_or_create_words
+    from .deck_service import _ensure_normal_cards
 
-        # Get or create Word in DB
-        word_obj, created = Word.objects.get_or_create(
-            user=user,
-            original_word=word,
-            language=language,
-            defaults={'translation': translation},
-        )
+    word_translations = [(word, _find_translation(word, translations)) for word in words_list]
+    results = bulk_get_or_create_words(user, [
+        {'original_word': word, 'language': language, 'translation': translation}
+        for word, translation in word_translations
+    ])
 
+    words_data = []
+    with_new_media = {}
+    for (word, translation), (word_obj, created) in zip(word_translations, results):
         if not created and word_obj.translation != translation:
             word_obj.translation = translation
             word_obj.save(update_fields=['translation'])
 
         word_data = {
+            'word_id': word_obj.id,
             'original_word': word,
             'translation': translation,
         }
@@ -83,129 +92,207 @@ def generate_cards(user, words_list: list[str], language: str,
             word, audio_files, word_obj, 'audio')
         if audio_path:
             word_data['audio_file'] = str(audio_path)
-            if str(audio_path) not in media_files:
-                media_files.append(str(audio_path))
             if is_new_audio:
                 word_obj.audio_file = get_relative_media_path(audio_path)
-                word_obj.save(update_fields=['audio_file'])
+                with_new_media[word_obj.id] = word_obj
 
         # Resolve image
         image_path, is_new_image = resolve_word_media(
             word, image_files, word_obj, 'images')
         if image_path:
             word_data['image_file'] = str(image_path)
-            if str(image_path) not in media_files:
-                media_files.append(str(image_path))
             if is_new_image:
                 word_obj.image_file = get_relative_media_path(image_path)
-                word_obj.save(update_fields=['image_file'])
+                with_new_media[word_obj.id] = word_obj
 
         words_data.append(word_data)
 
-    # Literary context enrichment (if user has active literary source)
+    if with_new_media:
+        Word.objects.bulk_update(with_new_media.values(), ['audio_file', 'image_file'])
+        # bulk_update sends no post_save: count media refs and invalidate the user cache here
+        media_store.sync_references(with_new_media.values(), update_fields=['audio_file', 'image_file'])
+        user_cache.bump_version(user.id)
+
     literary_source = getattr(user, 'active_literary_source', None)
-    if literary_source and save_to_decks:
-        try:
-            from apps.literary_context.generation import generate_batch_context
-            from apps.literary_context.models import WordContextMedia
-
-            # Use already-created word objects (in same transaction)
-            word_obj_list = [
-                Word.objects.get(user=user, original_word=w, language=language)
-                for w in words_list
-            ]
-
-            # Generate context for all words (skips existing)
-            logger.info(
-                f"Generating literary context for {len(word_obj_list)} words "
-                f"from source '{literary_source}'"
-            )
-            generate_batch_context(word_obj_list, literary_source, skip_existing=True, user=user)
-
-            # Collect results into a lookup map
-            context_qs = WordContextMedia.objects.filter(
-                word__in=word_obj_list, source=literary_source
-            ).select_related('word')
-            literary_context_map = {}
-            for ctx in context_qs:
-                sentences = ctx.sentences or []
-                first_sentence = sentences[0]['text'] if sentences else ''
-                literary_context_map[ctx.word.original_word] = {
-                    'hint': ctx.hint_text or '',
-                    'sentence': first_sentence,
-                }
-
-            # Enrich word_data with literary context
-            for wd in words_data:
-                w_key = wd['original_word']
-                ctx_data = literary_context_map.get(w_key, {})
-                wd['hint'] = ctx_data.get('hint', '')
-                wd['example_sentence'] = ctx_data.get('sentence', '')
-
-            logger.info(
-                f"Literary context enriched {len(literary_context_map)}/{len(words_list)} words"
-            )
-        except Exception as e:
-            logger.error(f"Literary context enrichment failed (non-critical): {e}", exc_info=True)
+    deck = None
+    if save_to_decks:
+        deck = Deck.objects.create(
+            user=user,
+            name=deck_name,
+            target_lang=language,
+            source_lang=getattr(user, 'native_language', 'ru') or 'ru',
+            literary_source=literary_source,
+            is_learning_active=True,
+        )
+        word_objects = list({word_obj.id: word_obj for word_obj, _ in results}.values())
+        deck.words.add(*word_objects)
+
+        # Ensure every word has a normal Card (words may already exist
+        # from bulk-create or previous decks)
+        _ensure_normal_cards(user, word_objects)
+
+    return CardGenerationJob.objects.create(
+        user=user,
+        deck=deck,
+        literary_source=literary_source if save_to_decks else None,
+        deck_name=deck_name,
+        words_data=words_data,
+    )
+
+
+def _enrich_with_literary_context(job: CardGenerationJob, words_data: list[dict],
+                                  on_progress=None) -> None:
+    """Add hint/example_sentence from the job's literary source to words_data (non-critical)."""
+    try:
+        from apps.literary_context.generation import generate_batch_context
+        from apps.literary_context.models import WordContextMedia
+
+        source = job.literary_source
+        word_ids = {wd['word_id'] for wd in words_data}
+        word_obj_list = list(Word.objects.filter(id__in=word_ids))
+
+        # Generate context for all words (skips existing)
+        logger.info(
+            f"Generating literary context for {len(word_obj_list)} words "
+            f"from source '{source}'"
+        )
+        generate_batch_context(
+            word_obj_list, source, skip_existing=True, user=job.user,
+            on_progress=on_progress,
+        )
+
+        # Collect results into a lookup map
+        literary_context_map = {}
+        for ctx in WordContextMedia.objects.filter(word_id__in=word_ids, source=source):
+            sentences = ctx.sentences or []
+            literary_context_map[ctx.word_id] = {
+                'hint': ctx.hint_text or '',
+                'sentence': sentences[0]['text'] if sentences else '',
+            }
+
+        # Enrich word_data with literary context
+        for wd in words_data:
+            ctx_data = literary_context_map.get(wd['word_id'], {})
+            wd['hint'] = ctx_data.get('hint', '')
+            wd['example_sentence'] = ctx_data.get('sentence', '')
+
+        logger.info(
+            f"Literary context enriched {len(literary_context_map)}/{len(words_data)} words"
+        )
+    except Exception as e:
+        logger.error(f"Literary context enrichment failed (non-critical): {e}", exc_info=True)
+
+
+def _noop_progress(stage, progress, current_word=''):
+    pass
+
+
+def build_generation_package(job: CardGenerationJob, on_progress=_noop_progress) -> dict:
+    """
+    Slow part of card generation: literary context enrichment, .apkg writing
+    and Anki collection import. Runs outside a DB transaction.
+
+    Safe to repeat for the same job: context generation skips existing
+    media and the GeneratedDeck (id = job id) is overwritten.
+
+    Args:
+        job: The CardGenerationJob.
+        on_progress: Callback(stage, progress_percent, current_word).
+
+    Returns:
+        Dict with file_id, download_url, deck_name, cards_count, deck_id (optional).
+    """
+    words_data = [dict(wd) for wd in job.words_data]
+
+    if job.literary_source_id:
+        on_progress('context', 0)
+
+        def context_progress(current, total, word_text):
+            on_progress('context', int(current / total * CONTEXT_PROGRESS) if total else 0, word_text)
+
+        _enrich_with_literary_context(job, words_data, on_progress=context_progress)
+
+    on_progress('packaging', CONTEXT_PROGRESS if job.literary_source_id else 0)
+    media_files = []
+    for wd in words_data:
+        for key in ('audio_file', 'image_file'):
+            if wd.get(key) and wd[key] not in media_files:
+                media_files.append(wd[key])
 
     # Generate .apkg file
-    file_id = uuid.uuid4()
+    file_id = job.id
     temp_dir = Path(settings.MEDIA_ROOT) / 'temp_files'
     temp_dir.mkdir(parents=True, exist_ok=True)
     output_path = temp_dir / f"{file_id}.apkg"
 
     generate_apkg(
-        words_data=words_data,
-        deck_name=deck_name,
+        words_data=[
+            {key: value for key, value in wd.items() if key != 'word_id'}
+            for wd in words_data
+        ],
+        deck_name=job.deck_name,
         media_files=media_files if media_files else None,
         output_path=output_path,
     )
 
-    generated_deck = GeneratedDeck.objects.create(
+    generated_deck, _ = GeneratedDeck.objects.update_or_create(
         id=file_id,
-        user=user,
-        deck_name=deck_name,
-        file_path=str(output_path),
-        cards_count=len(words_data) * 2,
+        defaults={
+            'user': job.user,
+            'deck_name': job.deck_name,
+            'file_path': str(output_path),
+            'cards_count': len(words_data) * 2,
+        },
     )
 
     # Try anki sync import (non-critical)
+    on_progress('anki_import', PACKAGING_PROGRESS)
     try:
         from apps.anki_sync.utils import import_apkg_to_anki_collection
-        import_apkg_to_anki_collection(user=user, apkg_path=output_path)
+        import_apkg_to_anki_collection(user=job.user, apkg_path=output_path)
     except Exception as e:
         logger.warning(f"Anki sync import failed: {e}")
 
-    response_data = {
-        'file_id': file_id,
+    result = {
+        'file_id': str(file_id),
         'download_url': f'/api/cards/download/{file_id}/',
-        'deck_name': deck_name,
+        'deck_name': job.deck_name,
         'cards_count': generated_deck.cards_count,
     }
+    if job.deck_id:
+        result['deck_id'] = job.deck_id
+        result['deck_url'] = f'/decks/{job.deck_id}'
+    return result
 
-    # Save to "My Decks"
-    if save_to_decks:
-        deck = Deck.objects.create(
-            user=user,
-            name=deck_name,
-            target_lang=language,
-            source_lang=getattr(user, 'native_language', 'ru') or 'ru',
-            literary_source=getattr(user, 'active_literary_source', None),
-            is_learning_active=True,
-        )
-        word_objects = Word.objects.filter(
-            user=user, original_word__in=words_list, language=language)
-        deck.words.set(word_objects)
 
-        # Ensure every word has a normal Card (signal only fires on create,
-        # but words may already exist from bulk-create or previous decks)
-        for word_obj in word_objects:
-            Card.create_from_word(word_obj, 'normal')
+def generate_cards(user, words_list: list[str], language: str,
+                   translations: dict, audio_files: dict, image_files: dict,
+                   deck_name: str, image_style: str = 'balanced',
+                   save_to_decks: bool = True) -> dict:
+    """
+    Generate Anki cards synchronously: create_generation_job + build_generation_package.
 
-        response_data['deck_id'] = deck.id
-        response_data['deck_url'] = f'/decks/{deck.id}'
+    The API queues the job instead (see apps/cards/tasks.py); this is for
+    callers that need the result in-process.
 
-    return response_data
+    Returns:
+        Dict with file_id, download_url, deck_name, cards_count, deck_id (optional).
+    """
+    job = create_generation_job(
+        user=user,
+        words_list=words_list,
+        language=language,
+        translations=translations,
+        audio_files=audio_files,
+        image_files=image_files,
+        deck_name=deck_name,
+        save_to_decks=save_to_decks,
+    )
+    result = build_generation_package(job)
+    CardGenerationJob.objects.filter(id=job.id).update(
+        status='completed', stage='done', progress=100, result=result,
+    )
+    return result
 
 
 def auto_enrich_simple_mode(user, words_list: list[str], language: str,
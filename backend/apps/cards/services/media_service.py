@@ -1,16 +1,18 @@
 """
 Media service: path normalization, file upload, image/audio generation orchestration.
 """
-import uuid
 import logging
 from pathlib import Path
 
 from django.conf import settings
 
 from apps.words.models import Word
+from apps.cards import media_store
 from apps.cards.llm_utils import (
     generate_image,
+    generate_images_batch,
     generate_audio_with_tts,
+    find_cached_audio,
     edit_image_with_gemini,
     extract_words_from_photo,
 )
@@ -20,6 +22,7 @@ from apps.cards.token_utils import (
     check_balance,
     get_image_generation_cost,
 )
+from apps.core import user_cache
 from apps.core.constants import (
     AUDIO_GENERATION_COST,
     IMAGE_GENERATION_COST,
@@ -135,27 +138,19 @@ def resolve_word_media(word_text: str, media_files_dict: dict, word_obj: Word,
 
 def save_uploaded_file(uploaded_file, subdir: str, allowed_extensions: list[str] = None) -> tuple[Path, str]:
     """
-    Save an uploaded file to MEDIA_ROOT/subdir/ with a unique name.
+    Save an uploaded file to the content-addressed media store under subdir/.
+    Re-uploading the same content returns the existing file.
 
     Returns:
-        (absolute_path, file_id)
+        (absolute_path, file_id) where file_id is the content SHA-256
     """
-    file_id = str(uuid.uuid4())
     ext = Path(uploaded_file.name).suffix.lower()
 
     if allowed_extensions and ext not in allowed_extensions:
         ext = allowed_extensions[0]
 
-    filename = f"{file_id}{ext}"
-    target_dir = Path(settings.MEDIA_ROOT) / subdir
-    target_dir.mkdir(parents=True, exist_ok=True)
-
-    file_path = target_dir / filename
-    with open(file_path, 'wb') as f:
-        for chunk in uploaded_file.chunks():
-            f.write(chunk)
-
-    return file_path, file_id
+    relative_path = media_store.save_file(uploaded_file, subdir, ext)
+    return Path(settings.MEDIA_ROOT) / relative_path, media_store.parse_blob_path(relative_path)
 
 
 def generate_image_for_word(user, word: str, translation: str, language: str,
@@ -228,6 +223,94 @@ def generate_image_for_word(user, word: str, translation: str, language: str,
         raise
 
 
+def generate_images_for_words(user, items: list[dict], image_style: str = 'balanced',
+                              provider: str = None, gemini_model: str = None) -> dict:
+    """
+    Generate images for several words concurrently (generate_images_batch).
+
+    Tokens are spent and refunded per word as in generate_image_for_word:
+    a word is charged before generation and refunded if its image fails;
+    words that cannot be paid for are not generated. All DB work stays in
+    the calling thread.
+
+    Args:
+        items: [{'word', 'translation', 'language', 'word_id' (optional)}, ...]
+
+    Returns:
+        {word: {image_url, image_id, file_path, prompt} or {'error': str}}
+    """
+    if not provider or provider == 'auto':
+        provider = getattr(user, 'image_provider', 'openai')
+    if provider == 'gemini' and not gemini_model:
+        gemini_model = getattr(user, 'gemini_model', 'gemini-2.5-flash-image')
+
+    cost = max(1, int(get_image_generation_cost(provider=provider, gemini_model=gemini_model)))
+
+    word_objs = Word.objects.filter(user=user).in_bulk(
+        [item['word_id'] for item in items if item.get('word_id')]
+    )
+    results = {}
+    charged = {}
+    for item in items:
+        word, translation = item['word'], item['translation']
+        word_obj = word_objs.get(item.get('word_id'))
+        if word_obj is not None and word_obj.card_type == 'inverted':
+            word, translation = word_obj.translation, word_obj.original_word
+        if word in charged:
+            continue
+
+        token, success = spend_tokens(user, cost,
+            description=f"Image generation for '{word}' ({provider}, model: {gemini_model or 'N/A'})")
+        if not success:
+            results[item['word']] = {'error': f'Недостаточно токенов. Требуется: {cost}'}
+            continue
+        charged[word] = {
+            'key': item['word'],
+            'translation': translation,
+            'language': item['language'],
+            'word_obj': word_obj,
+        }
+
+    generated = generate_images_batch(
+        [
+            {'word': word, 'translation': entry['translation'], 'language': entry['language']}
+            for word, entry in charged.items()
+        ],
+        user=user,
+        native_language=getattr(user, 'native_language', 'ru'),
+        image_style=image_style,
+        provider=provider,
+        gemini_model=gemini_model,
+    )
+
+    bound = []
+    for word, entry in charged.items():
+        result = generated.get(word)
+        if result is None:
+            refund_tokens(user, cost, description=f"Refund for image generation error for '{word}'")
+            results[entry['key']] = {'error': 'Image generation failed'}
+            continue
+
+        image_path, prompt = result
+        relative_path = get_relative_media_path(image_path)
+        if entry['word_obj'] is not None:
+            entry['word_obj'].image_file.name = relative_path
+            bound.append(entry['word_obj'])
+        results[entry['key']] = {
+            'image_url': get_media_url(relative_path),
+            'image_id': image_path.stem,
+            'file_path': str(image_path),
+            'prompt': prompt,
+        }
+
+    if bound:
+        Word.objects.bulk_update(bound, ['image_file'])
+        # bulk_update sends no post_save: count media refs and invalidate the user cache here
+        media_store.sync_references(bound, update_fields=['image_file'])
+        user_cache.bump_version(user.id)
+    return results
+
+
 def edit_image_for_word(user, word_id: int, mixin: str) -> dict:
     """
     Edit an existing word's image via Gemini image-to-image.
@@ -281,6 +364,15 @@ def edit_image_for_word(user, word_id: int, mixin: str) -> dict:
         raise
 
 
+def _spend_audio_tokens(user, word: str) -> None:
+    """Charge AUDIO_GENERATION_COST for OpenAI TTS or raise ValueError."""
+    token, success = spend_tokens(user, AUDIO_GENERATION_COST,
+        description=f"Audio generation for '{word}' (OpenAI TTS)")
+    if not success:
+        raise ValueError(
+            f'Недостаточно токенов. Требуется: {AUDIO_GENERATION_COST}, доступно: {token.balance}')
+
+
 def generate_audio_for_word(user, word: str, language: str,
                             word_id: int = None, provider: str = None) -> dict:
     """
@@ -296,44 +388,46 @@ def generate_audio_for_word(user, word: str, language: str,
         if not hasattr(user, 'audio_provider') or user.audio_provider == 'openai':
             provider = 'gtts'
 
-    # Check/spend tokens (only for OpenAI)
-    if provider == 'openai':
-        balance = check_balance(user)
-        if balance < AUDIO_GENERATION_COST:
-            raise ValueError(
-                f'Недостаточно токенов. Требуется: {AUDIO_GENERATION_COST}, доступно: {balance}')
-
-        token, success = spend_tokens(user, AUDIO_GENERATION_COST,
-            description=f"Audio generation for '{word}' (OpenAI TTS)")
-        if not success:
-            raise ValueError('Недостаточно токенов для генерации аудио')
+    # Only OpenAI costs tokens, and audio already in the TTS cache is free.
+    # A miss is paid before synthesis and refunded if synthesis fails or the
+    # audio turns out to be cached after all.
+    charged = provider == 'openai' and find_cached_audio(word, language, user, provider) is None
+    if charged:
+        _spend_audio_tokens(user, word)
 
     try:
-        audio_path = generate_audio_with_tts(
+        audio_path, cache_hit = generate_audio_with_tts(
             word=word, language=language, user=user, provider=provider)
-
-        relative_path = get_relative_media_path(audio_path)
-        audio_url = get_media_url(relative_path)
-
-        if word_id:
-            try:
-                word_obj = Word.objects.get(id=word_id, user=user)
-                word_obj.audio_file.name = relative_path
-                word_obj.save()
-            except Word.DoesNotExist:
-                pass
-
-        return {
-            'audio_url': audio_url,
-            'audio_id': audio_path.stem,
-            'file_path': str(audio_path),
-        }
     except Exception:
-        if provider == 'openai':
+        if charged:
             refund_tokens(user, AUDIO_GENERATION_COST,
                 description=f"Refund for audio generation error for '{word}'")
         raise
 
+    if charged and cache_hit:
+        refund_tokens(user, AUDIO_GENERATION_COST,
+            description=f"Refund for cached audio for '{word}'")
+    elif provider == 'openai' and not charged and not cache_hit:
+        # The cached file was evicted before synthesis: the call was a paid miss
+        _spend_audio_tokens(user, word)
+
+    relative_path = get_relative_media_path(audio_path)
+    audio_url = get_media_url(relative_path)
+
+    if word_id:
+        try:
+            word_obj = Word.objects.get(id=word_id, user=user)
+            word_obj.audio_file.name = relative_path
+            word_obj.save()
+        except Word.DoesNotExist:
+            pass
+
+    return {
+        'audio_url': audio_url,
+        'audio_id': audio_path.stem,
+        'file_path': str(audio_path),
+    }
+
 
 def extract_words_from_photo_service(user, image_data: bytes,
                                      target_lang: str, source_lang: str) -> list[str]:
@@ -3,6 +3,7 @@ import logging
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from apps.words.models import Word
+from . import media_store
 from .models import Card
 
 logger = logging.getLogger(__name__)
@@ -24,3 +25,7 @@ def create_card_for_new_word(sender, instance, created, **kwargs):
                 "Failed to create card for word id=%s ('%s')",
                 instance.id, instance.original_word
             )
+
+
+# Учет ссылок на файлы контентно-адресуемого хранилища
+media_store.connect_signals()
@@ -0,0 +1,33 @@
+"""
+Background job handlers of the cards app (run by manage.py run_workers).
+
+generate_cards_view only does the fast DB writes (create_generation_job)
+and returns the job id; run_generation_job builds the literary context,
+the .apkg and the Anki import, writing progress to the job row. Claiming,
+heartbeats and retries are handled by apps.core.jobs.
+"""
+from django.utils import timezone
+
+from apps.core import jobs
+from .models import CardGenerationJob
+from .services.generation_service import build_generation_package
+
+
+@jobs.handler(CardGenerationJob)
+def run_generation_job(job):
+    def on_progress(stage, progress, current_word=''):
+        CardGenerationJob.objects.filter(id=job.id).update(
+            stage=stage,
+            progress=progress,
+            current_word=current_word[:200],
+            updated_at=timezone.now(),
+        )
+
+    result = build_generation_package(job, on_progress=on_progress)
+    CardGenerationJob.objects.filter(id=job.id).update(
+        stage='done',
+        progress=100,
+        current_word='',
+        result=result,
+        updated_at=timezone.now(),
+    )
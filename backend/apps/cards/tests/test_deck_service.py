@@ -43,6 +43,34 @@ class TestAddWordsToDeck:
         assert not errors
 
 
+    def test_add_many_new_words_fixed_queries(self, user, deck, django_assert_max_num_queries):
+        words_data = [
+            {'original_word': f'Wort{i}', 'translation': f't{i}', 'language': 'de',
+             'image_url': f'/media/images/w{i}.png'}
+            for i in range(30)
+        ]
+        with django_assert_max_num_queries(20):
+            added, errors = add_words_to_deck(user, deck, words_data)
+        assert len(added) == 30
+        assert not errors
+        assert deck.words.count() == 30
+        assert Card.objects.filter(word__in=added, card_type='normal').count() == 30
+        assert Word.objects.get(original_word='Wort3').image_file.name == 'images/w3.png'
+
+    def test_existing_word_updated_and_gets_card(self, user, deck, word):
+        Card.objects.filter(word=word).delete()
+        added, errors = add_words_to_deck(user, deck, [{
+            'original_word': word.original_word,
+            'translation': 'new translation',
+            'language': word.language,
+            'audio_url': '/media/audio/new.mp3',
+        }])
+        word.refresh_from_db()
+        assert added == [word.id]
+        assert word.translation == 'new translation'
+        assert word.audio_file.name == 'audio/new.mp3'
+        assert Card.objects.filter(word=word, card_type='normal').exists()
+
 @pytest.mark.django_db
 class TestUpdateWordInDeck:
     def test_update_translation(self, user, deck, word):
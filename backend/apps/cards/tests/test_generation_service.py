@@ -5,9 +5,16 @@ from unittest.mock import patch, MagicMock
 
 from django.conf import settings
 
+from datetime import timedelta
+
+from django.utils import timezone
+
 from apps.words.models import Word
-from apps.cards.models import Deck, GeneratedDeck
+from apps.cards.models import CardGenerationJob, Deck, GeneratedDeck
+from apps.cards.tasks import run_generation_job
+from apps.core import jobs
 from apps.cards.services.generation_service import (
+    create_generation_job,
     generate_cards,
     auto_enrich_simple_mode,
     generate_apkg_from_deck,
@@ -93,6 +100,92 @@ class TestGenerateCards:
         assert word.translation == 'new'
 
 
+def _create_job(user, words=('Hund', 'Katze'), **kwargs):
+    return create_generation_job(
+        user=user,
+        words_list=list(words),
+        language='de',
+        translations={word: f'{word}-tr' for word in words},
+        audio_files={},
+        image_files={},
+        deck_name='Test deck',
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+class TestGenerationJobs:
+    @patch('apps.cards.services.generation_service.generate_apkg')
+    def test_create_job_writes_words_without_packaging(self, mock_apkg, user):
+        job = _create_job(user)
+
+        mock_apkg.assert_not_called()
+        assert job.status == 'pending'
+        assert job.deck.words.count() == 2
+        assert [wd['original_word'] for wd in job.words_data] == ['Hund', 'Katze']
+        assert not GeneratedDeck.objects.filter(id=job.id).exists()
+
+    def test_create_job_query_count_independent_of_size(self, user, django_assert_max_num_queries):
+        with django_assert_max_num_queries(30):
+            _create_job(user, words=[f'Wort{i}' for i in range(40)])
+
+    @patch('apps.cards.services.generation_service.generate_apkg')
+    def test_run_job_completes_and_is_repeatable(self, mock_apkg, user):
+        job = _create_job(user)
+
+        assert jobs.process_next(CardGenerationJob) is True
+        job.refresh_from_db()
+        assert job.status == 'completed'
+        assert job.stage == 'done'
+        assert job.result['file_id'] == str(job.id)
+        assert job.result['deck_id'] == job.deck_id
+
+        # Повторный запуск (например, после перезапуска воркера) не дублирует колоду
+        assert jobs.run(job, run_generation_job) is True
+        assert GeneratedDeck.objects.filter(user=user).count() == 1
+
+    @patch('apps.cards.services.generation_service.generate_apkg')
+    def test_failed_job_retried_with_backoff_then_failed(self, mock_apkg, user):
+        mock_apkg.side_effect = RuntimeError('disk full')
+        job = _create_job(user)
+
+        now = timezone.now()
+        for attempt in range(1, job.max_attempts + 1):
+            claimed = jobs.claim(CardGenerationJob, now=now)
+            assert claimed.attempts == attempt
+            assert jobs.run(claimed, run_generation_job) is False
+            job.refresh_from_db()
+            assert jobs.claim(CardGenerationJob, now=now) is None  # пауза перед повтором
+            now = job.available_at
+
+        assert job.status == 'failed'
+        assert job.error_message == 'disk full'
+        assert jobs.claim(CardGenerationJob, now=now + timedelta(days=1)) is None
+
+    def test_stale_running_job_is_reclaimed(self, user):
+        job = _create_job(user)
+        claimed = jobs.claim(CardGenerationJob)
+        assert claimed.id == job.id
+        assert jobs.claim(CardGenerationJob) is None  # heartbeat свежий
+
+        later = timezone.now() + jobs.STALE_AFTER + timedelta(seconds=1)
+        reclaimed = jobs.claim(CardGenerationJob, now=later)
+        assert reclaimed.id == job.id
+        assert reclaimed.attempts == 2
+
+    def test_stale_job_out_of_attempts_is_failed(self, user):
+        job = _create_job(user)
+        CardGenerationJob.objects.filter(id=job.id).update(
+            status='running',
+            attempts=job.max_attempts,
+            heartbeat_at=timezone.now() - jobs.STALE_AFTER * 2,
+        )
+
+        assert jobs.claim(CardGenerationJob) is None
+        job.refresh_from_db()
+        assert job.status == 'failed'
+
+
 @pytest.mark.django_db
 class TestAutoEnrichSimpleMode:
     @patch('apps.cards.services.generation_service.select_image_style')
@@ -13,12 +13,14 @@ from apps.cards.services.media_service import (
     resolve_word_media,
     save_uploaded_file,
     generate_image_for_word,
+    generate_images_for_words,
     generate_audio_for_word,
     edit_image_for_word,
     extract_words_from_photo_service,
 )
 from apps.words.models import Word
 from apps.cards.token_utils import add_tokens, check_balance
+from apps.core.constants import AUDIO_GENERATION_COST, IMAGE_GENERATION_COST
 
 
 MEDIA_ROOT = settings.MEDIA_ROOT
@@ -159,7 +161,7 @@ class TestGenerateImageForWord:
                 user=user, word='Hund', translation='dog', language='de')
 
     @patch('apps.cards.services.media_service.generate_image')
-    def test_refunds_on_error(self, mock_gen, user):
+    def test_not_charged_on_error(self, mock_gen, user):
         add_tokens(user, 10)
         initial = check_balance(user)
         mock_gen.side_effect = RuntimeError('API error')
@@ -171,6 +173,43 @@ class TestGenerateImageForWord:
         assert check_balance(user) == initial
 
 
+@pytest.mark.django_db
+class TestGenerateImagesForWords:
+    @patch('apps.cards.services.media_service.generate_images_batch')
+    def test_charges_per_word_and_refunds_failures(self, mock_batch, user):
+        add_tokens(user, 10)
+        initial = check_balance(user)
+        test_path = Path(MEDIA_ROOT) / 'images' / 'batch.jpg'
+        test_path.parent.mkdir(parents=True, exist_ok=True)
+        test_path.touch()
+        word = Word.objects.create(user=user, original_word='Hund', translation='dog', language='de')
+        mock_batch.return_value = {'Hund': (test_path, 'prompt'), 'Katze': None}
+
+        results = generate_images_for_words(user, [
+            {'word': 'Hund', 'translation': 'dog', 'language': 'de', 'word_id': word.id},
+            {'word': 'Katze', 'translation': 'cat', 'language': 'de'},
+        ], provider='openai')
+
+        assert results['Hund']['prompt'] == 'prompt'
+        assert 'error' in results['Katze']
+        word.refresh_from_db()
+        assert word.image_file.name == 'images/batch.jpg'
+        # Списание за оба слова, возврат за неудачное
+        assert initial - check_balance(user) == IMAGE_GENERATION_COST
+        assert len(mock_batch.call_args[0][0]) == 2
+
+    @patch('apps.cards.services.media_service.generate_images_batch')
+    def test_words_without_tokens_are_skipped(self, mock_batch, user):
+        mock_batch.return_value = {}
+
+        results = generate_images_for_words(user, [
+            {'word': 'Hund', 'translation': 'dog', 'language': 'de'},
+        ], provider='openai')
+
+        assert 'Недостаточно токенов' in results['Hund']['error']
+        assert mock_batch.call_args[0][0] == []
+
+
 @pytest.mark.django_db
 class TestGenerateAudioForWord:
     @patch('apps.cards.services.media_service.generate_audio_with_tts')
@@ -180,11 +219,12 @@ class TestGenerateAudioForWord:
         test_path.parent.mkdir(parents=True, exist_ok=True)
         test_path.touch()
 
-        mock_gen.return_value = test_path
+        mock_gen.return_value = (test_path, False)
 
-        result = generate_audio_for_word(user=user, word='Hund', language='de')
+        result = generate_audio_for_word(user=user, word='Hund', language='de', provider='openai')
         assert 'audio_url' in result
         assert 'audio_id' in result
+        assert check_balance(user) == 10 - AUDIO_GENERATION_COST
 
     def test_insufficient_tokens_raises(self, user):
         with pytest.raises(ValueError, match='Недостаточно токенов'):
@@ -196,14 +236,55 @@ class TestGenerateAudioForWord:
         test_path = Path(MEDIA_ROOT) / 'audio' / 'test.mp3'
         test_path.parent.mkdir(parents=True, exist_ok=True)
         test_path.touch()
-        mock_gen.return_value = test_path
+        mock_gen.return_value = (test_path, False)
 
         result = generate_audio_for_word(
             user=user, word='Hund', language='de', provider='gtts')
         assert 'audio_url' in result
 
     @patch('apps.cards.services.media_service.generate_audio_with_tts')
-    def test_refunds_on_error(self, mock_gen, user):
+    def test_cache_hit_is_not_charged(self, mock_gen, user):
+        add_tokens(user, 10)
+        mock_gen.return_value = (Path(MEDIA_ROOT) / 'audio' / 'test.mp3', True)
+
+        generate_audio_for_word(user=user, word='Hund', language='de', provider='openai')
+
+        assert check_balance(user) == 10
+
+    @patch('apps.cards.services.media_service.spend_tokens')
+    @patch('apps.cards.services.media_service.generate_audio_with_tts')
+    def test_failed_charge_returns_no_audio(self, mock_gen, mock_spend, user):
+        add_tokens(user, 10)
+        word_obj = Word.objects.create(
+            user=user, original_word='Hund', translation='dog', language='de')
+        mock_spend.return_value = (MagicMock(balance=0), False)
+
+        with pytest.raises(ValueError, match='Недостаточно токенов'):
+            generate_audio_for_word(
+                user=user, word='Hund', language='de', word_id=word_obj.id, provider='openai')
+
+        mock_gen.assert_not_called()
+        word_obj.refresh_from_db()
+        assert not word_obj.audio_file
+
+    @patch('apps.cards.services.media_service.find_cached_audio')
+    @patch('apps.cards.services.media_service.generate_audio_with_tts')
+    def test_evicted_cache_entry_is_charged(self, mock_gen, mock_cached, user):
+        """Кэш был, но запись вытеснили до синтеза: платный промах"""
+        word_obj = Word.objects.create(
+            user=user, original_word='Hund', translation='dog', language='de')
+        mock_cached.return_value = Path(MEDIA_ROOT) / 'audio' / 'test.mp3'
+        mock_gen.return_value = (Path(MEDIA_ROOT) / 'audio' / 'test.mp3', False)
+
+        with pytest.raises(ValueError, match='Недостаточно токенов'):
+            generate_audio_for_word(
+                user=user, word='Hund', language='de', word_id=word_obj.id, provider='openai')
+
+        word_obj.refresh_from_db()
+        assert not word_obj.audio_file
+
+    @patch('apps.cards.services.media_service.generate_audio_with_tts')
+    def test_not_charged_on_error(self, mock_gen, user):
         add_tokens(user, 10)
         initial = check_balance(user)
         mock_gen.side_effect = RuntimeError('TTS API error')
@@ -0,0 +1,183 @@
+"""Тесты для media_store.py — контентно-адресуемое хранилище медиафайлов."""
+import hashlib
+import os
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.cards import media_store
+from apps.cards.models import Deck, MediaBlob
+from apps.cards.services.media_service import save_uploaded_file
+from apps.words.models import Word
+from apps.words.utils import bulk_get_or_create_words
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def refs(path):
+    return MediaBlob.objects.get(path=path).ref_count
+
+
+def age(media_root, path, days=2):
+    """Состаривает файл и строку, чтобы они вышли за grace-период"""
+    past = time.time() - days * 86400
+    os.utime(media_root / path, (past, past))
+    MediaBlob.objects.filter(path=path).update(updated_at=timezone.now() - timedelta(days=days))
+
+
+class TestSave:
+    def test_same_content_is_stored_once(self, media_root):
+        first = media_store.save_bytes(b'jpeg', 'images', '.JPG')
+        second = media_store.save_bytes(b'jpeg', 'images', '.jpg')
+
+        sha = hashlib.sha256(b'jpeg').hexdigest()
+        assert first == second == f'images/{sha[:2]}/{sha}.jpg'
+        assert (media_root / first).read_bytes() == b'jpeg'
+        assert len(list((media_root / 'images').rglob('*'))) == 2  # каталог ab/ и файл
+
+    def test_upload_returns_content_hash(self, media_root):
+        path1, id1 = save_uploaded_file(SimpleUploadedFile('a.png', b'png'), 'images', ['.jpg', '.png'])
+        path2, id2 = save_uploaded_file(SimpleUploadedFile('b.png', b'png'), 'images', ['.jpg', '.png'])
+
+        assert path1 == path2
+        assert id1 == hashlib.sha256(b'png').hexdigest()
+        assert path1.suffix == '.png'
+
+    def test_parse_blob_path_ignores_legacy_files(self):
+        sha = 'a' * 64
+        assert media_store.parse_blob_path(f'images/aa/{sha}.jpg') == sha
+        assert media_store.parse_blob_path('images/0b9c1e2a-uuid.jpg') is None
+        assert media_store.parse_blob_path(f'audio/{sha}.mp3') is None
+
+
+@pytest.mark.django_db
+class TestReferences:
+    def test_word_save_and_delete(self, media_root, user):
+        image = media_store.save_bytes(b'img', 'images', '.jpg')
+        other = media_store.save_bytes(b'other', 'images', '.jpg')
+        assert not MediaBlob.objects.exists()
+
+        word = Word.objects.create(user=user, original_word='Haus', translation='дом',
+                                   language='de', image_file=image)
+        assert refs(image) == 1
+
+        word.image_file = other
+        word.save()
+        assert (refs(image), refs(other)) == (0, 1)
+
+        Word.objects.get(id=word.id).delete()
+        assert refs(other) == 0
+
+    def test_unchanged_and_deferred_fields_are_not_counted(self, media_root, user):
+        image = media_store.save_bytes(b'img', 'images', '.jpg')
+        word = Word.objects.create(user=user, original_word='Haus', translation='дом',
+                                   language='de', image_file=image)
+
+        word.translation = 'здание'
+        word.save()
+        deferred = Word.objects.only('id', 'translation').get(id=word.id)
+        deferred.save(update_fields=['translation'])
+
+        assert refs(image) == 1
+
+    def test_legacy_paths_are_ignored(self, media_root, user):
+        Word.objects.create(user=user, original_word='Haus', translation='дом',
+                            language='de', image_file='images/legacy.jpg')
+        assert not MediaBlob.objects.exists()
+
+    def test_bulk_created_words_are_counted(self, media_root, user):
+        image = media_store.save_bytes(b'img', 'images', '.jpg')
+
+        bulk_get_or_create_words(user, [
+            {'original_word': 'Haus', 'language': 'de', 'translation': 'дом', 'image_file': image},
+            {'original_word': 'Baum', 'language': 'de', 'translation': 'дерево', 'image_file': image},
+        ])
+
+        assert refs(image) == 2
+
+    def test_clone_shares_files(self, media_root, user):
+        image = media_store.save_bytes(b'img', 'images', '.jpg')
+        audio = media_store.save_bytes(b'mp3', 'audio', '.mp3')
+        word = Word.objects.create(user=user, original_word='Haus', translation='дом',
+                                   language='de', image_file=image, audio_file=audio)
+        deck = Deck.objects.create(user=user, name='Дом', cover=image)
+        deck.words.add(word)
+
+        call_command('clone_user_data', source=user.username, target='clone',
+                     target_password='clone-pass', apply=True, stdout=open(os.devnull, 'w'))
+
+        clone = Word.objects.get(user__username='clone')
+        assert clone.image_file.name == image
+        assert Deck.objects.get(user__username='clone').cover.name == image
+        assert (refs(image), refs(audio)) == (4, 2)
+        assert len(list((media_root / 'images').rglob('*.jpg'))) == 1
+
+
+@pytest.mark.django_db
+class TestCollectGarbage:
+    def test_deletes_only_unreferenced_expired_files(self, media_root, user, django_capture_on_commit_callbacks):
+        kept = media_store.save_bytes(b'kept', 'images', '.jpg')
+        released = media_store.save_bytes(b'released', 'images', '.jpg')
+        fresh = media_store.save_bytes(b'fresh', 'images', '.jpg')
+        word = Word.objects.create(user=user, original_word='Haus', translation='дом',
+                                   language='de', image_file=released)
+        Word.objects.create(user=user, original_word='Baum', translation='дерево',
+                            language='de', image_file=kept)
+        word.delete()
+        for path in (kept, released):
+            age(media_root, path)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            stats = media_store.collect_garbage()
+
+        assert stats == {'deleted': 1, 'freed_bytes': len(b'released')}
+        assert not (media_root / released).exists()
+        assert (media_root / kept).exists()
+        assert (media_root / fresh).exists()
+        assert not MediaBlob.objects.filter(path=released).exists()
+
+    def test_lagging_counter_does_not_delete_referenced_file(self, media_root, user, django_capture_on_commit_callbacks):
+        image = media_store.save_bytes(b'img', 'images', '.jpg')
+        Word.objects.create(user=user, original_word='Haus', translation='дом',
+                            language='de', image_file=image)
+        MediaBlob.objects.filter(path=image).update(ref_count=0)
+        age(media_root, image)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert media_store.collect_garbage()['deleted'] == 0
+        assert (media_root / image).exists()
+
+    def test_deletes_expired_orphan_files(self, media_root):
+        orphan = media_store.save_bytes(b'orphan', 'images', '.jpg')
+        fresh = media_store.save_bytes(b'fresh', 'images', '.jpg')
+        age(media_root, orphan)
+
+        assert media_store.collect_garbage(dry_run=True)['deleted'] == 1
+        assert (media_root / orphan).exists()
+
+        media_store.collect_garbage()
+        assert not (media_root / orphan).exists()
+        assert (media_root / fresh).exists()
+
+
+@pytest.mark.django_db
+class TestRecount:
+    def test_rebuilds_counts_from_database(self, media_root, user):
+        image = media_store.save_bytes(b'img', 'images', '.jpg')
+        Word.objects.create(user=user, original_word='Haus', translation='дом',
+                            language='de', image_file=image)
+        Word.objects.filter(user=user).update(image_file=None)
+        Word.objects.create(user=user, original_word='Baum', translation='дерево',
+                            language='de', hint_audio=image)
+        MediaBlob.objects.filter(path=image).update(ref_count=7)
+
+        assert media_store.recount() == 1
+        assert refs(image) == 1
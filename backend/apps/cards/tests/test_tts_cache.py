@@ -0,0 +1,125 @@
+"""Тесты для tts_cache.py — общий кэш синтеза речи."""
+import io
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.management import call_command
+
+from apps.cards import tts_cache
+from apps.cards.models import TTSCacheEntry
+from apps.cards.services.media_service import generate_audio_for_word
+from apps.cards.token_utils import add_tokens, check_balance
+from apps.words.models import Word
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+class TestMakeKey:
+    def test_normalizes_whitespace(self):
+        assert tts_cache.make_key(' Guten  Morgen ', 'de', 'nova', 'gtts') == \
+            tts_cache.make_key('Guten Morgen', 'DE', 'nova', 'GTTS')
+
+    def test_voice_and_provider_are_part_of_key(self):
+        key = tts_cache.make_key('Haus', 'de', 'nova', 'openai:tts-1-hd')
+        assert key != tts_cache.make_key('Haus', 'de', 'onyx', 'openai:tts-1-hd')
+        assert key != tts_cache.make_key('Haus', 'de', 'nova', 'openai:tts-1')
+
+
+@pytest.mark.django_db
+class TestGetOrSynthesize:
+    def test_second_call_is_a_hit(self, media_root):
+        synthesize = MagicMock(return_value=b'mp3')
+
+        first, hit1 = tts_cache.get_or_synthesize('Haus', 'de', 'nova', 'gtts', synthesize)
+        second, hit2 = tts_cache.get_or_synthesize('Haus ', 'de', 'nova', 'gtts', synthesize)
+
+        assert (hit1, hit2) == (False, True)
+        assert first == second
+        assert synthesize.call_count == 1
+        assert TTSCacheEntry.objects.get().hits == 1
+
+    def test_missing_file_is_synthesized_again(self, media_root):
+        path, _ = tts_cache.get_or_synthesize('Haus', 'de', 'nova', 'gtts', lambda: b'mp3')
+        (media_root / path).unlink()
+
+        path, hit = tts_cache.get_or_synthesize('Haus', 'de', 'nova', 'gtts', lambda: b'new')
+        assert hit is False
+        assert (media_root / path).read_bytes() == b'new'
+
+    def test_failed_synthesis_is_not_cached(self, media_root):
+        assert tts_cache.get_or_synthesize('Haus', 'de', 'nova', 'gtts', lambda: None) == (None, False)
+        assert not TTSCacheEntry.objects.exists()
+
+
+@pytest.mark.django_db
+class TestEvict:
+    def test_evicts_unreferenced_oldest_entries(self, media_root, user, settings):
+        settings.TTS_CACHE_MAX_BYTES = 10 ** 6
+        paths = [
+            tts_cache.get_or_synthesize(text, 'de', 'nova', 'gtts', lambda: b'x' * 4)[0]
+            for text in ('eins', 'zwei', 'drei')
+        ]
+        Word.objects.create(user=user, original_word='eins', translation='один',
+                            language='de', audio_file=paths[0])
+
+        assert tts_cache.evict(max_bytes=4) == 2
+
+        # Самая старая запись занята словом и остается, остальные удаляются с файлами
+        assert list(TTSCacheEntry.objects.values_list('file_path', flat=True)) == [paths[0]]
+        assert (media_root / paths[0]).exists()
+        assert not (media_root / paths[1]).exists()
+        assert not (media_root / paths[2]).exists()
+
+    def test_store_does_not_evict(self, media_root, settings):
+        settings.TTS_CACHE_MAX_BYTES = 4
+        for text in ('eins', 'zwei', 'drei'):
+            tts_cache.get_or_synthesize(text, 'de', 'nova', 'gtts', lambda: b'x' * 4)
+
+        assert TTSCacheEntry.objects.count() == 3
+
+    def test_max_chunks_bounds_the_scan(self, media_root, user, settings):
+        settings.TTS_CACHE_MAX_BYTES = 10 ** 6
+        paths = [
+            tts_cache.get_or_synthesize(text, 'de', 'nova', 'gtts', lambda: b'x' * 4)[0]
+            for text in ('eins', 'zwei', 'drei')
+        ]
+        for text, path in zip(('eins', 'zwei'), paths):
+            Word.objects.create(user=user, original_word=text, translation=text,
+                                language='de', audio_file=path)
+
+        with patch.object(tts_cache, 'EVICTION_CHUNK', 2):
+            assert tts_cache.evict(max_bytes=0, max_chunks=1) == 0
+            assert tts_cache.evict(max_bytes=0) == 1
+
+    def test_prune_command(self, media_root, settings):
+        settings.TTS_CACHE_MAX_BYTES = 4
+        for text in ('eins', 'zwei'):
+            tts_cache.get_or_synthesize(text, 'de', 'nova', 'gtts', lambda: b'x' * 4)
+
+        out = io.StringIO()
+        call_command('prune_tts_cache', stdout=out)
+
+        assert 'evicted: 1' in out.getvalue()
+        assert list(TTSCacheEntry.objects.values_list('text', flat=True)) == ['zwei']
+
+
+@pytest.mark.django_db
+class TestWordAudioCache:
+    @patch('apps.cards.llm_utils.get_openai_client')
+    def test_cached_word_audio_is_not_charged(self, mock_client, media_root, user):
+        add_tokens(user, 10)
+        mock_client.return_value.audio.speech.create.return_value.content = b'mp3'
+
+        first = generate_audio_for_word(user=user, word='Hund', language='de', provider='openai')
+        balance = check_balance(user)
+        second = generate_audio_for_word(user=user, word='Hund', language='de', provider='openai')
+
+        assert first['audio_url'] == second['audio_url']
+        assert check_balance(user) == balance
+        assert mock_client.return_value.audio.speech.create.call_count == 1
+        assert Path(second['file_path']).exists()
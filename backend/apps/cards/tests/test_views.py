@@ -10,7 +10,9 @@ from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from apps.words.models import Word
-from apps.cards.models import GeneratedDeck, UserPrompt, Deck, Token, TokenTransaction, Card, PartOfSpeechCache
+from apps.cards.models import CardGenerationJob, GeneratedDeck, UserPrompt, Deck, Token, TokenTransaction, Card, PartOfSpeechCache
+from apps.cards.tasks import run_generation_job  # noqa: F401 (регистрирует обработчик)
+from apps.core import jobs
 from apps.cards.utils import create_card_model, create_deck, generate_apkg, parse_words_input
 from apps.cards.prompt_utils import get_user_prompt, get_or_create_user_prompt, reset_user_prompt_to_default
 from apps.cards.default_prompts import get_default_prompt, format_prompt, get_image_prompt_for_style, IMAGE_PROMPTS
@@ -20,7 +22,8 @@ from apps.cards.llm_utils import (
     analyze_mixed_languages,
     translate_words,
     process_german_word,
-    extract_words_from_photo
+    extract_words_from_photo,
+    generate_images_batch,
 )
 
 User = get_user_model()
@@ -149,11 +152,35 @@ class TestCardsAPI:
             'image_style': 'balanced'
         }, format='json')
         
-        assert response.status_code == status.HTTP_201_CREATED
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data['status'] == 'pending'
+        assert 'download_url' not in response.data
+        # Слова и колода сохраняются сразу, .apkg собирает воркер
+        assert Word.objects.filter(user=user, original_word='casa').exists()
+        assert Deck.objects.filter(id=response.data['deck_id']).exists()
+        
+        assert jobs.process_next(CardGenerationJob) is True
+        
+        response = client.get(response.data['status_url'])
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == 'completed'
+        assert response.data['progress'] == 100
         assert 'file_id' in response.data
         assert 'download_url' in response.data
         assert response.data['deck_name'] == 'Тестовая колода'
         assert response.data['cards_count'] == 4  # 2 слова * 2 карточки
+    
+    def test_generation_job_status_other_user(self):
+        """Статус чужой задачи недоступен"""
+        owner = User.objects.create_user(username='owner', password='testpass123')
+        other = User.objects.create_user(username='other', password='testpass123')
+        job = CardGenerationJob.objects.create(user=owner, deck_name='Колода')
+        
+        client = APIClient()
+        client.force_authenticate(user=other)
+        response = client.get(f'/api/cards/generate/jobs/{job.id}/')
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
 
     def test_generate_cards_unauthenticated(self):
         """Тест генерации карточек (неаутентифицированный пользователь)"""
@@ -187,7 +214,7 @@ class TestCardsAPI:
             'deck_name': 'Тестовая колода'
         }, format='json')
         
-        assert response.status_code == status.HTTP_201_CREATED
+        assert response.status_code == status.HTTP_202_ACCEPTED
         # Проверяем, что слово сохранилось
         assert Word.objects.filter(user=user, original_word='casa').count() == 1
         word = Word.objects.get(user=user, original_word='casa')
@@ -220,7 +247,7 @@ class TestCardsAPI:
             'deck_name': 'Тестовая колода'
         }, format='json')
         
-        assert response.status_code == status.HTTP_201_CREATED
+        assert response.status_code == status.HTTP_202_ACCEPTED
         # Проверяем, что перевод обновился
         word = Word.objects.get(user=user, original_word='casa')
         assert word.translation == 'новый перевод'
@@ -1035,6 +1062,97 @@ class TestGermanWordProcessing:
         assert len(result) > 0
 
 
+class TestImageBatchGeneration:
+    """Тесты для параллельной пакетной генерации изображений"""
+    
+    WORDS = [{'word': f'Wort{i}', 'translation': f'слово{i}', 'language': 'de'} for i in range(6)]
+    
+    @patch('apps.cards.llm_utils.get_bucket')
+    @patch('apps.cards.llm_utils.generate_image')
+    def test_runs_concurrently(self, mock_gen, mock_bucket):
+        """Время пакета определяется числом потоков, а не числом слов"""
+        import threading
+        import time
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def slow_generate(word, **kwargs):
+            with lock:
+                active.append(word)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(word)
+            return Path(f'/tmp/{word}.jpg'), kwargs['custom_prompt']
+        
+        mock_gen.side_effect = slow_generate
+        
+        results = generate_images_batch(self.WORDS, use_two_stage=False, max_workers=3)
+        
+        assert set(results) == {item['word'] for item in self.WORDS}
+        assert max(peak) == 3
+        assert mock_bucket.return_value.acquire.call_count == 6
+    
+    @patch('apps.core.llm.rate_limit.time.sleep')
+    @patch('apps.cards.llm_utils.generate_image')
+    def test_retries_rate_limited_word(self, mock_gen, mock_sleep):
+        """429 повторяется, остальные ошибки — None для слова"""
+        calls = []
+        
+        def flaky(word, **kwargs):
+            calls.append(word)
+            if word == 'Wort0' and calls.count(word) == 1:
+                raise Exception('Ошибка при генерации изображения через DALL-E 3: Error code: 429')
+            if word == 'Wort1':
+                raise Exception('content_policy_violation')
+            return Path(f'/tmp/{word}.jpg'), 'prompt'
+        
+        mock_gen.side_effect = flaky
+        
+        results = generate_images_batch(self.WORDS[:3], use_two_stage=False, max_workers=2)
+        
+        assert results['Wort0'] == (Path('/tmp/Wort0.jpg'), 'prompt')
+        assert results['Wort1'] is None
+        assert calls.count('Wort0') == 2
+        assert calls.count('Wort1') == 1
+    
+    @pytest.mark.django_db
+    @patch('apps.cards.services.media_service.generate_images_batch')
+    def test_batch_endpoint(self, mock_batch, settings):
+        """POST /api/media/generate-images/ генерирует изображения пакетом"""
+        from apps.cards.token_utils import add_tokens
+        
+        user = User.objects.create_user(username='batchuser', password='testpass123')
+        add_tokens(user, 10)
+        word = Word.objects.create(user=user, original_word='Wort0', translation='слово0', language='de')
+        mock_batch.return_value = {'Wort0': (Path(settings.MEDIA_ROOT) / 'images' / 'w0.jpg', 'prompt')}
+        
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.post('/api/media/generate-images/', {
+            'words': [dict(self.WORDS[0], word_id=word.id), self.WORDS[1]],
+            'provider': 'openai',
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results']['Wort0']['image_url']
+        assert 'error' in response.data['results']['Wort1']
+        assert len(mock_batch.call_args[0][0]) == 2
+        word.refresh_from_db()
+        assert word.image_file.name == 'images/w0.jpg'
+    
+    @pytest.mark.django_db
+    def test_batch_endpoint_requires_words(self):
+        user = User.objects.create_user(username='batchuser', password='testpass123')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        
+        response = client.post('/api/media/generate-images/', {'words': []}, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.django_db
 class TestWordAnalysisAPI:
     """Тесты для API анализа слов"""
@@ -2085,7 +2203,8 @@ class TestAutoGeneration:
         # Проверяем, что запрос обработан (может быть ошибка валидации или успех)
         assert response.status_code in [
             status.HTTP_200_OK, 
-            status.HTTP_201_CREATED, 
+            status.HTTP_201_CREATED,
+            status.HTTP_202_ACCEPTED, 
             status.HTTP_400_BAD_REQUEST,
             status.HTTP_500_INTERNAL_SERVER_ERROR
         ]
@@ -2116,7 +2235,7 @@ class TestAutoGeneration:
         
         # В простом режиме должно быть вызвано автоматическое название
         # (проверяем через статус ответа, так как функция может быть вызвана)
-        assert response.status_code in [status.HTTP_200_OK, status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST]
+        assert response.status_code in [status.HTTP_200_OK, status.HTTP_201_CREATED, status.HTTP_202_ACCEPTED, status.HTTP_400_BAD_REQUEST]
     
     @patch('apps.cards.services.generation_service.select_image_style')
     @patch('apps.cards.services.generation_service.detect_category')
@@ -2145,7 +2264,7 @@ class TestAutoGeneration:
         }, format='json')
         
         # Проверяем, что функции были вызваны или запрос обработан
-        assert response.status_code in [status.HTTP_200_OK, status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST]
+        assert response.status_code in [status.HTTP_200_OK, status.HTTP_201_CREATED, status.HTTP_202_ACCEPTED, status.HTTP_400_BAD_REQUEST]
     
     def test_advanced_mode_manual_settings(self):
         """В расширенном режиме используются ручные настройки"""
@@ -2168,7 +2287,7 @@ class TestAutoGeneration:
         }, format='json')
         
         # В расширенном режиме должны использоваться предоставленные настройки
-        assert response.status_code in [status.HTTP_200_OK, status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST]
+        assert response.status_code in [status.HTTP_200_OK, status.HTTP_201_CREATED, status.HTTP_202_ACCEPTED, status.HTTP_400_BAD_REQUEST]
 
 
 # ========== ЭТАП 9: Система токенов ==========
@@ -2532,7 +2651,7 @@ class TestTokenIntegration:
         add_tokens(user, 10)
         initial_balance = check_balance(user)
         
-        mock_generate.return_value = Path('test.mp3')
+        mock_generate.return_value = (Path('test.mp3'), False)
         
         client = APIClient()
         client.force_authenticate(user=user)
@@ -3346,7 +3465,56 @@ class TestCardAPI:
         response = self.client.get('/api/cards/cards/')
         
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data['results']) == 1
+        assert response.data['next'] is None
+    
+    def test_list_cards_cursor_pages(self):
+        """GET /api/cards/cards/?page_size= — курсорные страницы без пропусков и повторов"""
+        Card.create_from_word(self.word)
+        for text in ('Baum', 'Tisch', 'Stuhl', 'Fenster'):
+            Word.objects.create(
+                user=self.user, original_word=text, translation='x', language='de'
+            )
+        
+        seen = []
+        url = '/api/cards/cards/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data['results']) <= 2
+            seen.extend(card['id'] for card in response.data['results'])
+            url = response.data['next']
+        
+        assert sorted(seen) == sorted(Card.objects.filter(user=self.user).values_list('id', flat=True))
+    
+    def test_list_cards_default_page_is_bounded(self, monkeypatch):
+        """Без page_size ответ ограничен CARD_LIST_PAGE_SIZE"""
+        Card.create_from_word(self.word)
+        Word.objects.create(user=self.user, original_word='Baum', translation='x', language='de')
+        monkeypatch.setattr('apps.cards.views.CARD_LIST_PAGE_SIZE', 1)
+        
+        response = self.client.get('/api/cards/cards/')
+        
+        assert len(response.data['results']) == 1
+        assert response.data['next_cursor']
+    
+    def test_list_cards_sparse_fields_and_compact(self):
+        """fields= оставляет только запрошенные поля, compact убирает URL медиа"""
+        Card.create_from_word(self.word)
+        
+        response = self.client.get('/api/cards/cards/?fields=id,word_text,next_review')
+        assert set(response.data['results'][0]) == {'id', 'word_text', 'next_review'}
+        
+        response = self.client.get('/api/cards/cards/?compact=true')
+        card = response.data['results'][0]
+        assert 'image_file' not in card and 'audio_file' not in card
+        assert card['word_text'] == 'Haus'
+    
+    def test_list_cards_invalid_params(self):
+        """Неизвестные поля, сортировка и курсор — 400"""
+        assert self.client.get('/api/cards/cards/?fields=id,secret').status_code == 400
+        assert self.client.get('/api/cards/cards/?ordering=ease_factor').status_code == 400
+        assert self.client.get('/api/cards/cards/?cursor=garbage').status_code == 400
     
     def test_card_detail(self):
         """GET /api/cards/{id}/ — детали карточки"""
@@ -0,0 +1,204 @@
+"""
+Кэш синтеза речи (TTSCacheEntry)
+
+Одинаковый текст одним голосом одного провайдера синтезируется один раз:
+ключ — SHA-256 нормализованных (provider, voice, language, text), файл
+хранится под именем ключа и переиспользуется всеми пользователями. При
+попадании в кэш вызова провайдера нет, поэтому вызывающий код не
+списывает токены.
+
+Когда суммарный размер кэша превышает settings.TTS_CACHE_MAX_BYTES,
+давно не использованные записи удаляются вместе с файлами — только
+если на файл не ссылаются слова и литературный контекст. Вытеснение
+выполняется периодически (manage.py prune_tts_cache), а не в запросе.
+
+Использование:
+    relative_path, hit = get_or_synthesize(
+        text, language, voice='nova', provider='openai:tts-1-hd',
+        synthesize=lambda: client.audio.speech.create(...).content,
+        subdir='hints',
+    )
+"""
+import hashlib
+import logging
+import os
+import unicodedata
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import TTSCacheEntry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+EVICTION_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC и схлопнутые пробелы: 'Haus ' и 'Haus' — один ключ"""
+    return ' '.join(unicodedata.normalize('NFC', text or '').split())
+
+
+def make_key(text: str, language: str, voice: str, provider: str) -> str:
+    """
+    Ключ кэша по нормализованному входу синтеза
+
+    Returns:
+        SHA-256 в hex
+    """
+    parts = [provider.strip().lower(), (voice or '').strip(), language.strip().lower(), normalize_text(text)]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def lookup(text: str, language: str, voice: str, provider: str) -> Optional[str]:
+    """
+    Ищет готовое аудио
+
+    Returns:
+        Путь относительно MEDIA_ROOT или None (нет записи или файл пропал)
+    """
+    key = make_key(text, language, voice, provider)
+    entry = TTSCacheEntry.objects.filter(key=key).only('id', 'file_path').first()
+    if entry is None:
+        return None
+    if not (Path(settings.MEDIA_ROOT) / entry.file_path).exists():
+        entry.delete()
+        return None
+    TTSCacheEntry.objects.filter(id=entry.id).update(
+        hits=F('hits') + 1,
+        last_used_at=timezone.now(),
+    )
+    return entry.file_path
+
+
+def store(text: str, language: str, voice: str, provider: str,
+          audio_bytes: bytes, subdir: str = 'audio') -> str:
+    """
+    Сохраняет синтезированное аудио в кэш
+
+    Returns:
+        Путь относительно MEDIA_ROOT
+    """
+    key = make_key(text, language, voice, provider)
+    relative_path = f'{subdir}/{key}.mp3'
+    file_path = Path(settings.MEDIA_ROOT) / relative_path
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Запись через временный файл: параллельный воркер не увидит половину файла
+    tmp_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(audio_bytes)
+    os.replace(tmp_path, file_path)
+
+    try:
+        entry, _ = TTSCacheEntry.objects.get_or_create(
+            key=key,
+            defaults={
+                'provider': provider,
+                'voice': voice or '',
+                'language': language,
+                'text': normalize_text(text),
+                'file_path': relative_path,
+                'size_bytes': len(audio_bytes),
+            },
+        )
+    except IntegrityError:
+        # Ту же запись одновременно создал другой процесс
+        entry = TTSCacheEntry.objects.get(key=key)
+    return entry.file_path
+
+
+def get_or_synthesize(text: str, language: str, voice: str, provider: str,
+                      synthesize: Callable[[], Optional[bytes]],
+                      subdir: str = 'audio') -> Tuple[Optional[str], bool]:
+    """
+    Возвращает аудио из кэша или синтезирует и кэширует его
+
+    Args:
+        synthesize: Вызов провайдера, возвращает байты mp3 (None — не удалось)
+
+    Returns:
+        (путь относительно MEDIA_ROOT или None, было ли попадание в кэш)
+    """
+    cached = lookup(text, language, voice, provider)
+    if cached:
+        logger.info(f"[TTS cache] Попадание: '{normalize_text(text)[:50]}' ({provider}/{voice})")
+        return cached, True
+
+    audio_bytes = synthesize()
+    if not audio_bytes:
+        return None, False
+    return store(text, language, voice, provider, audio_bytes, subdir), False
+
+
+def _referenced_paths(paths: list[str]) -> set[str]:
+    """Пути из списка, на которые ссылаются слова или литературный контекст"""
+    from apps.words.models import Word
+    from apps.literary_context.models import WordContextMedia
+
+    referenced = set()
+    for model, field in (
+        (Word, 'audio_file'),
+        (Word, 'hint_audio'),
+        (WordContextMedia, 'audio_file'),
+        (WordContextMedia, 'hint_audio'),
+    ):
+        referenced.update(
+            model.objects.filter(**{f'{field}__in': paths}).values_list(field, flat=True)
+        )
+    return referenced
+
+
+def evict(max_bytes: int = None, max_chunks: int = None) -> int:
+    """
+    Удаляет давно не использованные записи без ссылок, пока кэш больше лимита
+
+    Args:
+        max_bytes: Лимит размера (по умолчанию settings.TTS_CACHE_MAX_BYTES)
+        max_chunks: Сколько пачек по EVICTION_CHUNK записей просмотреть за
+            вызов (None — без ограничения); остаток дочистит следующий запуск
+
+    Returns:
+        Количество удаленных записей
+    """
+    if max_bytes is None:
+        max_bytes = getattr(settings, 'TTS_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+    total = TTSCacheEntry.objects.aggregate(total=Sum('size_bytes'))['total'] or 0
+    if total <= max_bytes:
+        return 0
+
+    media_root = Path(settings.MEDIA_ROOT)
+    evicted = 0
+    entries = TTSCacheEntry.objects.order_by('last_used_at', 'id')
+    chunks = 0
+    while total > max_bytes and (max_chunks is None or chunks < max_chunks):
+        chunks += 1
+        chunk = list(entries.values('id', 'file_path', 'size_bytes', 'last_used_at')[:EVICTION_CHUNK])
+        if not chunk:
+            break
+        last = chunk[-1]
+        entries = entries.filter(
+            Q(last_used_at__gt=last['last_used_at']) |
+            Q(last_used_at=last['last_used_at'], id__gt=last['id'])
+        )
+        referenced = _referenced_paths([entry['file_path'] for entry in chunk])
+
+        to_delete = []
+        for entry in chunk:
+            if total <= max_bytes:
+                break
+            if entry['file_path'] in referenced:
+                continue
+            to_delete.append(entry['id'])
+            (media_root / entry['file_path']).unlink(missing_ok=True)
+            total -= entry['size_bytes']
+        TTSCacheEntry.objects.filter(id__in=to_delete).delete()
+        evicted += len(to_delete)
+
+    if evicted:
+        logger.info(f"[TTS cache] Вытеснено записей: {evicted}")
+    return evicted
@@ -3,12 +3,14 @@ from . import views
 
 urlpatterns = [
     path('generate/', views.generate_cards_view, name='generate-cards'),
+    path('generate/jobs/<uuid:job_id>/', views.generation_job_status_view, name='generation-job-status'),
     path('download/<uuid:file_id>/', views.download_cards_view, name='download-cards'),
 ]
 
 # Media endpoints
 media_urlpatterns = [
     path('generate-image/', views.generate_image_view, name='generate-image'),
+    path('generate-images/', views.generate_images_view, name='generate-images'),
     path('edit-image/', views.edit_image_view, name='edit-image'),
     path('generate-audio/', views.generate_audio_view, name='generate-audio'),
     path('upload-image/', views.upload_image_view, name='upload-image'),
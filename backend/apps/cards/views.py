@@ -8,13 +8,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.core.pagination import InvalidCursor, paginate_by_cursor
 from apps.words.models import Word
 from django.shortcuts import get_object_or_404
 
-from .models import GeneratedDeck, UserPrompt, Deck, Card
+from .models import CardGenerationJob, GeneratedDeck, UserPrompt, Deck, Card
 from .serializers import (
     CardGenerationSerializer,
     ImageGenerationSerializer,
+    ImageBatchGenerationSerializer,
     ImageEditSerializer,
     AudioGenerationSerializer,
     ImageUploadSerializer,
@@ -44,6 +46,7 @@ from .token_utils import get_or_create_token, add_tokens, check_balance
 
 from .services.media_service import (
     generate_image_for_word,
+    generate_images_for_words,
     edit_image_for_word,
     generate_audio_for_word,
     extract_words_from_photo_service,
@@ -52,7 +55,7 @@ from .services.media_service import (
     get_media_url,
 )
 from .services.generation_service import (
-    generate_cards,
+    create_generation_job,
     auto_enrich_simple_mode,
     generate_apkg_from_deck,
 )
@@ -69,13 +72,23 @@ from .services.deck_service import (
 
 logger = logging.getLogger(__name__)
 
+CARD_LIST_PAGE_SIZE = 100
+CARD_LIST_MAX_PAGE_SIZE = 500
+CARD_LIST_ORDERINGS = {'next_review', '-next_review', 'created_at', '-created_at'}
+
 
 # ========== Card Generation ==========
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def generate_cards_view(request):
-    """Generate Anki cards."""
+    """
+    Generate Anki cards.
+
+    Words, cards and the deck are saved right away; literary context, the
+    .apkg file and the Anki import are built by a worker. Returns 202 with
+    job_id; poll generation_job_status_view for progress and download_url.
+    """
     serializer = CardGenerationSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -99,7 +112,7 @@ def generate_cards_view(request):
             logger.error(f"Simple mode enrichment error: {e}")
 
     try:
-        result = generate_cards(
+        job = create_generation_job(
             user=request.user,
             words_list=words_list,
             language=language,
@@ -107,10 +120,10 @@ def generate_cards_view(request):
             audio_files=audio_files,
             image_files=image_files,
             deck_name=deck_name,
-            image_style=image_style,
             save_to_decks=save_to_decks,
         )
-        return Response(result, status=status.HTTP_201_CREATED)
+        return Response(
+            _generation_job_data(job), status=status.HTTP_202_ACCEPTED)
     except Exception as e:
         logger.error(f"Card generation error for {request.user.username}: {e}", exc_info=True)
         return Response(
@@ -118,6 +131,32 @@ def generate_cards_view(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _generation_job_data(job):
+    data = {
+        'job_id': str(job.id),
+        'status': job.status,
+        'stage': job.stage,
+        'progress': job.progress,
+        'current_word': job.current_word,
+        'deck_name': job.deck_name,
+        'deck_id': job.deck_id,
+        'status_url': f'/api/cards/generate/jobs/{job.id}/',
+    }
+    if job.status == 'completed':
+        data.update(job.result)
+    elif job.status == 'failed':
+        data['error'] = job.error_message
+    return data
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def generation_job_status_view(request, job_id):
+    """Card generation job status and progress; download_url once completed."""
+    job = get_object_or_404(CardGenerationJob, id=job_id, user=request.user)
+    return Response(_generation_job_data(job))
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def download_cards_view(request, file_id):
@@ -166,6 +205,34 @@ def generate_image_view(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def generate_images_view(request):
+    """
+    Generate images for several words in one request.
+
+    Images are generated concurrently under the provider rate limit; tokens
+    are charged per word. Returns {results: {word: {...} or {error}}}.
+    """
+    serializer = ImageBatchGenerationSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results = generate_images_for_words(
+            user=request.user,
+            items=serializer.validated_data['words'],
+            image_style=serializer.validated_data.get('image_style', 'balanced'),
+            provider=serializer.validated_data.get('provider'),
+            gemini_model=serializer.validated_data.get('gemini_model'),
+        )
+        return Response({'results': results}, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response(
+            {'error': f'Image generation error: {e}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def edit_image_view(request):
@@ -801,7 +868,39 @@ def deck_create_empty_card_view(request, deck_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def card_list_view(request):
-    """List user's cards with filters."""
+    """
+    List user's cards with filters, one cursor page at a time.
+
+    Query params:
+    - type, learning, suspended, word_id: filters
+    - ordering: next_review (default), -next_review, created_at, -created_at
+    - page_size: default CARD_LIST_PAGE_SIZE, at most CARD_LIST_MAX_PAGE_SIZE
+    - cursor: next_cursor from the previous page
+    - fields: comma-separated CardListSerializer fields to return
+    - compact=true: omit media URLs
+    """
+    ordering = request.query_params.get('ordering', 'next_review')
+    if ordering not in CARD_LIST_ORDERINGS:
+        return Response(
+            {'error': f'ordering must be one of: {", ".join(sorted(CARD_LIST_ORDERINGS))}'},
+            status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page_size = int(request.query_params.get('page_size', CARD_LIST_PAGE_SIZE))
+    except (TypeError, ValueError):
+        page_size = CARD_LIST_PAGE_SIZE
+    page_size = min(max(page_size, 1), CARD_LIST_MAX_PAGE_SIZE)
+
+    fields = request.query_params.get('fields')
+    if fields is not None:
+        fields = [name.strip() for name in fields.split(',') if name.strip()]
+        unknown = set(fields) - set(CardListSerializer.Meta.fields)
+        if unknown:
+            return Response(
+                {'error': f'Unknown fields: {", ".join(sorted(unknown))}'},
+                status=status.HTTP_400_BAD_REQUEST)
+    compact = request.query_params.get('compact') == 'true'
+
     cards = Card.objects.filter(user=request.user).select_related('word')
 
     card_type = request.query_params.get('type')
@@ -822,8 +921,26 @@ def card_list_view(request):
     if word_id:
         cards = cards.filter(word_id=word_id)
 
-    serializer = CardListSerializer(cards, many=True, context={'request': request})
-    return Response(serializer.data)
+    try:
+        page = paginate_by_cursor(
+            cards, ordering, request.query_params.get('cursor'), page_size)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+    next_url = None
+    if page.next_cursor:
+        query_params = request.query_params.copy()
+        query_params['cursor'] = page.next_cursor
+        next_url = f"{request.path}?{query_params.urlencode()}"
+
+    serializer = CardListSerializer(
+        page.items, many=True, fields=fields, compact=compact,
+        context={'request': request})
+    return Response({
+        'next': next_url,
+        'next_cursor': page.next_cursor,
+        'results': serializer.data,
+    })
 
 
 @api_view(['GET', 'DELETE'])
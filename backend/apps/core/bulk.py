@@ -0,0 +1,33 @@
+"""
+Scope for set-based operations.
+
+Queryset update/delete and bulk_create over thousands of rows handle the
+side effects of per-row signals themselves, once for the whole set (one
+word-status recompute, one cache bump, one counters reset). Receivers that
+would repeat that work for every row check in_bulk_operation() and return.
+Cascaded deletes still send post_delete per row, so this matters there too.
+
+Usage:
+    with bulk_operation():
+        Word.objects.filter(id__in=word_ids).delete()
+    user_cache.bump_version(user.id)
+"""
+import threading
+from contextlib import contextmanager
+
+_state = threading.local()
+
+
+@contextmanager
+def bulk_operation():
+    """Mark the current thread as running a set-based operation."""
+    depth = getattr(_state, 'depth', 0)
+    _state.depth = depth + 1
+    try:
+        yield
+    finally:
+        _state.depth = depth
+
+
+def in_bulk_operation() -> bool:
+    return getattr(_state, 'depth', 0) > 0
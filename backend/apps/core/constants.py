@@ -97,6 +97,14 @@ TIME_PER_LEARNING_CARD = 1.5
 TIME_PER_REVIEW_CARD = 0.25
 TIME_PER_NEW_CARD = 0.5
 
+# Размер пачки для bulk_create записей журнала ответов
+REVIEW_LOG_BATCH_SIZE = 500
+
+# Серверные тренировочные сессии
+TRAINING_SESSION_TTL_HOURS = 12
+TRAINING_SESSION_NEXT_DEFAULT = 10
+TRAINING_SESSION_NEXT_MAX = 100
+
 
 # ═══════════════════════════════════════════════════════════════
 # Типы карточек и статусы обучения
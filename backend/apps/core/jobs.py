@@ -0,0 +1,221 @@
+"""
+Durable background jobs stored in the database.
+
+A job is a row of a model derived from QueuedJob; enqueueing is creating
+the row. Workers (manage.py run_workers) claim rows with
+SELECT ... FOR UPDATE SKIP LOCKED, so several worker processes can share
+a table, and touch heartbeat_at from a side thread while the handler runs.
+A running row whose heartbeat stopped (worker killed, container restarted)
+is claimed again after STALE_AFTER. A handler that raises is retried with
+exponential backoff; after max_attempts the row is marked failed.
+
+Handlers live in the apps' tasks.py modules, which run_workers imports
+(autodiscover):
+
+    @jobs.handler(DeckContextJob)
+    def run_deck_context_job(job):
+        ...
+
+Queues that are not QueuedJob tables register a drain function that
+returns True when it did any work:
+
+    jobs.register_queue('etymology', lambda: process_queue()['claimed'] > 0)
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.db import connection, models, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = timedelta(seconds=30)
+STALE_AFTER = timedelta(minutes=2)
+RETRY_BACKOFF = timedelta(seconds=30)
+
+JOB_STATUS_CHOICES = [
+    ('pending', 'Pending'),
+    ('running', 'Running'),
+    ('completed', 'Completed'),
+    ('failed', 'Failed'),
+]
+
+# name -> drain function; name -> (model, handler) for QueuedJob tables
+_queues = {}
+_handlers = {}
+
+
+class QueuedJob(models.Model):
+    """Queue state shared by durable job models."""
+
+    status = models.CharField(max_length=20, choices=JOB_STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        help_text='Not claimed before this time (retry backoff)',
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text='Touched by the worker while the job runs',
+    )
+    error_message = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    max_attempts = 3
+
+    class Meta:
+        abstract = True
+
+
+def register_queue(name, drain):
+    """Register a drain function: called by workers, returns True if it did work."""
+    _queues[name] = drain
+
+
+def handler(model):
+    """Register the decorated function as the handler of `model` jobs."""
+    def decorator(func):
+        _handlers[model._meta.label] = (model, func)
+        register_queue(model._meta.label, lambda: process_next(model))
+        return func
+    return decorator
+
+
+def autodiscover():
+    """Import tasks.py of every installed app so handlers get registered."""
+    autodiscover_modules('tasks')
+
+
+def queue_names():
+    return list(_queues)
+
+
+def claim(model, now=None):
+    """
+    Take the oldest claimable job of `model`: pending and past its backoff,
+    or running with a stale heartbeat. Jobs out of attempts are marked failed.
+
+    Returns:
+        the job (status running, attempts incremented) or None
+    """
+    now = now or timezone.now()
+    claimable = (
+        Q(status='pending', available_at__lte=now) |
+        Q(status='running', heartbeat_at__lt=now - STALE_AFTER)
+    )
+    while True:
+        with transaction.atomic():
+            job = (
+                model.objects.select_for_update(skip_locked=True)
+                .filter(claimable)
+                .order_by('created_at')
+                .first()
+            )
+            if job is None:
+                return None
+            if job.attempts >= job.max_attempts:
+                job.status = 'failed'
+                job.error_message = job.error_message or 'Worker stopped responding'
+                job.save(update_fields=['status', 'error_message', 'updated_at'])
+                continue
+            job.status = 'running'
+            job.attempts += 1
+            job.heartbeat_at = now
+            job.save(update_fields=['status', 'attempts', 'heartbeat_at', 'updated_at'])
+            return job
+
+
+class _Heartbeat:
+    """Touches job.heartbeat_at every HEARTBEAT_INTERVAL while the handler runs."""
+
+    def __init__(self, job):
+        self.job = job
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        try:
+            while not self._stop.wait(HEARTBEAT_INTERVAL.total_seconds()):
+                type(self.job).objects.filter(pk=self.job.pk).update(heartbeat_at=timezone.now())
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def run(job, func):
+    """
+    Run a claimed job. On success the job is completed; on error it goes back
+    to pending with backoff, or is failed once attempts are used up.
+
+    Returns:
+        whether the handler succeeded
+    """
+    model = type(job)
+    try:
+        with _Heartbeat(job):
+            func(job)
+    except Exception as e:
+        logger.error(
+            "%s %s failed (attempt %s/%s): %s",
+            model._meta.label, job.pk, job.attempts, job.max_attempts, e,
+            exc_info=True,
+        )
+        now = timezone.now()
+        if job.attempts >= job.max_attempts:
+            update = {'status': 'failed'}
+        else:
+            update = {
+                'status': 'pending',
+                'available_at': now + RETRY_BACKOFF * 2 ** (job.attempts - 1),
+            }
+        model.objects.filter(pk=job.pk).update(
+            error_message=str(e)[:2000], updated_at=now, **update
+        )
+        return False
+
+    model.objects.filter(pk=job.pk).update(
+        status='completed', error_message='', updated_at=timezone.now()
+    )
+    return True
+
+
+def process_next(model, now=None):
+    """
+    Claim and run one job of `model` with its registered handler.
+
+    Returns:
+        True if a job was claimed (whatever its outcome)
+    """
+    _, func = _handlers[model._meta.label]
+    job = claim(model, now=now)
+    if job is None:
+        return False
+    run(job, func)
+    return True
+
+
+def run_once(names=None):
+    """
+    Give every registered queue (or the named ones) one turn.
+
+    Returns:
+        number of queues that did work
+    """
+    busy = 0
+    for name in names or queue_names():
+        try:
+            busy += bool(_queues[name]())
+        except Exception:
+            logger.exception("Queue %s failed", name)
+    return busy
@@ -0,0 +1,107 @@
+"""
+Client-side rate limiting for LLM/image provider calls.
+
+One TokenBucket per provider and process, shared by all threads: a call
+takes a token before hitting the API, tokens refill at the configured
+requests per minute. Calls rejected by the provider anyway (HTTP 429,
+RESOURCE_EXHAUSTED) are retried with exponential backoff.
+
+Limits come from settings.LLM_RATE_LIMITS:
+    {'openai_image': {'concurrency': 4, 'requests_per_minute': 20}, ...}
+
+Usage:
+    bucket = get_bucket('openai_image')
+    result = call_with_retry(lambda: client.images.generate(...), bucket)
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMITS = {'concurrency': 2, 'requests_per_minute': 10}
+MAX_RETRIES = 4
+RETRY_BASE_DELAY = 2.0  # seconds, doubled on every retry
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_limits(name: str) -> dict:
+    """Configured limits for a provider: concurrency and requests_per_minute."""
+    limits = getattr(settings, 'LLM_RATE_LIMITS', {}).get(name, {})
+    return {**DEFAULT_LIMITS, **limits}
+
+
+def get_bucket(name: str) -> TokenBucket:
+    """Per-process bucket of a provider (created on first use)."""
+    with _buckets_lock:
+        if name not in _buckets:
+            limits = get_limits(name)
+            rate = limits['requests_per_minute'] / 60
+            # A full pool of workers may start at once
+            _buckets[name] = TokenBucket(rate, capacity=max(1, limits['concurrency']))
+        return _buckets[name]
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """429 / RESOURCE_EXHAUSTED; exhausted quota (billing) is not retried."""
+    if getattr(error, 'status_code', None) == 429:
+        return 'insufficient_quota' not in str(error)
+    message = str(error).lower()
+    if 'insufficient_quota' in message:
+        return False
+    return (
+        '429' in message
+        or 'rate limit' in message
+        or 'resource_exhausted' in message
+        or 'resource exhausted' in message
+    )
+
+
+def call_with_retry(func, bucket: TokenBucket = None, max_retries: int = MAX_RETRIES,
+                    base_delay: float = RETRY_BASE_DELAY):
+    """
+    Call func() after taking a token from `bucket`; on a rate-limit error
+    wait base_delay * 2**attempt and try again. Other errors propagate.
+    """
+    for attempt in range(max_retries + 1):
+        if bucket is not None:
+            bucket.acquire()
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= max_retries or not is_rate_limit_error(e):
+                raise
+            delay = base_delay * 2 ** attempt
+            logger.warning(f"Rate limited ({e}), retry {attempt + 1}/{max_retries} in {delay:.0f}s")
+            time.sleep(delay)
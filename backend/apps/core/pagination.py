@@ -0,0 +1,125 @@
+"""
+Keyset (cursor) pagination for function views.
+
+A page is read as WHERE (sort_value, id) is after the cursor ... LIMIT n + 1,
+so its cost does not depend on how deep the page is, unlike OFFSET.
+The cursor is an opaque url-safe token with the sort value and id of the
+last row of the previous page. NULL sort values always go last.
+
+Usage:
+    page = paginate_by_cursor(queryset, '-created_at', request.query_params.get('cursor'), 50)
+    page.items, page.next_cursor
+"""
+import base64
+import binascii
+import json
+import datetime
+from dataclasses import dataclass
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+
+
+class InvalidCursor(ValueError):
+    """Cursor token cannot be decoded for the requested ordering."""
+
+
+@dataclass
+class CursorPage:
+    items: list
+    next_cursor: str = None
+
+
+def _sort_field(queryset, name):
+    """
+    Field used to parse cursor values and whether the sort value may be NULL
+    (annotations are always treated as nullable).
+    """
+    annotation = queryset.query.annotations.get(name)
+    if annotation is not None:
+        return annotation.output_field, True
+    field = queryset.model._meta.get_field(name)
+    return field, field.null
+
+
+def _json_default(value):
+    # Полный isoformat: DjangoJSONEncoder обрезает микросекунды,
+    # и курсор перестал бы точно указывать на строку
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(value, pk) -> str:
+    raw = json.dumps([value, pk], default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, field):
+    """
+    Returns:
+        tuple: (sort value converted by `field`, pk)
+    Raises:
+        InvalidCursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        value, pk = json.loads(raw)
+        if value is not None:
+            value = field.to_python(value)
+        return value, int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, ValidationError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+def keyset_ordering(ordering):
+    """order_by() arguments for `ordering` with id as the tie-breaker."""
+    name = ordering.lstrip('-')
+    if ordering.startswith('-'):
+        return [F(name).desc(nulls_last=True), '-pk']
+    return [F(name).asc(nulls_last=True), 'pk']
+
+
+def keyset_filter(ordering, value, pk, nullable=True):
+    """Q selecting rows that come after (value, pk) in keyset_ordering(ordering)."""
+    name = ordering.lstrip('-')
+    lookup = 'lt' if ordering.startswith('-') else 'gt'
+
+    if value is None:
+        return Q(**{f'{name}__isnull': True, f'pk__{lookup}': pk})
+
+    after = Q(**{f'{name}__{lookup}': value}) | Q(**{name: value, f'pk__{lookup}': pk})
+    if nullable:
+        after |= Q(**{f'{name}__isnull': True})
+    return after
+
+
+def paginate_by_cursor(queryset, ordering, cursor=None, page_size=20):
+    """
+    One page of `queryset` in keyset order.
+
+    Prefetches of `queryset` run only for the rows of the page.
+
+    Raises:
+        InvalidCursor
+    """
+    name = ordering.lstrip('-')
+    try:
+        field, nullable = _sort_field(queryset, name)
+    except FieldDoesNotExist as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+    queryset = queryset.order_by(*keyset_ordering(ordering))
+    if cursor:
+        value, pk = decode_cursor(cursor, field)
+        queryset = queryset.filter(
+            keyset_filter(ordering, value, pk, nullable=nullable)
+        )
+
+    items = list(queryset[:page_size + 1])
+    if len(items) <= page_size:
+        return CursorPage(items)
+
+    items = items[:page_size]
+    last = items[-1]
+    return CursorPage(items, encode_cursor(getattr(last, name), last.pk))
@@ -0,0 +1,62 @@
+"""Tests for jobs.py — durable DB job queue and the run_workers command."""
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.core import jobs
+
+
+@pytest.fixture
+def queues():
+    with patch.dict(jobs._queues, clear=True):
+        yield jobs._queues
+
+
+class TestRunOnce:
+    def test_counts_queues_with_work(self, queues):
+        jobs.register_queue('busy', lambda: True)
+        jobs.register_queue('idle', lambda: False)
+
+        assert jobs.run_once() == 1
+        assert jobs.run_once(['idle']) == 0
+
+    def test_failing_queue_does_not_stop_others(self, queues):
+        calls = []
+
+        def broken():
+            raise RuntimeError('boom')
+
+        jobs.register_queue('broken', broken)
+        jobs.register_queue('ok', lambda: calls.append(1) or True)
+
+        assert jobs.run_once() == 1
+        assert calls == [1]
+
+
+class TestRunWorkersCommand:
+    def test_registers_app_queues(self):
+        jobs.autodiscover()
+        assert {
+            'cards.CardGenerationJob',
+            'literary_context.DeckContextJob',
+            'training.etymology',
+        } <= set(jobs.queue_names())
+
+    def test_once_runs_selected_queue(self, queues):
+        calls = []
+        jobs.register_queue('test', lambda: calls.append(1) or True)
+
+        with patch.object(jobs, 'autodiscover'):
+            out = StringIO()
+            call_command('run_workers', '--once', '--queue', 'test', stdout=out)
+
+        assert calls == [1]
+        assert 'Queues with work: 1/1' in out.getvalue()
+
+    def test_unknown_queue(self, queues):
+        with patch.object(jobs, 'autodiscover'):
+            with pytest.raises(CommandError):
+                call_command('run_workers', '--once', '--queue', 'missing')
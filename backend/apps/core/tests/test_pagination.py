@@ -0,0 +1,72 @@
+"""
+Тесты курсорной пагинации
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.core.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    paginate_by_cursor,
+)
+from apps.words.models import Word
+
+User = get_user_model()
+
+
+class TestCursorToken:
+    def test_roundtrip_datetime(self):
+        value = timezone.now()
+        field = Word._meta.get_field('created_at')
+
+        assert decode_cursor(encode_cursor(value, 42), field) == (value, 42)
+
+    def test_roundtrip_null(self):
+        field = Word._meta.get_field('created_at')
+
+        assert decode_cursor(encode_cursor(None, 7), field) == (None, 7)
+
+    @pytest.mark.parametrize('token', ['', '!!!', encode_cursor('not a date', 1)])
+    def test_invalid_token(self, token):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(token, Word._meta.get_field('created_at'))
+
+
+@pytest.mark.django_db
+class TestPaginateByCursor:
+    @pytest.fixture
+    def words(self):
+        user = User.objects.create_user(username='pager', password='testpass123')
+        now = timezone.now()
+        words = []
+        for i in range(7):
+            word = Word.objects.create(
+                user=user, original_word=f'w{i}', translation=f't{i}', language='de'
+            )
+            words.append(word)
+        # Одинаковые created_at у пар — порядок внутри пары задаёт id
+        for i, word in enumerate(words):
+            Word.objects.filter(pk=word.pk).update(created_at=now - timedelta(minutes=i // 2))
+        return Word.objects.filter(user=user)
+
+    @pytest.mark.parametrize('ordering', ['created_at', '-created_at'])
+    def test_pages_cover_queryset_once(self, words, ordering):
+        cursor, seen = None, []
+        while True:
+            page = paginate_by_cursor(words, ordering, cursor, page_size=3)
+            seen.extend(word.pk for word in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        expected = list(words.order_by(ordering, ordering.replace('created_at', 'pk'))
+                        .values_list('pk', flat=True))
+        assert seen == expected
+
+    def test_unknown_field(self, words):
+        with pytest.raises(InvalidCursor):
+            paginate_by_cursor(words, 'missing', None)
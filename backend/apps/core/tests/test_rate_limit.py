@@ -0,0 +1,83 @@
+"""Tests for llm/rate_limit.py — token bucket and retries on 429."""
+from unittest.mock import patch
+
+import pytest
+
+from apps.core.llm import rate_limit
+from apps.core.llm.rate_limit import TokenBucket, call_with_retry, is_rate_limit_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch.object(rate_limit.time, 'monotonic', fake.monotonic), \
+            patch.object(rate_limit.time, 'sleep', fake.sleep):
+        yield fake
+
+
+class TestTokenBucket:
+    def test_burst_then_rate(self, clock):
+        bucket = TokenBucket(rate=2, capacity=3)
+
+        for _ in range(3):
+            bucket.acquire()
+        assert clock.now == 0
+
+        bucket.acquire()
+        bucket.acquire()
+        assert clock.now == pytest.approx(1.0)
+
+
+class TestCallWithRetry:
+    def test_retries_rate_limit_with_backoff(self, clock):
+        calls = []
+
+        def func():
+            calls.append(clock.now)
+            if len(calls) < 3:
+                raise Exception('Error code: 429 - Rate limit reached')
+            return 'ok'
+
+        assert call_with_retry(func, base_delay=1) == 'ok'
+        assert calls == [0, 1, 3]
+
+    def test_other_errors_are_not_retried(self, clock):
+        calls = []
+
+        def func():
+            calls.append(1)
+            raise ValueError('bad prompt')
+
+        with pytest.raises(ValueError):
+            call_with_retry(func)
+        assert calls == [1]
+
+    def test_gives_up_after_max_retries(self, clock):
+        def func():
+            raise Exception('429 Too Many Requests')
+
+        with pytest.raises(Exception, match='429'):
+            call_with_retry(func, max_retries=2, base_delay=1)
+        assert clock.now == 3
+
+
+class TestIsRateLimitError:
+    @pytest.mark.parametrize('message, expected', [
+        ('Error code: 429 - Rate limit reached for images', True),
+        ('429 RESOURCE_EXHAUSTED', True),
+        ('Error code: 429 - insufficient_quota', False),
+        ('content_policy_violation', False),
+    ])
+    def test_messages(self, message, expected):
+        assert is_rate_limit_error(Exception(message)) is expected
@@ -0,0 +1,76 @@
+"""Tests for user_cache.py — versioned per-user cache."""
+import pytest
+from django.core.cache import cache
+
+from apps.core import user_cache
+from apps.words.models import Word
+
+
+@pytest.mark.django_db
+class TestUserCache:
+    def test_builds_once_per_version(self, django_capture_on_commit_callbacks):
+        calls = []
+
+        def builder():
+            calls.append(1)
+            return {'value': len(calls)}
+
+        assert user_cache.get_or_build(1, 'stats', builder) == {'value': 1}
+        assert user_cache.get_or_build(1, 'stats', builder) == {'value': 1}
+        assert len(calls) == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user_cache.bump_version(1)
+        assert user_cache.get_or_build(1, 'stats', builder) == {'value': 2}
+
+    def test_versions_are_per_user(self, django_capture_on_commit_callbacks):
+        user_cache.get_or_build(1, 'stats', lambda: 'first')
+        with django_capture_on_commit_callbacks(execute=True):
+            user_cache.bump_version(2)
+        assert user_cache.get_or_build(1, 'stats', lambda: 'second') == 'first'
+
+    def test_lost_version_does_not_revive_old_entries(self, django_capture_on_commit_callbacks):
+        user_cache.get_or_build(1, 'stats', lambda: 'old')
+        cache.delete(user_cache.VERSION_KEY.format(user_id=1))
+        with django_capture_on_commit_callbacks(execute=True):
+            user_cache.bump_version(1)
+        assert user_cache.get_or_build(1, 'stats', lambda: 'new') == 'new'
+
+    def test_bump_waits_for_commit(self, django_capture_on_commit_callbacks):
+        version = user_cache.get_version(1)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            user_cache.bump_version(1)
+            user_cache.bump_version(1)
+            # До коммита читатель видит прежнюю версию и прежние данные
+            assert user_cache.get_version(1) == version
+
+        for callback in callbacks:
+            callback()
+        assert user_cache.get_version(1) != version
+
+
+@pytest.mark.django_db
+class TestUserCacheInvalidation:
+    def test_word_and_deck_writes_bump_version(self, user, deck, django_capture_on_commit_callbacks):
+        version = user_cache.get_version(user.id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            word = Word.objects.create(
+                user=user, original_word='Haus', translation='дом', language='de')
+        assert user_cache.get_version(user.id) != version
+
+        version = user_cache.get_version(user.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            deck.words.add(word)
+        assert user_cache.get_version(user.id) != version
+
+    def test_other_user_not_bumped(self, user, user2, django_capture_on_commit_callbacks):
+        # Отложенные сбросы от создания фикстур применяются первым колбэком
+        with django_capture_on_commit_callbacks(execute=True):
+            user_cache.bump_version(user2.id)
+        version = user_cache.get_version(user.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            Word.objects.create(
+                user=user2, original_word='Haus', translation='дом', language='de')
+        assert user_cache.get_version(user.id) == version
@@ -0,0 +1,72 @@
+"""
+Per-user cache of computed payloads (dashboard, stats, notifications).
+
+Every key includes the user's version. Writes to the user's cards, words,
+decks and categories replace the version, which makes all older entries
+unreachable at once; they expire by TTL. The cache backend is shared by all
+workers (see CACHES in settings), so a payload is computed once per change.
+
+Inside a transaction the version is replaced on commit (once per user),
+so a concurrent reader cannot rebuild an entry from uncommitted data under
+the new version. A bump writes a fresh time_ns() value rather than
+incrementing, which needs no atomic incr from the backend (the file cache
+has none) and cannot lose a concurrent bump.
+
+Usage:
+    data = get_or_build(user.id, 'dashboard', lambda: build(user), timeout=60)
+    bump_version(user.id)
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'user_cache_version:{user_id}'
+ENTRY_KEY = 'user_cache:{user_id}:{version}:{name}'
+DEFAULT_TIMEOUT = 60
+
+
+def _new_version() -> int:
+    # Новое значение, а не incr: счётчик, пропавший из кэша (вытеснение,
+    # рестарт), не вернётся к значению, под которым уже лежат старые записи
+    return time.time_ns()
+
+
+def get_version(user_id) -> int:
+    """Current cache version of the user (created on first use)."""
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key) or _new_version()
+    return version
+
+
+def _flush_bumps(connection) -> None:
+    user_ids, connection._user_cache_bumps = getattr(connection, '_user_cache_bumps', set()), set()
+    for user_id in user_ids:
+        cache.set(VERSION_KEY.format(user_id=user_id), _new_version(), None)
+
+
+def bump_version(user_id, using=None) -> None:
+    """Invalidate every cached payload of the user (after commit inside a transaction)."""
+    connection = transaction.get_connection(using)
+    if not hasattr(connection, '_user_cache_bumps'):
+        connection._user_cache_bumps = set()
+    connection._user_cache_bumps.add(user_id)
+    # Колбэк на каждый вызов: отброшенный откатом savepoint'а не теряет
+    # сброс — набор на соединении опустошит следующий колбэк
+    transaction.on_commit(lambda: _flush_bumps(connection), using=using)
+
+
+def get_or_build(user_id, name, builder, timeout=DEFAULT_TIMEOUT):
+    """
+    Return the cached payload `name` for the user's current version,
+    building and storing it with `builder()` on a miss.
+    """
+    key = ENTRY_KEY.format(user_id=user_id, version=get_version(user_id), name=name)
+    data = cache.get(key)
+    if data is None:
+        data = builder()
+        cache.set(key, data, timeout)
+    return data
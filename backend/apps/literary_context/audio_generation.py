@@ -1,15 +1,14 @@
 """
 Audio generation for literary context.
 Supports: ElevenLabs -> OpenAI TTS -> gTTS fallback chain.
+Audio is shared through the TTS cache (apps/cards/tts_cache.py): the same
+text, language and voice is synthesized once.
 """
 import io
-import uuid
 import logging
-from pathlib import Path
 from typing import Optional
 
-from django.conf import settings as django_settings
-
+from apps.cards import tts_cache
 from .models import LiteraryContextSettings
 
 logger = logging.getLogger(__name__)
@@ -36,21 +35,6 @@ DEFAULT_VOICES = {
 }
 
 
-def _save_audio_bytes(audio_bytes: bytes, subdir: str = 'literary_audio') -> str:
-    """Save audio bytes to media and return relative path."""
-    file_id = str(uuid.uuid4())
-    filename = f'{file_id}.mp3'
-
-    media_root = Path(django_settings.MEDIA_ROOT)
-    audio_dir = media_root / subdir
-    audio_dir.mkdir(parents=True, exist_ok=True)
-
-    file_path = audio_dir / filename
-    file_path.write_bytes(audio_bytes)
-
-    return f'{subdir}/{filename}'
-
-
 def generate_audio_elevenlabs(
     text: str,
     language: str,
@@ -130,20 +114,21 @@ def generate_literary_audio(
     Returns:
         Relative path to saved audio file, or None if all providers fail.
     """
-    # Tier 1: ElevenLabs
-    audio_bytes = generate_audio_elevenlabs(text, language, voice_id)
-    if audio_bytes:
-        return _save_audio_bytes(audio_bytes, subdir)
-
-    # Tier 2: OpenAI TTS
-    audio_bytes = generate_audio_openai(text, language)
-    if audio_bytes:
-        return _save_audio_bytes(audio_bytes, subdir)
-
-    # Tier 3: gTTS
-    audio_bytes = generate_audio_gtts(text, language)
-    if audio_bytes:
-        return _save_audio_bytes(audio_bytes, subdir)
+    voice_id = voice_id or DEFAULT_VOICES.get(language, DEFAULT_VOICES['en'])
+    tiers = [
+        ('elevenlabs:eleven_multilingual_v2', voice_id,
+         lambda: generate_audio_elevenlabs(text, language, voice_id)),
+        ('openai:tts-1', 'alloy', lambda: generate_audio_openai(text, language)),
+        ('gtts', 'com', lambda: generate_audio_gtts(text, language)),
+    ]
+    # A cached lower tier does not skip a higher one that may be available now
+    for provider, voice, synthesize in tiers:
+        relative_path, _ = tts_cache.get_or_synthesize(
+            text, language, voice=voice, provider=provider,
+            synthesize=synthesize, subdir=subdir,
+        )
+        if relative_path:
+            return relative_path
 
     logger.error(f'All audio providers failed for text: {text[:50]}')
     return None
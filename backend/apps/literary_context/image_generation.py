@@ -3,14 +3,12 @@ Scene image generation for literary context.
 Uses Gemini (gemini-2.5-flash-image) for image generation.
 """
 import io
-import uuid
 import logging
-from pathlib import Path
 from typing import Optional
 
 from PIL import Image
-from django.conf import settings
 
+from apps.cards import media_store
 from .models import SceneAnchor, LiteraryContextSettings
 
 logger = logging.getLogger(__name__)
@@ -83,19 +81,10 @@ def generate_scene_image(
     if image.mode != 'RGB':
         image = image.convert('RGB')
 
-    # Save
-    file_id = str(uuid.uuid4())
-    filename = f'{file_id}.jpg'
-
-    media_root = Path(settings.MEDIA_ROOT)
-    scenes_dir = media_root / 'literary_scenes'
-    scenes_dir.mkdir(parents=True, exist_ok=True)
-
-    file_path = scenes_dir / filename
-    image.save(file_path, 'JPEG', quality=95)
+    # Save (content-addressed: identical scenes share one file)
+    relative_path = media_store.save_image(image, 'literary_scenes')
 
     # Update anchor
-    relative_path = f'literary_scenes/{filename}'
     anchor.image_file = relative_path
     anchor.image_prompt = prompt
     anchor.is_generated = True
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.17 on 2026-10-17 05:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('literary_context', '0004_add_deck_context_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deckcontextjob',
+            name='attempts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='deckcontextjob',
+            name='available_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Not claimed before this time (retry backoff)'),
+        ),
+        migrations.AddField(
+            model_name='deckcontextjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Touched by the worker while the job runs', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='deckcontextjob',
+            index=models.Index(fields=['status', 'created_at'], name='literary_co_status_91905d_idx'),
+        ),
+    ]
@@ -5,6 +5,7 @@ from django.db import models
 from django.core.cache import cache
 
 from apps.core.constants import LANGUAGE_CHOICES
+from apps.core.jobs import QueuedJob
 
 
 class LiterarySource(models.Model):
@@ -192,16 +193,12 @@ class WordContextMedia(models.Model):
         return f"{self.word} @ {self.source.slug} ({status})"
 
 
-JOB_STATUS_CHOICES = [
-    ('pending', 'Pending'),
-    ('running', 'Running'),
-    ('completed', 'Completed'),
-    ('failed', 'Failed'),
-]
-
+class DeckContextJob(QueuedJob):
+    """
+    Tracks async literary context generation for a deck.
 
-class DeckContextJob(models.Model):
-    """Tracks async literary context generation for a deck."""
+    Run by the worker (manage.py run_workers, handler in tasks.py).
+    """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     deck = models.ForeignKey(
         'cards.Deck', on_delete=models.CASCADE, related_name='context_jobs'
@@ -212,21 +209,18 @@ class DeckContextJob(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='context_jobs'
     )
-    status = models.CharField(
-        max_length=20, choices=JOB_STATUS_CHOICES, default='pending'
-    )
     progress = models.IntegerField(default=0, help_text='0-100 percent')
     current_word = models.CharField(max_length=200, blank=True, default='')
     stats = models.JSONField(default=dict, blank=True)
     unmatched_words = models.JSONField(default=list, blank=True)
-    error_message = models.TextField(blank=True, default='')
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Deck Context Job'
         verbose_name_plural = 'Deck Context Jobs'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
 
     def __str__(self):
         return f"Job {self.id} [{self.status}] {self.deck} → {self.source.slug}"
@@ -1,19 +1,18 @@
 """
-Celery-ready task functions for literary context generation.
+Task functions for literary context generation.
 
-These functions can be wrapped with @shared_task when Celery is added.
-For now, they are called synchronously from views and management commands.
-
-Usage (future):
-    from celery import shared_task
-
-    @shared_task
-    def generate_word_context_task(word_id, source_slug):
-        return _generate_word_context_task(word_id, source_slug)
+run_deck_context_job is the background handler for DeckContextJob rows:
+generate_deck_context_async_view queues the job and the worker
+(manage.py run_workers) runs it, with heartbeats and retries from
+apps.core.jobs. The other functions are called synchronously from views
+and management commands.
 """
 import logging
 
-from .models import LiterarySource, WordContextMedia, LiteraryContextSettings
+from django.utils import timezone
+
+from apps.core import jobs
+from .models import DeckContextJob, LiterarySource, WordContextMedia, LiteraryContextSettings
 
 logger = logging.getLogger(__name__)
 
@@ -57,3 +56,40 @@ def generate_scene_image_task(anchor_id: int) -> dict:
     anchor = SceneAnchor.objects.get(id=anchor_id)
     generate_scene_image(anchor)
     return {'anchor_id': anchor_id, 'success': True}
+
+
+@jobs.handler(DeckContextJob)
+def run_deck_context_job(job):
+    """Generate literary context for all words of the job's deck."""
+    from apps.cards.models import Deck
+    from .generation import generate_batch_context
+
+    def on_progress(current, total, word_text):
+        pct = int(current / total * 100) if total else 0
+        DeckContextJob.objects.filter(id=job.id).update(
+            progress=pct,
+            current_word=word_text[:200],
+            updated_at=timezone.now(),
+        )
+
+    stats = generate_batch_context(
+        job.deck.words.all(), job.source,
+        skip_existing=True,
+        skip_hint=False,
+        force=False,
+        on_progress=on_progress,
+        user=job.user,
+    )
+
+    Deck.objects.filter(id=job.deck_id).update(
+        literary_source=job.source,
+        literary_source_override=True,
+    )
+
+    DeckContextJob.objects.filter(id=job.id).update(
+        progress=100,
+        current_word='',
+        stats=stats,
+        unmatched_words=stats.get('unmatched_words', []),
+        updated_at=timezone.now(),
+    )
@@ -1,13 +1,19 @@
 """Tests for async deck context generation endpoints."""
 import uuid
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 import pytest
 from rest_framework.test import APIClient
 
+from apps.core import jobs
 from apps.literary_context.models import DeckContextJob
 
 
+@pytest.fixture(autouse=True)
+def registered_handlers():
+    jobs.autodiscover()
+
+
 @pytest.fixture
 def api_client(test_user):
     client = APIClient()
@@ -16,13 +22,7 @@ def api_client(test_user):
 
 
 class TestGenerateDeckContextAsync:
-    @patch('apps.literary_context.views.threading.Thread')
-    def test_creates_job_and_returns_id(
-        self, mock_thread_cls, api_client, deck_with_words, chekhov_source
-    ):
-        mock_thread = MagicMock()
-        mock_thread_cls.return_value = mock_thread
-
+    def test_creates_job_and_returns_id(self, api_client, deck_with_words, chekhov_source):
         deck, words = deck_with_words
         response = api_client.post(
             '/api/literary-context/generate-deck-context-async/',
@@ -35,7 +35,7 @@ class TestGenerateDeckContextAsync:
         job = DeckContextJob.objects.get(id=response.data['job_id'])
         assert job.status == 'pending'
         assert job.deck_id == deck.id
-        mock_thread.start.assert_called_once()
+        assert job.attempts == 0  # waits for the worker
 
     def test_missing_params(self, api_client):
         response = api_client.post(
@@ -54,13 +54,7 @@ class TestGenerateDeckContextAsync:
         )
         assert response.status_code == 404
 
-    @patch('apps.literary_context.views.threading.Thread')
-    def test_returns_existing_running_job(
-        self, mock_thread_cls, api_client, deck_with_words, chekhov_source
-    ):
-        mock_thread = MagicMock()
-        mock_thread_cls.return_value = mock_thread
-
+    def test_returns_existing_running_job(self, api_client, deck_with_words, chekhov_source):
         deck, _ = deck_with_words
 
         # First call creates job
@@ -80,6 +74,41 @@ class TestGenerateDeckContextAsync:
         assert response2.data['job_id'] == job_id
 
 
+class TestRunDeckContextJob:
+    @patch('apps.literary_context.generation.generate_batch_context')
+    def test_worker_runs_job(self, mock_generate, deck_with_words, chekhov_source):
+        deck, words = deck_with_words
+        mock_generate.return_value = {'generated': 3, 'unmatched_words': ['xyz']}
+        job = DeckContextJob.objects.create(deck=deck, source=chekhov_source, user=deck.user)
+
+        assert jobs.process_next(DeckContextJob) is True
+
+        job.refresh_from_db()
+        assert job.status == 'completed'
+        assert job.progress == 100
+        assert job.stats['generated'] == 3
+        assert job.unmatched_words == ['xyz']
+        deck.refresh_from_db()
+        assert deck.literary_source_id == chekhov_source.id
+        assert deck.literary_source_override is True
+        assert set(mock_generate.call_args[0][0]) == set(words)
+
+    @patch('apps.literary_context.generation.generate_batch_context')
+    def test_failed_job_is_retried_later(self, mock_generate, deck_with_words, chekhov_source):
+        deck, _ = deck_with_words
+        mock_generate.side_effect = RuntimeError('LLM down')
+        job = DeckContextJob.objects.create(deck=deck, source=chekhov_source, user=deck.user)
+
+        assert jobs.process_next(DeckContextJob) is True
+
+        job.refresh_from_db()
+        assert job.status == 'pending'
+        assert job.error_message == 'LLM down'
+        assert job.available_at > job.created_at
+        # Not claimed again until the backoff expires
+        assert jobs.process_next(DeckContextJob) is False
+
+
 class TestJobStatusView:
     def test_pending_status(self, api_client, deck_with_words, chekhov_source):
         deck, _ = deck_with_words
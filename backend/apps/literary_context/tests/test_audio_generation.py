@@ -8,26 +8,9 @@ from apps.literary_context.audio_generation import (
     generate_audio_elevenlabs,
     generate_audio_openai,
     generate_audio_gtts,
-    _save_audio_bytes,
 )
 
 
-class TestSaveAudioBytes:
-    def test_saves_file(self, tmp_path):
-        from django.conf import settings
-        original = settings.MEDIA_ROOT
-        settings.MEDIA_ROOT = str(tmp_path)
-        try:
-            result = _save_audio_bytes(b'fake audio data', 'test_audio')
-            assert result.startswith('test_audio/')
-            assert result.endswith('.mp3')
-            full_path = tmp_path / result
-            assert full_path.exists()
-            assert full_path.read_bytes() == b'fake audio data'
-        finally:
-            settings.MEDIA_ROOT = original
-
-
 class TestElevenLabsAudio:
     @patch.dict('os.environ', {'ELEVENLABS_API_KEY': 'test-key'})
     @patch('apps.literary_context.audio_generation.HAS_ELEVENLABS', True)
@@ -74,6 +57,7 @@ class TestOpenAIAudio:
         assert result is None
 
 
+@pytest.mark.django_db
 class TestGenerateLiteraryAudio:
     @patch('apps.literary_context.audio_generation.generate_audio_gtts')
     @patch('apps.literary_context.audio_generation.generate_audio_openai')
@@ -137,3 +121,17 @@ class TestGenerateLiteraryAudio:
 
         result = generate_literary_audio('test', 'de')
         assert result is None
+
+    @patch('apps.literary_context.audio_generation.generate_audio_gtts')
+    @patch('apps.literary_context.audio_generation.generate_audio_openai')
+    @patch('apps.literary_context.audio_generation.generate_audio_elevenlabs')
+    def test_same_text_is_synthesized_once(self, mock_el, mock_openai, mock_gtts, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        mock_el.return_value = b'elevenlabs audio'
+
+        first = generate_literary_audio('Guten  Morgen', 'de')
+        second = generate_literary_audio('Guten Morgen', 'de', subdir='literary_hints')
+
+        assert first == second
+        assert (tmp_path / first).read_bytes() == b'elevenlabs audio'
+        mock_el.assert_called_once()
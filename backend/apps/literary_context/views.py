@@ -1,5 +1,4 @@
 import logging
-import threading
 
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
@@ -150,64 +149,6 @@ def generate_deck_context_view(request):
     return Response(stats, status=status.HTTP_200_OK)
 
 
-def _run_deck_context_job(job_id, word_ids, source_id, deck_id, user_id):
-    """Background thread: generate literary context for all words in a deck."""
-    import django
-    django.db.connections.close_all()
-
-    job = DeckContextJob.objects.get(id=job_id)
-    job.status = 'running'
-    job.save(update_fields=['status', 'updated_at'])
-
-    try:
-        source = LiterarySource.objects.get(id=source_id)
-        words = Word.objects.filter(id__in=word_ids)
-
-        def on_progress(current, total, word_text):
-            pct = int(current / total * 100) if total else 0
-            DeckContextJob.objects.filter(id=job_id).update(
-                progress=pct,
-                current_word=word_text[:200],
-            )
-
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        user = User.objects.get(id=user_id)
-
-        stats = generate_batch_context(
-            words, source,
-            skip_existing=True,
-            skip_hint=False,
-            force=False,
-            on_progress=on_progress,
-            user=user,
-        )
-
-        # Set deck literary source
-        Deck.objects.filter(id=deck_id).update(
-            literary_source=source,
-            literary_source_override=True,
-        )
-
-        job.refresh_from_db()
-        job.status = 'completed'
-        job.progress = 100
-        job.current_word = ''
-        job.stats = stats
-        job.unmatched_words = stats.get('unmatched_words', [])
-        job.save(update_fields=[
-            'status', 'progress', 'current_word', 'stats',
-            'unmatched_words', 'updated_at',
-        ])
-
-    except Exception as e:
-        logger.error(f'Deck context job {job_id} failed: {e}')
-        DeckContextJob.objects.filter(id=job_id).update(
-            status='failed',
-            error_message=str(e)[:2000],
-        )
-
-
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def generate_deck_context_async_view(request):
@@ -215,6 +156,9 @@ def generate_deck_context_async_view(request):
     POST /api/literary-context/generate-deck-context-async/
     Body: {deck_id: int, source_slug: str}
     Returns: {job_id: str}
+
+    The job is queued in the database and run by the worker
+    (manage.py run_workers, see tasks.run_deck_context_job).
     """
     deck_id = request.data.get('deck_id')
     source_slug = request.data.get('source_slug')
@@ -228,8 +172,7 @@ def generate_deck_context_async_view(request):
     deck = get_object_or_404(Deck, id=deck_id, user=request.user)
     source = get_object_or_404(LiterarySource, slug=source_slug, is_active=True)
 
-    word_ids = list(deck.words.values_list('id', flat=True))
-    if not word_ids:
+    if not deck.words.exists():
         return Response(
             {'error': 'Deck has no words'},
             status=status.HTTP_400_BAD_REQUEST,
@@ -248,13 +191,6 @@ def generate_deck_context_async_view(request):
         user=request.user,
     )
 
-    thread = threading.Thread(
-        target=_run_deck_context_job,
-        args=(job.id, word_ids, source.id, deck.id, request.user.id),
-        daemon=True,
-    )
-    thread.start()
-
     return Response({'job_id': str(job.id)}, status=status.HTTP_202_ACCEPTED)
 
 
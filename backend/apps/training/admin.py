@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import UserTrainingSettings, NotificationSettings
+from .models import (
+    UserTrainingSettings, NotificationSettings, ReviewLog, TrainingSession, UserDailyActivity,
+    PendingEtymology,
+)
 
 
 @admin.register(NotificationSettings)
@@ -53,3 +56,35 @@ class UserTrainingSettingsAdmin(admin.ModelAdmin):
             'classes': ('collapse',),
         }),
     )
+
+
+@admin.register(ReviewLog)
+class ReviewLogAdmin(admin.ModelAdmin):
+    list_display = ['user', 'card', 'answer', 'interval_before', 'interval_after', 'ease_factor', 'reviewed_at']
+    list_filter = ['answer', 'was_in_learning_mode']
+    search_fields = ['user__username']
+    raw_id_fields = ['user', 'card']
+    date_hierarchy = 'reviewed_at'
+
+
+@admin.register(TrainingSession)
+class TrainingSessionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'answered_count', 'created_at', 'expires_at']
+    search_fields = ['user__username']
+    raw_id_fields = ['user']
+    readonly_fields = ['queue', 'requeue', 'payloads']
+
+
+@admin.register(UserDailyActivity)
+class UserDailyActivityAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'reviews', 'successes', 'timed_reviews', 'time_spent']
+    search_fields = ['user__username']
+    raw_id_fields = ['user']
+    date_hierarchy = 'date'
+
+
+@admin.register(PendingEtymology)
+class PendingEtymologyAdmin(admin.ModelAdmin):
+    list_display = ['word', 'user', 'attempts', 'claimed_at', 'created_at']
+    search_fields = ['user__username', 'word__original_word']
+    raw_id_fields = ['word', 'user']
@@ -128,6 +128,94 @@ def generate_etymology(
         raise Exception(f"Ошибка при генерации этимологии: {str(e)}")
 
 
+def generate_etymologies_batch(words: List[Word], user: User) -> dict:
+    """
+    Генерирует этимологию для нескольких слов пользователя одним запросом к AI
+    
+    Каждое слово получает тот же промпт, что и в generate_etymology;
+    модель возвращает JSON-объект {id слова: этимология}. Токены
+    (ETYMOLOGY_COST) списываются только за полученные этимологии,
+    слова сверх баланса не отправляются.
+    
+    Args:
+        words: Слова одного пользователя
+        user: Пользователь (для проверки баланса и пользовательского промпта)
+    
+    Returns:
+        dict {word_id: этимология}
+    
+    Raises:
+        Exception: Ошибка при вызове AI API или разборе ответа
+    """
+    affordable = check_balance(user) // ETYMOLOGY_COST
+    words = list(words)[:max(affordable, 0)]
+    if not words:
+        return {}
+    
+    from apps.cards.language_utils import LANGUAGE_NAMES
+    native_lang_code = getattr(user, 'native_language', 'ru') or 'ru'
+    native_language = LANGUAGE_NAMES.get(native_lang_code, 'Russian')
+    prompt_template = get_etymology_prompt(user)
+    
+    tasks = "\n\n".join(
+        f"[{word.id}]\n" + format_prompt(
+            prompt_template,
+            word=word.original_word,
+            translation=word.translation,
+            language=word.language,
+            native_language=native_language
+        )
+        for word in words
+    )
+    prompt = (
+        "Выполни задание для каждого слова ниже. Ответь JSON-объектом, "
+        "где ключ — число в квадратных скобках, значение — текст этимологии.\n\n"
+        + tasks
+    )
+    
+    logger.info(f"Пакетная генерация этимологии для {len(words)} слов пользователя {user.username}")
+    
+    try:
+        client = get_openai_client()
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": f"Ты помощник для объяснения этимологии слов. Отвечай точно и информативно на языке {native_language}."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.7,
+            max_tokens=300 * len(words),
+            response_format={"type": "json_object"}
+        )
+        result = json.loads(response.choices[0].message.content)
+    except Exception as e:
+        logger.error(f"Ошибка при пакетной генерации этимологии: {str(e)}")
+        raise Exception(f"Ошибка при генерации этимологии: {str(e)}")
+    
+    etymologies = {}
+    for word in words:
+        etymology = str(result.get(str(word.id)) or '').strip()
+        # Та же валидация, что и для одиночной генерации
+        if len(etymology) < 10:
+            continue
+        token, success = spend_tokens(
+            user,
+            ETYMOLOGY_COST,
+            f"Генерация этимологии для слова '{word.original_word}'"
+        )
+        if not success:
+            break
+        etymologies[word.id] = etymology
+    
+    return etymologies
+
+
 def generate_hint(
     word: str,
     translation: str,
@@ -224,52 +312,34 @@ def generate_hint(
         hint_audio_path = None
         if generate_audio:
             try:
-                # Генерируем аудио через существующую функцию
-                # Используем OpenAI TTS для генерации аудио из текста подсказки
-                from apps.cards.llm_utils import generate_audio_with_openai_tts
-                from pathlib import Path
-                from django.conf import settings
-                import uuid
-                
-                # Создаем клиент OpenAI
-                client = get_openai_client()
-                
-                # Генерируем аудио через OpenAI TTS-1-HD
-                response = client.audio.speech.create(
-                    model="tts-1-hd",
-                    voice="nova",  # Используем мягкий голос
-                    input=hint_text,
-                )
-                
-                # Получаем аудио данные
-                audio_data = response.content
-                
-                # Генерируем уникальное имя файла
-                file_id = str(uuid.uuid4())
-                filename = f"{file_id}.mp3"
-                
-                # Сохраняем аудио в папку hints/
-                media_root = Path(settings.MEDIA_ROOT)
-                hints_dir = media_root / "hints"
-                hints_dir.mkdir(parents=True, exist_ok=True)
-                
-                audio_path = hints_dir / filename
-                
-                # Сохраняем аудиофайл
-                with open(audio_path, 'wb') as f:
-                    f.write(audio_data)
+                # Озвучка через OpenAI TTS-1-HD мягким голосом; одинаковый текст
+                # берется из кэша — без вызова API и без списания токенов
+                from apps.cards import tts_cache
                 
-                hint_audio_path = str(audio_path)
+                def synthesize():
+                    response = client.audio.speech.create(
+                        model="tts-1-hd",
+                        voice="nova",
+                        input=hint_text,
+                    )
+                    return response.content
                 
-                # Списание токенов за аудио (1 токен = 2 единицы)
-                token, success = spend_tokens(
-                    user,
-                    HINT_AUDIO_COST,
-                    f"Генерация аудио подсказки для слова '{word}'"
+                relative_path, cache_hit = tts_cache.get_or_synthesize(
+                    hint_text, language, voice='nova', provider='openai:tts-1-hd',
+                    synthesize=synthesize, subdir='hints',
                 )
+                hint_audio_path = str(Path(settings.MEDIA_ROOT) / relative_path)
                 
-                if not success:
-                    logger.warning(f"Не удалось списать токены за аудио подсказки")
+                if not cache_hit:
+                    # Списание токенов за аудио (1 токен = 2 единицы)
+                    token, success = spend_tokens(
+                        user,
+                        HINT_AUDIO_COST,
+                        f"Генерация аудио подсказки для слова '{word}'"
+                    )
+                    
+                    if not success:
+                        logger.warning(f"Не удалось списать токены за аудио подсказки")
                 
             except Exception as e:
                 logger.warning(f"Не удалось сгенерировать аудио для подсказки: {str(e)}")
@@ -0,0 +1,123 @@
+"""
+Пересборка дневной сводки тренировок (UserDailyActivity) из журнала ответов.
+
+По умолчанию работает в режиме dry-run.
+
+Примеры:
+    python manage.py backfill_daily_activity
+    python manage.py backfill_daily_activity --username admin --apply
+    python manage.py backfill_daily_activity --from-cards --apply
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+from apps.cards.models import Card
+from apps.training.models import ReviewLog, UserDailyActivity
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user daily activity rollup from the review log"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username",
+            type=str,
+            help="Rebuild a single user (default: all users)",
+        )
+        parser.add_argument(
+            "--from-cards",
+            action="store_true",
+            help="Also add days known only from Card.last_review (history before the review log)",
+        )
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Replace existing rollup rows (default: dry-run)",
+        )
+
+    def handle(self, *args, **options):
+        logs = ReviewLog.objects.all()
+        cards = Card.objects.filter(last_review__isnull=False)
+        activity = UserDailyActivity.objects.all()
+
+        if options["username"]:
+            try:
+                user = User.objects.get(username=options["username"])
+            except User.DoesNotExist as exc:
+                raise CommandError(f"User '{options['username']}' not found") from exc
+            logs = logs.filter(user=user)
+            cards = cards.filter(user=user)
+            activity = activity.filter(user=user)
+
+        # TruncDate использует текущий часовой пояс — те же локальные даты,
+        # что пишет review_log.update_daily_activity
+        rows = {}
+        daily_logs = (
+            logs.annotate(day=TruncDate("reviewed_at"))
+            .values("user_id", "day")
+            .annotate(
+                reviews=Count("id"),
+                successes=Count("id", filter=Q(answer__in=(2, 3))),
+                timed_reviews=Count("id", filter=Q(time_spent__isnull=False)),
+                time_spent=Sum("time_spent"),
+            )
+            .order_by()
+        )
+        for row in daily_logs:
+            rows[(row["user_id"], row["day"])] = UserDailyActivity(
+                user_id=row["user_id"],
+                date=row["day"],
+                reviews=row["reviews"],
+                successes=row["successes"],
+                timed_reviews=row["timed_reviews"],
+                time_spent=row["time_spent"] or 0,
+            )
+        from_logs = len(rows)
+
+        if options["from_cards"]:
+            daily_cards = (
+                cards.annotate(day=TruncDate("last_review"))
+                .values("user_id", "day")
+                .annotate(
+                    reviews=Count("id"),
+                    successes=Count("id", filter=Q(consecutive_lapses=0)),
+                )
+                .order_by()
+            )
+            for row in daily_cards:
+                rows.setdefault((row["user_id"], row["day"]), UserDailyActivity(
+                    user_id=row["user_id"],
+                    date=row["day"],
+                    reviews=row["reviews"],
+                    successes=row["successes"],
+                ))
+
+        self.stdout.write("")
+        self.stdout.write(self.style.WARNING("=== Daily activity backfill ==="))
+        self.stdout.write(f"Existing rollup rows: {activity.count()}")
+        self.stdout.write(f"Days from review log: {from_logs}")
+        if options["from_cards"]:
+            self.stdout.write(f"Days from card last_review only: {len(rows) - from_logs}")
+        self.stdout.write("")
+
+        if not options["apply"]:
+            self.stdout.write(
+                self.style.WARNING("DRY RUN only. Add --apply to rebuild the rollup.")
+            )
+            return
+
+        with transaction.atomic():
+            deleted, _ = activity.delete()
+            UserDailyActivity.objects.bulk_create(rows.values(), batch_size=BATCH_SIZE)
+
+        self.stdout.write(self.style.SUCCESS("Backfill completed successfully."))
+        self.stdout.write(f"Rows deleted: {deleted}")
+        self.stdout.write(f"Rows created: {len(rows)}")
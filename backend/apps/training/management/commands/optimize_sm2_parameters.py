@@ -0,0 +1,88 @@
+"""
+Подбор параметров SM-2 по истории ответов (ReviewLog).
+
+По умолчанию работает в режиме dry-run.
+
+Примеры:
+    python manage.py optimize_sm2_parameters
+    python manage.py optimize_sm2_parameters --username admin --apply
+    python manage.py optimize_sm2_parameters --days 180 --min-reviews 200 --apply
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.training.services.optimizer_service import (
+    DEFAULT_HISTORY_DAYS,
+    MIN_REVIEWS_FOR_FIT,
+    optimize_parameters,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Fit interval_modifier, ease deltas and learning steps to users' review history"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username",
+            type=str,
+            help="Optimize a single user (default: all users with review history)",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=DEFAULT_HISTORY_DAYS,
+            help=f"History window in days (default: {DEFAULT_HISTORY_DAYS})",
+        )
+        parser.add_argument(
+            "--min-reviews",
+            type=int,
+            default=MIN_REVIEWS_FOR_FIT,
+            help=f"Minimum review-mode answers to fit a user (default: {MIN_REVIEWS_FOR_FIT})",
+        )
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Write fitted values to training settings (default: dry-run)",
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options["username"]:
+            try:
+                user_ids = [User.objects.get(username=options["username"]).id]
+            except User.DoesNotExist as exc:
+                raise CommandError(f"User '{options['username']}' not found") from exc
+
+        fitted = optimize_parameters(
+            user_ids=user_ids,
+            days=options["days"],
+            min_reviews=options["min_reviews"],
+            apply=options["apply"],
+        )
+
+        self.stdout.write("")
+        self.stdout.write(self.style.WARNING("=== SM-2 parameter optimization ==="))
+        self.stdout.write(f"Users fitted: {len(fitted)}")
+        for user_id, values in fitted.items():
+            if options["verbosity"] < 2:
+                break
+            self.stdout.write(
+                f"  user={user_id} reviews={values['reviews']} "
+                f"retention={values['retention']} "
+                f"interval_modifier={values['interval_modifier']} "
+                f"hard_ef_delta={values['hard_ef_delta']} "
+                f"easy_ef_delta={values['easy_ef_delta']} "
+                f"learning_steps={values['learning_steps']}"
+            )
+        self.stdout.write("")
+
+        if not options["apply"]:
+            self.stdout.write(
+                self.style.WARNING("DRY RUN only. Add --apply to save fitted values.")
+            )
+            return
+
+        self.stdout.write(self.style.SUCCESS("Fitted values saved."))
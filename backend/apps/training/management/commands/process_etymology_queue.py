@@ -0,0 +1,69 @@
+"""
+Фоновая генерация этимологии для слов из очереди (PendingEtymology).
+
+Несколько слов одного пользователя отправляются в LLM одним запросом.
+По умолчанию работает непрерывно; --once обрабатывает одну пачку (для cron).
+Несколько экземпляров можно запускать параллельно.
+
+Примеры:
+    python manage.py process_etymology_queue
+    python manage.py process_etymology_queue --once
+    python manage.py process_etymology_queue --batch-size 200 --words-per-call 25
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.training.services.etymology_service import (
+    QUEUE_BATCH_SIZE,
+    WORDS_PER_CALL,
+    process_queue,
+)
+
+
+class Command(BaseCommand):
+    help = "Generate etymologies for queued words in batched LLM calls"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process one batch and exit (default: run until interrupted)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=QUEUE_BATCH_SIZE,
+            help=f"Queue rows claimed per batch (default: {QUEUE_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--words-per-call",
+            type=int,
+            default=WORDS_PER_CALL,
+            help=f"Words sent in one LLM request (default: {WORDS_PER_CALL})",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when the queue is empty (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            stats = process_queue(
+                batch_size=options["batch_size"],
+                words_per_call=options["words_per_call"],
+            )
+            if stats["claimed"]:
+                self.stdout.write(
+                    f"Claimed: {stats['claimed']}, "
+                    f"generated: {stats['generated']}, failed: {stats['failed']}, "
+                    f"deferred: {stats['deferred']}"
+                )
+            if options["once"]:
+                break
+            if not stats["claimed"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS("Etymology queue processed."))
@@ -0,0 +1,30 @@
+"""
+Пересчёт счётчиков для проверки уведомлений (NotificationSettings).
+
+По умолчанию пересчитываются только устаревшие счётчики: сброшенные,
+за прошлый день или те, у которых наступило ближайшее повторение.
+Предназначена для периодического запуска (cron), например раз в минуту.
+
+Примеры:
+    python manage.py refresh_notification_counters
+    python manage.py refresh_notification_counters --all
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.training.services.notification_service import sweep_stale_counters
+
+
+class Command(BaseCommand):
+    help = "Refresh stale per-user notification counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Refresh counters of every user (default: only stale ones)",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = sweep_stale_counters(refresh_all=options["all"])
+        self.stdout.write(self.style.SUCCESS(f"Notification counters refreshed: {refreshed}"))
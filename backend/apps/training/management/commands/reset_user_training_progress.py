@@ -13,7 +13,8 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from apps.cards.models import Card
-from apps.training.models import UserTrainingSettings
+from apps.training.models import UserTrainingSettings, ReviewLog, UserDailyActivity
+from apps.training.services.notification_service import mark_counters_stale
 from apps.words.models import Word
 
 User = get_user_model()
@@ -47,8 +48,13 @@ class Command(BaseCommand):
         cards_qs = Card.objects.filter(user=user)
         words_qs = Word.objects.filter(user=user)
 
+        logs_qs = ReviewLog.objects.filter(user=user)
+        activity_qs = UserDailyActivity.objects.filter(user=user)
+
         cards_count = cards_qs.count()
         words_count = words_qs.count()
+        logs_count = logs_qs.count()
+        activity_count = activity_qs.count()
         settings_exists = UserTrainingSettings.objects.filter(user=user).exists()
 
         self.stdout.write("")
@@ -56,6 +62,8 @@ class Command(BaseCommand):
         self.stdout.write(f"User: {user.username} (id={user.id})")
         self.stdout.write(f"Cards to reset: {cards_count}")
         self.stdout.write(f"Words to reset status: {words_count}")
+        self.stdout.write(f"Review log entries to delete: {logs_count}")
+        self.stdout.write(f"Daily activity rows to delete: {activity_count}")
         self.stdout.write(f"Training settings exists: {settings_exists}")
         self.stdout.write("")
 
@@ -80,6 +88,9 @@ class Command(BaseCommand):
             )
 
             updated_words = words_qs.update(learning_status="new")
+            deleted_logs, _ = logs_qs.delete()
+            deleted_activity, _ = activity_qs.delete()
+            mark_counters_stale(user.id)
 
             settings_obj, _ = UserTrainingSettings.objects.get_or_create(
                 user=user,
@@ -100,6 +111,8 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("Reset completed successfully."))
         self.stdout.write(f"Cards updated: {updated_cards}")
         self.stdout.write(f"Words updated: {updated_words}")
+        self.stdout.write(f"Review log entries deleted: {deleted_logs}")
+        self.stdout.write(f"Daily activity rows deleted: {deleted_activity}")
         self.stdout.write(
             f"Training settings counters: total_reviews={settings_obj.total_reviews}, "
             f"successful_reviews={settings_obj.successful_reviews}, "
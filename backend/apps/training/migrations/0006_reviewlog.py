@@ -0,0 +1,39 @@
+# Generated by Django 4.2.17 on 2026-10-17 03:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cards', '0014_alter_deck_source_lang_alter_deck_target_lang'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('training', '0005_activate_existing_decks_categories'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer', models.PositiveSmallIntegerField(choices=[(0, 'Снова'), (1, 'Трудно'), (2, 'Хорошо'), (3, 'Легко')], verbose_name='Ответ')),
+                ('interval_before', models.IntegerField(default=0, verbose_name='Интервал до ответа (дни)')),
+                ('interval_after', models.IntegerField(default=0, verbose_name='Интервал после ответа (дни)')),
+                ('ease_factor', models.FloatField(verbose_name='Ease Factor после ответа')),
+                ('was_in_learning_mode', models.BooleanField(default=False, verbose_name='Был в режиме изучения')),
+                ('time_spent', models.FloatField(blank=True, null=True, verbose_name='Время ответа (секунды)')),
+                ('reviewed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время ответа')),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_logs', to='cards.card', verbose_name='Карточка')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_logs', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Запись журнала ответов',
+                'verbose_name_plural': 'Журнал ответов',
+                'ordering': ['-reviewed_at'],
+                'indexes': [models.Index(fields=['user', 'reviewed_at'], name='training_re_user_id_32ec63_idx'), models.Index(fields=['card', 'reviewed_at'], name='training_re_card_id_49b886_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.17 on 2026-10-17 04:03
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('training', '0006_reviewlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('queue', models.JSONField(default=list, verbose_name='Очередь id карточек')),
+                ('requeue', models.JSONField(default=list, verbose_name='Повторные показы [timestamp, card_id]')),
+                ('payloads', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Сериализованные карточки')),
+                ('answered_count', models.PositiveIntegerField(default=0, verbose_name='Отвечено карточек')),
+                ('expires_at', models.DateTimeField(verbose_name='Истекает')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='training_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Тренировочная сессия',
+                'verbose_name_plural': 'Тренировочные сессии',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'expires_at'], name='training_tr_user_id_1a30db_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.17 on 2026-10-17 04:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('training', '0007_trainingsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата (локальная)')),
+                ('reviews', models.PositiveIntegerField(default=0, verbose_name='Ответов')),
+                ('successes', models.PositiveIntegerField(default=0, verbose_name='Успешных ответов')),
+                ('timed_reviews', models.PositiveIntegerField(default=0, verbose_name='Ответов с замером времени')),
+                ('time_spent', models.FloatField(default=0, verbose_name='Время (секунды)')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Активность за день',
+                'verbose_name_plural': 'Активность по дням',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='userdailyactivity',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='unique_user_daily_activity'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.17 on 2026-10-17 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0008_userdailyactivity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationsettings',
+            name='cards_due',
+            field=models.PositiveIntegerField(default=0, verbose_name='Карточек к повторению'),
+        ),
+        migrations.AddField(
+            model_name='notificationsettings',
+            name='counters_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Дата счётчика ответов (локальная)'),
+        ),
+        migrations.AddField(
+            model_name='notificationsettings',
+            name='counters_updated_at',
+            field=models.DateTimeField(blank=True, help_text='NULL — счётчики устарели и будут пересчитаны', null=True, verbose_name='Счётчики обновлены'),
+        ),
+        migrations.AddField(
+            model_name='notificationsettings',
+            name='next_due_at',
+            field=models.DateTimeField(blank=True, help_text='Когда счётчик карточек к повторению вырастет', null=True, verbose_name='Ближайшее повторение'),
+        ),
+        migrations.AddField(
+            model_name='notificationsettings',
+            name='today_reviews',
+            field=models.PositiveIntegerField(default=0, verbose_name='Ответов сегодня'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.17 on 2026-10-17 04:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('words', '0013_word_search_text'),
+        ('training', '0009_notification_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingEtymology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True, verbose_name='Взято в обработку')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_etymologies', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('word', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pending_etymology', to='words.word', verbose_name='Слово')),
+            ],
+            options={
+                'verbose_name': 'Этимология в очереди',
+                'verbose_name_plural': 'Очередь этимологий',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['claimed_at', 'created_at'], name='training_pe_claimed_0ca53b_idx')],
+            },
+        ),
+    ]
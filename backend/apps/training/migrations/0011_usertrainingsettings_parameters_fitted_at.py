@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-17 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0010_pendingetymology'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertrainingsettings',
+            name='parameters_fitted_at',
+            field=models.DateTimeField(blank=True, help_text='Время последнего optimize_sm2_parameters --apply; следующий подбор учитывает только ответы после него', null=True, verbose_name='Последний подбор параметров'),
+        ),
+    ]
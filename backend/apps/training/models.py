@@ -1,7 +1,10 @@
-from datetime import time as dt_time
+import bisect
+import uuid
+from datetime import datetime, time as dt_time, timezone as dt_timezone
 
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
 
@@ -78,6 +81,32 @@ class NotificationSettings(models.Model):
         verbose_name='Последнее уведомление'
     )
 
+    # Счётчики для проверки уведомлений.
+    # Обновляются инкрементально при ответах и пересчитываются,
+    # когда устарели (см. services/notification_service.py)
+    cards_due = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Карточек к повторению'
+    )
+    today_reviews = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Ответов сегодня'
+    )
+    counters_date = models.DateField(
+        null=True, blank=True,
+        verbose_name='Дата счётчика ответов (локальная)'
+    )
+    next_due_at = models.DateTimeField(
+        null=True, blank=True,
+        verbose_name='Ближайшее повторение',
+        help_text='Когда счётчик карточек к повторению вырастет'
+    )
+    counters_updated_at = models.DateTimeField(
+        null=True, blank=True,
+        verbose_name='Счётчики обновлены',
+        help_text='NULL — счётчики устарели и будут пересчитаны'
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -100,6 +129,16 @@ class NotificationSettings(models.Model):
             # Ночной диапазон (22:00 - 08:00)
             return current_time >= start or current_time <= end
 
+    def counters_are_fresh(self, now=None) -> bool:
+        """Счётчики актуальны: не сброшены, за сегодня и ни одна карточка ещё не «созрела»"""
+        if now is None:
+            now = timezone.now()
+        return (
+            self.counters_updated_at is not None
+            and self.counters_date == timezone.localdate(now)
+            and (self.next_due_at is None or self.next_due_at > now)
+        )
+
     def should_notify(self) -> bool:
         """Проверяет, нужно ли отправлять уведомление"""
         if self.notification_frequency == 'off':
@@ -297,6 +336,13 @@ class UserTrainingSettings(models.Model):
         verbose_name='Последняя калибровка',
         help_text='Номер ответа, на котором была последняя калибровка'
     )
+    parameters_fitted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Последний подбор параметров',
+        help_text='Время последнего optimize_sm2_parameters --apply; следующий подбор '
+                  'учитывает только ответы после него'
+    )
     
     # ═══════════════════════════════════════════════════════════════
     # МЕТАДАННЫЕ
@@ -425,13 +471,16 @@ class UserTrainingSettings(models.Model):
         """
         return (self.total_reviews - self.last_calibration_at) >= self.calibration_interval
     
-    def calibrate(self) -> dict:
+    def calibrate(self, save: bool = True) -> dict:
         """
         Выполняет калибровку параметров на основе статистики.
         
         Анализирует последние N ответов и корректирует interval_modifier
         для достижения target_retention.
         
+        Args:
+            save: Сохранять ли изменения сразу (False — для пакетной обработки)
+        
         Returns:
             dict с информацией о калибровке:
             {
@@ -468,7 +517,8 @@ class UserTrainingSettings(models.Model):
             self.interval_modifier = min(2.0, self.interval_modifier * 1.05)
         
         self.last_calibration_at = self.total_reviews
-        self.save()
+        if save:
+            self.save()
         
         return {
             'calibrated': True,
@@ -478,14 +528,290 @@ class UserTrainingSettings(models.Model):
             'target_rate': target_rate,
         }
     
-    def record_review(self, successful: bool) -> None:
+    def record_review(self, successful: bool, save: bool = True) -> None:
         """
         Записывает ответ пользователя для статистики.
         
         Args:
             successful: True если ответ был успешным (Good/Easy)
+            save: Сохранять ли счётчики сразу (False — для пакетной обработки)
         """
         self.total_reviews += 1
         if successful:
             self.successful_reviews += 1
-        self.save(update_fields=['total_reviews', 'successful_reviews', 'updated_at'])
+        if save:
+            self.save(update_fields=['total_reviews', 'successful_reviews', 'updated_at'])
+
+
+class ReviewLog(models.Model):
+    """
+    Журнал ответов (append-only).
+
+    Одна строка на каждый ответ пользователя. Хранит состояние SM-2 до и после
+    ответа, чтобы статистика, стрики и калибровка строились по истории,
+    а не по последнему состоянию карточки.
+    Записи создаются пачками через ReviewLogBuffer.
+    """
+
+    ANSWER_CHOICES = [
+        (0, 'Снова'),
+        (1, 'Трудно'),
+        (2, 'Хорошо'),
+        (3, 'Легко'),
+    ]
+
+    card = models.ForeignKey(
+        'cards.Card',
+        on_delete=models.CASCADE,
+        related_name='review_logs',
+        verbose_name='Карточка'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='review_logs',
+        verbose_name='Пользователь'
+    )
+    answer = models.PositiveSmallIntegerField(
+        choices=ANSWER_CHOICES,
+        verbose_name='Ответ'
+    )
+    interval_before = models.IntegerField(
+        default=0,
+        verbose_name='Интервал до ответа (дни)'
+    )
+    interval_after = models.IntegerField(
+        default=0,
+        verbose_name='Интервал после ответа (дни)'
+    )
+    ease_factor = models.FloatField(
+        verbose_name='Ease Factor после ответа'
+    )
+    was_in_learning_mode = models.BooleanField(
+        default=False,
+        verbose_name='Был в режиме изучения'
+    )
+    time_spent = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Время ответа (секунды)'
+    )
+    reviewed_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Время ответа'
+    )
+
+    class Meta:
+        verbose_name = 'Запись журнала ответов'
+        verbose_name_plural = 'Журнал ответов'
+        ordering = ['-reviewed_at']
+        indexes = [
+            models.Index(fields=['user', 'reviewed_at']),
+            models.Index(fields=['card', 'reviewed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: card {self.card_id} → {self.answer} ({self.reviewed_at:%Y-%m-%d %H:%M})"
+
+    @property
+    def successful(self) -> bool:
+        """Успешный ответ (Good/Easy)"""
+        return self.answer in (2, 3)
+
+
+class UserDailyActivity(models.Model):
+    """
+    Дневная сводка тренировок пользователя.
+
+    Одна строка на (пользователь, локальная дата). Обновляется инкрементально
+    при записи журнала ответов (см. review_log.update_daily_activity),
+    поэтому стрик, график по дням и годовая тепловая карта читаются
+    одним запросом по диапазону дат.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='daily_activity',
+        verbose_name='Пользователь'
+    )
+    date = models.DateField(
+        verbose_name='Дата (локальная)'
+    )
+    reviews = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Ответов'
+    )
+    successes = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Успешных ответов'
+    )
+    timed_reviews = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Ответов с замером времени'
+    )
+    time_spent = models.FloatField(
+        default=0,
+        verbose_name='Время (секунды)'
+    )
+
+    class Meta:
+        verbose_name = 'Активность за день'
+        verbose_name_plural = 'Активность по дням'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'date'], name='unique_user_daily_activity'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.date} — {self.reviews} ({self.successes} успешных)"
+
+    @property
+    def success_rate(self) -> float:
+        return (self.successes / self.reviews) if self.reviews > 0 else 0.0
+
+
+class TrainingSession(models.Model):
+    """
+    Серверная тренировочная сессия.
+
+    Хранит очередь id карточек и уже сериализованные данные карточек,
+    чтобы запросы внутри сессии не пересобирали очередь.
+    Карточки на шагах обучения после ответа возвращаются в очередь
+    повторных показов (requeue) по новому next_review.
+    """
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='training_sessions',
+        verbose_name='Пользователь'
+    )
+    queue = models.JSONField(
+        default=list,
+        verbose_name='Очередь id карточек'
+    )
+    requeue = models.JSONField(
+        default=list,
+        verbose_name='Повторные показы [timestamp, card_id]'
+    )
+    payloads = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        verbose_name='Сериализованные карточки'
+    )
+    answered_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Отвечено карточек'
+    )
+    expires_at = models.DateTimeField(
+        verbose_name='Истекает'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Тренировочная сессия'
+        verbose_name_plural = 'Тренировочные сессии'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: session {self.id} ({len(self.queue)} + {len(self.requeue)})"
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at <= timezone.now()
+
+    @property
+    def remaining_count(self) -> int:
+        return len(self.queue) + len(self.requeue)
+
+    def record_answer(self, card_id: int, payload: dict, next_review=None,
+                      in_learning: bool = False) -> None:
+        """
+        Убирает карточку из очереди; карточку на шагах обучения
+        вставляет в requeue по next_review (без сохранения).
+        """
+        if str(card_id) not in self.payloads:
+            return
+
+        self.queue = [cid for cid in self.queue if cid != card_id]
+        self.requeue = [entry for entry in self.requeue if entry[1] != card_id]
+        self.answered_count += 1
+
+        if in_learning and next_review is not None:
+            bisect.insort(self.requeue, [next_review.timestamp(), card_id])
+            self.payloads[str(card_id)] = payload
+        else:
+            self.payloads.pop(str(card_id), None)
+
+    def next_cards(self, limit: int, now=None) -> list:
+        """
+        Следующие карточки к показу: сначала наступившие повторные показы
+        (по next_review), затем исходная очередь.
+        """
+        now_ts = (now or timezone.now()).timestamp()
+        due_ids = [cid for due, cid in self.requeue if due <= now_ts]
+        card_ids = (due_ids + self.queue)[:limit]
+        return [self.payloads[str(cid)] for cid in card_ids]
+
+    @property
+    def next_due_at(self):
+        """Время ближайшего повторного показа (или None)."""
+        if not self.requeue:
+            return None
+        return datetime.fromtimestamp(self.requeue[0][0], tz=dt_timezone.utc)
+
+
+class PendingEtymology(models.Model):
+    """
+    Очередь автоматической генерации этимологии.
+
+    Создание слова только добавляет строку сюда; фоновый обработчик
+    (manage.py process_etymology_queue) забирает пачку, отправляет
+    несколько слов в один запрос к LLM и сохраняет результат bulk_update.
+    """
+
+    word = models.OneToOneField(
+        'words.Word',
+        on_delete=models.CASCADE,
+        related_name='pending_etymology',
+        verbose_name='Слово'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='pending_etymologies',
+        verbose_name='Пользователь'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взято в обработку'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Этимология в очереди'
+        verbose_name_plural = 'Очередь этимологий'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['claimed_at', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: word {self.word_id} (attempts: {self.attempts})"
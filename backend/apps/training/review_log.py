@@ -0,0 +1,113 @@
+"""
+Буферизованная запись журнала ответов (ReviewLog).
+
+Записи накапливаются в памяти и сохраняются одним bulk_create,
+поэтому пачка ответов стоит один INSERT, а не по запросу на ответ.
+Вместе с журналом инкрементально обновляется дневная сводка
+(UserDailyActivity).
+"""
+from collections import defaultdict
+from typing import Iterable, List
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.constants import REVIEW_LOG_BATCH_SIZE
+from .models import ReviewLog, UserDailyActivity
+
+
+def update_daily_activity(entries: Iterable[ReviewLog]) -> int:
+    """
+    Прибавляет ответы к дневной сводке пользователей.
+
+    Ответы группируются по (пользователь, локальная дата), на каждую группу —
+    один UPDATE с F()-инкрементами (INSERT, если строки за день ещё нет).
+
+    Returns:
+        int: Количество затронутых строк сводки
+    """
+    totals = defaultdict(lambda: {'reviews': 0, 'successes': 0, 'timed_reviews': 0, 'time_spent': 0.0})
+    for entry in entries:
+        row = totals[(entry.user_id, timezone.localdate(entry.reviewed_at))]
+        row['reviews'] += 1
+        row['successes'] += int(entry.successful)
+        if entry.time_spent is not None:
+            row['timed_reviews'] += 1
+            row['time_spent'] += entry.time_spent
+
+    for (user_id, date), values in totals.items():
+        increments = {field: F(field) + value for field, value in values.items()}
+        rows = UserDailyActivity.objects.filter(user_id=user_id, date=date)
+        if rows.update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                UserDailyActivity.objects.create(user_id=user_id, date=date, **values)
+        except IntegrityError:
+            # Строку за этот день успел создать параллельный запрос
+            rows.update(**increments)
+
+    return len(totals)
+
+
+def save_review_logs(entries: List[ReviewLog], batch_size: int = REVIEW_LOG_BATCH_SIZE) -> int:
+    """
+    Сохраняет записи журнала одним bulk_create и обновляет дневную сводку.
+
+    Returns:
+        int: Количество сохранённых записей
+    """
+    if not entries:
+        return 0
+    ReviewLog.objects.bulk_create(entries, batch_size=batch_size)
+    update_daily_activity(entries)
+    return len(entries)
+
+
+class ReviewLogBuffer:
+    """
+    Буфер записей ReviewLog.
+
+    Использование:
+        with ReviewLogBuffer() as review_log:
+            SM2Algorithm.process_answer(card, 2, settings, review_log=review_log)
+
+    При выходе из контекста буфер сбрасывается в БД. Если буфер
+    переполнен (batch_size), сброс происходит досрочно.
+    """
+
+    def __init__(self, batch_size: int = REVIEW_LOG_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._entries: List[ReviewLog] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> 'ReviewLogBuffer':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # При исключении записи отбрасываются вместе с незавершённой операцией
+        if exc_type is None:
+            self.flush()
+        else:
+            self._entries.clear()
+
+    def add(self, entry: ReviewLog) -> None:
+        """Добавляет запись в буфер (сбрасывает при переполнении)."""
+        self._entries.append(entry)
+        if len(self._entries) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Сохраняет накопленные записи одним bulk_create (и дневную сводку).
+
+        Returns:
+            int: Количество сохранённых записей
+        """
+        if not self._entries:
+            return 0
+        entries, self._entries = self._entries, []
+        return save_review_logs(entries, batch_size=self.batch_size)
@@ -205,6 +205,16 @@ class TrainingSessionSerializer(serializers.Serializer):
     total_count = serializers.IntegerField()
 
 
+class TrainingSessionNextSerializer(serializers.Serializer):
+    """Сериализатор для ответа GET /api/training/session/<id>/next/"""
+    
+    session_id = serializers.UUIDField()
+    cards = serializers.ListField(child=serializers.DictField())
+    remaining_count = serializers.IntegerField()
+    answered_count = serializers.IntegerField()
+    next_due_at = serializers.DateTimeField(allow_null=True)
+
+
 class TrainingAnswerRequestSerializer(serializers.Serializer):
     """Сериализатор для запроса POST /api/training/answer/"""
     
@@ -236,6 +246,45 @@ class TrainingAnswerResponseSerializer(serializers.Serializer):
     card = serializers.DictField()
 
 
+class TrainingAnswerBatchItemSerializer(serializers.Serializer):
+    """Один ответ в пакете POST /api/training/answer/batch/"""
+    
+    card_id = serializers.IntegerField(required=True)
+    answer = serializers.IntegerField(min_value=0, max_value=3, required=True)
+    time_spent = serializers.FloatField(required=False, min_value=0)
+
+
+class TrainingAnswerBatchRequestSerializer(serializers.Serializer):
+    """Сериализатор для запроса POST /api/training/answer/batch/"""
+    
+    MAX_ANSWERS = 200
+    
+    session_id = serializers.UUIDField(required=False)
+    answers = TrainingAnswerBatchItemSerializer(
+        many=True, allow_empty=False, max_length=MAX_ANSWERS
+    )
+
+
+class TrainingAnswerBatchResultSerializer(serializers.Serializer):
+    """Результат обработки одного ответа из пакета"""
+    
+    card_id = serializers.IntegerField()
+    new_interval = serializers.IntegerField()
+    new_ease_factor = serializers.FloatField()
+    next_review = serializers.DateTimeField()
+    entered_learning_mode = serializers.BooleanField()
+    exited_learning_mode = serializers.BooleanField()
+    learning_step = serializers.IntegerField()
+    calibrated = serializers.BooleanField()
+
+
+class TrainingAnswerBatchResponseSerializer(serializers.Serializer):
+    """Сериализатор для ответа POST /api/training/answer/batch/"""
+    
+    processed = serializers.IntegerField()
+    results = TrainingAnswerBatchResultSerializer(many=True)
+
+
 class CardActionRequestSerializer(serializers.Serializer):
     """Базовый сериализатор для enter-learning/exit-learning"""
     
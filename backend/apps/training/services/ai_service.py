@@ -81,6 +81,7 @@ def generate_hint_for_word(user, word_id, force_regenerate=False, generate_audio
         }
 
     target_word, target_translation, target_language = _resolve_word_fields(word, user)
+    balance_before = check_balance(user)
 
     hint_text, hint_audio_path = generate_hint(
         word=target_word,
@@ -108,14 +109,15 @@ def generate_hint_for_word(user, word_id, force_regenerate=False, generate_audio
     word.save(update_fields=['hint_text', 'hint_audio'])
 
     hint_audio_url = word.hint_audio.url if word.hint_audio else None
-    tokens_spent = 2 if generate_audio and hint_audio_path else 1
+    # Audio found in the TTS cache is not charged
+    balance_after = check_balance(user)
 
     return {
         'word_id': word.id,
         'hint_text': hint_text,
         'hint_audio_url': hint_audio_url,
-        'tokens_spent': tokens_spent,
-        'balance_after': check_balance(user),
+        'tokens_spent': balance_before - balance_after,
+        'balance_after': balance_after,
     }
 
 
@@ -0,0 +1,158 @@
+"""
+Etymology service: automatic etymology for new words via a DB-backed queue.
+
+Creating a word only inserts a PendingEtymology row (enqueue). The worker
+(manage.py run_workers or process_etymology_queue) claims a batch, sends up to
+WORDS_PER_CALL words of one user per LLM request and stores the results
+with one UPDATE that skips words whose etymology was filled in meanwhile.
+Failed rows are retried after CLAIM_TIMEOUT and dropped after MAX_ATTEMPTS;
+rows the user cannot pay for yet wait for CLAIM_TIMEOUT without using up
+an attempt.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, Q, TextField, Value, When
+from django.utils import timezone
+
+from apps.cards.token_utils import check_balance
+from apps.core import user_cache
+from apps.core.constants import ETYMOLOGY_COST
+from apps.words.models import Word
+from ..models import PendingEtymology
+
+logger = logging.getLogger(__name__)
+
+QUEUE_BATCH_SIZE = 100
+WORDS_PER_CALL = 20
+MAX_ATTEMPTS = 3
+# Взятые, но не завершённые строки (упавший обработчик, ошибка LLM)
+# снова доступны после этого времени
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue(words):
+    """Queue words without etymology (one INSERT, duplicates are ignored)."""
+    PendingEtymology.objects.bulk_create(
+        [
+            PendingEtymology(word_id=word.id, user_id=word.user_id)
+            for word in words if not word.etymology
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def claim_batch(size=QUEUE_BATCH_SIZE, now=None):
+    """
+    Take up to `size` queued rows for processing. Rows locked by another
+    worker are skipped (SELECT ... FOR UPDATE SKIP LOCKED on PostgreSQL).
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        items = list(
+            PendingEtymology.objects.select_for_update(skip_locked=True)
+            .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - CLAIM_TIMEOUT))
+            .order_by('created_at')[:size]
+        )
+        PendingEtymology.objects.filter(
+            id__in=[item.id for item in items]
+        ).update(claimed_at=now)
+    return items
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _store_etymologies(words):
+    """
+    Save generated etymologies in one UPDATE, only where the word still has
+    none: an etymology the user typed while the LLM call ran is kept.
+
+    Returns:
+        number of words updated
+    """
+    if not words:
+        return 0
+    return Word.objects.filter(id__in=[word.id for word in words], etymology='').update(
+        etymology=Case(
+            *[When(id=word.id, then=Value(word.etymology)) for word in words],
+            output_field=TextField(),
+        )
+    )
+
+
+def process_queue(batch_size=QUEUE_BATCH_SIZE, words_per_call=WORDS_PER_CALL):
+    """
+    Process one batch of the queue.
+
+    Returns:
+        dict with claimed, generated, failed and deferred (not enough
+        tokens) counts
+    """
+    from ..ai_generation import generate_etymologies_batch
+
+    items = claim_batch(batch_size)
+    if not items:
+        return {'claimed': 0, 'generated': 0, 'failed': 0, 'deferred': 0}
+
+    words = Word.objects.select_related('user').in_bulk([item.word_id for item in items])
+    done = []
+    failed = []
+    by_user = defaultdict(list)
+    for item in items:
+        word = words.get(item.word_id)
+        if word is None or word.etymology:
+            done.append(item.id)
+        else:
+            by_user[word.user_id].append((item, word))
+
+    generated = []
+    deferred = 0
+    for entries in by_user.values():
+        user = entries[0][1].user
+        for chunk in _chunks(entries, words_per_call):
+            # Слова сверх баланса не отправляются и остаются в очереди без
+            # попытки: claimed_at не сбрасывается, повтор после CLAIM_TIMEOUT
+            affordable = max(check_balance(user) // ETYMOLOGY_COST, 0)
+            deferred += len(chunk[affordable:])
+            chunk = chunk[:affordable]
+            if not chunk:
+                continue
+            try:
+                etymologies = generate_etymologies_batch([word for _, word in chunk], user)
+            except Exception:
+                logger.exception(
+                    "Failed to generate etymologies for user id=%s (%s words)",
+                    user.id, len(chunk)
+                )
+                failed.extend(item.id for item, _ in chunk)
+                continue
+
+            for item, word in chunk:
+                if word.id in etymologies:
+                    word.etymology = etymologies[word.id]
+                    generated.append(word)
+                    done.append(item.id)
+                else:
+                    # Пустой или слишком короткий ответ — повтор после CLAIM_TIMEOUT
+                    failed.append(item.id)
+
+    with transaction.atomic():
+        stored = _store_etymologies(generated)
+        PendingEtymology.objects.filter(id__in=done).delete()
+        PendingEtymology.objects.filter(id__in=failed).update(attempts=F('attempts') + 1)
+        PendingEtymology.objects.filter(id__in=failed, attempts__gte=MAX_ATTEMPTS).delete()
+
+    # update() не отправляет post_save — сбрасываем кэш явно
+    for user_id in {word.user_id for word in generated}:
+        user_cache.bump_version(user_id)
+
+    logger.info(
+        "Etymology queue: claimed=%s generated=%s failed=%s deferred=%s",
+        len(items), stored, len(failed), deferred
+    )
+    return {'claimed': len(items), 'generated': stored, 'failed': len(failed), 'deferred': deferred}
@@ -0,0 +1,128 @@
+"""
+Forecast service: projected review workload per day.
+
+The projection runs over NumPy arrays of the user's card state instead of
+per-card Python objects: every due card is assumed to be answered "Good"
+and is rescheduled with the vectorized SM-2 interval math.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from apps.cards.models import Card
+from ..sm2 import SM2Algorithm
+from .session_service import get_or_create_settings
+
+logger = logging.getLogger(__name__)
+
+MIN_FORECAST_DAYS = 30
+MAX_FORECAST_DAYS = 365
+SECONDS_PER_DAY = 86400
+
+
+def project_due_counts(due_days, intervals, ease_factors, in_learning, settings, days):
+    """
+    Project how many reviews fall on each of the next `days` days.
+
+    Args:
+        due_days: int array, day index of the next review (0 = today, overdue clipped to 0)
+        intervals: int array, current intervals in days
+        ease_factors: float array, current ease factors
+        in_learning: bool array, True for cards still in learning mode
+        settings: UserTrainingSettings with the SM-2 modifiers
+        days: forecast horizon
+
+    Returns:
+        np.ndarray of length `days` with due counts per day.
+    """
+    due_days = np.asarray(due_days, dtype=np.int64)
+    intervals = np.asarray(intervals, dtype=np.int64)
+    ease_factors = np.asarray(ease_factors, dtype=np.float64)
+    in_learning = np.asarray(in_learning, dtype=bool)
+
+    counts = np.zeros(days, dtype=np.int64)
+
+    active = due_days < days
+    due_days = due_days[active]
+    intervals = intervals[active]
+    ease_factors = ease_factors[active]
+    in_learning = in_learning[active]
+
+    # Каждая итерация — один ответ "Хорошо" по всем карточкам, попавшим в горизонт.
+    # Интервал растёт минимум на день, поэтому итераций O(sqrt(days)).
+    while due_days.size:
+        counts += np.bincount(due_days, minlength=days)
+
+        # Карточки в обучении проходят шаги и выпускаются с graduating_interval
+        graduated = np.full(due_days.shape, settings.graduating_interval, dtype=np.int64)
+
+        ease_factors = np.where(
+            in_learning,
+            ease_factors,
+            np.maximum(settings.min_ease_factor, ease_factors + settings.good_ef_delta),
+        )
+        reviewed = SM2Algorithm.calculate_next_intervals(
+            intervals, ease_factors, 2, settings
+        )
+        intervals = np.where(in_learning, graduated, reviewed)
+        in_learning = np.zeros_like(in_learning)
+        due_days = due_days + np.maximum(1, intervals)
+
+        active = due_days < days
+        due_days = due_days[active]
+        intervals = intervals[active]
+        ease_factors = ease_factors[active]
+        in_learning = in_learning[active]
+
+    return counts
+
+
+def get_review_forecast(user, days=MIN_FORECAST_DAYS):
+    """
+    Build the review workload forecast for the next `days` days.
+
+    Returns:
+        dict with days, start_date, overdue, new_cards, total and a per-day
+        list of {'date', 'due'}.
+    """
+    settings = get_or_create_settings(user)
+
+    rows = list(
+        Card.objects.for_user(user)
+        .filter(next_review__isnull=False)
+        .order_by()
+        .values_list('next_review', 'interval', 'ease_factor', 'is_in_learning_mode')
+    )
+    new_cards = Card.objects.for_user(user).filter(next_review__isnull=True).count()
+
+    today = timezone.localdate()
+    day_start = timezone.make_aware(datetime.combine(today, time.min)).timestamp()
+
+    if rows:
+        next_reviews, intervals, ease_factors, in_learning = zip(*rows)
+        timestamps = np.fromiter(
+            (dt.timestamp() for dt in next_reviews), dtype=np.float64, count=len(rows)
+        )
+        due_days = np.floor((timestamps - day_start) / SECONDS_PER_DAY).astype(np.int64)
+        overdue = int(np.count_nonzero(due_days < 0))
+        due_days = np.maximum(due_days, 0)
+        counts = project_due_counts(
+            due_days, intervals, ease_factors, in_learning, settings, days
+        )
+    else:
+        overdue = 0
+        counts = np.zeros(days, dtype=np.int64)
+
+    return {
+        'days': days,
+        'start_date': today,
+        'overdue': overdue,
+        'new_cards': new_cards,
+        'total': int(counts.sum()),
+        'forecast': [
+            {'date': today + timedelta(days=offset), 'due': int(count)}
+            for offset, count in enumerate(counts)
+        ],
+    }
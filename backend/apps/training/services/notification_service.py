@@ -0,0 +1,144 @@
+"""
+Notification service: per-user counters for the polled notification check.
+
+NotificationSettings stores cards_due, today_reviews and next_due_at, so a
+check reads one row instead of counting over Card:
+
+- answers adjust the counters in place (apply_answers_to_counters);
+- other card writes mark them stale (mark_counters_stale);
+- stale counters, a new local day or a card coming due (next_due_at <= now)
+  trigger a recompute on read or by the periodic sweep
+  (manage.py refresh_notification_counters).
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from apps.cards.models import Card
+from ..models import NotificationSettings, UserDailyActivity
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = [
+    'cards_due', 'today_reviews', 'counters_date', 'next_due_at', 'counters_updated_at',
+]
+SWEEP_BATCH_SIZE = 500
+
+
+def stale_counters_filter(now):
+    """Q for NotificationSettings rows whose counters must be recomputed."""
+    return (
+        Q(counters_updated_at__isnull=True)
+        | ~Q(counters_date=timezone.localdate(now))
+        | Q(counters_date__isnull=True)
+        | Q(next_due_at__lte=now)
+    )
+
+
+def refresh_counters(settings_list, now=None):
+    """
+    Recompute counters for the given NotificationSettings rows
+    (two grouped queries and one bulk_update for the whole list).
+
+    Returns:
+        int: number of refreshed rows
+    """
+    settings_list = list(settings_list)
+    if not settings_list:
+        return 0
+
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    user_ids = [obj.user_id for obj in settings_list]
+
+    card_rows = {
+        row['user_id']: row
+        for row in Card.objects.filter(user_id__in=user_ids)
+        .values('user_id')
+        .annotate(
+            due=Count('id', filter=Q(next_review__lte=now)),
+            next_due=Min('next_review', filter=Q(next_review__gt=now)),
+        )
+        .order_by()
+    }
+    reviews = dict(
+        UserDailyActivity.objects.filter(user_id__in=user_ids, date=today)
+        .values_list('user_id', 'reviews')
+    )
+
+    for obj in settings_list:
+        row = card_rows.get(obj.user_id, {})
+        obj.cards_due = row.get('due', 0)
+        obj.next_due_at = row.get('next_due')
+        obj.today_reviews = reviews.get(obj.user_id, 0)
+        obj.counters_date = today
+        obj.counters_updated_at = now
+
+    NotificationSettings.objects.bulk_update(settings_list, COUNTER_FIELDS)
+    return len(settings_list)
+
+
+def sweep_stale_counters(now=None, refresh_all=False):
+    """
+    Periodic sweep: recompute counters that are stale or whose cards came due.
+
+    Returns:
+        int: number of refreshed rows
+    """
+    now = now or timezone.now()
+    queryset = NotificationSettings.objects.order_by('pk')
+    if not refresh_all:
+        queryset = queryset.filter(stale_counters_filter(now))
+
+    refreshed = 0
+    batch = []
+    for obj in queryset.iterator(chunk_size=SWEEP_BATCH_SIZE):
+        batch.append(obj)
+        if len(batch) >= SWEEP_BATCH_SIZE:
+            refreshed += refresh_counters(batch, now=now)
+            batch = []
+    refreshed += refresh_counters(batch, now=now)
+
+    logger.info("Refreshed notification counters for %s users", refreshed)
+    return refreshed
+
+
+def mark_counters_stale(user_id):
+    """Drop the user's counters; they are recomputed on the next read or sweep."""
+    NotificationSettings.objects.filter(
+        user_id=user_id, counters_updated_at__isnull=False
+    ).update(counters_updated_at=None)
+
+
+def apply_answers_to_counters(user_id, was_due, next_reviews, reviews, now=None):
+    """
+    Adjust fresh counters after answers without recounting.
+
+    Args:
+        was_due: number of answered cards that were due before the answers
+        next_reviews: next_review of every answered card after the answers
+        reviews: number of answers
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        obj = NotificationSettings.objects.select_for_update().filter(user_id=user_id).first()
+        if obj is None or not obj.counters_are_fresh(now):
+            return
+
+        still_due = sum(1 for next_review in next_reviews if next_review and next_review <= now)
+        upcoming = [next_review for next_review in next_reviews if next_review and next_review > now]
+        if obj.next_due_at is not None:
+            upcoming.append(obj.next_due_at)
+
+        obj.cards_due = max(0, obj.cards_due - was_due + still_due)
+        obj.today_reviews += reviews
+        obj.next_due_at = min(upcoming) if upcoming else None
+        obj.counters_updated_at = now
+        NotificationSettings.objects.filter(pk=obj.pk).update(
+            cards_due=obj.cards_due,
+            today_reviews=obj.today_reviews,
+            next_due_at=obj.next_due_at,
+            counters_updated_at=now,
+        )
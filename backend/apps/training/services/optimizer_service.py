@@ -0,0 +1,225 @@
+"""
+Optimizer service: fits SM-2 parameters to each user's review history.
+
+Unlike UserTrainingSettings.calibrate (±5% steps from lifetime totals), the
+fit reads ReviewLog and works on NumPy arrays for all users at once.
+
+Model: recall decays exponentially with the interval, R(t) = exp(-t / S).
+If the observed retention at the current intervals is r, scaling the
+intervals by ln(target) / ln(r) moves retention to the target. The same
+rule is applied to three groups of reviews:
+
+- review-mode answers          → interval_modifier
+- reviews after Hard / Easy    → hard_ef_delta / easy_ef_delta
+- learning-mode answers        → learning_steps
+
+Observed retention is shrunk towards the target with PRIOR_WEIGHT
+pseudo-reviews, so small samples move parameters only a little.
+
+The ratios scale the parameters that produced the reviews, so only reviews
+made since the last fit (UserTrainingSettings.parameters_fitted_at) are
+used: a second run on the same history finds too few reviews and changes
+nothing.
+"""
+import logging
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import ReviewLog, UserTrainingSettings
+
+logger = logging.getLogger(__name__)
+
+MIN_REVIEWS_FOR_FIT = 100
+DEFAULT_HISTORY_DAYS = 365
+PRIOR_WEIGHT = 20
+
+# Границы подбираемых параметров
+INTERVAL_MODIFIER_RANGE = (0.5, 2.0)
+HARD_EF_DELTA_RANGE = (-0.3, 0.0)
+EASY_EF_DELTA_RANGE = (0.0, 0.3)
+RATIO_RANGE = (0.5, 2.0)
+DELTA_RATIO_RANGE = (0.8, 1.25)
+LEARNING_STEP_RANGE = (1, 1440)  # минуты
+
+FITTED_FIELDS = [
+    'interval_modifier', 'hard_ef_delta', 'easy_ef_delta',
+    'learning_steps', 'parameters_fitted_at', 'updated_at',
+]
+
+
+def load_review_history(user_ids=None, days=DEFAULT_HISTORY_DAYS):
+    """
+    Load review history as NumPy arrays ordered by (card, reviewed_at).
+    Only reviews made after the user's last fit are included.
+
+    Returns:
+        dict of arrays: user_id, card_id, answer, learning, ease_factor.
+    """
+    fitted_at = 'user__training_settings__parameters_fitted_at'
+    logs = ReviewLog.objects.filter(
+        Q(**{f'{fitted_at}__isnull': True}) | Q(reviewed_at__gt=F(fitted_at)),
+        reviewed_at__gte=timezone.now() - timedelta(days=days),
+    )
+    if user_ids is not None:
+        logs = logs.filter(user_id__in=user_ids)
+
+    rows = logs.order_by('card_id', 'reviewed_at').values_list(
+        'user_id', 'card_id', 'answer', 'was_in_learning_mode', 'ease_factor'
+    )
+    columns = list(zip(*rows.iterator(chunk_size=10000))) or [(), (), (), (), ()]
+    user_id, card_id, answer, learning, ease_factor = columns
+
+    return {
+        'user_id': np.asarray(user_id, dtype=np.int64),
+        'card_id': np.asarray(card_id, dtype=np.int64),
+        'answer': np.asarray(answer, dtype=np.int64),
+        'learning': np.asarray(learning, dtype=bool),
+        'ease_factor': np.asarray(ease_factor, dtype=np.float64),
+    }
+
+
+def _retention(user_idx, outcomes, mask, targets):
+    """
+    Per-user retention over the reviews selected by `mask`, shrunk towards
+    each user's target.
+
+    Returns:
+        (retention array, review count array), both indexed by user position.
+    """
+    n_users = targets.size
+    counts = np.bincount(user_idx[mask], minlength=n_users)
+    hits = np.bincount(user_idx[mask], weights=outcomes[mask], minlength=n_users)
+    retention = (hits + PRIOR_WEIGHT * targets) / (counts + PRIOR_WEIGHT)
+    return np.clip(retention, 0.01, 0.999), counts
+
+
+def _interval_ratio(retention, target, bounds):
+    """Interval scale that moves retention to target under exponential forgetting."""
+    return np.clip(np.log(target) / np.log(retention), *bounds)
+
+
+def fit_parameters(history, settings_by_user, min_reviews=MIN_REVIEWS_FOR_FIT):
+    """
+    Fit parameters for every user present in `history`.
+
+    Args:
+        history: arrays from load_review_history
+        settings_by_user: {user_id: UserTrainingSettings}
+        min_reviews: minimum review-mode answers required to fit a user
+
+    Returns:
+        {user_id: dict of fitted values} for users with enough history.
+    """
+    if not history['user_id'].size:
+        return {}
+
+    users, user_idx = np.unique(history['user_id'], return_inverse=True)
+    n_users = users.size
+    answer = history['answer']
+    learning = history['learning']
+    success = (answer >= 2).astype(np.float64)
+
+    # Исход следующего ответа по той же карточке
+    same_card_next = np.zeros(answer.shape, dtype=bool)
+    same_card_next[:-1] = history['card_id'][1:] == history['card_id'][:-1]
+    next_success = np.zeros_like(success)
+    next_success[:-1] = success[1:]
+
+    targets = np.array([
+        settings_by_user[uid].target_retention if uid in settings_by_user else 0.9
+        for uid in users
+    ])
+
+    review_retention, review_counts = _retention(user_idx, success, ~learning, targets)
+    interval_ratio = _interval_ratio(review_retention, targets, RATIO_RANGE)
+
+    # Удержание на следующем повторе после Hard/Easy → масштаб EF
+    ease_sum = np.bincount(user_idx, weights=history['ease_factor'], minlength=n_users)
+    mean_ease = ease_sum / np.maximum(np.bincount(user_idx, minlength=n_users), 1)
+    hard_retention, _ = _retention(
+        user_idx, next_success, ~learning & same_card_next & (answer == 1), targets
+    )
+    easy_retention, _ = _retention(
+        user_idx, next_success, ~learning & same_card_next & (answer == 3), targets
+    )
+    hard_ratio = _interval_ratio(hard_retention, targets, DELTA_RATIO_RANGE)
+    easy_ratio = _interval_ratio(easy_retention, targets, DELTA_RATIO_RANGE)
+
+    learning_retention, learning_counts = _retention(user_idx, success, learning, targets)
+    step_ratio = _interval_ratio(learning_retention, targets, RATIO_RANGE)
+
+    fitted = {}
+    for i, uid in enumerate(users.tolist()):
+        settings = settings_by_user.get(uid)
+        if settings is None or review_counts[i] < min_reviews:
+            continue
+
+        result = {
+            'interval_modifier': round(float(np.clip(
+                settings.interval_modifier * interval_ratio[i], *INTERVAL_MODIFIER_RANGE
+            )), 3),
+            'hard_ef_delta': round(float(np.clip(
+                settings.hard_ef_delta + mean_ease[i] * (hard_ratio[i] - 1), *HARD_EF_DELTA_RANGE
+            )), 3),
+            'easy_ef_delta': round(float(np.clip(
+                settings.easy_ef_delta + mean_ease[i] * (easy_ratio[i] - 1), *EASY_EF_DELTA_RANGE
+            )), 3),
+            'learning_steps': list(settings.learning_steps or [2, 10]),
+            'retention': round(float(review_retention[i]), 3),
+            'reviews': int(review_counts[i]),
+        }
+        if learning_counts[i] >= min_reviews // 4:
+            result['learning_steps'] = _scale_steps(result['learning_steps'], step_ratio[i])
+        fitted[uid] = result
+
+    return fitted
+
+
+def _scale_steps(steps, ratio):
+    """Scale learning steps keeping them positive and strictly increasing."""
+    scaled = []
+    for step in steps:
+        value = int(np.clip(round(step * ratio), *LEARNING_STEP_RANGE))
+        if scaled and value <= scaled[-1]:
+            value = scaled[-1] + 1
+        scaled.append(value)
+    return scaled
+
+
+def optimize_parameters(user_ids=None, days=DEFAULT_HISTORY_DAYS,
+                        min_reviews=MIN_REVIEWS_FOR_FIT, apply=True):
+    """
+    Fit parameters for the given users (all users with history by default)
+    and write them back with one bulk_update.
+
+    Returns:
+        {user_id: fitted values} for every user that was fitted.
+    """
+    history = load_review_history(user_ids=user_ids, days=days)
+    present_ids = np.unique(history['user_id']).tolist()
+    settings_by_user = UserTrainingSettings.objects.in_bulk(present_ids, field_name='user_id')
+
+    fitted = fit_parameters(history, settings_by_user, min_reviews=min_reviews)
+
+    if apply and fitted:
+        now = timezone.now()
+        changed = []
+        for uid, values in fitted.items():
+            settings = settings_by_user[uid]
+            settings.interval_modifier = values['interval_modifier']
+            settings.hard_ef_delta = values['hard_ef_delta']
+            settings.easy_ef_delta = values['easy_ef_delta']
+            settings.learning_steps = values['learning_steps']
+            settings.parameters_fitted_at = now
+            settings.updated_at = now
+            changed.append(settings)
+        with transaction.atomic():
+            UserTrainingSettings.objects.bulk_update(changed, FITTED_FIELDS, batch_size=500)
+        logger.info("Optimized SM-2 parameters for %s users", len(changed))
+
+    return fitted
+
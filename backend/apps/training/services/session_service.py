@@ -1,22 +1,39 @@
 """
 Session service: building card queues, processing answers, learning mode transitions.
 """
-import uuid
 import logging
+from datetime import timedelta
 
+from django.db import transaction
 from django.utils import timezone
 
 from apps.cards.models import Card, Deck
 from apps.cards.serializers import CardListSerializer
+from apps.core import user_cache
 from apps.words.models import Word
-from ..models import UserTrainingSettings
+from apps.words.utils import update_words_learning_status
+from apps.core.constants import TRAINING_SESSION_TTL_HOURS
+from ..models import TrainingSession, UserTrainingSettings
+from ..review_log import ReviewLogBuffer
 from ..session_utils import build_card_queue
 from ..sm2 import SM2Algorithm
+from .notification_service import apply_answers_to_counters
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_AGE_GROUP = 'adult'
 
+# Поля карточки, которые меняет SM2Algorithm.process_answer
+SM2_CARD_FIELDS = [
+    'ease_factor', 'interval', 'repetitions', 'lapses', 'consecutive_lapses',
+    'next_review', 'last_review', 'learning_step', 'is_in_learning_mode',
+    'updated_at',
+]
+SM2_SETTINGS_FIELDS = [
+    'total_reviews', 'successful_reviews', 'interval_modifier',
+    'last_calibration_at', 'updated_at',
+]
+
 
 def _resolve_word_fields(word, user):
     """
@@ -37,6 +54,10 @@ def _resolve_word_fields(word, user):
     return word.original_word, word.translation, word.language
 
 
+def _is_due(card, now):
+    return card.next_review is not None and card.next_review <= now
+
+
 def get_or_create_settings(user):
     """Get or create training settings for user."""
     settings, _ = UserTrainingSettings.objects.get_or_create(
@@ -47,7 +68,8 @@ def get_or_create_settings(user):
 
 
 def build_training_session(user, deck_id=None, category_id=None,
-                           duration=None, new_cards=True, request=None):
+                           duration=None, new_cards=True, request=None,
+                           include_descendants=False):
     """
     Build a training session with card queue.
 
@@ -65,17 +87,26 @@ def build_training_session(user, deck_id=None, category_id=None,
         category_id=category_id,
         duration_minutes=duration,
         include_new_cards=new_cards,
-        settings=settings
+        settings=settings,
+        include_descendants=include_descendants,
     )
 
-    session_id = uuid.uuid4()
     cards_data = CardListSerializer(
         queue_result['cards'], many=True,
         context={'request': request}
     ).data
 
+    now = timezone.now()
+    TrainingSession.objects.filter(user=user, expires_at__lte=now).delete()
+    session = TrainingSession.objects.create(
+        user=user,
+        queue=[card['id'] for card in cards_data],
+        payloads={str(card['id']): card for card in cards_data},
+        expires_at=now + timedelta(hours=TRAINING_SESSION_TTL_HOURS),
+    )
+
     return {
-        'session_id': session_id,
+        'session_id': session.id,
         'cards': cards_data,
         'estimated_time': queue_result['estimated_time'],
         'new_count': queue_result['new_count'],
@@ -85,9 +116,74 @@ def build_training_session(user, deck_id=None, category_id=None,
     }
 
 
-def process_answer(user, card_id, answer, time_spent=None, request=None):
+def get_active_session(user, session_id):
+    """
+    Get a non-expired training session of the user.
+
+    Raises:
+        TrainingSession.DoesNotExist if not found or expired.
+    """
+    return TrainingSession.objects.get(
+        id=session_id, user=user, expires_at__gt=timezone.now()
+    )
+
+
+def get_session_next_cards(user, session_id, limit):
+    """
+    Next cards of a stored session: due learning-step cards first
+    (by next_review), then the rest of the original queue.
+    Reads one row; nothing is rebuilt or re-serialized.
+
+    Returns:
+        dict with session_id, cards, remaining_count, answered_count, next_due_at.
+    Raises:
+        TrainingSession.DoesNotExist if not found or expired.
+    """
+    session = get_active_session(user, session_id)
+    return {
+        'session_id': session.id,
+        'cards': session.next_cards(limit),
+        'remaining_count': session.remaining_count,
+        'answered_count': session.answered_count,
+        'next_due_at': session.next_due_at,
+    }
+
+
+def _record_session_answers(user, session_id, entries):
+    """
+    Update the stored session queue after answers, in order
+    (missing/expired sessions are ignored).
+
+    Args:
+        entries: (card_id, card_data, next_review, in_learning) per answer.
+    """
+    with transaction.atomic():
+        session = TrainingSession.objects.select_for_update().filter(
+            id=session_id, user=user, expires_at__gt=timezone.now()
+        ).first()
+        if session is None:
+            return
+        for card_id, card_data, next_review, in_learning in entries:
+            session.record_answer(
+                card_id, card_data, next_review=next_review, in_learning=in_learning,
+            )
+        session.save(update_fields=[
+            'queue', 'requeue', 'payloads', 'answered_count', 'updated_at'
+        ])
+
+
+def _record_session_answer(user, session_id, card, card_data):
+    """Update the stored session queue after a single answer."""
+    _record_session_answers(user, session_id, [
+        (card.id, card_data, card.next_review, card.is_in_learning_mode),
+    ])
+
+
+def process_answer(user, card_id, answer, time_spent=None, request=None,
+                   session_id=None):
     """
     Process user answer on a card via SM2 algorithm.
+    If session_id is given, the stored session queue is updated as well.
 
     Returns:
         dict with card_id, new_interval, new_ease_factor, next_review, etc.
@@ -99,10 +195,16 @@ def process_answer(user, card_id, answer, time_spent=None, request=None):
 
     was_in_learning_before = card.is_in_learning_mode
     was_calibrated_before = settings.last_calibration_at is not None
+    was_due = _is_due(card, timezone.now())
 
+    # Счётчики уведомлений обновляются ниже инкрементально
+    card._skip_notification_counters = True
     result = SM2Algorithm.process_answer(
         card=card, answer=answer, settings=settings, time_spent=time_spent
     )
+    apply_answers_to_counters(
+        user.id, was_due=int(was_due), next_reviews=[card.next_review], reviews=1
+    )
 
     card.refresh_from_db()
     settings.refresh_from_db()
@@ -113,6 +215,9 @@ def process_answer(user, card_id, answer, time_spent=None, request=None):
 
     card_data = CardListSerializer(card, context={'request': request}).data
 
+    if session_id is not None:
+        _record_session_answer(user, session_id, card, card_data)
+
     return {
         'card_id': card.id,
         'new_interval': result['new_interval'],
@@ -126,6 +231,96 @@ def process_answer(user, card_id, answer, time_spent=None, request=None):
     }
 
 
+@transaction.atomic
+def process_answers_batch(user, answers, session_id=None, request=None):
+    """
+    Process a batch of answers from one session in memory.
+
+    SM2 runs over all answers without intermediate saves; results are
+    persisted with one Card bulk_update, one settings update, one
+    ReviewLog bulk_create and one word-status recompute. Answers are
+    applied in order, so the same card may be answered several times.
+    If session_id is given, every answer is applied to the stored session
+    queue as well, like process_answer does.
+
+    Args:
+        answers: list of dicts with card_id, answer and optional time_spent.
+
+    Returns:
+        dict with processed count and per-answer results.
+    Raises:
+        Card.DoesNotExist if any card is not found (nothing is saved).
+    """
+    card_ids = {item['card_id'] for item in answers}
+    cards = Card.objects.select_related('word').filter(user=user, id__in=card_ids).in_bulk()
+    missing = card_ids - cards.keys()
+    if missing:
+        raise Card.DoesNotExist(f'Cards not found: {sorted(missing)}')
+
+    settings = get_or_create_settings(user)
+    now = timezone.now()
+    was_due = sum(1 for card in cards.values() if _is_due(card, now))
+
+    results = []
+    session_entries = []
+    with ReviewLogBuffer() as review_log:
+        for item in answers:
+            card = cards[item['card_id']]
+            was_in_learning_before = card.is_in_learning_mode
+            result = SM2Algorithm.process_answer(
+                card=card,
+                answer=item['answer'],
+                settings=settings,
+                time_spent=item.get('time_spent'),
+                review_log=review_log,
+                commit=False,
+            )
+            results.append({
+                'card_id': card.id,
+                'new_interval': result['new_interval'],
+                'new_ease_factor': result['new_ease_factor'],
+                'next_review': result['next_review'],
+                'entered_learning_mode': result['entered_learning_mode'],
+                'exited_learning_mode': was_in_learning_before and not card.is_in_learning_mode,
+                'learning_step': result['learning_step'],
+                'calibrated': result['calibrated'],
+            })
+            session_entries.append((card.id, card.next_review, card.is_in_learning_mode))
+
+        # bulk_update не обновляет auto_now
+        now = timezone.now()
+        for card in cards.values():
+            card.updated_at = now
+        Card.objects.bulk_update(cards.values(), SM2_CARD_FIELDS)
+        settings.save(update_fields=SM2_SETTINGS_FIELDS)
+
+    update_words_learning_status({card.word_id for card in cards.values()})
+    # bulk_update не отправляет post_save — сбрасываем кэш явно
+    user_cache.bump_version(user.id)
+    apply_answers_to_counters(
+        user.id,
+        was_due=was_due,
+        next_reviews=[card.next_review for card in cards.values()],
+        reviews=len(answers),
+    )
+
+    if session_id is not None:
+        # Повторный показ — в текущем состоянии карточки (после всех ответов пакета)
+        payloads = {
+            card.id: CardListSerializer(card, context={'request': request}).data
+            for card in cards.values() if card.is_in_learning_mode
+        }
+        _record_session_answers(user, session_id, [
+            (card_id, payloads.get(card_id), next_review, in_learning)
+            for card_id, next_review, in_learning in session_entries
+        ])
+
+    return {
+        'processed': len(results),
+        'results': results,
+    }
+
+
 def enter_learning_mode(user, card_id, request=None):
     """
     Manually enter learning mode for a card.
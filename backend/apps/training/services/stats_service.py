@@ -3,49 +3,64 @@ Stats service: streak calculation, card status counts, dashboard data, forgettin
 """
 import math
 import logging
-from collections import defaultdict
 from datetime import timedelta
 
 from django.utils import timezone
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, F, Q
 
 from apps.cards.models import Card, Deck
+from apps.core import user_cache
 from apps.words.models import Category
-from ..models import UserTrainingSettings, NotificationSettings
+from ..models import UserTrainingSettings, NotificationSettings, UserDailyActivity
+from .notification_service import refresh_counters
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_AGE_GROUP = 'adult'
+ACTIVITY_HEATMAP_DAYS = 365
+
+# Кривая забывания зависит только от состояния карточек — живёт до изменения.
+# Остальные сводки зависят и от текущего времени (карточки «созревают»
+# без записи в БД), поэтому их TTL короткий.
+FORGETTING_CURVE_CACHE_TIMEOUT = 60 * 60 * 24
+STATS_CACHE_TIMEOUT = 60
+
+# (min interval, max interval, label)
+FORGETTING_CURVE_BUCKETS = [
+    (1, 1, '1'),
+    (2, 3, '2-3'),
+    (4, 7, '4-7'),
+    (8, 14, '8-14'),
+    (15, 30, '15-30'),
+    (31, 60, '31-60'),
+    (61, 90, '61-90'),
+    (91, 365, '91+'),
+]
 
 
 def calculate_streak_days(user):
     """
     Подсчитывает количество дней подряд с тренировками.
 
+    Дни берутся из дневной сводки (UserDailyActivity) одним запросом
+    по диапазону дат за последний год.
+
     Returns:
         int: Количество дней streak
     """
-    cards = Card.objects.for_user(user).filter(
-        last_review__isnull=False
-    ).exclude(last_review__lt=timezone.now() - timedelta(days=365))
-
-    if not cards.exists():
-        return 0
-
-    training_dates = set()
-    for card in cards:
-        if card.last_review:
-            training_dates.add(card.last_review.date())
-
-    if not training_dates:
-        return 0
+    today = timezone.localdate()
+    training_dates = (
+        UserDailyActivity.objects
+        .filter(user=user, date__gte=today - timedelta(days=365), date__lte=today, reviews__gt=0)
+        .order_by('-date')
+        .values_list('date', flat=True)
+    )
 
-    sorted_dates = sorted(training_dates, reverse=True)
     streak = 0
-    current_date = timezone.now().date()
+    current_date = today
 
-    for date in sorted_dates:
-        if date == current_date or date == current_date - timedelta(days=streak):
+    for date in training_dates:
+        if date == current_date or date == current_date - timedelta(days=1):
             streak += 1
             current_date = date
         else:
@@ -54,94 +69,141 @@ def calculate_streak_days(user):
     return streak
 
 
-def get_cards_by_status(user):
+def get_activity_heatmap(user, days=ACTIVITY_HEATMAP_DAYS):
     """
-    Возвращает распределение карточек по статусам.
+    Активность по дням за последние `days` дней (для годовой тепловой карты).
+    Кэшируется по версии пользователя.
 
     Returns:
-        dict: {'new': int, 'learning': int, 'review': int, 'mastered': int}
+        dict with start_date, end_date, total_reviews, active_days and
+        a list of {'date', 'reviews', 'successes'} for days with reviews.
     """
-    cards = Card.objects.for_user(user)
-    now = timezone.now()
-
-    new_count = cards.filter(
-        is_in_learning_mode=True, repetitions=0, interval=0
-    ).count()
+    return user_cache.get_or_build(
+        user.id, f'activity:{days}:{timezone.localdate()}',
+        lambda: _build_activity_heatmap(user, days),
+        timeout=STATS_CACHE_TIMEOUT,
+    )
 
-    learning_count = cards.filter(
-        is_in_learning_mode=True
-    ).exclude(repetitions=0, interval=0).count()
 
-    review_count = cards.filter(
-        is_in_learning_mode=False, next_review__lte=now
-    ).count()
+def _build_activity_heatmap(user, days):
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=days - 1)
 
-    mastered_count = cards.filter(
-        is_in_learning_mode=False, next_review__gt=now, interval__gte=30
-    ).count()
+    rows = list(
+        UserDailyActivity.objects
+        .filter(user=user, date__gte=start_date, date__lte=end_date, reviews__gt=0)
+        .order_by('date')
+        .values('date', 'reviews', 'successes')
+    )
 
     return {
-        'new': new_count,
-        'learning': learning_count,
-        'review': review_count,
-        'mastered': mastered_count,
+        'start_date': start_date,
+        'end_date': end_date,
+        'total_reviews': sum(row['reviews'] for row in rows),
+        'active_days': len(rows),
+        'days': rows,
     }
 
 
-def get_card_counts_for_queryset(cards_qs):
+def _card_count_aggregates(now):
     """
-    Подсчитывает карточки по статусам для произвольного queryset.
+    Условные агрегаты для подсчёта карточек по статусам одним запросом.
 
-    Returns:
-        dict: {'new', 'learning', 'review', 'mastered', 'total', 'due'}
+    Подходят и для aggregate(), и для values(...).annotate() с группировкой
+    по колоде/категории.
     """
-    now = timezone.now()
-    total = cards_qs.count()
+    is_new = Q(is_in_learning_mode=True, repetitions=0, interval=0)
+    return {
+        'total': Count('id'),
+        'new': Count('id', filter=is_new),
+        'learning': Count('id', filter=Q(is_in_learning_mode=True) & ~Q(repetitions=0, interval=0)),
+        'review': Count('id', filter=Q(is_in_learning_mode=False, next_review__lte=now)),
+        'mastered': Count(
+            'id', filter=Q(is_in_learning_mode=False, next_review__gt=now, interval__gte=30)
+        ),
+    }
 
-    new_count = cards_qs.filter(
-        is_in_learning_mode=True, repetitions=0, interval=0
-    ).count()
 
-    learning_count = cards_qs.filter(
-        is_in_learning_mode=True
-    ).exclude(repetitions=0, interval=0).count()
+def _card_counts(row=None):
+    """Приводит строку агрегатов к словарю {'new', 'learning', 'review', 'mastered', 'total', 'due'}."""
+    row = row or {}
+    counts = {
+        key: row.get(key) or 0
+        for key in ('new', 'learning', 'review', 'mastered', 'total')
+    }
+    counts['due'] = counts['new'] + counts['learning'] + counts['review']
+    return counts
 
-    review_count = cards_qs.filter(
-        is_in_learning_mode=False, next_review__lte=now
-    ).count()
 
-    mastered_count = cards_qs.filter(
-        is_in_learning_mode=False, next_review__gt=now, interval__gte=30
-    ).count()
+def _grouped_card_counts(cards_qs, group_field, now):
+    """
+    Подсчитывает карточки по статусам с группировкой по group_field
+    (например, 'word__decks') одним запросом.
 
-    due_count = new_count + learning_count + review_count
+    Returns:
+        dict: {group_id: counts}
+    """
+    rows = (
+        cards_qs.filter(**{f'{group_field}__isnull': False})
+        .values(group_id=F(group_field))
+        .annotate(**_card_count_aggregates(now))
+        .order_by()
+    )
+    return {row['group_id']: _card_counts(row) for row in rows}
 
+
+def get_cards_by_status(user):
+    """
+    Возвращает распределение карточек по статусам.
+
+    Returns:
+        dict: {'new': int, 'learning': int, 'review': int, 'mastered': int}
+    """
+    counts = get_card_counts_for_queryset(Card.objects.for_user(user))
     return {
-        'new': new_count,
-        'learning': learning_count,
-        'review': review_count,
-        'mastered': mastered_count,
-        'total': total,
-        'due': due_count,
+        'new': counts['new'],
+        'learning': counts['learning'],
+        'review': counts['review'],
+        'mastered': counts['mastered'],
     }
 
 
+def get_card_counts_for_queryset(cards_qs):
+    """
+    Подсчитывает карточки по статусам для произвольного queryset (один запрос).
+
+    Returns:
+        dict: {'new', 'learning', 'review', 'mastered', 'total', 'due'}
+    """
+    return _card_counts(
+        cards_qs.order_by().aggregate(**_card_count_aggregates(timezone.now()))
+    )
+
+
 def get_training_stats(user, period='all'):
     """
-    Get training statistics for a given period.
+    Get training statistics for a given period (cached per user version).
 
     Returns:
         dict with period, total_reviews, successful_reviews, success_rate,
         streak_days, cards_by_status, reviews_by_day, average_time_per_card,
         total_time_spent.
     """
-    now = timezone.now()
+    return user_cache.get_or_build(
+        user.id, f'stats:{period}',
+        lambda: _build_training_stats(user, period),
+        timeout=STATS_CACHE_TIMEOUT,
+    )
+
+
+def _build_training_stats(user, period):
+    today = timezone.localdate()
     if period == 'day':
-        start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        start_date = today
     elif period == 'week':
-        start_date = now - timedelta(days=7)
+        start_date = today - timedelta(days=7)
     elif period == 'month':
-        start_date = now - timedelta(days=30)
+        start_date = today - timedelta(days=30)
     else:
         start_date = None
 
@@ -153,32 +215,28 @@ def get_training_stats(user, period='all'):
     successful_reviews = settings.successful_reviews
     success_rate = (successful_reviews / total_reviews) if total_reviews > 0 else 0.0
 
-    cards = Card.objects.for_user(user)
-    cards_in_period = cards.filter(last_review__gte=start_date) if start_date else cards
-
-    reviews_by_day_dict = defaultdict(lambda: {'total': 0, 'successful': 0})
-    for card in cards_in_period:
-        if card.last_review:
-            day = card.last_review.date()
-            reviews_by_day_dict[day]['total'] += 1
-            if card.repetitions > 0 or card.ease_factor >= settings.starting_ease:
-                reviews_by_day_dict[day]['successful'] += 1
+    activity = UserDailyActivity.objects.filter(user=user, reviews__gt=0)
+    if start_date:
+        activity = activity.filter(date__gte=start_date)
 
     reviews_by_day = []
-    for date, stats in sorted(reviews_by_day_dict.items()):
-        rate = (stats['successful'] / stats['total']) if stats['total'] > 0 else 0.0
+    total_time = 0.0
+    timed_reviews = 0
+    for day in activity.order_by('date'):
         reviews_by_day.append({
-            'date': date,
-            'total': stats['total'],
-            'successful': stats['successful'],
-            'success_rate': round(rate, 2),
+            'date': day.date,
+            'total': day.reviews,
+            'successful': day.successes,
+            'success_rate': round(day.success_rate, 2),
         })
+        total_time += day.time_spent
+        timed_reviews += day.timed_reviews
 
     streak_days = calculate_streak_days(user)
     cards_by_status = get_cards_by_status(user)
 
-    total_time_spent = getattr(settings, 'total_time_spent', 0)
-    average_time_per_card = (total_time_spent / total_reviews) if total_reviews > 0 else 0.0
+    total_time_spent = int(total_time)
+    average_time_per_card = (total_time_spent / timed_reviews) if timed_reviews > 0 else 0.0
 
     return {
         'period': period,
@@ -195,11 +253,20 @@ def get_training_stats(user, period='all'):
 
 def get_dashboard_data(user):
     """
-    Build dashboard data: decks, categories, orphans with card counts.
+    Build dashboard data: decks, categories, orphans with card counts
+    (cached per user version).
 
     Returns:
         dict with quick_stats, decks, categories, orphans.
     """
+    return user_cache.get_or_build(
+        user.id, 'dashboard',
+        lambda: _build_dashboard_data(user),
+        timeout=STATS_CACHE_TIMEOUT,
+    )
+
+
+def _build_dashboard_data(user):
     training_settings, _ = UserTrainingSettings.objects.get_or_create(
         user=user, defaults={'age_group': DEFAULT_AGE_GROUP}
     )
@@ -209,32 +276,33 @@ def get_dashboard_data(user):
     successful_reviews = training_settings.successful_reviews
     success_rate = (successful_reviews / total_reviews) if total_reviews > 0 else 0.0
 
+    now = timezone.now()
     all_user_cards = Card.objects.for_user(user)
     total_due = get_card_counts_for_queryset(all_user_cards)['due']
 
+    # Счётчики по всем колодам и категориям — по одному запросу с GROUP BY
+    deck_counts = _grouped_card_counts(all_user_cards, 'word__decks', now)
+    category_counts = _grouped_card_counts(all_user_cards, 'word__categories', now)
+
     decks_data = []
     for deck in Deck.objects.filter(user=user).order_by('-updated_at'):
-        deck_cards = all_user_cards.filter(word__decks=deck)
-        cards_info = get_card_counts_for_queryset(deck_cards)
         decks_data.append({
             'id': deck.id,
             'name': deck.name,
             'cover': deck.cover.url if deck.cover else None,
             'is_learning_active': deck.is_learning_active,
-            'cards': cards_info,
+            'cards': deck_counts.get(deck.id) or _card_counts(),
         })
 
     categories_data = []
     for cat in Category.objects.filter(user=user).order_by('order', 'name'):
-        cat_cards = all_user_cards.filter(word__categories=cat)
-        cards_info = get_card_counts_for_queryset(cat_cards)
         categories_data.append({
             'id': cat.id,
             'name': cat.name,
             'icon': cat.icon,
             'parent_id': cat.parent_id,
             'is_learning_active': cat.is_learning_active,
-            'cards': cards_info,
+            'cards': category_counts.get(cat.id) or _card_counts(),
         })
 
     orphan_cards = all_user_cards.filter(word__decks__isnull=True)
@@ -291,12 +359,36 @@ def get_forgetting_curve_data(user):
     """
     Get data for building the user's forgetting curve.
 
+    All bucket counts and summary aggregates come from one query; the
+    result is cached per user until one of the user's cards changes.
+
     Returns:
         dict with points, theoretical_curve, summary.
     """
+    return user_cache.get_or_build(
+        user.id, 'forgetting_curve',
+        lambda: _build_forgetting_curve_data(user),
+        timeout=FORGETTING_CURVE_CACHE_TIMEOUT,
+    )
+
+
+def _build_forgetting_curve_data(user):
+    """Compute forgetting curve data with a single conditional aggregate."""
     reviewed_cards = Card.objects.filter(user=user, repetitions__gt=0)
 
-    if not reviewed_cards.exists():
+    aggregates = {
+        'total': Count('id'),
+        'avg_ef': Avg('ease_factor'),
+        'avg_interval': Avg('interval', filter=Q(consecutive_lapses=0)),
+    }
+    for index, (low, high, _label) in enumerate(FORGETTING_CURVE_BUCKETS):
+        in_bucket = Q(interval__gte=low, interval__lte=high)
+        aggregates[f'bucket_{index}'] = Count('id', filter=in_bucket)
+        aggregates[f'successful_{index}'] = Count('id', filter=in_bucket & Q(consecutive_lapses=0))
+
+    row = reviewed_cards.order_by().aggregate(**aggregates)
+
+    if not row['total']:
         return {
             'points': [],
             'theoretical_curve': [],
@@ -307,25 +399,13 @@ def get_forgetting_curve_data(user):
             },
         }
 
-    buckets = [
-        (1, 1, '1'),
-        (2, 3, '2-3'),
-        (4, 7, '4-7'),
-        (8, 14, '8-14'),
-        (15, 30, '15-30'),
-        (31, 60, '31-60'),
-        (61, 90, '61-90'),
-        (91, 365, '91+'),
-    ]
-
     points = []
-    for low, high, label in buckets:
-        cards_in_bucket = reviewed_cards.filter(interval__gte=low, interval__lte=high)
-        total = cards_in_bucket.count()
+    for index, (low, high, label) in enumerate(FORGETTING_CURVE_BUCKETS):
+        total = row[f'bucket_{index}']
         if total == 0:
             continue
 
-        successful = cards_in_bucket.filter(consecutive_lapses=0).count()
+        successful = row[f'successful_{index}']
         retention = successful / total if total > 0 else 0
 
         mid_day = (low + high) / 2
@@ -337,9 +417,7 @@ def get_forgetting_curve_data(user):
             'successful': successful,
         })
 
-    avg_interval = reviewed_cards.filter(
-        consecutive_lapses=0
-    ).aggregate(avg=Avg('interval'))['avg'] or 30
+    avg_interval = row['avg_interval'] or 30
 
     theoretical = []
     for day in [1, 2, 3, 5, 7, 10, 14, 21, 30, 45, 60, 90, 120, 180, 365]:
@@ -349,8 +427,8 @@ def get_forgetting_curve_data(user):
             'retention': round(retention, 1),
         })
 
-    total_reviews = reviewed_cards.aggregate(total=Count('id'))['total'] or 0
-    avg_ef = reviewed_cards.aggregate(avg_ef=Avg('ease_factor'))['avg_ef'] or 2.5
+    total_reviews = row['total']
+    avg_ef = row['avg_ef'] or 2.5
 
     return {
         'points': points,
@@ -367,6 +445,9 @@ def check_notification(user):
     """
     Check if a notification should be shown.
 
+    Reads the precomputed counters from NotificationSettings (one query
+    when they are fresh).
+
     Returns:
         dict with should_notify, cards_due, streak_at_risk, message, notification_type.
     """
@@ -375,12 +456,12 @@ def check_notification(user):
         defaults={'notification_frequency': 'normal'}
     )
 
+    # Счётчики хранятся в той же строке; пересчёт — только если устарели
     now = timezone.now()
-    cards_due = Card.objects.filter(user=user, next_review__lte=now).count()
-
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_reviews = Card.objects.filter(user=user, last_review__gte=today_start).count()
-    streak_at_risk = today_reviews == 0
+    if not settings_obj.counters_are_fresh(now):
+        refresh_counters([settings_obj], now=now)
+    cards_due = settings_obj.cards_due
+    streak_at_risk = settings_obj.today_reviews == 0
 
     should_notify = False
     message = ''
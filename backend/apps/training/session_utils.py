@@ -2,12 +2,12 @@
 Утилиты для формирования очереди карточек для тренировочных сессий.
 """
 from typing import Dict, List, Optional
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.utils import timezone
 from datetime import timedelta
 
 from apps.cards.models import Card, Deck
-from apps.words.models import Category
+from apps.words.models import Category, Word
 from apps.core.constants import TIME_PER_LEARNING_CARD, TIME_PER_REVIEW_CARD, TIME_PER_NEW_CARD
 from .models import UserTrainingSettings
 
@@ -36,55 +36,52 @@ def estimate_session_time(
     return int(total_minutes)
 
 
-def limit_cards_by_time(
-    learning_cards: List[Card],
-    review_cards: List[Card],
-    new_cards: List[Card],
-    duration_minutes: int
-) -> List[Card]:
+def _take(queryset, limit) -> List[Card]:
+    """Выбирает не больше limit карточек (LIMIT в SQL)."""
+    limit = int(limit)
+    if limit <= 0:
+        return []
+    return list(queryset[:limit])
+
+
+def _word_in_category(category: Category, include_descendants: bool = False) -> Exists:
     """
-    Ограничивает количество карточек по времени.
-    
-    Возвращает подмножество карточек, которое помещается в указанное время.
-    Приоритет: learning → review → new
-    
-    Args:
-        learning_cards: Карточки в режиме обучения
-        review_cards: Карточки на повторение
-        new_cards: Новые карточки
-        duration_minutes: Доступное время в минутах
-    
-    Returns:
-        List[Card]: Ограниченный список карточек
+    EXISTS: слово карточки входит в категорию (или, с include_descendants,
+    в любую категорию её поддерева — префиксный фильтр по Category.path).
     """
-    result = []
-    remaining_time = duration_minutes
+    if include_descendants:
+        category_filter = category.get_subtree_filter('category__')
+    else:
+        category_filter = Q(category_id=category.id)
+    return Exists(
+        Word.categories.through.objects.filter(
+            category_filter,
+            word_id=OuterRef('word_id'),
+        )
+    )
+
+
+def _active_training_filter(include_orphan_words: bool) -> Q:
+    """
+    Фильтр общей тренировки: слово в активной колоде или активной категории
+    (или без колод, если включены сироты).
     
-    # 1. Добавляем карточки в режиме обучения
-    for card in learning_cards:
-        if remaining_time >= TIME_PER_LEARNING_CARD:
-            result.append(card)
-            remaining_time -= TIME_PER_LEARNING_CARD
-        else:
-            break
-    
-    # 2. Добавляем карточки на повторение
-    for card in review_cards:
-        if remaining_time >= TIME_PER_REVIEW_CARD:
-            result.append(card)
-            remaining_time -= TIME_PER_REVIEW_CARD
-        else:
-            break
-    
-    # 3. Добавляем новые карточки
-    for card in new_cards:
-        if remaining_time >= TIME_PER_NEW_CARD:
-            result.append(card)
-            remaining_time -= TIME_PER_NEW_CARD
-        else:
-            break
-    
-    return result
+    EXISTS-подзапросы вместо JOIN по M2M не размножают строки,
+    поэтому .distinct() не нужен и LIMIT применяется к карточкам.
+    """
+    deck_links = Deck.words.through.objects.filter(word_id=OuterRef('word_id'))
+    active_filter = (
+        Q(Exists(deck_links.filter(deck__is_learning_active=True))) |
+        Q(Exists(
+            Word.categories.through.objects.filter(
+                word_id=OuterRef('word_id'),
+                category__is_learning_active=True,
+            )
+        ))
+    )
+    if include_orphan_words:
+        active_filter |= ~Q(Exists(deck_links))
+    return active_filter
 
 
 def _empty_queue() -> Dict:
@@ -105,7 +102,8 @@ def build_card_queue(
     category_id: Optional[int] = None,
     duration_minutes: int = 20,
     include_new_cards: bool = True,
-    settings: Optional[UserTrainingSettings] = None
+    settings: Optional[UserTrainingSettings] = None,
+    include_descendants: bool = False
 ) -> Dict:
     """
     Формирует очередь карточек для тренировочной сессии.
@@ -113,7 +111,8 @@ def build_card_queue(
     Логика выбора карточек:
     - Если deck_id указан: карточки только из этой колоды.
       Колода авто-активируется при первом использовании.
-    - Если category_id указан: карточки только из этой категории.
+    - Если category_id указан: карточки только из этой категории
+      (с include_descendants — и из всех её подкатегорий).
       Категория авто-активируется при первом использовании.
     - Если ничего не указано (общая тренировка): карточки из
       активных колод + активных категорий + сирот (если включено).
@@ -125,6 +124,7 @@ def build_card_queue(
         duration_minutes: Длительность сессии в минутах
         include_new_cards: Включать ли новые карточки
         settings: Настройки тренировки (если None, получаем автоматически)
+        include_descendants: Для category_id — включать подкатегории
     
     Returns:
         dict:
@@ -168,67 +168,63 @@ def build_card_queue(
                 category.is_learning_active = True
                 category.save(update_fields=['is_learning_active'])
             base_queryset = base_queryset.filter(
-                word__categories=category
-            ).distinct()
+                _word_in_category(category, include_descendants)
+            )
         except Category.DoesNotExist:
             return _empty_queue()
     
     # Общая тренировка: только карточки из активных колод/категорий + сироты
     else:
-        active_filter = (
-            Q(word__decks__is_learning_active=True) |
-            Q(word__categories__is_learning_active=True)
+        base_queryset = base_queryset.filter(
+            _active_training_filter(settings.include_orphan_words)
         )
-        if settings.include_orphan_words:
-            active_filter |= Q(word__decks__isnull=True)
-        base_queryset = base_queryset.filter(active_filter).distinct()
+    
+    now = timezone.now()
+    
+    # Бюджет времени считается до запросов: каждая корзина выбирается
+    # с LIMIT, равным числу карточек, которое ещё помещается в сессию.
+    # Приоритет: learning → review → new.
+    remaining_time = duration_minutes
     
     # 1. Карточки в режиме обучения (которые уже начали тренировать)
     # Это карточки с is_in_learning_mode=True и next_review <= now
-    learning_cards = list(
+    learning_cards = _take(
         base_queryset.filter(
             is_in_learning_mode=True,
-            next_review__lte=timezone.now()
-        ).order_by('next_review', 'learning_step')
+            next_review__lte=now
+        ).order_by('next_review', 'learning_step'),
+        remaining_time // TIME_PER_LEARNING_CARD
     )
+    remaining_time -= len(learning_cards) * TIME_PER_LEARNING_CARD
     
     # 2. Карточки на повторение (прошли режим обучения)
-    review_cards = list(
+    review_cards = _take(
         base_queryset.filter(
             is_in_learning_mode=False,
-            next_review__lte=timezone.now()
-        ).order_by('next_review')
+            next_review__lte=now
+        ).order_by('next_review'),
+        remaining_time // TIME_PER_REVIEW_CARD
     )
+    remaining_time -= len(review_cards) * TIME_PER_REVIEW_CARD
     
     # 3. Новые карточки (если нужно)
     # Это карточки в режиме обучения, но еще не показанные
     # (next_review в будущем ИЛИ next_review=NULL — только что созданные)
     new_cards = []
     if include_new_cards:
-        new_cards = list(
+        new_cards = _take(
             base_queryset.filter(
                 is_in_learning_mode=True,
             ).filter(
-                Q(next_review__gt=timezone.now()) | Q(next_review__isnull=True)
-            ).order_by('created_at')
+                Q(next_review__gt=now) | Q(next_review__isnull=True)
+            ).order_by('created_at'),
+            remaining_time // TIME_PER_NEW_CARD
         )
     
-    # Ограничиваем по времени
-    limited_cards = limit_cards_by_time(
-        learning_cards,
-        review_cards,
-        new_cards,
-        duration_minutes
-    )
-    
-    # Подсчитываем статистику
-    learning_ids = {c.id for c in learning_cards}
-    review_ids = {c.id for c in review_cards}
-    new_ids = {c.id for c in new_cards}
-    
-    learning_count = sum(1 for c in limited_cards if c.id in learning_ids)
-    review_count = sum(1 for c in limited_cards if c.id in review_ids)
-    new_count = sum(1 for c in limited_cards if c.id in new_ids)
+    learning_count = len(learning_cards)
+    review_count = len(review_cards)
+    new_count = len(new_cards)
+    limited_cards = learning_cards + review_cards + new_cards
     
     # Оценка времени
     estimated_time = estimate_session_time(learning_count, review_count, new_count)
@@ -1,7 +1,11 @@
 import logging
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from apps.cards.models import Deck
+from apps.core import user_cache
+from apps.core.bulk import in_bulk_operation
+from apps.words.models import Word
 from .models import UserTrainingSettings
 
 User = get_user_model()
@@ -23,58 +27,66 @@ def create_training_settings_for_new_user(sender, instance, created, **kwargs):
         UserTrainingSettings.create_for_user(instance, age_group)
 
 
+@receiver(post_save, sender='cards.Card')
+@receiver(post_delete, sender='cards.Card')
+@receiver(post_save, sender='words.Word')
+@receiver(post_delete, sender='words.Word')
+@receiver(post_save, sender='cards.Deck')
+@receiver(post_delete, sender='cards.Deck')
+@receiver(post_save, sender='words.Category')
+@receiver(post_delete, sender='words.Category')
+@receiver(post_save, sender=UserTrainingSettings)
+def bump_user_stats_cache(sender, instance, **kwargs):
+    """Сбрасывает кэш статистики пользователя при изменении его данных"""
+    if in_bulk_operation():
+        return
+    user_cache.bump_version(instance.user_id)
+
+
+@receiver(post_save, sender='cards.Card')
+@receiver(post_delete, sender='cards.Card')
+def mark_notification_counters_stale(sender, instance, **kwargs):
+    """
+    Любое изменение карточки, кроме ответа (он обновляет счётчики сам),
+    сбрасывает счётчики уведомлений — они пересчитаются при чтении.
+    """
+    if getattr(instance, '_skip_notification_counters', False) or in_bulk_operation():
+        return
+    from .services.notification_service import mark_counters_stale
+    mark_counters_stale(instance.user_id)
+
+
+def bump_user_stats_cache_on_m2m(sender, instance, action, **kwargs):
+    """Состав колод и категорий меняет счётчики дашборда"""
+    if in_bulk_operation():
+        return
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        user_cache.bump_version(instance.user_id)
+
+
+m2m_changed.connect(bump_user_stats_cache_on_m2m, sender=Deck.words.through)
+m2m_changed.connect(bump_user_stats_cache_on_m2m, sender=Word.categories.through)
+
+
 @receiver(post_save, sender='words.Word')
 def auto_generate_etymology(sender, instance, created, **kwargs):
     """
-    Автоматически генерирует этимологию при создании нового слова
+    Ставит новое слово в очередь генерации этимологии
+    
+    Сама генерация (пачками, в фоне) — services/etymology_service.process_queue,
+    баланс токенов проверяется там же.
     
     Условия:
     - Слово только что создано (created=True)
-    - У пользователя достаточно токенов (>= 1 токен = 2 единицы)
     - Этимология ещё не заполнена
     - Пользователь не отключил автоматическую генерацию (опционально, через атрибут)
     """
     if not created:
         return
     
-    # Проверяем, что этимология не заполнена
-    if instance.etymology:
-        return  # Этимология уже есть
-    
     # Проверка, отключена ли автоматическая генерация (через атрибут)
     if getattr(instance, '_skip_etymology_generation', False):
         return
     
-    # Проверка баланса
-    from apps.cards.token_utils import check_balance
-    balance = check_balance(instance.user)
-    if balance < 1:  # Минимум 1 токен
-        logger.info(
-            "Insufficient tokens for auto-etymology, word id=%s, balance=%s",
-            instance.id, balance
-        )
-        return
-    
-    try:
-        # Импортируем здесь, чтобы избежать циклических зависимостей
-        from .ai_generation import generate_etymology
-        
-        etymology = generate_etymology(
-            word=instance.original_word,
-            translation=instance.translation,
-            language=instance.language,
-            user=instance.user
-        )
-        
-        # Обновляем этимологию (используем update для избежания повторного сигнала)
-        sender.objects.filter(id=instance.id).update(etymology=etymology)
-        
-        logger.info(
-            "Auto-generated etymology for word id=%s ('%s')",
-            instance.id, instance.original_word
-        )
-    except Exception:
-        logger.exception(
-            "Failed to auto-generate etymology for word id=%s ('%s')",
-            instance.id, instance.original_word
-        )
+    from .services.etymology_service import enqueue
+    enqueue([instance])
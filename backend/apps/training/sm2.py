@@ -5,13 +5,15 @@
 включая внутрисессионное обучение, калибровку и автоматическое управление
 режимом изучения.
 """
+import numpy as np
 from django.utils import timezone
 from datetime import timedelta
 from typing import Dict, Optional
 
 from apps.cards.models import Card
 from apps.core.constants import MAX_EASE_FACTOR
-from .models import UserTrainingSettings
+from .models import UserTrainingSettings, ReviewLog
+from .review_log import ReviewLogBuffer, save_review_logs
 
 
 class SM2Algorithm:
@@ -29,7 +31,9 @@ class SM2Algorithm:
         card: Card,
         answer: int,
         settings: UserTrainingSettings,
-        time_spent: Optional[float] = None
+        time_spent: Optional[float] = None,
+        review_log: Optional[ReviewLogBuffer] = None,
+        commit: bool = True
     ) -> Dict:
         """
         Обрабатывает ответ пользователя на карточку.
@@ -39,6 +43,11 @@ class SM2Algorithm:
             answer: Оценка ответа (0=Again, 1=Hard, 2=Good, 3=Easy)
             settings: Настройки тренировки пользователя
             time_spent: Время, потраченное на ответ (секунды, опционально)
+            review_log: Буфер журнала ответов. Если не передан,
+                запись ReviewLog сохраняется сразу.
+            commit: Сохранять ли карточку и настройки. При commit=False
+                изменения остаются в памяти (пакетная обработка), а запись
+                журнала попадает только в review_log.
         
         Returns:
             dict с результатами обработки:
@@ -58,6 +67,7 @@ class SM2Algorithm:
         
         # Запоминаем начальное состояние
         was_in_learning_mode = card.is_in_learning_mode
+        interval_before = card.interval
         entered_learning_mode = False
         exited_learning_mode = False
         calibrated = False
@@ -90,15 +100,33 @@ class SM2Algorithm:
                 card.repetitions += 1
         
         # Запись статистики для калибровки
-        settings.record_review(successful=successful)
+        settings.record_review(successful=successful, save=commit)
         
         # Проверка на калибровку
         if settings.should_calibrate():
-            calibration_result = settings.calibrate()
+            calibration_result = settings.calibrate(save=commit)
             calibrated = calibration_result.get('calibrated', False)
         
         # Сохранение карточки
-        card.save()
+        if commit:
+            card.save()
+        
+        # Запись в журнал ответов
+        entry = ReviewLog(
+            card=card,
+            user_id=card.user_id,
+            answer=answer,
+            interval_before=interval_before,
+            interval_after=card.interval,
+            ease_factor=card.ease_factor,
+            was_in_learning_mode=was_in_learning_mode,
+            time_spent=time_spent,
+            reviewed_at=card.last_review,
+        )
+        if review_log is not None:
+            review_log.add(entry)
+        elif commit:
+            save_review_logs([entry])
         
         return {
             'card': card,
@@ -330,6 +358,41 @@ class SM2Algorithm:
         
         return new_interval
     
+    @classmethod
+    def calculate_next_intervals(
+        cls,
+        intervals: np.ndarray,
+        ease_factors: np.ndarray,
+        answer: int,
+        settings: UserTrainingSettings
+    ) -> np.ndarray:
+        """
+        Векторная версия calculate_next_interval для массивов карточек.
+        
+        Args:
+            intervals: Текущие интервалы (дни)
+            ease_factors: Ease Factor карточек
+            answer: Оценка ответа, одна на все карточки (1=Hard, 2=Good, 3=Easy)
+            settings: Настройки тренировки
+        
+        Returns:
+            np.ndarray: Интервалы в днях (int64)
+        """
+        intervals = np.asarray(intervals, dtype=np.int64)
+        if answer == 0:  # Again - возврат в режим обучения
+            return np.zeros_like(intervals)
+        
+        if answer not in (1, 2, 3):
+            raise ValueError(f"Invalid answer: {answer}")
+        
+        base_interval = np.where(intervals > 0, intervals, 1).astype(np.float64)
+        if answer in (2, 3):  # Good/Easy масштабируются через EF
+            base_interval = base_interval * np.asarray(ease_factors, dtype=np.float64)
+        
+        new_intervals = cls.apply_interval_modifiers_array(base_interval, answer, settings)
+        # Минимум +1 день от предыдущего
+        return np.maximum(intervals + 1, new_intervals)
+    
     @classmethod
     def should_enter_learning_mode(
         cls,
@@ -418,3 +481,34 @@ class SM2Algorithm:
         # Применяем модификаторы
         new_interval = int(base_interval * modifier * settings.interval_modifier)
         return max(1, new_interval)
+    
+    @classmethod
+    def apply_interval_modifiers_array(
+        cls,
+        base_intervals: np.ndarray,
+        answer: int,
+        settings: UserTrainingSettings
+    ) -> np.ndarray:
+        """
+        Векторная версия apply_interval_modifiers.
+        
+        Args:
+            base_intervals: Базовые интервалы в днях
+            answer: Оценка ответа (1=Hard, 2=Good, 3=Easy)
+            settings: Настройки тренировки
+        
+        Returns:
+            np.ndarray: Модифицированные интервалы в днях (int64)
+        """
+        if answer == 1:  # Hard
+            modifier = settings.hard_interval_modifier
+        elif answer == 2:  # Good
+            modifier = 1.0
+        elif answer == 3:  # Easy
+            modifier = settings.easy_bonus
+        else:
+            raise ValueError(f"Invalid answer for interval modifier: {answer}")
+        
+        base_intervals = np.asarray(base_intervals, dtype=np.float64)
+        new_intervals = (base_intervals * modifier * settings.interval_modifier).astype(np.int64)
+        return np.maximum(1, new_intervals)
@@ -0,0 +1,8 @@
+"""
+Background queues of the training app (run by manage.py run_workers).
+"""
+from apps.core import jobs
+from .services.etymology_service import process_queue
+
+
+jobs.register_queue('training.etymology', lambda: process_queue()['claimed'] > 0)
@@ -91,6 +91,30 @@ class TestGenerateHint:
         assert result['tokens_spent'] == 1
 
 
+    @patch('apps.training.ai_generation.get_openai_client')
+    def test_cached_hint_audio_is_not_charged(self, mock_client, user, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        add_tokens(user, 10)
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = 'A loyal companion with four legs.'
+        mock_client.return_value.chat.completions.create.return_value = mock_response
+        mock_client.return_value.audio.speech.create.return_value.content = b'fake audio'
+
+        words = [
+            Word.objects.create(user=user, original_word=w, translation='собака', language='de')
+            for w in ('Hund', 'Köter')
+        ]
+        first = generate_hint_for_word(user, words[0].id)
+        second = generate_hint_for_word(user, words[1].id)
+
+        assert first['tokens_spent'] == 2
+        # Та же подсказка озвучена из кэша: только текст
+        assert second['tokens_spent'] == 1
+        assert second['hint_audio_url'] == first['hint_audio_url']
+        assert mock_client.return_value.audio.speech.create.call_count == 1
+
+
 @pytest.mark.django_db
 class TestGenerateSentences:
     @patch('apps.training.ai_generation.get_openai_client')
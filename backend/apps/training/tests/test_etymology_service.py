@@ -0,0 +1,149 @@
+"""Tests for etymology_service.py — queued etymology generation."""
+import json
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.utils import timezone
+
+from apps.cards.token_utils import add_tokens, check_balance
+from apps.training.models import PendingEtymology
+from apps.training.services import etymology_service
+from apps.training.services.etymology_service import claim_batch, process_queue
+from apps.words.models import Word
+
+
+def _llm_response(payload):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = json.dumps(payload)
+    return response
+
+
+@pytest.mark.django_db
+class TestEnqueue:
+    def test_word_creation_only_enqueues(self, user):
+        add_tokens(user, 10)
+        with patch('apps.training.ai_generation.get_openai_client') as mock_client:
+            word = Word.objects.create(
+                user=user, original_word='Haus', translation='дом', language='de'
+            )
+        mock_client.assert_not_called()
+        assert PendingEtymology.objects.filter(word=word, user=user).exists()
+
+    def test_skip_flag_and_existing_etymology(self, user):
+        skipped = Word(user=user, original_word='Haus', translation='дом', language='de')
+        skipped._skip_etymology_generation = True
+        skipped.save()
+        Word.objects.create(
+            user=user, original_word='Katze', translation='кошка', language='de',
+            etymology='уже есть'
+        )
+        assert not PendingEtymology.objects.exists()
+
+    def test_bulk_path_enqueues_new_words(self, user):
+        from apps.words.utils import bulk_get_or_create_words
+        bulk_get_or_create_words(user, [
+            {'original_word': f'Wort{i}', 'language': 'de', 'translation': 't'} for i in range(3)
+        ])
+        assert PendingEtymology.objects.filter(user=user).count() == 3
+
+
+@pytest.mark.django_db
+class TestProcessQueue:
+    @pytest.fixture
+    def words(self, user):
+        return [
+            Word.objects.create(user=user, original_word=f'Wort{i}', translation=f't{i}', language='de')
+            for i in range(5)
+        ]
+
+    @patch('apps.training.ai_generation.get_openai_client')
+    def test_packs_words_into_calls(self, mock_client, user, words):
+        add_tokens(user, 10)
+        balance = check_balance(user)
+        create = mock_client.return_value.chat.completions.create
+        create.side_effect = lambda **kwargs: _llm_response({
+            str(word.id): f'Этимология слова {word.original_word}'
+            for word in words if f'[{word.id}]' in kwargs['messages'][1]['content']
+        })
+
+        stats = process_queue(words_per_call=3)
+
+        assert stats == {'claimed': 5, 'generated': 5, 'failed': 0, 'deferred': 0}
+        assert create.call_count == 2
+        assert not PendingEtymology.objects.exists()
+        assert Word.objects.get(id=words[4].id).etymology == 'Этимология слова Wort4'
+        assert check_balance(user) == balance - 5
+
+    @patch('apps.training.ai_generation.get_openai_client')
+    def test_no_tokens_keeps_words_queued(self, mock_client, user, words):
+        for _ in range(etymology_service.MAX_ATTEMPTS + 1):
+            PendingEtymology.objects.update(claimed_at=None)
+            stats = process_queue()
+            assert (stats['deferred'], stats['failed']) == (5, 0)
+
+        mock_client.assert_not_called()
+        assert set(PendingEtymology.objects.values_list('attempts', flat=True)) == {0}
+        # Без токенов строки ждут CLAIM_TIMEOUT, а не берутся каждый проход
+        assert claim_batch() == []
+
+    @patch('apps.training.ai_generation.get_openai_client')
+    def test_empty_answers_hit_retry_limit(self, mock_client, user, words):
+        add_tokens(user, 10)
+        mock_client.return_value.chat.completions.create.return_value = _llm_response({})
+
+        for _ in range(etymology_service.MAX_ATTEMPTS):
+            PendingEtymology.objects.update(claimed_at=None)
+            assert process_queue()['failed'] == 5
+
+        assert not PendingEtymology.objects.exists()
+        assert Word.objects.filter(etymology='').count() == 5
+
+    @patch('apps.training.ai_generation.get_openai_client')
+    def test_partial_balance_defers_the_rest(self, mock_client, user, words):
+        add_tokens(user, 2)
+        create = mock_client.return_value.chat.completions.create
+        create.side_effect = lambda **kwargs: _llm_response({
+            str(word.id): f'Этимология слова {word.original_word}'
+            for word in words if f'[{word.id}]' in kwargs['messages'][1]['content']
+        })
+
+        stats = process_queue(words_per_call=3)
+
+        assert (stats['generated'], stats['deferred'], stats['failed']) == (2, 3, 0)
+        assert PendingEtymology.objects.filter(attempts=0).count() == 3
+
+    @patch('apps.training.ai_generation.get_openai_client')
+    def test_user_typed_etymology_is_kept(self, mock_client, user, words):
+        add_tokens(user, 10)
+
+        def answer(**kwargs):
+            # Пользователь заполнил этимологию, пока шел запрос к LLM
+            Word.objects.filter(id=words[0].id).update(etymology='вручную')
+            return _llm_response({str(word.id): f'Этимология слова {word.original_word}' for word in words})
+
+        mock_client.return_value.chat.completions.create.side_effect = answer
+
+        assert process_queue()['generated'] == 4
+        assert Word.objects.get(id=words[0].id).etymology == 'вручную'
+        assert Word.objects.get(id=words[1].id).etymology == 'Этимология слова Wort1'
+
+    @patch('apps.training.ai_generation.get_openai_client')
+    def test_llm_error_retried_after_timeout(self, mock_client, user, words):
+        add_tokens(user, 10)
+        mock_client.return_value.chat.completions.create.side_effect = RuntimeError('API down')
+
+        assert process_queue()['failed'] == 5
+        # Повторно не берётся, пока не истёк CLAIM_TIMEOUT
+        assert claim_batch() == []
+        later = timezone.now() + etymology_service.CLAIM_TIMEOUT + timedelta(seconds=1)
+        assert len(claim_batch(now=later)) == 5
+
+    def test_deleted_or_filled_words_leave_queue(self, user, words):
+        words[0].delete()
+        Word.objects.filter(id=words[1].id).update(etymology='вручную')
+        PendingEtymology.objects.exclude(word_id=words[1].id).delete()
+
+        assert process_queue() == {'claimed': 1, 'generated': 0, 'failed': 0, 'deferred': 0}
+        assert not PendingEtymology.objects.exists()
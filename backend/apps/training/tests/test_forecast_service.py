@@ -0,0 +1,105 @@
+"""Tests for forecast_service.py — vectorized review workload projection."""
+import pytest
+import numpy as np
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework import status
+
+from apps.cards.models import Card
+from apps.words.models import Word
+from apps.training.models import UserTrainingSettings
+from apps.training.services.forecast_service import (
+    project_due_counts,
+    get_review_forecast,
+)
+
+
+@pytest.fixture
+def training_settings(user):
+    settings, _ = UserTrainingSettings.objects.get_or_create(
+        user=user, defaults={'age_group': 'adult'}
+    )
+    return settings
+
+
+def _create_card(user, original, **kwargs):
+    w = Word.objects.create(
+        user=user, original_word=original, translation='перевод', language='de')
+    card = Card.objects.get(user=user, word=w, card_type='normal')
+    for key, value in kwargs.items():
+        setattr(card, key, value)
+    card.save()
+    return card
+
+
+class TestProjectDueCounts:
+    def test_review_card_rescheduled_with_good(self):
+        settings = UserTrainingSettings(interval_modifier=1.0, good_ef_delta=0.0)
+        counts = project_due_counts([0], [10], [2.5], [False], settings, 30)
+
+        # 10 * 2.5 = 25 days, the next review (25 * 2.5) falls outside the horizon
+        assert counts[0] == 1
+        assert counts[25] == 1
+        assert counts.sum() == 2
+
+    def test_learning_card_graduates(self):
+        settings = UserTrainingSettings(graduating_interval=1, good_ef_delta=0.0)
+        counts = project_due_counts([0], [0], [2.5], [True], settings, 30)
+
+        # graduate → 1 day, then max(2, 1 * 2.5) = 2, then 5, then 12
+        assert list(np.flatnonzero(counts)) == [0, 1, 3, 8, 20]
+
+    def test_cards_outside_horizon_ignored(self):
+        settings = UserTrainingSettings()
+        counts = project_due_counts([45], [30], [2.5], [False], settings, 30)
+        assert counts.sum() == 0
+        assert len(counts) == 30
+
+    def test_interval_modifier_spreads_reviews(self):
+        fast = UserTrainingSettings(interval_modifier=0.5)
+        slow = UserTrainingSettings(interval_modifier=1.5)
+        args = ([0] * 3, [4, 6, 8], [2.5] * 3, [False] * 3)
+
+        assert project_due_counts(*args, fast, 90).sum() > project_due_counts(*args, slow, 90).sum()
+
+
+@pytest.mark.django_db
+class TestGetReviewForecast:
+    def test_empty_user(self, user, training_settings):
+        result = get_review_forecast(user, 30)
+        assert result['total'] == 0
+        assert len(result['forecast']) == 30
+        assert result['forecast'][0]['date'] == timezone.localdate()
+
+    def test_counts_overdue_and_new(self, user, training_settings):
+        now = timezone.now()
+        _create_card(user, 'Hund', is_in_learning_mode=False, interval=10,
+                     next_review=now - timedelta(days=3))
+        _create_card(user, 'Katze', is_in_learning_mode=False, interval=10,
+                     next_review=now + timedelta(days=5))
+        _create_card(user, 'Maus')  # never shown: next_review is NULL
+
+        result = get_review_forecast(user, 30)
+        assert result['overdue'] == 1
+        assert result['new_cards'] == 1
+        assert result['forecast'][0]['due'] >= 1
+        assert result['total'] >= 2
+
+
+@pytest.mark.django_db
+class TestForecastAPI:
+    def test_default_horizon(self, authenticated_client, training_settings):
+        response = authenticated_client.get('/api/training/forecast/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['days'] == 30
+        assert len(response.data['forecast']) == 30
+
+    def test_custom_horizon(self, authenticated_client, training_settings):
+        response = authenticated_client.get('/api/training/forecast/?days=90')
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['forecast']) == 90
+
+    @pytest.mark.parametrize('days', ['10', '400', 'abc'])
+    def test_invalid_horizon(self, authenticated_client, training_settings, days):
+        response = authenticated_client.get(f'/api/training/forecast/?days={days}')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,108 @@
+"""Tests for notification_service.py — precomputed notification counters."""
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.cards.models import Card
+from apps.words.models import Word
+from apps.training.models import NotificationSettings, UserTrainingSettings
+from apps.training.services.notification_service import (
+    refresh_counters,
+    sweep_stale_counters,
+)
+from apps.training.services.session_service import process_answer, process_answers_batch
+from apps.training.services.stats_service import check_notification
+
+
+def _due_card(user, original, **kwargs):
+    w = Word.objects.create(
+        user=user, original_word=original, translation='перевод', language='de')
+    Card.objects.filter(word=w).update(
+        is_in_learning_mode=False, interval=5, repetitions=3,
+        next_review=timezone.now() - timedelta(hours=1), **kwargs,
+    )
+    return Card.objects.get(word=w, card_type='normal')
+
+
+@pytest.fixture
+def notification_settings(user):
+    UserTrainingSettings.objects.get_or_create(user=user, defaults={'age_group': 'adult'})
+    obj, _ = NotificationSettings.objects.get_or_create(user=user)
+    return obj
+
+
+@pytest.mark.django_db
+class TestNotificationCounters:
+    def test_check_reads_one_row_when_fresh(
+            self, user, notification_settings, django_assert_num_queries):
+        _due_card(user, 'Hund')
+        _due_card(user, 'Katze')
+        assert check_notification(user)['cards_due'] == 2
+
+        with django_assert_num_queries(1):
+            result = check_notification(user)
+        assert result['cards_due'] == 2
+        assert result['streak_at_risk'] is True
+
+    def test_answer_updates_counters_in_place(self, user, notification_settings):
+        card = _due_card(user, 'Hund')
+        _due_card(user, 'Katze')
+        check_notification(user)
+
+        process_answer(user, card.id, answer=2)
+
+        obj = NotificationSettings.objects.get(user=user)
+        assert obj.counters_are_fresh()
+        assert obj.cards_due == 1
+        assert obj.today_reviews == 1
+        assert check_notification(user)['streak_at_risk'] is False
+
+    def test_batch_answers_update_counters(self, user, notification_settings):
+        card = _due_card(user, 'Hund')
+        check_notification(user)
+
+        process_answers_batch(user, [
+            {'card_id': card.id, 'answer': 2},
+            {'card_id': card.id, 'answer': 3},
+        ])
+
+        obj = NotificationSettings.objects.get(user=user)
+        assert obj.cards_due == 0
+        assert obj.today_reviews == 2
+        card.refresh_from_db()
+        assert obj.next_due_at == card.next_review
+
+    def test_card_delete_marks_stale(self, user, notification_settings):
+        card = _due_card(user, 'Hund')
+        check_notification(user)
+
+        card.delete()
+
+        assert NotificationSettings.objects.get(user=user).counters_updated_at is None
+        assert check_notification(user)['cards_due'] == 0
+
+    def test_card_coming_due_triggers_recount(self, user, notification_settings):
+        card = _due_card(user, 'Hund')
+        Card.objects.filter(id=card.id).update(next_review=timezone.now() + timedelta(minutes=5))
+        obj = NotificationSettings.objects.get(user=user)
+        refresh_counters([obj])
+        assert obj.cards_due == 0
+
+        later = timezone.now() + timedelta(minutes=10)
+        assert not obj.counters_are_fresh(later)
+        refresh_counters([obj], now=later)
+        assert obj.cards_due == 1
+
+    def test_sweep_refreshes_only_stale(self, user, user2, notification_settings):
+        _due_card(user, 'Hund')
+        other, _ = NotificationSettings.objects.get_or_create(user=user2)
+        refresh_counters([other])
+
+        assert sweep_stale_counters() == 1
+        assert NotificationSettings.objects.get(user=user).cards_due == 1
+
+        out = StringIO()
+        call_command('refresh_notification_counters', '--all', stdout=out)
+        assert 'refreshed: 2' in out.getvalue()
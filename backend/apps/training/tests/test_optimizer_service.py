@@ -0,0 +1,129 @@
+"""Tests for optimizer_service.py — fitting SM-2 parameters to review history."""
+import pytest
+import numpy as np
+from io import StringIO
+from django.core.management import call_command
+
+from apps.cards.models import Card
+from apps.training.models import UserTrainingSettings, ReviewLog
+from apps.training.services.optimizer_service import (
+    fit_parameters,
+    optimize_parameters,
+)
+
+
+def _history(user_id, answers, learning=None, card_ids=None):
+    n = len(answers)
+    return {
+        'user_id': np.full(n, user_id, dtype=np.int64),
+        'card_id': np.asarray(card_ids if card_ids is not None else range(n), dtype=np.int64),
+        'answer': np.asarray(answers, dtype=np.int64),
+        'learning': np.asarray(learning if learning is not None else [False] * n, dtype=bool),
+        'ease_factor': np.full(n, 2.5),
+    }
+
+
+def _settings(**kwargs):
+    defaults = {'interval_modifier': 1.0, 'target_retention': 0.9, 'learning_steps': [2, 10]}
+    defaults.update(kwargs)
+    return UserTrainingSettings(**defaults)
+
+
+class TestFitParameters:
+    def test_low_retention_shortens_intervals(self):
+        history = _history(1, [0] * 100 + [2] * 100)  # 50% retention
+        fitted = fit_parameters(history, {1: _settings()}, min_reviews=100)
+        assert fitted[1]['interval_modifier'] < 1.0
+
+    def test_high_retention_lengthens_intervals(self):
+        history = _history(1, [2] * 200)
+        fitted = fit_parameters(history, {1: _settings()}, min_reviews=100)
+        assert fitted[1]['interval_modifier'] > 1.0
+
+    def test_on_target_keeps_modifier(self):
+        history = _history(1, [0] * 20 + [2] * 180)  # exactly 90%
+        fitted = fit_parameters(history, {1: _settings()}, min_reviews=100)
+        assert fitted[1]['interval_modifier'] == pytest.approx(1.0, abs=0.01)
+
+    def test_too_few_reviews_skipped(self):
+        history = _history(1, [2] * 50)
+        assert fit_parameters(history, {1: _settings()}, min_reviews=100) == {}
+
+    def test_users_fitted_independently(self):
+        a = _history(1, [2] * 200)
+        b = _history(2, [0] * 100 + [2] * 100, card_ids=range(1000, 1200))
+        history = {key: np.concatenate([a[key], b[key]]) for key in a}
+        fitted = fit_parameters(history, {1: _settings(), 2: _settings()}, min_reviews=100)
+        assert fitted[1]['interval_modifier'] > 1.0 > fitted[2]['interval_modifier']
+
+    def test_failed_reviews_after_hard_lower_hard_delta(self):
+        # Каждая карточка: Hard, затем провал на следующем повторе
+        answers = [1, 0] * 100
+        card_ids = np.repeat(np.arange(100), 2)
+        history = _history(1, answers, card_ids=card_ids)
+        fitted = fit_parameters(history, {1: _settings(hard_ef_delta=-0.15)}, min_reviews=100)
+        assert fitted[1]['hard_ef_delta'] < -0.15
+
+    def test_learning_failures_shorten_steps(self):
+        answers = [2] * 180 + [0] * 20 + [0] * 60
+        learning = [False] * 200 + [True] * 60
+        history = _history(1, answers, learning=learning)
+        fitted = fit_parameters(history, {1: _settings()}, min_reviews=100)
+        steps = fitted[1]['learning_steps']
+        assert steps[0] < 2 or steps[1] < 10
+        assert steps == sorted(set(steps))
+
+
+@pytest.fixture
+def normal_card(user, word):
+    """Карточка, созданная сигналом для слова."""
+    return Card.objects.get(word=word, card_type='normal')
+
+
+@pytest.mark.django_db
+class TestOptimizeParameters:
+    def _log_reviews(self, user, card, answers):
+        ReviewLog.objects.bulk_create([
+            ReviewLog(card=card, user=user, answer=a, ease_factor=2.5) for a in answers
+        ])
+
+    def test_writes_fitted_values(self, user, normal_card):
+        self._log_reviews(user, normal_card, [2] * 150)
+
+        fitted = optimize_parameters(user_ids=[user.id], min_reviews=100)
+
+        settings = UserTrainingSettings.objects.get(user=user)
+        assert settings.interval_modifier == fitted[user.id]['interval_modifier'] > 1.0
+        assert settings.parameters_fitted_at is not None
+
+    def test_second_run_on_same_history_changes_nothing(self, user, normal_card):
+        self._log_reviews(user, normal_card, [2] * 150)
+        optimize_parameters(user_ids=[user.id], min_reviews=100)
+        first = UserTrainingSettings.objects.get(user=user)
+
+        fitted = optimize_parameters(user_ids=[user.id], min_reviews=100)
+
+        second = UserTrainingSettings.objects.get(user=user)
+        assert fitted == {}
+        assert (second.interval_modifier, second.hard_ef_delta, second.easy_ef_delta,
+                second.learning_steps) == (first.interval_modifier, first.hard_ef_delta,
+                                           first.easy_ef_delta, first.learning_steps)
+
+    def test_dry_run_does_not_write(self, user, normal_card):
+        self._log_reviews(user, normal_card, [2] * 150)
+        before = UserTrainingSettings.objects.get(user=user).interval_modifier
+
+        optimize_parameters(user_ids=[user.id], min_reviews=100, apply=False)
+
+        settings = UserTrainingSettings.objects.get(user=user)
+        assert settings.interval_modifier == before
+        assert settings.parameters_fitted_at is None
+
+    def test_command(self, user, normal_card):
+        self._log_reviews(user, normal_card, [0] * 80 + [2] * 80)
+        out = StringIO()
+
+        call_command('optimize_sm2_parameters', '--apply', stdout=out)
+
+        assert 'Users fitted: 1' in out.getvalue()
+        assert UserTrainingSettings.objects.get(user=user).interval_modifier < 1.0
@@ -4,13 +4,15 @@ from datetime import timedelta
 from django.utils import timezone
 
 from apps.cards.models import Card, Deck
-from apps.words.models import Word
-from apps.training.models import UserTrainingSettings
+from apps.words.models import Category, Word
+from apps.training.models import UserTrainingSettings, ReviewLog, TrainingSession
 from apps.training.services.session_service import (
     _resolve_word_fields,
     get_or_create_settings,
     build_training_session,
+    get_session_next_cards,
     process_answer,
+    process_answers_batch,
     enter_learning_mode,
     exit_learning_mode,
 )
@@ -106,6 +108,20 @@ class TestBuildTrainingSession:
         result = build_training_session(user, duration=5)
         assert 'estimated_time' in result
 
+    def test_category_filter_include_descendants(self, user, training_settings):
+        root = Category.objects.create(user=user, name='Food')
+        child = Category.objects.create(user=user, name='Fruit', parent=root)
+        w = Word.objects.create(
+            user=user, original_word='Apfel', translation='яблоко', language='de')
+        child.words.add(w)
+
+        result = build_training_session(user, category_id=root.id)
+        assert result['total_count'] == 0
+
+        result = build_training_session(
+            user, category_id=root.id, include_descendants=True)
+        assert result['total_count'] == 1
+
 
 @pytest.mark.django_db
 class TestProcessAnswer:
@@ -129,6 +145,113 @@ class TestProcessAnswer:
         assert result['card_id'] == review_card.id
 
 
+@pytest.mark.django_db
+class TestProcessAnswersBatch:
+    def test_same_card_answered_twice(self, user, review_card, training_settings):
+        result = process_answers_batch(user, [
+            {'card_id': review_card.id, 'answer': 2},
+            {'card_id': review_card.id, 'answer': 2},
+        ])
+        review_card.refresh_from_db()
+
+        assert result['processed'] == 2
+        # Two Good answers move the card from step 0 through step 1 to graduation
+        assert result['results'][1]['exited_learning_mode'] is True
+        assert review_card.is_in_learning_mode is False
+        assert ReviewLog.objects.filter(card=review_card).count() == 2
+
+    def test_matches_single_answer_processing(self, user, review_card, training_settings):
+        process_answers_batch(user, [{'card_id': review_card.id, 'answer': 3}])
+        review_card.refresh_from_db()
+
+        assert review_card.interval == training_settings.easy_interval
+        training_settings.refresh_from_db()
+        assert training_settings.total_reviews == 1
+
+    def test_nonexistent_card_raises(self, user, review_card, training_settings):
+        with pytest.raises(Card.DoesNotExist):
+            process_answers_batch(user, [
+                {'card_id': review_card.id, 'answer': 2},
+                {'card_id': 99999, 'answer': 2},
+            ])
+        assert ReviewLog.objects.count() == 0
+
+
+@pytest.mark.django_db
+class TestTrainingSessionQueue:
+    @pytest.fixture(autouse=True)
+    def include_orphans(self, training_settings):
+        training_settings.include_orphan_words = True
+        training_settings.save()
+
+    def test_session_is_stored(self, user, review_card, training_settings):
+        result = build_training_session(user)
+        session = TrainingSession.objects.get(id=result['session_id'])
+        assert session.queue == [review_card.id]
+        assert session.payloads[str(review_card.id)]['id'] == review_card.id
+
+    def test_learning_card_is_requeued_by_next_review(self, user, review_card, training_settings):
+        session_id = build_training_session(user)['session_id']
+
+        process_answer(user, review_card.id, answer=0, session_id=session_id)
+
+        review_card.refresh_from_db()
+        session = TrainingSession.objects.get(id=session_id)
+        assert session.queue == []
+        assert session.requeue == [[review_card.next_review.timestamp(), review_card.id]]
+        assert session.answered_count == 1
+
+        now_result = get_session_next_cards(user, session_id, limit=10)
+        assert now_result['cards'] == []
+        assert now_result['remaining_count'] == 1
+        assert now_result['next_due_at'] == review_card.next_review
+
+        later = session.next_cards(10, now=review_card.next_review)
+        assert [card['id'] for card in later] == [review_card.id]
+
+    def test_graduated_card_leaves_session(self, user, review_card, training_settings):
+        session_id = build_training_session(user)['session_id']
+
+        process_answer(user, review_card.id, answer=3, session_id=session_id)
+
+        session = TrainingSession.objects.get(id=session_id)
+        assert session.remaining_count == 0
+        assert session.payloads == {}
+
+    def test_batch_answers_update_session(self, user, review_card, training_settings):
+        session_id = build_training_session(user)['session_id']
+
+        process_answers_batch(user, [{'card_id': review_card.id, 'answer': 0}], session_id=session_id)
+
+        review_card.refresh_from_db()
+        session = TrainingSession.objects.get(id=session_id)
+        assert session.queue == []
+        assert session.requeue == [[review_card.next_review.timestamp(), review_card.id]]
+        assert session.payloads[str(review_card.id)]['id'] == review_card.id
+        assert session.answered_count == 1
+
+    def test_batch_graduated_card_leaves_session(self, user, review_card, training_settings):
+        session_id = build_training_session(user)['session_id']
+
+        process_answers_batch(user, [
+            {'card_id': review_card.id, 'answer': 0},
+            {'card_id': review_card.id, 'answer': 3},
+        ], session_id=session_id)
+
+        session = TrainingSession.objects.get(id=session_id)
+        assert session.remaining_count == 0
+        assert session.answered_count == 2
+        assert get_session_next_cards(user, session_id, limit=10)['cards'] == []
+
+    def test_expired_session_raises(self, user, training_settings):
+        session_id = build_training_session(user)['session_id']
+        TrainingSession.objects.filter(id=session_id).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        with pytest.raises(TrainingSession.DoesNotExist):
+            get_session_next_cards(user, session_id, limit=10)
+
+
 @pytest.mark.django_db
 class TestEnterExitLearningMode:
     def test_enter_learning(self, user, training_settings):
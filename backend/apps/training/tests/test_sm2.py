@@ -12,7 +12,8 @@ from django.utils import timezone
 
 from apps.cards.models import Card, Deck
 from apps.words.models import Word
-from apps.training.models import UserTrainingSettings
+from apps.training.models import UserTrainingSettings, ReviewLog, UserDailyActivity
+from apps.training.review_log import ReviewLogBuffer
 from apps.training.sm2 import SM2Algorithm
 from apps.core.constants import MAX_EASE_FACTOR
 
@@ -483,3 +484,87 @@ class TestSM2LearningStepEdgeCases:
 
         assert new_card.is_in_learning_mode is True
         assert result['exited_learning_mode'] is False
+
+
+@pytest.mark.django_db
+class TestSM2ReviewLog:
+    """Tests for ReviewLog entries written by process_answer."""
+
+    def test_answer_writes_log_entry(self, learned_card, training_settings):
+        SM2Algorithm.process_answer(learned_card, 2, training_settings, time_spent=4.5)
+
+        log = ReviewLog.objects.get(card=learned_card)
+        assert log.user_id == learned_card.user_id
+        assert log.answer == 2
+        assert log.interval_before == 10
+        assert log.interval_after == learned_card.interval
+        assert log.ease_factor == learned_card.ease_factor
+        assert log.was_in_learning_mode is False
+        assert log.time_spent == 4.5
+        assert log.successful is True
+
+    def test_buffer_defers_insert_until_flush(self, new_card, learned_card, training_settings):
+        with ReviewLogBuffer() as review_log:
+            SM2Algorithm.process_answer(new_card, 0, training_settings, review_log=review_log)
+            SM2Algorithm.process_answer(learned_card, 3, training_settings, review_log=review_log)
+            assert len(review_log) == 2
+            assert ReviewLog.objects.count() == 0
+
+        assert ReviewLog.objects.count() == 2
+        assert ReviewLog.objects.get(card=new_card).was_in_learning_mode is True
+
+    def test_buffer_flushes_when_full(self, new_card, training_settings):
+        review_log = ReviewLogBuffer(batch_size=2)
+        SM2Algorithm.process_answer(new_card, 2, training_settings, review_log=review_log)
+        assert ReviewLog.objects.count() == 0
+        SM2Algorithm.process_answer(new_card, 2, training_settings, review_log=review_log)
+        assert ReviewLog.objects.count() == 2
+        assert len(review_log) == 0
+
+    def test_answers_update_daily_activity(self, new_card, learned_card, training_settings):
+        SM2Algorithm.process_answer(learned_card, 2, training_settings, time_spent=4.0)
+        with ReviewLogBuffer() as review_log:
+            SM2Algorithm.process_answer(new_card, 0, training_settings, review_log=review_log)
+            SM2Algorithm.process_answer(new_card, 3, training_settings,
+                                        time_spent=2.0, review_log=review_log)
+
+        day = UserDailyActivity.objects.get(user_id=new_card.user_id)
+        assert day.date == timezone.localdate()
+        assert day.reviews == 3
+        assert day.successes == 2
+        assert day.timed_reviews == 2
+        assert day.time_spent == 6.0
+
+
+@pytest.mark.django_db
+class TestSM2VectorizedIntervals:
+    """calculate_next_intervals must match calculate_next_interval card by card."""
+
+    @pytest.mark.parametrize('answer', [1, 2, 3])
+    def test_matches_scalar_version(self, new_card, training_settings, answer):
+        training_settings.interval_modifier = 0.93
+        intervals = [0, 1, 3, 10, 45, 200]
+        ease_factors = [1.3, 2.5, 2.1, 2.77, 3.4, 1.9]
+
+        vectorized = SM2Algorithm.calculate_next_intervals(
+            intervals, ease_factors, answer, training_settings
+        )
+
+        for i, (interval, ef) in enumerate(zip(intervals, ease_factors)):
+            new_card.interval = interval
+            new_card.ease_factor = ef
+            expected = SM2Algorithm.calculate_next_interval(new_card, answer, training_settings)
+            assert vectorized[i] == expected
+
+    def test_again_returns_zeros(self, training_settings):
+        result = SM2Algorithm.calculate_next_intervals([5, 10], [2.5, 2.5], 0, training_settings)
+        assert list(result) == [0, 0]
+
+    def test_modifiers_array_matches_scalar(self, training_settings):
+        for answer in (1, 2, 3):
+            result = SM2Algorithm.apply_interval_modifiers_array([1, 7, 30], answer, training_settings)
+            expected = [
+                SM2Algorithm.apply_interval_modifiers(b, answer, training_settings)
+                for b in (1, 7, 30)
+            ]
+            assert list(result) == expected
@@ -1,13 +1,17 @@
 """Tests for stats_service.py — streak, card counts, dashboard, forgetting curve."""
 import pytest
 from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
 from django.utils import timezone
 
 from apps.cards.models import Card, Deck
 from apps.words.models import Word, Category
-from apps.training.models import UserTrainingSettings
+from apps.training.models import UserTrainingSettings, ReviewLog, UserDailyActivity
+from apps.training.review_log import save_review_logs
 from apps.training.services.stats_service import (
     calculate_streak_days,
+    get_activity_heatmap,
     get_cards_by_status,
     get_card_counts_for_queryset,
     get_training_stats,
@@ -44,40 +48,86 @@ def _create_card(user, original, translation='перевод', **kwargs):
     return card
 
 
+def _activity(user, days_ago, reviews=1, successes=1):
+    return UserDailyActivity.objects.create(
+        user=user, date=timezone.localdate() - timedelta(days=days_ago),
+        reviews=reviews, successes=successes,
+    )
+
+
 @pytest.mark.django_db
 class TestCalculateStreakDays:
     def test_no_reviews_returns_zero(self, user):
         assert calculate_streak_days(user) == 0
 
     def test_today_review_returns_one(self, user):
-        card = _create_card(user, 'Hund')
-        card.last_review = timezone.now()
-        card.save()
+        _activity(user, 0)
         assert calculate_streak_days(user) == 1
 
     def test_two_consecutive_days(self, user):
+        _activity(user, 0)
+        _activity(user, 1)
+        assert calculate_streak_days(user) == 2
+
+    def test_gap_breaks_streak(self, user):
+        _activity(user, 0)
+        _activity(user, 3)  # gap
+        assert calculate_streak_days(user) == 1
+
+    def test_streak_from_review_log(self, user):
         now = timezone.now()
-        c1 = _create_card(user, 'Hund')
-        c1.last_review = now
-        c1.save()
+        card = _create_card(user, 'Hund')
+        save_review_logs([
+            ReviewLog(card=card, user=user, answer=2, ease_factor=2.5,
+                      reviewed_at=now - timedelta(days=days))
+            for days in (0, 1, 2)
+        ])
+        # last_review only keeps the latest answer; the log keeps all three days
+        assert calculate_streak_days(user) == 3
 
-        c2 = _create_card(user, 'Katze')
-        c2.last_review = now - timedelta(days=1)
-        c2.save()
 
-        assert calculate_streak_days(user) == 2
+@pytest.mark.django_db
+class TestGetActivityHeatmap:
+    def test_returns_days_in_range(self, user):
+        _activity(user, 0, reviews=4, successes=3)
+        _activity(user, 10, reviews=2, successes=2)
+        _activity(user, 400, reviews=9, successes=9)  # вне года
 
-    def test_gap_breaks_streak(self, user):
+        result = get_activity_heatmap(user)
+
+        assert result['end_date'] == timezone.localdate()
+        assert result['active_days'] == 2
+        assert result['total_reviews'] == 6
+        assert result['days'][-1] == {
+            'date': timezone.localdate(), 'reviews': 4, 'successes': 3,
+        }
+
+
+@pytest.mark.django_db
+class TestBackfillDailyActivity:
+    def test_rebuilds_rollup_from_log(self, user):
         now = timezone.now()
-        c1 = _create_card(user, 'Hund')
-        c1.last_review = now
-        c1.save()
+        card = _create_card(user, 'Hund')
+        ReviewLog.objects.bulk_create([
+            ReviewLog(card=card, user=user, answer=answer, ease_factor=2.5,
+                      time_spent=3, reviewed_at=now - timedelta(days=days))
+            for days, answer in ((0, 2), (0, 0), (2, 3))
+        ])
+        _activity(user, 5)  # устаревшая строка без записей в журнале
 
-        c2 = _create_card(user, 'Katze')
-        c2.last_review = now - timedelta(days=3)  # gap
-        c2.save()
+        call_command('backfill_daily_activity', '--apply', stdout=StringIO())
 
-        assert calculate_streak_days(user) == 1
+        rows = {a.date: a for a in UserDailyActivity.objects.filter(user=user)}
+        today = timezone.localdate()
+        assert set(rows) == {today, today - timedelta(days=2)}
+        assert rows[today].reviews == 2
+        assert rows[today].successes == 1
+        assert rows[today].time_spent == 6
+
+    def test_dry_run_changes_nothing(self, user):
+        _activity(user, 0)
+        call_command('backfill_daily_activity', stdout=StringIO())
+        assert UserDailyActivity.objects.filter(user=user).count() == 1
 
 
 @pytest.mark.django_db
@@ -153,6 +203,30 @@ class TestGetTrainingStats:
         result = get_training_stats(user, 'day')
         assert result['period'] == 'day'
 
+    def test_reviews_by_day_from_review_log(self, user, training_settings):
+        now = timezone.now()
+        card = _create_card(user, 'Hund')
+        save_review_logs([
+            ReviewLog(card=card, user=user, answer=0, ease_factor=2.3,
+                      time_spent=6, reviewed_at=now),
+            ReviewLog(card=card, user=user, answer=2, ease_factor=2.3,
+                      time_spent=4, reviewed_at=now),
+            ReviewLog(card=card, user=user, answer=3, ease_factor=2.45,
+                      reviewed_at=now - timedelta(days=20)),
+        ])
+
+        result = get_training_stats(user, 'week')
+        assert len(result['reviews_by_day']) == 1
+        day = result['reviews_by_day'][0]
+        assert day['total'] == 2
+        assert day['successful'] == 1
+        assert day['success_rate'] == 0.5
+        assert result['total_time_spent'] == 10
+        assert result['average_time_per_card'] == 5.0
+
+        result = get_training_stats(user, 'all')
+        assert sum(d['total'] for d in result['reviews_by_day']) == 3
+
 
 @pytest.mark.django_db
 class TestGetDashboardData:
@@ -173,6 +247,61 @@ class TestGetDashboardData:
         assert len(result['decks']) == 1
         assert result['decks'][0]['name'] == deck.name
 
+    def test_grouped_counts_match_per_queryset_counts(self, user, training_settings):
+        now = timezone.now()
+        deck_a = Deck.objects.create(user=user, name='A')
+        deck_b = Deck.objects.create(user=user, name='B')
+        category = Category.objects.create(user=user, name='Дом')
+        new_card = _create_card(user, 'Haus')
+        review_card = _create_card(
+            user, 'Auto', is_in_learning_mode=False, interval=5, repetitions=3,
+            next_review=now - timedelta(days=1))
+        mastered_card = _create_card(
+            user, 'Baum', is_in_learning_mode=False, interval=40, repetitions=6,
+            next_review=now + timedelta(days=10))
+        deck_a.words.add(new_card.word, review_card.word)
+        deck_b.words.add(review_card.word, mastered_card.word)
+        category.words.add(new_card.word, mastered_card.word)
+        _create_card(user, 'Katze')  # сирота
+
+        result = get_dashboard_data(user)
+
+        all_cards = Card.objects.for_user(user)
+        decks = {d['id']: d['cards'] for d in result['decks']}
+        for deck in (deck_a, deck_b):
+            assert decks[deck.id] == get_card_counts_for_queryset(all_cards.filter(word__decks=deck))
+        assert result['categories'][0]['cards'] == get_card_counts_for_queryset(
+            all_cards.filter(word__categories=category))
+        assert result['orphans']['cards']['total'] == 1
+        assert result['quick_stats']['total_due'] == 3
+
+    def test_query_count_does_not_grow_with_decks(
+            self, user, training_settings, django_assert_max_num_queries):
+        for i in range(5):
+            deck = Deck.objects.create(user=user, name=f'Deck {i}')
+            deck.words.add(_create_card(user, f'Wort{i}').word)
+            category = Category.objects.create(user=user, name=f'Cat {i}')
+            category.words.add(deck.words.first())
+
+        with django_assert_max_num_queries(10):
+            result = get_dashboard_data(user)
+
+        assert len(result['decks']) == 5
+        assert all(d['cards']['total'] == 1 for d in result['decks'])
+        assert all(c['cards']['new'] == 1 for c in result['categories'])
+
+    def test_cached_until_user_data_changes(
+            self, user, training_settings, django_assert_num_queries,
+            django_capture_on_commit_callbacks):
+        get_dashboard_data(user)
+
+        with django_assert_num_queries(0):
+            assert get_dashboard_data(user)['decks'] == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Deck.objects.create(user=user, name='Neu')
+        assert len(get_dashboard_data(user)['decks']) == 1
+
 
 @pytest.mark.django_db
 class TestActivateDeactivate:
@@ -233,6 +362,35 @@ class TestForgettingCurve:
         assert len(result['theoretical_curve']) > 0
         assert result['summary']['total_reviews'] == 1
 
+    def test_buckets_in_one_query(self, user, django_assert_num_queries):
+        for word, interval, lapses in (('Hund', 1, 0), ('Katze', 5, 0), ('Maus', 6, 2)):
+            _create_card(user, word, is_in_learning_mode=False, interval=interval,
+                         repetitions=2, consecutive_lapses=lapses)
+
+        with django_assert_num_queries(1):
+            result = get_forgetting_curve_data(user)
+
+        points = {p['label']: p for p in result['points']}
+        assert set(points) == {'1', '4-7'}
+        assert points['4-7']['total_cards'] == 2
+        assert points['4-7']['successful'] == 1
+        assert result['summary']['current_stability'] == 3.0
+
+    def test_cached_until_card_changes(self, user, django_assert_num_queries,
+                                       django_capture_on_commit_callbacks):
+        card = _create_card(user, 'Hund', is_in_learning_mode=False,
+                            interval=5, repetitions=3)
+        get_forgetting_curve_data(user)
+
+        with django_assert_num_queries(0):
+            assert get_forgetting_curve_data(user)['summary']['total_reviews'] == 1
+
+        card.interval = 40
+        with django_capture_on_commit_callbacks(execute=True):
+            card.save()
+        result = get_forgetting_curve_data(user)
+        assert [p['label'] for p in result['points']] == ['31-60']
+
 
 @pytest.mark.django_db
 class TestCheckNotification:
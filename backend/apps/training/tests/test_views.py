@@ -1256,37 +1256,59 @@ class TestSessionUtils:
         # Ожидаемое время: 5*1.5 + 10*0.25 + 2*0.5 = 7.5 + 2.5 + 1.0 = 11 минут
         assert time == 11
     
-    def test_limit_cards_by_time(self):
-        """Тест ограничения карточек по времени"""
-        from apps.training.session_utils import limit_cards_by_time
-        from apps.cards.models import Card
+    def test_build_card_queue_limits_new_cards_in_sql(self):
+        """Новые карточки выбираются с LIMIT по бюджету времени"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from apps.training.session_utils import build_card_queue
         
-        # Создаем карточки
-        learning_cards = [
-            Card.objects.create(
+        self.settings.include_orphan_words = True
+        self.settings.save()
+        for i in range(10):
+            word = Word.objects.create(
                 user=self.user,
-                word=self.word1,
-                card_type='normal',
-                is_in_learning_mode=True
+                original_word=f'Wort{i}',
+                translation=f'слово{i}',
+                language='de'
             )
-        ]
-        review_cards = [
-            Card.objects.create(
+            Card.objects.filter(word=word).update(
+                is_in_learning_mode=True, next_review=None
+            )
+        
+        with CaptureQueriesContext(connection) as ctx:
+            queue = build_card_queue(
                 user=self.user,
-                word=self.word2,
-                card_type='normal',
-                is_in_learning_mode=False
+                duration_minutes=2,
+                settings=self.settings
             )
-        ]
         
-        limited = limit_cards_by_time(
-            learning_cards=learning_cards,
-            review_cards=review_cards,
-            new_cards=[],
-            duration_minutes=5
+        # 2 минуты / 0.5 минуты на новую карточку = 4 карточки
+        assert queue['new_count'] == 4
+        assert queue['total_count'] == 4
+        assert any('LIMIT 4' in q['sql'] for q in ctx.captured_queries)
+        assert not any('DISTINCT' in q['sql'] for q in ctx.captured_queries)
+    
+    def test_build_card_queue_no_duplicates_from_multiple_links(self):
+        """Слово в нескольких активных колодах и категориях попадает в очередь один раз"""
+        from apps.training.session_utils import build_card_queue
+        
+        card = Card.objects.create(
+            user=self.user,
+            word=self.word1,
+            card_type='normal',
+            is_in_learning_mode=False,
+            next_review=timezone.now() - timedelta(hours=1)
         )
+        for name in ('Deck 1', 'Deck 2'):
+            deck = Deck.objects.create(user=self.user, name=name, is_learning_active=True)
+            deck.words.add(self.word1)
+        category = Category.objects.create(user=self.user, name='Дом', is_learning_active=True)
+        self.word1.categories.add(category)
         
-        assert len(limited) <= len(learning_cards) + len(review_cards)
+        queue = build_card_queue(user=self.user, settings=self.settings)
+        
+        assert [c.id for c in queue['cards']] == [card.id]
+        assert queue['review_count'] == 1
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -1417,6 +1439,32 @@ class TestTrainingSessionAPI:
         
         assert response.status_code == status.HTTP_200_OK
         assert response.data['total_count'] == 0
+    
+    def test_session_next_cards(self):
+        """Тест GET /api/training/session/<id>/next/"""
+        session_id = self.client.get('/api/training/session/').data['session_id']
+        
+        response = self.client.get(f'/api/training/session/{session_id}/next/?limit=5')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['cards'] == []
+        assert response.data['remaining_count'] == 0
+    
+    def test_session_next_cards_unknown_session(self):
+        """Тест несуществующей сессии"""
+        response = self.client.get(
+            '/api/training/session/00000000-0000-0000-0000-000000000000/next/'
+        )
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_session_next_cards_invalid_limit(self):
+        """Тест невалидного limit"""
+        session_id = self.client.get('/api/training/session/').data['session_id']
+        
+        response = self.client.get(f'/api/training/session/{session_id}/next/?limit=0')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
 @pytest.mark.django_db
@@ -1531,6 +1579,87 @@ class TestTrainingAnswerAPI:
         assert response.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.django_db
+class TestTrainingAnswerBatchAPI:
+    """Тесты для POST /api/training/answer/batch/"""
+    
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        from apps.cards.models import Card
+        from apps.words.models import Word
+        
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        
+        self.cards = []
+        for original in ('Haus', 'Baum'):
+            word = Word.objects.create(
+                user=self.user,
+                original_word=original,
+                translation='перевод',
+                language='de'
+            )
+            card = Card.objects.get(word=word, card_type='normal')
+            card.is_in_learning_mode = False
+            card.interval = 10
+            card.repetitions = 3
+            card.next_review = timezone.now() - timedelta(days=1)
+            card.save()
+            self.cards.append(card)
+    
+    def test_batch_updates_cards_and_settings(self):
+        """Тест пакетной обработки ответов"""
+        from apps.training.models import ReviewLog
+        
+        response = self.client.post('/api/training/answer/batch/', {
+            'answers': [
+                {'card_id': self.cards[0].id, 'answer': 2, 'time_spent': 3},
+                {'card_id': self.cards[1].id, 'answer': 0},
+            ]
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['processed'] == 2
+        assert response.data['results'][1]['entered_learning_mode'] is True
+        
+        self.cards[0].refresh_from_db()
+        self.cards[1].refresh_from_db()
+        assert self.cards[0].interval > 10
+        assert self.cards[1].is_in_learning_mode is True
+        assert self.cards[1].word.learning_status == 'learning'
+        
+        settings = UserTrainingSettings.objects.get(user=self.user)
+        assert settings.total_reviews == 2
+        assert settings.successful_reviews == 1
+        assert ReviewLog.objects.filter(user=self.user).count() == 2
+    
+    def test_batch_invalid_card_saves_nothing(self):
+        """Тест: неизвестная карточка отклоняет весь пакет"""
+        response = self.client.post('/api/training/answer/batch/', {
+            'answers': [
+                {'card_id': self.cards[0].id, 'answer': 2},
+                {'card_id': 99999, 'answer': 2},
+            ]
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        self.cards[0].refresh_from_db()
+        assert self.cards[0].interval == 10
+    
+    def test_batch_empty_rejected(self):
+        """Тест пустого пакета"""
+        response = self.client.post(
+            '/api/training/answer/batch/', {'answers': []}, format='json'
+        )
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.django_db
 class TestTrainingLearningModeAPI:
     """Тесты для enter-learning/exit-learning"""
@@ -2394,6 +2523,17 @@ class TestNotificationAPI:
         assert response.status_code == status.HTTP_200_OK
         assert response.data['cards_due'] >= 6
 
+    def test_notification_check_conditional_get(self):
+        """Повторная проверка с If-None-Match возвращает 304"""
+        response = self.client.get('/api/training/notifications/check/')
+        etag = response['ETag']
+
+        response = self.client.get(
+            '/api/training/notifications/check/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+
     def test_invalid_threshold(self):
         """Невалидный порог карточек"""
         response = self.client.patch('/api/training/notifications/settings/', {
@@ -7,12 +7,16 @@ urlpatterns = [
     path('settings/defaults/', views.training_settings_defaults_view, name='training-settings-defaults'),
     # ЭТАП 6: Training API
     path('session/', views.training_session_view, name='training-session'),
+    path('session/<uuid:session_id>/next/', views.training_session_next_view, name='training-session-next'),
     path('answer/', views.training_answer_view, name='training-answer'),
+    path('answer/batch/', views.training_answer_batch_view, name='training-answer-batch'),
     path('enter-learning/', views.training_enter_learning_view, name='training-enter-learning'),
     path('exit-learning/', views.training_exit_learning_view, name='training-exit-learning'),
     path('stats/', views.training_stats_view, name='training-stats'),
     # Дашборд тренировок и активация
     path('dashboard/', views.training_dashboard_view, name='training-dashboard'),
+    path('activity/', views.training_activity_view, name='training-activity'),
+    path('forecast/', views.training_forecast_view, name='training-forecast'),
     path('deck/<int:deck_id>/activate/', views.training_deck_activate_view, name='training-deck-activate'),
     path('deck/<int:deck_id>/deactivate/', views.training_deck_deactivate_view, name='training-deck-deactivate'),
     path('category/<int:category_id>/activate/', views.training_category_activate_view, name='training-category-activate'),
@@ -1,6 +1,8 @@
 """
 Training views — thin layer: validate input → call service → return response.
 """
+import hashlib
+import json
 import logging
 
 from rest_framework.decorators import api_view, permission_classes
@@ -8,15 +10,19 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags, quote_etag
 
-from .models import UserTrainingSettings, NotificationSettings
+from .models import UserTrainingSettings, NotificationSettings, TrainingSession
 from .serializers import (
     UserTrainingSettingsSerializer,
     UserTrainingSettingsUpdateSerializer,
     UserTrainingSettingsDefaultsSerializer,
     TrainingSessionSerializer,
+    TrainingSessionNextSerializer,
     TrainingAnswerRequestSerializer,
     TrainingAnswerResponseSerializer,
+    TrainingAnswerBatchRequestSerializer,
+    TrainingAnswerBatchResponseSerializer,
     CardActionRequestSerializer,
     CardActionResponseSerializer,
     TrainingStatsSerializer,
@@ -34,13 +40,16 @@ from .serializers import (
 from .services.session_service import (
     get_or_create_settings,
     build_training_session,
+    get_session_next_cards,
     process_answer,
+    process_answers_batch,
     enter_learning_mode,
     exit_learning_mode,
 )
 from .services.stats_service import (
     get_training_stats,
     get_dashboard_data,
+    get_activity_heatmap,
     activate_deck,
     deactivate_deck,
     activate_category,
@@ -48,6 +57,11 @@ from .services.stats_service import (
     get_forgetting_curve_data,
     check_notification,
 )
+from .services.forecast_service import (
+    get_review_forecast,
+    MIN_FORECAST_DAYS,
+    MAX_FORECAST_DAYS,
+)
 from .services.ai_service import (
     generate_etymology_for_word,
     generate_hint_for_word,
@@ -55,6 +69,7 @@ from .services.ai_service import (
     generate_synonym_for_word,
 )
 from apps.cards.models import Card, Deck
+from apps.core.constants import TRAINING_SESSION_NEXT_DEFAULT, TRAINING_SESSION_NEXT_MAX
 from apps.words.models import Word, Category
 
 DEFAULT_AGE_GROUP = 'adult'
@@ -119,6 +134,9 @@ def training_session_view(request):
     category_id = request.query_params.get('category_id')
     duration = request.query_params.get('duration')
     new_cards = request.query_params.get('new_cards', 'true').lower() == 'true'
+    include_descendants = request.query_params.get(
+        'include_descendants', 'false'
+    ).lower() == 'true'
 
     # Validate deck_id
     if deck_id is not None:
@@ -168,12 +186,45 @@ def training_session_view(request):
         duration=duration,
         new_cards=new_cards,
         request=request,
+        include_descendants=include_descendants,
     )
 
     serializer = TrainingSessionSerializer(response_data)
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def training_session_next_view(request, session_id):
+    """GET /api/training/session/<session_id>/next/?limit=10"""
+    limit = request.query_params.get('limit', TRAINING_SESSION_NEXT_DEFAULT)
+    try:
+        limit = int(limit)
+    except (ValueError, TypeError):
+        return Response(
+            {'error': 'limit должен быть целым числом'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not 1 <= limit <= TRAINING_SESSION_NEXT_MAX:
+        return Response(
+            {'error': f'limit должен быть от 1 до {TRAINING_SESSION_NEXT_MAX}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        response_data = get_session_next_cards(
+            user=request.user, session_id=session_id, limit=limit
+        )
+    except TrainingSession.DoesNotExist:
+        return Response(
+            {'error': 'Сессия не найдена или истекла'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    serializer = TrainingSessionNextSerializer(response_data)
+    return Response(serializer.data)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def training_answer_view(request):
@@ -193,6 +244,7 @@ def training_answer_view(request):
             answer=answer,
             time_spent=time_spent,
             request=request,
+            session_id=serializer.validated_data.get('session_id'),
         )
     except Card.DoesNotExist:
         return Response(
@@ -204,6 +256,31 @@ def training_answer_view(request):
     return Response(response_serializer.data)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def training_answer_batch_view(request):
+    """POST /api/training/answer/batch/"""
+    serializer = TrainingAnswerBatchRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        response_data = process_answers_batch(
+            user=request.user,
+            answers=serializer.validated_data['answers'],
+            session_id=serializer.validated_data.get('session_id'),
+            request=request,
+        )
+    except Card.DoesNotExist:
+        return Response(
+            {'error': 'Карточка не найдена или не принадлежит пользователю'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    response_serializer = TrainingAnswerBatchResponseSerializer(response_data)
+    return Response(response_serializer.data)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def training_enter_learning_view(request):
@@ -273,6 +350,33 @@ def training_dashboard_view(request):
     return Response(get_dashboard_data(request.user))
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def training_activity_view(request):
+    """GET /api/training/activity/ — активность по дням за год"""
+    return Response(get_activity_heatmap(request.user))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def training_forecast_view(request):
+    """GET /api/training/forecast/?days=30"""
+    days = request.query_params.get('days', MIN_FORECAST_DAYS)
+    try:
+        days = int(days)
+    except (ValueError, TypeError):
+        return Response(
+            {'error': 'days должен быть целым числом'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not MIN_FORECAST_DAYS <= days <= MAX_FORECAST_DAYS:
+        return Response(
+            {'error': f'days должен быть от {MIN_FORECAST_DAYS} до {MAX_FORECAST_DAYS}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response(get_review_forecast(request.user, days))
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def training_deck_activate_view(request, deck_id):
@@ -483,8 +587,22 @@ def notification_settings_view(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def notification_check_view(request):
-    """GET /api/training/notifications/check/"""
-    return Response(check_notification(request.user))
+    """
+    GET /api/training/notifications/check/
+
+    Поддерживает условный GET: при совпадении If-None-Match — 304 без тела.
+    """
+    data = check_notification(request.user)
+    etag = quote_etag(hashlib.md5(
+        json.dumps(data, sort_keys=True).encode()
+    ).hexdigest())
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    return response
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -0,0 +1,96 @@
+"""
+Дерево категорий пользователя со счётчиками.
+
+Иерархия хранится материализованным путём (Category.path — ID предков
+от корня, '/1/5/'), поэтому поддерево выбирается префиксным фильтром по
+индексу, а всё дерево со счётчиками собирается тремя запросами:
+1. категории (всё дерево или поддерево одной категории);
+2. связи слово ↔ категория для этих категорий;
+3. число карточек к показу по словам этих категорий.
+Счётчики поддеревьев сводятся в памяти: слово из нескольких категорий
+поддерева считается один раз.
+
+Использование:
+    roots = load_category_tree(request.user)
+    CategoryTreeSerializer(roots, many=True).data
+"""
+from collections import defaultdict
+
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from apps.cards.models import Card
+from .models import Category, Word
+
+
+def due_cards_filter(now=None) -> Q:
+    """Карточки к показу: новые, в обучении и на повторении (как 'due' в статистике)."""
+    now = now or timezone.now()
+    return Q(is_in_learning_mode=True) | Q(is_in_learning_mode=False, next_review__lte=now)
+
+
+def load_category_tree(user, root=None) -> list[Category]:
+    """
+    Загружает дерево категорий со счётчиками.
+
+    Каждой категории проставляются атрибуты:
+    - words_count / total_words_count — слова в категории / во всём поддереве;
+    - due_count / total_due_count — карточки к показу по этим словам;
+    - tree_children — дочерние категории в порядке (order, name).
+
+    Args:
+        user: Владелец категорий
+        root: Если указана — загружается только она и её потомки
+
+    Returns:
+        list[Category]: корневые категории ([root] при загрузке поддерева)
+    """
+    categories = Category.objects.filter(user=user)
+    links = Word.categories.through.objects.filter(category__user=user)
+    if root is not None:
+        categories = categories.filter(root.get_subtree_filter())
+        links = links.filter(root.get_subtree_filter('category__'))
+
+    categories = list(categories.order_by('order', 'name'))
+    if not categories:
+        return []
+
+    words_by_category = defaultdict(set)
+    for category_id, word_id in links.values_list('category_id', 'word_id'):
+        words_by_category[category_id].add(word_id)
+
+    due_by_word = dict(
+        Card.objects.for_user(user)
+        .filter(due_cards_filter())
+        .filter(Exists(links.filter(word_id=OuterRef('word_id'))))
+        .order_by()
+        .values('word_id')
+        .annotate(due=Count('id'))
+        .values_list('word_id', 'due')
+    )
+
+    by_id = {category.id: category for category in categories}
+    subtree_words = defaultdict(set)
+    for category in categories:
+        words = words_by_category.get(category.id, set())
+        for target_id in (category.id, *category.ancestor_ids):
+            if target_id in by_id:
+                subtree_words[target_id] |= words
+
+    roots = []
+    for category in categories:
+        category.tree_children = []
+    for category in categories:
+        words = words_by_category.get(category.id, set())
+        total_words = subtree_words[category.id]
+        category.words_count = len(words)
+        category.total_words_count = len(total_words)
+        category.due_count = sum(due_by_word.get(word_id, 0) for word_id in words)
+        category.total_due_count = sum(due_by_word.get(word_id, 0) for word_id in total_words)
+
+        parent = by_id.get(category.parent_id)
+        if parent is not None:
+            parent.tree_children.append(category)
+        else:
+            roots.append(category)
+    return roots
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.17 on 2026-10-17 04:44
+
+import unicodedata
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+SEARCH_FIELDS = ('original_word', 'translation', 'hint_text', 'notes')
+
+
+def build_search_text(word):
+    """Копия apps.words.search.build_search_text на момент миграции"""
+    text = ' '.join(getattr(word, field) or '' for field in SEARCH_FIELDS)
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+def fill_search_text(apps, schema_editor):
+    """Заполняет search_text для существующих слов"""
+    Word = apps.get_model('words', 'Word')
+
+    batch = []
+    for word in Word.objects.only('id', 'original_word', 'translation', 'hint_text', 'notes').iterator(chunk_size=BATCH_SIZE):
+        word.search_text = build_search_text(word)
+        batch.append(word)
+        if len(batch) >= BATCH_SIZE:
+            Word.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    Word.objects.bulk_update(batch, ['search_text'])
+
+
+def create_trigram_index(apps, schema_editor):
+    """GIN-индекс pg_trgm по search_text (только PostgreSQL; на SQLite — FTS5, см. apps/words/search.py)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS words_word_search_trgm '
+        'ON words_word USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS words_word_search_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('words', '0012_alter_word_card_type_alter_word_language'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='word',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Слово, перевод, подсказка и заметки без регистра и диакритики (см. apps/words/search.py)', verbose_name='Текст для поиска'),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.17 on 2026-10-17 05:13
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_category_paths(apps, schema_editor):
+    """Строит материализованные пути существующих категорий (обход от корней)"""
+    Category = apps.get_model('words', 'Category')
+
+    children = {}
+    for category_id, parent_id in Category.objects.values_list('id', 'parent_id'):
+        children.setdefault(parent_id, []).append(category_id)
+
+    paths = {}
+    stack = [(category_id, '/') for category_id in children.get(None, [])]
+    while stack:
+        category_id, path = stack.pop()
+        paths[category_id] = path
+        stack.extend(
+            (child_id, f'{path}{category_id}/') for child_id in children.get(category_id, [])
+        )
+
+    Category.objects.bulk_update(
+        [Category(id=category_id, path=path) for category_id, path in paths.items()],
+        ['path'],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('words', '0013_word_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(db_index=True, default='/', editable=False, help_text='ID предков от корня: "/" у корневой, "/1/5/" у внука категории 1', max_length=500, verbose_name='Путь'),
+        ),
+        migrations.RunPython(fill_category_paths, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Substr
 from django.conf import settings
 
 from apps.core.constants import (
@@ -53,6 +54,14 @@ class Category(models.Model):
         verbose_name='Активна для тренировки',
         help_text='True = карточки из категории попадают в общую тренировку'
     )
+    path = models.CharField(
+        max_length=500,
+        default='/',
+        editable=False,
+        db_index=True,
+        verbose_name='Путь',
+        help_text='ID предков от корня: "/" у корневой, "/1/5/" у внука категории 1'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания'
@@ -73,40 +82,91 @@ class Category(models.Model):
         return self.name
     
     def save(self, *args, **kwargs):
-        """Валидация: категория не может быть своим родителем"""
+        """
+        Валидация (категория не может быть своим родителем или потомком)
+        и пересчёт материализованного пути.
+        
+        При переносе в другую ветку пути всех потомков переписываются
+        одним UPDATE. Сохранение с update_fields без parent путь не трогает.
+        """
         if self.pk and self.parent_id == self.pk:
             raise ValueError("Категория не может быть родителем самой себя")
-        # Проверка на циклическую зависимость
-        if self.parent:
-            ancestor = self.parent
-            while ancestor:
-                if ancestor.pk == self.pk:
-                    raise ValueError("Обнаружена циклическая зависимость")
-                ancestor = ancestor.parent
-        super().save(*args, **kwargs)
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'parent', 'parent_id'} & set(update_fields):
+            super().save(*args, **kwargs)
+            return
+        
+        with transaction.atomic(using=kwargs.get('using')):
+            # Путь родителя читаем из БД: объект self.parent может быть устаревшим
+            if self.parent_id:
+                parent_path = Category.objects.filter(
+                    pk=self.parent_id
+                ).values_list('path', flat=True).get()
+                new_path = f'{parent_path}{self.parent_id}/'
+            else:
+                new_path = '/'
+            if self.pk and f'/{self.pk}/' in new_path:
+                raise ValueError("Обнаружена циклическая зависимость")
+            
+            old_path = None
+            if self.pk and not self._state.adding:
+                old_path = Category.objects.filter(
+                    pk=self.pk
+                ).values_list('path', flat=True).first()
+            
+            self.path = new_path
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'path'}
+            super().save(*args, **kwargs)
+            
+            if old_path is not None and old_path != new_path:
+                old_prefix = f'{old_path}{self.pk}/'
+                Category.objects.filter(path__startswith=old_prefix).update(
+                    path=Concat(
+                        Value(self.subtree_prefix),
+                        Substr('path', len(old_prefix) + 1),
+                        output_field=models.CharField(),
+                    )
+                )
+    
+    @property
+    def subtree_prefix(self) -> str:
+        """Префикс пути всех потомков: '/1/5/' для категории 5 с родителем 1"""
+        return f'{self.path}{self.pk}/'
+    
+    @property
+    def ancestor_ids(self) -> list[int]:
+        """ID предков из пути, от корня к непосредственному родителю"""
+        return [int(pk) for pk in self.path.split('/') if pk]
+    
+    def get_subtree_filter(self, prefix: str = '') -> Q:
+        """
+        Q-фильтр «эта категория или её потомок».
+        
+        prefix — путь к категории в lookup, например 'category__'
+        для Word.categories.through или 'categories__' для Word.
+        """
+        return (
+            Q(**{f'{prefix}pk': self.pk}) |
+            Q(**{f'{prefix}path__startswith': self.subtree_prefix})
+        )
     
     def get_ancestors(self) -> list['Category']:
         """
-        Возвращает список всех родителей вверх по иерархии.
+        Возвращает список всех родителей вверх по иерархии (один запрос).
         Порядок: от непосредственного родителя к корню.
         """
-        ancestors = []
-        current = self.parent
-        while current:
-            ancestors.append(current)
-            current = current.parent
-        return ancestors
+        ancestor_ids = self.ancestor_ids
+        by_id = Category.objects.in_bulk(ancestor_ids)
+        return [by_id[pk] for pk in reversed(ancestor_ids) if pk in by_id]
     
     def get_descendants(self) -> list['Category']:
         """
-        Возвращает список всех потомков вниз по иерархии.
-        Рекурсивно обходит все дочерние категории.
+        Возвращает список всех потомков вниз по иерархии (один запрос
+        по префиксу пути).
         """
-        descendants = []
-        for child in self.children.all():
-            descendants.append(child)
-            descendants.extend(child.get_descendants())
-        return descendants
+        return list(Category.objects.filter(path__startswith=self.subtree_prefix))
     
     def get_full_path(self) -> str:
         """
@@ -123,11 +183,13 @@ class Category(models.Model):
         return self.words.count()
     
     def get_total_words_count(self) -> int:
-        """Возвращает количество слов в категории и всех потомках"""
-        count = self.words.count()
-        for descendant in self.get_descendants():
-            count += descendant.words.count()
-        return count
+        """
+        Возвращает количество слов в категории и всех потомках.
+        Слово из нескольких категорий поддерева считается один раз.
+        """
+        return Word.objects.filter(
+            categories__in=Category.objects.filter(self.get_subtree_filter())
+        ).distinct().count()
 
 
 class Word(models.Model):
@@ -264,6 +326,15 @@ class Word(models.Model):
         verbose_name='Статус обучения'
     )
     
+    # --- Поиск ---
+    search_text = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Текст для поиска',
+        help_text='Слово, перевод, подсказка и заметки без регистра и диакритики (см. apps/words/search.py)'
+    )
+    
     class Meta:
         verbose_name = 'Слово'
         verbose_name_plural = 'Слова'
@@ -278,6 +349,16 @@ class Word(models.Model):
     
     def __str__(self):
         return f"{self.original_word} ({self.language}) - {self.translation}"
+    
+    def save(self, *args, **kwargs):
+        """Пересчитывает search_text вместе с полями, из которых он строится"""
+        from .search import SEARCH_FIELDS, build_search_text
+        
+        self.search_text = build_search_text(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(SEARCH_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
 
     # ═══════════════════════════════════════════════════════════════
     # МЕТОДЫ
@@ -0,0 +1,149 @@
+"""
+Поиск по словам пользователя.
+
+Текст для поиска денормализован в Word.search_text: original_word,
+translation, hint_text и notes в нижнем регистре и без диакритики
+(Word.save пересчитывает поле). Запрос нормализуется так же, поэтому
+поиск не зависит от регистра и ударений.
+
+Бэкенды:
+- PostgreSQL: GIN-индекс pg_trgm по search_text (миграция 0013).
+  Подстрока (LIKE, использует индекс) или нечёткое совпадение по
+  триграммам (оператор %>, порог pg_trgm.word_similarity_threshold),
+  ранжирование по word_similarity.
+- SQLite (разработка и тесты): FTS5-таблица с триграммным токенизатором,
+  ранжирование по bm25. Таблица и триггеры создаются при первом поиске.
+  Нечёткого поиска нет — только совпадение по подстроке.
+
+Использование:
+    words = search_words(words, request.query_params['search'])
+    words.order_by('-search_rank')
+"""
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+SEARCH_FIELDS = ('original_word', 'translation', 'hint_text', 'notes')
+RANK_FIELD = 'search_rank'
+
+# Бонус к рангу, если запрос совпадает с началом исходного слова
+PREFIX_BOOST = 1.0
+
+FTS_TABLE = 'words_word_fts'
+# FTS5 trigram индексирует только последовательности от 3 символов
+FTS_MIN_QUERY_LENGTH = 3
+
+SQLITE_FTS_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        search_text, content='words_word', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON words_word BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON words_word BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text)
+        VALUES ('delete', old.id, old.search_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_text ON words_word BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text)
+        VALUES ('delete', old.id, old.search_text);
+        INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def normalize_search_text(text: str) -> str:
+    """Нижний регистр, без диакритики и лишних пробелов: 'Café  Ёлка' -> 'cafe елка'."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+def build_search_text(word) -> str:
+    """Значение Word.search_text для слова."""
+    return normalize_search_text(' '.join(
+        getattr(word, field) or '' for field in SEARCH_FIELDS
+    ))
+
+
+def _prefix_rank(query):
+    return Case(
+        When(search_text__startswith=query, then=Value(PREFIX_BOOST)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _search_postgresql(queryset, query):
+    # Импорт только на PostgreSQL: модуль требует psycopg
+    from django.contrib.postgres.lookups import TrigramWordSimilar
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    return queryset.filter(
+        Q(search_text__contains=query) | TrigramWordSimilar(F('search_text'), query)
+    ).annotate(**{
+        RANK_FIELD: TrigramWordSimilarity(query, 'search_text') + _prefix_rank(query),
+    })
+
+
+def ensure_sqlite_fts():
+    """Создаёт FTS5-таблицу и триггеры синхронизации, если их ещё нет."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+        )
+        if cursor.fetchone():
+            return
+        for statement in SQLITE_FTS_SCHEMA:
+            cursor.execute(statement)
+
+
+def _search_sqlite(queryset, query):
+    if len(query) < FTS_MIN_QUERY_LENGTH:
+        return queryset.filter(search_text__contains=query).annotate(**{
+            RANK_FIELD: _prefix_rank(query),
+        })
+
+    ensure_sqlite_fts()
+    # Фраза в кавычках — поиск подстроки, а не синтаксис FTS5
+    match = '"{}"'.format(query.replace('"', '""'))
+    matched_ids = RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]
+    )
+    bm25 = RawSQL(
+        f'SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = words_word.id',
+        [match],
+        output_field=FloatField(),
+    )
+    return queryset.filter(id__in=matched_ids).annotate(**{
+        RANK_FIELD: bm25 + _prefix_rank(query),
+    })
+
+
+def search_words(queryset, text):
+    """
+    Отбирает слова, подходящие под запрос, и добавляет аннотацию
+    search_rank (больше — релевантнее).
+    """
+    query = normalize_search_text(text)
+    if not query:
+        return queryset.annotate(**{RANK_FIELD: Value(0.0, output_field=FloatField())})
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(queryset, query)
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(queryset, query)
+    return queryset.filter(search_text__contains=query).annotate(**{
+        RANK_FIELD: _prefix_rank(query),
+    })
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Word, WordRelation, Category
+from .category_tree import load_category_tree
 
 
 class LiteraryContextOverlayMixin:
@@ -375,8 +376,7 @@ class CategoryUpdateSerializer(serializers.ModelSerializer):
                 )
             # Проверяем, что parent не является потомком текущей категории
             if instance:
-                descendants = instance.get_descendants()
-                if value in descendants:
+                if value.path.startswith(instance.subtree_prefix):
                     raise serializers.ValidationError(
                         "Нельзя установить потомка как родителя"
                     )
@@ -386,12 +386,18 @@ class CategoryUpdateSerializer(serializers.ModelSerializer):
 class CategoryTreeSerializer(serializers.ModelSerializer):
     """
     Рекурсивный сериализатор для дерева категорий.
-    Включает вложенные children.
+    Включает вложенные children и счётчики слов и карточек к показу
+    (своих и всего поддерева).
+    
+    Ожидает категории из load_category_tree; для одиночной категории
+    без загруженного дерева загружает её поддерево сам.
     """
     
     children = serializers.SerializerMethodField()
-    words_count = serializers.SerializerMethodField()
-    total_words_count = serializers.SerializerMethodField()
+    words_count = serializers.IntegerField(read_only=True)
+    total_words_count = serializers.IntegerField(read_only=True)
+    due_count = serializers.IntegerField(read_only=True)
+    total_due_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Category
@@ -403,20 +409,22 @@ class CategoryTreeSerializer(serializers.ModelSerializer):
             'order',
             'words_count',
             'total_words_count',
+            'due_count',
+            'total_due_count',
             'children',
             'created_at',
         ]
     
-    def get_children(self, obj):
-        """Рекурсивно сериализует дочерние категории"""
-        children = obj.children.all().order_by('order', 'name')
-        return CategoryTreeSerializer(children, many=True).data
-    
-    def get_words_count(self, obj):
-        return obj.get_words_count()
+    def to_representation(self, instance):
+        if not hasattr(instance, 'tree_children'):
+            instance = load_category_tree(instance.user, root=instance)[0]
+        return super().to_representation(instance)
     
-    def get_total_words_count(self, obj):
-        return obj.get_total_words_count()
+    def get_children(self, obj):
+        """Рекурсивно сериализует дочерние категории (уже загруженные)"""
+        return CategoryTreeSerializer(
+            obj.tree_children, many=True, context=self.context
+        ).data
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -499,14 +507,18 @@ class CheckMediaResponseWordSerializer(serializers.Serializer):
     audio_url = serializers.CharField(allow_null=True)
 
 
+# Действия выполняются над набором целиком (см. words_bulk_action_view)
+BULK_ACTION_MAX_WORDS = 5000
+
+
 class BulkActionRequestSerializer(serializers.Serializer):
     """Сериализатор для массовых действий"""
     
     word_ids = serializers.ListField(
         child=serializers.IntegerField(),
         min_length=1,
-        max_length=100,
-        help_text='Список ID слов (максимум 100)'
+        max_length=BULK_ACTION_MAX_WORDS,
+        help_text=f'Список ID слов (максимум {BULK_ACTION_MAX_WORDS})'
     )
     action = serializers.ChoiceField(
         choices=[
@@ -526,8 +538,8 @@ class BulkActionRequestSerializer(serializers.Serializer):
     
     def validate_word_ids(self, value):
         """Проверяем, что все ID валидны"""
-        if len(value) > 100:
-            raise serializers.ValidationError("Максимум 100 слов за раз")
+        if len(value) > BULK_ACTION_MAX_WORDS:
+            raise serializers.ValidationError(f"Максимум {BULK_ACTION_MAX_WORDS} слов за раз")
         return value
     
     def validate_params(self, value):
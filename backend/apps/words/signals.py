@@ -6,7 +6,8 @@ import logging
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from .utils import update_word_learning_status
+from apps.core.bulk import in_bulk_operation
+from .utils import schedule_word_status_update
 
 logger = logging.getLogger(__name__)
 
@@ -21,12 +22,10 @@ def update_word_status_on_card_change(sender, instance, **kwargs):
     - Создании новой карточки
     - Обновлении карточки (например, изменение is_in_learning_mode, next_review)
     - Удалении карточки
+    
+    Внутри транзакции пересчёт откладывается до коммита и выполняется
+    один раз для всех изменённых слов. Массовые операции (apps.core.bulk)
+    пересчитывают статусы сами.
     """
-    if instance.word:
-        try:
-            update_word_learning_status(instance.word)
-        except Exception:
-            logger.exception(
-                "Failed to update learning status for word id=%s",
-                instance.word_id
-            )
+    if instance.word_id and not in_bulk_operation():
+        schedule_word_status_update([instance.word_id], using=kwargs.get('using'))
@@ -141,6 +141,53 @@ class TestWordsAPI:
         assert response.data['count'] == 1
         assert response.data['results'][0]['original_word'] == 'casa'
 
+    def test_words_list_search_ignores_case_and_accents(self):
+        """Тест поиска без учёта регистра и диакритики, по подсказке и заметкам"""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        cafe = Word.objects.create(user=user, original_word='Café', translation='кафе', language='fr')
+        tree = Word.objects.create(user=user, original_word='sapin', translation='Ёлка', language='fr')
+        noted = Word.objects.create(
+            user=user, original_word='pain', translation='хлеб', language='fr',
+            notes='из булочной на углу'
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        
+        for query, expected in [('CAFE', cafe), ('елк', tree), ('булочн', noted)]:
+            response = client.get(f'/api/words/list/?search={query}')
+            assert response.status_code == status.HTTP_200_OK
+            assert [item['id'] for item in response.data['results']] == [expected.id]
+    
+    def test_words_list_search_follows_word_updates(self):
+        """Тест: после переименования слово ищется по новому тексту"""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        word = Word.objects.create(user=user, original_word='casa', translation='дом', language='pt')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        assert client.get('/api/words/list/?search=casa').data['count'] == 1
+        
+        word.original_word = 'livro'
+        word.save(update_fields=['original_word'])
+        
+        assert client.get('/api/words/list/?search=casa').data['count'] == 0
+        assert client.get('/api/words/list/?search=livr').data['count'] == 1
+    
+    def test_words_list_search_ranks_prefix_first(self):
+        """Тест: без ordering совпадение с началом слова выше совпадения в середине"""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        inner = Word.objects.create(user=user, original_word='Hochhaus', translation='небоскрёб', language='de')
+        prefix = Word.objects.create(user=user, original_word='Haustür', translation='входная дверь', language='de')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        
+        response = client.get('/api/words/list/?search=haus')
+        assert [item['id'] for item in response.data['results']] == [prefix.id, inner.id]
+        
+        response = client.get('/api/words/list/?search=haus&pagination=cursor&page_size=1')
+        assert [item['id'] for item in response.data['results']] == [prefix.id]
+        response = client.get(response.data['next'])
+        assert [item['id'] for item in response.data['results']] == [inner.id]
+
 
 @pytest.mark.django_db
 class TestWordModelNewFields:
@@ -804,6 +851,53 @@ class TestCategoryModel:
         
         assert other.name == 'Прочее'
     
+    def test_path_maintained_on_create(self, root_category, child_category, grandchild_category):
+        """Тест: материализованный путь строится при создании"""
+        assert root_category.path == '/'
+        assert child_category.path == f'/{root_category.id}/'
+        assert grandchild_category.path == f'/{root_category.id}/{child_category.id}/'
+        assert grandchild_category.ancestor_ids == [root_category.id, child_category.id]
+    
+    def test_move_rewrites_descendant_paths(self, user, root_category, child_category,
+                                            grandchild_category):
+        """Тест: перенос категории переписывает пути всего поддерева"""
+        other = Category.objects.create(user=user, name='Напитки')
+        child_category.parent = other
+        child_category.save()
+        
+        grandchild_category.refresh_from_db()
+        assert child_category.path == f'/{other.id}/'
+        assert grandchild_category.path == f'/{other.id}/{child_category.id}/'
+        assert root_category.get_descendants() == []
+        assert set(other.get_descendants()) == {child_category, grandchild_category}
+    
+    def test_move_to_root(self, root_category, child_category, grandchild_category):
+        """Тест: перенос в корень"""
+        child_category.parent = None
+        child_category.save()
+        
+        grandchild_category.refresh_from_db()
+        assert grandchild_category.path == f'/{child_category.id}/'
+    
+    def test_descendants_and_ancestors_single_query(self, root_category, child_category,
+                                                    grandchild_category,
+                                                    django_assert_num_queries):
+        """Тест: потомки и предки — одним запросом при любой глубине"""
+        with django_assert_num_queries(1):
+            assert len(root_category.get_descendants()) == 2
+        with django_assert_num_queries(1):
+            assert grandchild_category.get_ancestors() == [child_category, root_category]
+    
+    def test_total_words_count_counts_word_once(self, user, root_category, child_category):
+        """Тест: слово из нескольких категорий поддерева считается один раз"""
+        word = Word.objects.create(
+            user=user, original_word='Apfel', translation='яблоко', language='de'
+        )
+        word.categories.add(root_category, child_category)
+        
+        assert root_category.get_total_words_count() == 1
+        assert child_category.get_total_words_count() == 1
+    
     def test_cascade_delete(self, root_category, child_category, grandchild_category):
         """Тест: каскадное удаление потомков"""
         root_category.delete()
@@ -941,6 +1035,53 @@ class TestCategoryAPI:
         assert len(tree[0]['children']) == 1
         assert tree[0]['children'][0]['name'] == 'Фрукты'
     
+    def test_category_tree_counts(self, client, user):
+        """Тест: счётчики слов и карточек к показу — свои и поддерева"""
+        from apps.cards.models import Card
+        
+        root = Category.objects.create(user=user, name='Еда')
+        child = Category.objects.create(user=user, name='Фрукты', parent=root)
+        apple = Word.objects.create(
+            user=user, original_word='Apfel', translation='яблоко', language='de'
+        )
+        pear = Word.objects.create(
+            user=user, original_word='Birne', translation='груша', language='de'
+        )
+        apple.categories.add(root, child)
+        pear.categories.add(child)
+        # Одна карточка ещё не пора повторять
+        Card.objects.filter(word=pear).update(
+            is_in_learning_mode=False,
+            next_review=timezone.now() + timedelta(days=3),
+        )
+        
+        response = client.get('/api/words/categories/')
+        
+        root_data = response.data['categories'][0]
+        child_data = root_data['children'][0]
+        assert (root_data['words_count'], root_data['total_words_count']) == (1, 2)
+        assert (root_data['due_count'], root_data['total_due_count']) == (1, 1)
+        assert (child_data['words_count'], child_data['total_words_count']) == (2, 2)
+        assert (child_data['due_count'], child_data['total_due_count']) == (1, 1)
+        
+        response = client.get(f'/api/words/categories/{child.id}/')
+        assert response.data['total_words_count'] == 2
+    
+    def test_category_tree_query_count_independent_of_depth(self, client, user,
+                                                              django_assert_max_num_queries):
+        """Тест: число запросов дерева не растёт с числом и глубиной категорий"""
+        parent = None
+        for depth in range(6):
+            for index in range(3):
+                category = Category.objects.create(
+                    user=user, name=f'{depth}-{index}', parent=parent
+                )
+            parent = category
+        
+        with django_assert_max_num_queries(6):
+            response = client.get('/api/words/categories/')
+        assert response.data['count'] == 18
+    
     def test_get_flat_categories(self, client, user):
         """Тест получения плоского списка категорий"""
         root = Category.objects.create(user=user, name='Еда')
@@ -970,6 +1111,33 @@ class TestCategoryAPI:
         assert response.status_code == status.HTTP_200_OK
         assert Category.objects.filter(id=category.id).count() == 0
     
+    def test_get_category_words_include_descendants(self, client, user, category):
+        """Тест: слова категории вместе с подкатегориями"""
+        child = Category.objects.create(user=user, name='Фрукты', parent=category)
+        word = Word.objects.create(
+            user=user, original_word='Apfel', translation='яблоко', language='de'
+        )
+        word.categories.add(category, child)
+        Word.objects.create(
+            user=user, original_word='Birne', translation='груша', language='de'
+        ).categories.add(child)
+        
+        response = client.get(
+            f'/api/words/categories/{category.id}/words/?include_descendants=true'
+        )
+        
+        assert response.data['count'] == 2
+    
+    def test_update_category_rejects_descendant_parent(self, client, user, category):
+        """Тест: нельзя перенести категорию в своего потомка"""
+        child = Category.objects.create(user=user, name='Фрукты', parent=category)
+        
+        response = client.patch(
+            f'/api/words/categories/{category.id}/', {'parent': child.id}, format='json'
+        )
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
     def test_get_category_words(self, client, user, category):
         """Тест получения слов в категории"""
         word = Word.objects.create(
@@ -1225,6 +1393,109 @@ class TestWordsUtils:
         assert stats['due_for_review'] == 1
         assert stats['mastered'] == 1
         assert stats['next_review'] is not None
+    
+    def test_update_words_learning_status(self, word, user):
+        """Тест: пакетный пересчёт статусов совпадает с пословным"""
+        from .utils import update_words_learning_status, get_word_learning_status
+        from apps.cards.models import Card
+        
+        mastered_word = Word.objects.create(
+            user=user, original_word='Baum', translation='дерево', language='de'
+        )
+        empty_word = Word.objects.create(
+            user=user, original_word='Tisch', translation='стол', language='de'
+        )
+        Card.objects.filter(word=empty_word).delete()
+        # Обходим сигналы, чтобы статусы устарели
+        Card.objects.filter(word=mastered_word).update(
+            is_in_learning_mode=False,
+            interval=30,
+            next_review=timezone.now() + timedelta(days=30)
+        )
+        Word.objects.filter(id__in=[word.id, mastered_word.id, empty_word.id]).update(
+            learning_status='reviewing'
+        )
+        
+        changed = update_words_learning_status([word.id, mastered_word.id, empty_word.id])
+        
+        assert changed == 3
+        for w in (word, mastered_word, empty_word):
+            w.refresh_from_db()
+            assert w.learning_status == get_word_learning_status(w)
+        assert mastered_word.learning_status == 'mastered'
+        assert empty_word.learning_status == 'new'
+
+    def test_card_changes_coalesced_until_commit(self, word, user, django_assert_num_queries,
+                                                 django_capture_on_commit_callbacks):
+        """Тест: изменения карточек в транзакции пересчитывают статус один раз при коммите"""
+        from apps.cards.models import Card
+        
+        Word.objects.filter(id=word.id).update(learning_status='new')
+        card = Card.objects.get(word=word, card_type='normal')
+        
+        with django_capture_on_commit_callbacks() as callbacks:
+            for interval in (1, 5, 10):
+                card.interval = interval
+                card.is_in_learning_mode = False
+                card.next_review = timezone.now() - timedelta(hours=1)
+                card.save()
+        
+        word.refresh_from_db()
+        assert word.learning_status == 'new'
+        
+        # Один агрегирующий запрос по Card, выборка слов и один bulk_update
+        with django_assert_num_queries(3):
+            for callback in callbacks:
+                callback()
+        word.refresh_from_db()
+        assert word.learning_status == 'reviewing'
+    
+    def test_rolled_back_savepoint_keeps_words_pending(self, word, user,
+                                                      django_capture_on_commit_callbacks):
+        """Тест: после отката вложенной транзакции слова пересчитываются при следующем коммите"""
+        from unittest.mock import patch
+        from django.db import transaction
+        from .utils import schedule_word_status_update
+        
+        with django_capture_on_commit_callbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    schedule_word_status_update([word.id])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        assert callbacks == []
+        
+        with patch('apps.words.utils.update_words_learning_status') as update:
+            with django_capture_on_commit_callbacks(execute=True):
+                schedule_word_status_update([])
+                schedule_word_status_update([word.id + 1000])
+        update.assert_called_once()
+        assert {word.id, word.id + 1000} <= update.call_args.args[0]
+    
+    def test_flush_error_is_logged_not_raised(self, word, django_capture_on_commit_callbacks):
+        """Тест: ошибка пересчёта после коммита не превращает запрос в 500"""
+        from unittest.mock import patch
+        from .utils import schedule_word_status_update
+        
+        with patch('apps.words.utils.update_words_learning_status', side_effect=RuntimeError), \
+                patch('apps.words.utils.logger') as logger:
+            with django_capture_on_commit_callbacks(execute=True):
+                schedule_word_status_update([word.id])
+        logger.exception.assert_called_once()
+    
+    def test_schedule_outside_transaction_runs_immediately(self, word):
+        """Тест: вне транзакции статус пересчитывается сразу"""
+        from unittest.mock import patch
+        from django.db import connection
+        from .utils import schedule_word_status_update
+        
+        with patch.object(connection, 'in_atomic_block', False), \
+                patch.object(connection, 'get_autocommit', return_value=True), \
+                patch('apps.words.utils.update_words_learning_status') as update:
+            schedule_word_status_update([word.id, None])
+        update.assert_called_once()
+        assert word.id in update.call_args.args[0]
 
 
 @pytest.mark.django_db
@@ -1367,6 +1638,69 @@ class TestWordsCatalogAPI:
         assert response.data['next'] is None
         assert response.data['previous'] is not None
     
+    def test_words_list_cursor_pagination(self, client, user):
+        """Тест курсорной пагинации: обход всех страниц без пропусков и повторов"""
+        from apps.cards.models import Card
+        
+        for i in range(25):
+            Word.objects.create(
+                user=user,
+                original_word=f'Word{i:02d}',
+                translation=f'Перевод{i}',
+                language='de'
+            )
+        Card.objects.filter(user=user).update(next_review=timezone.now())
+        # У части слов нет карточек — next_review = NULL, такие идут последними
+        Card.objects.filter(word__original_word__in=['Word03', 'Word07']).delete()
+        
+        for ordering in ('-created_at', 'original_word', 'next_review', '-next_review'):
+            seen = []
+            url = f'/api/words/list/?pagination=cursor&page_size=10&ordering={ordering}'
+            while url:
+                response = client.get(url)
+                assert response.status_code == status.HTTP_200_OK
+                assert response.data['count'] == 25
+                seen.extend(item['id'] for item in response.data['results'])
+                url = response.data['next']
+            
+            assert len(seen) == 25
+            assert len(set(seen)) == 25
+            if ordering == 'original_word':
+                words = dict(Word.objects.values_list('id', 'original_word'))
+                assert [words[word_id] for word_id in seen] == sorted(words.values())
+            if ordering.endswith('next_review'):
+                last_words = dict(Word.objects.values_list('id', 'original_word'))
+                assert {last_words[word_id] for word_id in seen[-2:]} == {'Word03', 'Word07'}
+    
+    def test_words_list_cursor_page_query_count(self, client, user, category,
+                                                django_assert_max_num_queries):
+        """Тест: глубина страницы не влияет на число запросов, count берётся из кэша"""
+        for i in range(30):
+            word = Word.objects.create(
+                user=user, original_word=f'Wort{i}', translation=f'слово{i}', language='de'
+            )
+            word.categories.add(category)
+        
+        url = f'/api/words/list/?pagination=cursor&page_size=5&category_id={category.id}'
+        response = client.get(url)
+        assert response.data['count'] == 30
+        url = response.data['next']
+        
+        for _ in range(3):
+            # страница + prefetch categories/decks/cards
+            with django_assert_max_num_queries(4):
+                response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data['results']) == 5
+            url = response.data['next']
+    
+    def test_words_list_invalid_cursor(self, client, word1):
+        """Тест: некорректный курсор — 400"""
+        response = client.get('/api/words/list/?cursor=not-a-cursor')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'error' in response.data
+    
     def test_word_update(self, client, word1):
         """Тест обновления слова"""
         response = client.patch(f'/api/words/{word1.id}/', {
@@ -1436,6 +1770,47 @@ class TestWordsCatalogAPI:
         assert 'by_status' in response.data
         assert response.data['total_cards'] == 2
     
+    def test_words_stats_fixed_query_count(self, client, user, word1, word2,
+                                           django_assert_max_num_queries):
+        """Статистика не пересчитывает статусы слов и не растёт с числом слов"""
+        from .utils import update_words_learning_status
+        
+        for i in range(10):
+            Word.objects.create(
+                user=user, original_word=f'Wort{i}', translation=f'слово{i}',
+                language='de', part_of_speech='adverb',
+            )
+        # Статусы пересчитываются при коммите, а тест идёт внутри транзакции
+        update_words_learning_status(Word.objects.filter(user=user).values_list('id', flat=True))
+        Word.objects.filter(user=user, original_word='Wort0').update(etymology='от...')
+        
+        with django_assert_max_num_queries(10):
+            response = client.get('/api/words/stats/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total_words'] == 12
+        assert response.data['by_status'] == {'learning': 12}
+        assert response.data['by_part_of_speech']['adverb'] == 10
+        assert response.data['with_etymology'] == (
+            Word.objects.filter(user=user).exclude(etymology='').count()
+        )
+    
+    def test_words_stats_mastered_word_falling_due(self, client, user, word1, word2):
+        """Освоенное слово с наступившим повторением считается как reviewing"""
+        from apps.cards.models import Card
+        
+        Card.objects.filter(word__in=[word1, word2], user=user).update(
+            is_in_learning_mode=False, interval=60,
+            next_review=timezone.now() + timedelta(days=30),
+        )
+        Word.objects.filter(id__in=[word1.id, word2.id]).update(learning_status='mastered')
+        Card.objects.filter(word=word1, user=user).update(
+            next_review=timezone.now() - timedelta(hours=1))
+        
+        response = client.get('/api/words/stats/')
+        
+        assert response.data['by_status'] == {'mastered': 1, 'reviewing': 1}
+    
     def test_word_enter_learning(self, client, word1, user):
         """Тест отправки слова в режим изучения"""
         from apps.cards.models import Card
@@ -1579,6 +1954,56 @@ class TestWordsCatalogAPI:
         assert response.data['failed'] == 1
         assert len(response.data['errors']) == 1
     
+    @pytest.mark.parametrize('action', [
+        'enter_learning', 'delete', 'add_to_deck', 'add_to_category', 'remove_from_category',
+    ])
+    def test_bulk_action_query_count_independent_of_size(self, client, user, deck, category,
+                                                         action, django_assert_max_num_queries):
+        """Тест: действие выполняется над набором целиком, число запросов не растёт со словами"""
+        from apps.cards.models import Card
+        
+        words = [
+            Word.objects.create(user=user, original_word=f'Wort{i}', translation=f'слово{i}', language='de')
+            for i in range(150)
+        ]
+        word_ids = [word.id for word in words]
+        Card.objects.filter(word_id__in=word_ids).update(is_in_learning_mode=False)
+        if action == 'remove_from_category':
+            category.words.add(*words)
+        params = {'deck_id': deck.id, 'category_id': category.id}
+        
+        with django_assert_max_num_queries(30):
+            response = client.post('/api/words/bulk-action/', {
+                'word_ids': word_ids, 'action': action, 'params': params,
+            }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['successful'] == 150
+        if action == 'enter_learning':
+            assert not Card.objects.filter(word_id__in=word_ids, is_in_learning_mode=False).exists()
+            assert set(Word.objects.filter(id__in=word_ids).values_list('learning_status', flat=True)) == {'learning'}
+        elif action == 'delete':
+            assert not Word.objects.filter(id__in=word_ids).exists()
+            assert not Card.objects.filter(word_id__in=word_ids).exists()
+        elif action == 'add_to_deck':
+            assert deck.words.count() == 150
+        elif action == 'add_to_category':
+            assert category.words.count() == 150
+        else:
+            assert category.words.count() == 0
+    
+    def test_bulk_action_invalidates_user_cache(self, client, user, word1, word2,
+                                                django_capture_on_commit_callbacks):
+        """Тест: массовое удаление сбрасывает кэш статистики слов"""
+        assert client.get('/api/words/stats/').data['total_words'] == 2
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post('/api/words/bulk-action/', {
+                'word_ids': [word1.id], 'action': 'delete',
+            }, format='json')
+        
+        assert client.get('/api/words/stats/').data['total_words'] == 1
+    
     def test_word_list_includes_new_fields(self, client, word1):
         """Тест: список слов включает новые поля (next_review, cards_count, categories, decks)"""
         response = client.get('/api/words/list/')
@@ -1649,6 +2074,33 @@ class TestBulkCreate:
         word.refresh_from_db()
         assert word.translation == 'дом'
 
+    def test_bulk_path_query_count(self, django_assert_max_num_queries):
+        """Число запросов не зависит от количества слов"""
+        from apps.cards.models import Card
+        payload = {
+            'words': [
+                {'original_word': f'Wort{i}', 'translation': f'слово{i}', 'language': 'de'}
+                for i in range(50)
+            ]
+        }
+        with django_assert_max_num_queries(12):
+            response = self.client.post('/api/words/bulk-create/', payload, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert all(item['is_new'] for item in response.data['words'])
+        assert Card.objects.filter(user=self.user, card_type='normal').count() == 50
+        assert Word.objects.filter(user=self.user, search_text='wort7 слово7').exists()
+
+    def test_etymology_queued_not_generated(self):
+        """Этимология не генерируется в запросе — слова ставятся в очередь"""
+        from unittest.mock import patch
+        from apps.training.models import PendingEtymology
+        payload = {'words': [{'original_word': 'Haus', 'translation': 'дом', 'language': 'de'}]}
+        with patch('apps.training.ai_generation.get_openai_client') as mock_client:
+            response = self.client.post('/api/words/bulk-create/', payload, format='json')
+        mock_client.assert_not_called()
+        word_id = response.data['words'][0]['id']
+        assert PendingEtymology.objects.filter(word_id=word_id).exists()
+
     def test_has_media_flags(self):
         Word.objects.create(
             user=self.user, original_word='Haus', translation='дом', language='de',
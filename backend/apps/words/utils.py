@@ -1,12 +1,21 @@
 """
 Утилиты для работы со словами
 """
-from typing import Optional, Dict, Any
+import logging
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from django.db.models import Min, Count, Q
 
 from .models import Word
+from .search import build_search_text
+from apps.cards import media_store
 from apps.cards.models import Card
+from apps.core import user_cache
+
+logger = logging.getLogger(__name__)
+
+BULK_CREATE_BATCH_SIZE = 500
 
 
 def get_word_learning_status(word: Word) -> str:
@@ -82,6 +91,195 @@ def update_word_learning_status(word: Word) -> Word:
     return word
 
 
+def update_words_learning_status(word_ids: Iterable[int]) -> int:
+    """
+    Пересчитывает learning_status для набора слов.
+
+    Та же логика, что в get_word_learning_status, но одним агрегирующим
+    запросом по Card (GROUP BY word_id) и одним bulk_update вместо
+    нескольких запросов на каждое слово.
+
+    Args:
+        word_ids: ID слов
+
+    Returns:
+        int: Количество слов, у которых изменился статус
+    """
+    word_ids = set(word_ids)
+    if not word_ids:
+        return 0
+
+    now = timezone.now()
+    card_stats = {
+        row['word_id']: row
+        for row in Card.objects.filter(word_id__in=word_ids)
+        .values('word_id')
+        .annotate(
+            total=Count('id'),
+            learning=Count('id', filter=Q(is_in_learning_mode=True)),
+            due=Count('id', filter=Q(is_in_learning_mode=False, next_review__lte=now)),
+            mastered=Count('id', filter=Q(
+                is_in_learning_mode=False, next_review__gt=now, interval__gte=30
+            )),
+        )
+        .order_by()
+    }
+
+    changed = []
+    for word in Word.objects.filter(id__in=word_ids).only('id', 'learning_status'):
+        stats = card_stats.get(word.id)
+        if not stats or stats['total'] == 0:
+            new_status = 'new'
+        elif stats['learning']:
+            new_status = 'learning'
+        elif stats['due']:
+            new_status = 'reviewing'
+        elif stats['mastered'] == stats['total']:
+            new_status = 'mastered'
+        else:
+            new_status = 'reviewing'
+
+        if word.learning_status != new_status:
+            word.learning_status = new_status
+            changed.append(word)
+
+    if changed:
+        Word.objects.bulk_update(changed, ['learning_status'])
+    return len(changed)
+
+
+class _WordStatusFlush:
+    """
+    on_commit-колбэк соединения: пересчитывает статусы накопленных слов
+    одним проходом. Регистрируется при каждом изменении — первый вызов
+    после коммита забирает весь набор, остальные ничего не делают.
+    """
+
+    def __init__(self):
+        self.word_ids = set()
+
+    def __call__(self):
+        word_ids, self.word_ids = self.word_ids, set()
+        if not word_ids:
+            return
+        try:
+            update_words_learning_status(word_ids)
+        except Exception:
+            # Запись уже закоммичена — ошибка пересчёта не должна превращаться в 500
+            logger.exception("Failed to update learning status for words %s", sorted(word_ids))
+
+
+def schedule_word_status_update(word_ids: Iterable[int], using: Optional[str] = None) -> None:
+    """
+    Откладывает пересчёт learning_status до коммита транзакции.
+
+    Внутри транзакции ID слов копятся в одном наборе на соединении, а при
+    коммите пересчитываются через update_words_learning_status (один
+    агрегирующий запрос + один bulk_update), сколько бы карточек ни менялось.
+    Колбэк, отброшенный откатом savepoint'а, не теряет слова: они остаются
+    в наборе и пересчитываются следующим коммитом.
+    Вне транзакции пересчёт выполняется сразу.
+    """
+    word_ids = {word_id for word_id in word_ids if word_id is not None}
+    if not word_ids:
+        return
+
+    connection = transaction.get_connection(using)
+    flush = getattr(connection, '_word_status_flush', None)
+    if flush is None:
+        flush = connection._word_status_flush = _WordStatusFlush()
+    flush.word_ids.update(word_ids)
+    transaction.on_commit(flush, using=using)
+
+
+def bulk_get_or_create_words(user, items: List[Dict[str, Any]]) -> List[Tuple[Word, bool]]:
+    """
+    Пакетный get_or_create слов по (user, original_word, language).
+    
+    Одна выборка существующих слов, один bulk_create новых слов и один —
+    их normal-карточек. post_save для новых слов не отправляется, поэтому
+    то, что делали сигналы, выполняется здесь же: статус пересчитывается
+    при коммите, кэш пользователя сбрасывается, ссылки на медиафайлы
+    учитываются в хранилище, слова ставятся в очередь генерации этимологии.
+    
+    Args:
+        items: dict-ы с original_word, language и полями нового слова
+               (translation, image_file, ...), которые используются только при создании
+    
+    Returns:
+        список (word, created) в порядке items; повтор внутри пачки
+        получает то же слово с created=False
+    """
+    keys = [(item['original_word'], item['language']) for item in items]
+    if not keys:
+        return []
+    
+    existing = {
+        (word.original_word, word.language): word
+        for word in Word.objects.filter(
+            user=user,
+            original_word__in={original_word for original_word, _ in keys},
+            language__in={language for _, language in keys},
+        )
+    }
+    
+    new_words = {}
+    for key, item in zip(keys, items):
+        if key in existing or key in new_words:
+            continue
+        word = Word(user=user, **item)
+        word.search_text = build_search_text(word)
+        new_words[key] = word
+    
+    if new_words:
+        try:
+            with transaction.atomic():
+                Word.objects.bulk_create(new_words.values(), batch_size=BULK_CREATE_BATCH_SIZE)
+                Card.objects.bulk_create([
+                    Card(
+                        user=user,
+                        word=word,
+                        card_type='normal',
+                        ease_factor=2.5,
+                        is_in_learning_mode=True,
+                        is_auxiliary=False,
+                    )
+                    for word in new_words.values()
+                ], batch_size=BULK_CREATE_BATCH_SIZE)
+                schedule_word_status_update([word.id for word in new_words.values()])
+                media_store.sync_references(new_words.values(), created=True)
+        except IntegrityError:
+            # Параллельный запрос успел создать часть слов — поштучный путь с сигналами
+            return _get_or_create_words_one_by_one(user, keys, items)
+        
+        user_cache.bump_version(user.id)
+        from apps.training.services.etymology_service import enqueue
+        enqueue(new_words.values())
+    
+    results = []
+    created_keys = set()
+    for key in keys:
+        if key in existing:
+            results.append((existing[key], False))
+        else:
+            results.append((new_words[key], key not in created_keys))
+            created_keys.add(key)
+    return results
+
+
+def _get_or_create_words_one_by_one(user, keys, items) -> List[Tuple[Word, bool]]:
+    results = []
+    for (original_word, language), item in zip(keys, items):
+        defaults = {
+            field: value for field, value in item.items()
+            if field not in ('original_word', 'language')
+        }
+        results.append(Word.objects.get_or_create(
+            user=user, original_word=original_word, language=language, defaults=defaults,
+        ))
+    return results
+
+
 def get_word_next_review(word: Word):
     """
     Возвращает ближайшую дату следующего повторения среди всех карточек слова.
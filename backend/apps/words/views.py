@@ -1,8 +1,11 @@
+from urllib.parse import urlencode
+
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Q, Min, Count, Prefetch
+from django.db.models import Q, F, Min, Count, Case, When, Value, Prefetch, Exists, OuterRef, Subquery
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.core.paginator import Paginator
@@ -28,18 +31,32 @@ from .serializers import (
     CheckMediaRequestSerializer,
 )
 from apps.cards.models import Card
+from apps.training.services.notification_service import mark_counters_stale
+from apps.core import user_cache
+from apps.core.bulk import bulk_operation
+from apps.core.pagination import InvalidCursor, paginate_by_cursor
 from apps.cards.serializers import (
     CardSerializer,
     CardListSerializer,
     CardCreateClozeSerializer,
 )
+from .search import RANK_FIELD as SEARCH_RANK_FIELD, build_search_text, search_words
+from .category_tree import load_category_tree
 from .utils import (
+    bulk_get_or_create_words,
     get_word_learning_status,
     update_word_learning_status,
+    update_words_learning_status,
     get_word_next_review,
     get_word_cards_stats
 )
 
+WORDS_STATS_CACHE_TIMEOUT = 60
+WORDS_COUNT_CACHE_TIMEOUT = 60
+BULK_ACTION_DELETE_BATCH_SIZE = 1000
+# Параметры, которые не меняют набор слов (не входят в ключ кэша count)
+WORDS_LIST_PAGING_PARAMS = {'page', 'page_size', 'ordering', 'cursor', 'pagination'}
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -54,13 +71,19 @@ def words_list_view(request):
     - part_of_speech: фильтр по части речи
     - category_id: фильтр по категории
     - deck_id: фильтр по колоде
-    - search: поиск по тексту
+    - search: поиск по слову, переводу, подсказке и заметкам (без учёта регистра
+      и ударений, по умолчанию сортировка по релевантности)
     - has_etymology: true/false - есть/нет этимология
     - has_hint: true/false - есть/нет подсказка
     - has_sentences: true/false - есть/нет предложения
     - ordering: сортировка (created_at, -created_at, original_word, -original_word, learning_status, next_review, -next_review)
     - page: номер страницы (по умолчанию 1)
     - page_size: размер страницы (по умолчанию 20, максимум 100)
+    - pagination=cursor: курсорная пагинация вместо номеров страниц
+    - cursor: курсор следующей страницы (из поля next_cursor ответа)
+    
+    В курсорном режиме страница выбирается по (поле сортировки, id) без OFFSET,
+    а count берётся из кэша пользователя — время ответа не зависит от глубины.
     """
     words = Word.objects.filter(user=request.user)
     
@@ -68,13 +91,6 @@ def words_list_view(request):
     # Инвертирование теперь происходит на уровне Card, а не Word
     words = words.exclude(card_type='inverted')
     
-    # Оптимизация запросов
-    words = words.select_related('user').prefetch_related(
-        'categories',
-        'decks',
-        Prefetch('cards', queryset=Card.objects.filter(user=request.user))
-    )
-    
     # ═══════════════════════════════════════════════════════════════
     # ФИЛЬТРАЦИЯ
     # ═══════════════════════════════════════════════════════════════
@@ -99,7 +115,10 @@ def words_list_view(request):
     if category_id:
         try:
             category_id = int(category_id)
-            words = words.filter(categories__id=category_id).distinct()
+            # EXISTS вместо JOIN — не нужен DISTINCT
+            words = words.filter(Exists(Word.categories.through.objects.filter(
+                word_id=OuterRef('pk'), category_id=category_id
+            )))
         except (ValueError, TypeError):
             pass
     
@@ -108,17 +127,16 @@ def words_list_view(request):
     if deck_id:
         try:
             deck_id = int(deck_id)
-            words = words.filter(decks__id=deck_id).distinct()
+            words = words.filter(Exists(Word.decks.through.objects.filter(
+                word_id=OuterRef('pk'), deck_id=deck_id
+            )))
         except (ValueError, TypeError):
             pass
     
     # Поиск по словам и переводам
     search = request.query_params.get('search', None)
     if search:
-        words = words.filter(
-            Q(original_word__icontains=search) |
-            Q(translation__icontains=search)
-        )
+        words = search_words(words, search)
     
     # Фильтрация по наличию контента
     has_etymology = request.query_params.get('has_etymology', None)
@@ -149,16 +167,35 @@ def words_list_view(request):
     # АННОТАЦИИ ДЛЯ СОРТИРОВКИ
     # ═══════════════════════════════════════════════════════════════
     
-    # Аннотация для next_review (ближайшая дата повторения среди всех карточек)
+    filtered_words = words
+    
+    # Аннотация для next_review (ближайшая дата повторения среди всех карточек).
+    # Подзапрос вместо Min по JOIN — без GROUP BY по всем полям слова
     words = words.annotate(
-        next_review=Min('cards__next_review')
+        next_review=Subquery(
+            Card.objects.filter(word=OuterRef('pk'))
+            .order_by()
+            .values('word')
+            .annotate(next_review=Min('next_review'))
+            .values('next_review')
+        )
+    )
+    
+    # Оптимизация запросов (prefetch выполняется только для слов страницы)
+    words = words.select_related('user').prefetch_related(
+        'categories',
+        'decks',
+        Prefetch('cards', queryset=Card.objects.filter(user=request.user))
     )
     
     # ═══════════════════════════════════════════════════════════════
     # СОРТИРОВКА
     # ═══════════════════════════════════════════════════════════════
     
-    ordering = request.query_params.get('ordering', '-created_at')
+    ordering = request.query_params.get('ordering')
+    if search and not ordering:
+        # Без явной сортировки результаты поиска идут по релевантности
+        ordering = f'-{SEARCH_RANK_FIELD}'
     
     # Валидация ordering
     valid_orderings = [
@@ -168,11 +205,13 @@ def words_list_view(request):
         'next_review', '-next_review',
     ]
     
-    if ordering in valid_orderings:
-        words = words.order_by(ordering)
-    else:
+    if search:
+        valid_orderings.append(f'-{SEARCH_RANK_FIELD}')
+    
+    if ordering not in valid_orderings:
         # По умолчанию сортируем по дате создания (убывание)
-        words = words.order_by('-created_at')
+        ordering = '-created_at'
+    words = words.order_by(ordering)
     
     # ═══════════════════════════════════════════════════════════════
     # ПАГИНАЦИЯ
@@ -195,6 +234,9 @@ def words_list_view(request):
     except (ValueError, TypeError):
         page_size = 20
     
+    if request.query_params.get('pagination') == 'cursor' or 'cursor' in request.query_params:
+        return _words_list_cursor_page(request, words, filtered_words, ordering, page_size)
+    
     # Применяем пагинацию
     paginator = Paginator(words, page_size)
     total_count = paginator.count
@@ -238,6 +280,49 @@ def words_list_view(request):
     }, status=status.HTTP_200_OK)
 
 
+def _cached_words_count(request, filtered_words):
+    """Число слов под фильтрами запроса из кэша пользователя (сбрасывается при изменениях слов)."""
+    filters = sorted(
+        (key, value) for key, value in request.query_params.items()
+        if key not in WORDS_LIST_PAGING_PARAMS
+    )
+    return user_cache.get_or_build(
+        request.user.id,
+        f'words_count:{urlencode(filters)}',
+        filtered_words.count,
+        timeout=WORDS_COUNT_CACHE_TIMEOUT,
+    )
+
+
+def _words_list_cursor_page(request, words, filtered_words, ordering, page_size):
+    """Курсорная страница списка слов: WHERE по ключу сортировки + LIMIT."""
+    try:
+        page = paginate_by_cursor(
+            words, ordering, request.query_params.get('cursor'), page_size
+        )
+    except InvalidCursor:
+        return Response(
+            {'error': 'Некорректный курсор'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    next_url = None
+    if page.next_cursor:
+        query_params = request.query_params.copy()
+        query_params['cursor'] = page.next_cursor
+        query_params['pagination'] = 'cursor'
+        query_params.pop('page', None)
+        next_url = f"/api/words/list/?{query_params.urlencode()}"
+    
+    return Response({
+        'count': _cached_words_count(request, filtered_words),
+        'next': next_url,
+        'previous': None,
+        'next_cursor': page.next_cursor,
+        'results': WordListSerializer(page.items, many=True).data
+    }, status=status.HTTP_200_OK)
+
+
 # ═══════════════════════════════════════════════════════════════
 # WORD RELATIONS API
 # ═══════════════════════════════════════════════════════════════
@@ -419,12 +504,6 @@ def categories_list_view(request):
     POST: Создание новой категории
     """
     if request.method == 'GET':
-        # Получаем только корневые категории (без parent)
-        root_categories = Category.objects.filter(
-            user=request.user,
-            parent__isnull=True
-        ).order_by('order', 'name')
-        
         # Формат ответа зависит от параметра
         flat = request.query_params.get('flat', 'false').lower() == 'true'
         
@@ -435,8 +514,10 @@ def categories_list_view(request):
             ).order_by('order', 'name')
             serializer = CategorySerializer(all_categories, many=True)
         else:
-            # Дерево категорий
-            serializer = CategoryTreeSerializer(root_categories, many=True)
+            # Дерево категорий со счётчиками (три запроса на всё дерево)
+            serializer = CategoryTreeSerializer(
+                load_category_tree(request.user), many=True
+            )
         
         return Response({
             'count': Category.objects.filter(user=request.user).count(),
@@ -526,12 +607,13 @@ def category_words_view(request, category_id):
     ).lower() == 'true'
     
     if include_descendants:
-        # Собираем слова из текущей категории и всех потомков
-        category_ids = [category.id] + [d.id for d in category.get_descendants()]
-        words = Word.objects.filter(
-            user=request.user,
-            categories__id__in=category_ids
-        ).distinct()
+        # Слова из текущей категории и всех потомков (префикс пути)
+        words = Word.objects.filter(user=request.user).filter(
+            Exists(Word.categories.through.objects.filter(
+                category.get_subtree_filter('category__'),
+                word_id=OuterRef('pk'),
+            ))
+        )
     else:
         words = category.words.filter(user=request.user)
     
@@ -747,6 +829,59 @@ def word_stats_view(request, word_id):
     return Response(serializer.data)
 
 
+def _grouped_counts(words, field, choices):
+    """Количество слов по значениям field (только известные значения, count > 0)."""
+    known = {code for code, _ in choices}
+    return {
+        row[field]: row['count']
+        for row in words.values(field).annotate(count=Count('id')).order_by(field)
+        if row[field] in known
+    }
+
+
+def _build_words_stats(user):
+    """
+    Общая статистика по словам пользователя — фиксированное число запросов.
+    
+    learning_status поддерживается при записи карточек (signals), поэтому
+    здесь статусы только читаются. Единственный переход по времени — у
+    освоенного слова наступило повторение (mastered → reviewing); он
+    учитывается в том же GROUP BY по next_review карточек.
+    """
+    words = Word.objects.filter(user=user)
+    cards = Card.objects.filter(user=user, word__user=user)
+    now = timezone.now()
+    
+    due_card = cards.filter(word=OuterRef('pk'), is_in_learning_mode=False, next_review__lte=now)
+    current_status = words.annotate(current_status=Case(
+        When(Exists(due_card), learning_status='mastered', then=Value('reviewing')),
+        default=F('learning_status'),
+    ))
+    
+    content = words.aggregate(
+        total_words=Count('id'),
+        with_etymology=Count('id', filter=~Q(etymology='')),
+        with_hint=Count('id', filter=~Q(hint_text='')),
+        with_sentences=Count('id', filter=~Q(sentences=[])),
+    )
+    card_counts = cards.aggregate(
+        total_cards=Count('id'),
+        due_for_review=Count('id', filter=Q(is_in_learning_mode=False, next_review__lte=now)),
+    )
+    
+    return {
+        'total_words': content['total_words'],
+        'by_language': _grouped_counts(words, 'language', Word.LANGUAGE_CHOICES),
+        'by_status': _grouped_counts(current_status, 'current_status', Word.LEARNING_STATUS_CHOICES),
+        'by_part_of_speech': _grouped_counts(words, 'part_of_speech', Word.PART_OF_SPEECH_CHOICES),
+        'with_etymology': content['with_etymology'],
+        'with_hint': content['with_hint'],
+        'with_sentences': content['with_sentences'],
+        'total_cards': card_counts['total_cards'],
+        'due_for_review': card_counts['due_for_review'],
+    }
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def words_stats_view(request):
@@ -754,67 +889,11 @@ def words_stats_view(request):
     GET /api/words/stats/
     Получение общей статистики по словам пользователя
     """
-    words = Word.objects.filter(user=request.user).select_related('user')
-    cards = Card.objects.filter(user=request.user, word__user=request.user)
-    now = timezone.now()
-    
-    # Общее количество слов
-    total_words = words.count()
-    
-    # По языкам
-    by_language = {}
-    for lang_code, lang_name in Word.LANGUAGE_CHOICES:
-        count = words.filter(language=lang_code).count()
-        if count > 0:
-            by_language[lang_code] = count
-    
-    # По статусам (обновляем статусы перед подсчётом)
-    # Используем iterator() для оптимизации памяти при большом количестве слов
-    words_list = list(words)
-    for word in words_list:
-        update_word_learning_status(word)
-    
-    # Обновляем QuerySet после изменения статусов
-    words = Word.objects.filter(id__in=[w.id for w in words_list])
-    
-    by_status = {}
-    for status_code, status_name in Word.LEARNING_STATUS_CHOICES:
-        count = words.filter(learning_status=status_code).count()
-        if count > 0:
-            by_status[status_code] = count
-    
-    # По частям речи
-    by_part_of_speech = {}
-    for pos_code, pos_name in Word.PART_OF_SPEECH_CHOICES:
-        count = words.filter(part_of_speech=pos_code).count()
-        if count > 0:
-            by_part_of_speech[pos_code] = count
-    
-    # По наличию контента
-    with_etymology = words.exclude(etymology='').count()
-    with_hint = words.exclude(hint_text='').count()
-    with_sentences = words.exclude(sentences=[]).count()
-    
-    # Общее количество карточек
-    total_cards = cards.count()
-    
-    # Карточки на повторении
-    due_for_review = cards.filter(
-        is_in_learning_mode=False,
-        next_review__lte=now
-    ).count()
-    
-    response_data = {
-        'total_words': total_words,
-        'by_language': by_language,
-        'by_status': by_status,
-        'by_part_of_speech': by_part_of_speech,
-        'with_etymology': with_etymology,
-        'with_hint': with_hint,
-        'with_sentences': with_sentences,
-        'total_cards': total_cards,
-        'due_for_review': due_for_review
-    }
+    response_data = user_cache.get_or_build(
+        request.user.id, 'words_stats',
+        lambda: _build_words_stats(request.user),
+        timeout=WORDS_STATS_CACHE_TIMEOUT,
+    )
     
     serializer = WordsStatsSerializer(response_data)
     return Response(serializer.data)
@@ -865,24 +944,37 @@ def words_bulk_create_view(request):
     POST /api/words/bulk-create/
     Создание слов пачкой с дедупликацией (get_or_create по user+original_word+language).
     Возвращает id, статус медиа и флаг is_new для каждого слова.
+    
+    Новые слова и их карточки создаются двумя bulk_create, этимология
+    генерируется в фоне из очереди (см. bulk_get_or_create_words).
     """
     serializer = BulkCreateRequestSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    results = []
-    for item in serializer.validated_data['words']:
-        word, created = Word.objects.get_or_create(
-            user=request.user,
-            original_word=item['original_word'],
-            language=item.get('language', 'de'),
-            defaults={'translation': item.get('translation', '')},
-        )
-        # Если слово уже существовало и пришёл непустой перевод — обновляем
+    items = serializer.validated_data['words']
+    words = bulk_get_or_create_words(request.user, [
+        {
+            'original_word': item['original_word'],
+            'language': item.get('language', 'de'),
+            'translation': item.get('translation', ''),
+        }
+        for item in items
+    ])
+    
+    # Если слово уже существовало и пришёл непустой перевод — обновляем
+    translated = []
+    for item, (word, created) in zip(items, words):
         if not created and item.get('translation') and not word.translation:
             word.translation = item['translation']
-            word.save(update_fields=['translation'])
+            word.search_text = build_search_text(word)
+            translated.append(word)
+    if translated:
+        Word.objects.bulk_update(translated, ['translation', 'search_text'])
+        user_cache.bump_version(request.user.id)
 
+    results = []
+    for word, created in words:
         has_image = bool(word.image_file)
         has_audio = bool(word.audio_file)
         results.append({
@@ -958,118 +1050,85 @@ def words_bulk_action_view(request):
     params = serializer.validated_data.get('params', {})
     
     # Получаем слова пользователя
-    words = Word.objects.filter(id__in=word_ids, user=request.user).select_related('user')
+    words = Word.objects.filter(id__in=word_ids, user=request.user)
+    word_ids = list(words.values_list('id', flat=True))
     
-    if words.count() != len(word_ids):
+    if len(word_ids) != len(serializer.validated_data['word_ids']):
         return Response(
             {'error': 'Некоторые слова не найдены или не принадлежат пользователю'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    processed = 0
-    successful = 0
-    failed = 0
-    errors = []
-    
-    for word in words:
-        try:
-            processed += 1
-            
+    # Каждое действие выполняется над всем набором сразу; побочные эффекты
+    # сигналов (статусы, кэш, счётчики) применяются один раз после него
+    processed = len(word_ids)
+    error = None
+    try:
+        with transaction.atomic(), bulk_operation():
             if action == 'enter_learning':
                 # Отправляем все карточки в режим изучения
-                cards = Card.objects.filter(word=word, user=request.user)
-                for card in cards:
-                    if not card.is_in_learning_mode:
-                        card.enter_learning_mode()
-                        card.save()
-                update_word_learning_status(word)
-                successful += 1
+                Card.objects.filter(
+                    word_id__in=word_ids, user=request.user, is_in_learning_mode=False
+                ).update(
+                    is_in_learning_mode=True,
+                    learning_step=0,
+                    consecutive_lapses=0,
+                    updated_at=timezone.now(),
+                )
+                update_words_learning_status(word_ids)
             
             elif action == 'delete':
-                # Удаляем слово
-                word.delete()
-                successful += 1
+                for start in range(0, len(word_ids), BULK_ACTION_DELETE_BATCH_SIZE):
+                    Word.objects.filter(
+                        id__in=word_ids[start:start + BULK_ACTION_DELETE_BATCH_SIZE]
+                    ).delete()
             
             elif action == 'add_to_deck':
+                from apps.cards.models import Deck
                 deck_id = params.get('deck_id')
+                deck = Deck.objects.filter(id=deck_id, user=request.user).first() if deck_id else None
                 if not deck_id:
-                    errors.append({
-                        'word_id': word.id,
-                        'error': 'deck_id не указан в params'
-                    })
-                    failed += 1
-                    continue
-                
-                from apps.cards.models import Deck
-                deck = Deck.objects.filter(id=deck_id, user=request.user).first()
-                if not deck:
-                    errors.append({
-                        'word_id': word.id,
-                        'error': f'Колода {deck_id} не найдена'
-                    })
-                    failed += 1
-                    continue
-                
-                word.decks.add(deck)
-                successful += 1
+                    error = 'deck_id не указан в params'
+                elif not deck:
+                    error = f'Колода {deck_id} не найдена'
+                else:
+                    Deck.words.through.objects.bulk_create(
+                        [Deck.words.through(deck_id=deck.id, word_id=word_id) for word_id in word_ids],
+                        ignore_conflicts=True,
+                    )
             
-            elif action == 'add_to_category':
+            elif action in ('add_to_category', 'remove_from_category'):
                 category_id = params.get('category_id')
+                category = (
+                    Category.objects.filter(id=category_id, user=request.user).first()
+                    if category_id else None
+                )
+                through = Word.categories.through
                 if not category_id:
-                    errors.append({
-                        'word_id': word.id,
-                        'error': 'category_id не указан в params'
-                    })
-                    failed += 1
-                    continue
-                
-                category = Category.objects.filter(id=category_id, user=request.user).first()
-                if not category:
-                    errors.append({
-                        'word_id': word.id,
-                        'error': f'Категория {category_id} не найдена'
-                    })
-                    failed += 1
-                    continue
-                
-                word.categories.add(category)
-                successful += 1
-            
-            elif action == 'remove_from_category':
-                category_id = params.get('category_id')
-                if not category_id:
-                    errors.append({
-                        'word_id': word.id,
-                        'error': 'category_id не указан в params'
-                    })
-                    failed += 1
-                    continue
-                
-                category = Category.objects.filter(id=category_id, user=request.user).first()
-                if not category:
-                    errors.append({
-                        'word_id': word.id,
-                        'error': f'Категория {category_id} не найдена'
-                    })
-                    failed += 1
-                    continue
-                
-                word.categories.remove(category)
-                successful += 1
+                    error = 'category_id не указан в params'
+                elif not category:
+                    error = f'Категория {category_id} не найдена'
+                elif action == 'add_to_category':
+                    through.objects.bulk_create(
+                        [through(category_id=category.id, word_id=word_id) for word_id in word_ids],
+                        ignore_conflicts=True,
+                    )
+                else:
+                    through.objects.filter(category_id=category.id, word_id__in=word_ids).delete()
             
             else:
-                errors.append({
-                    'word_id': word.id,
-                    'error': f'Неизвестное действие: {action}'
-                })
-                failed += 1
-        
-        except Exception as e:
-            errors.append({
-                'word_id': word.id,
-                'error': str(e)
-            })
-            failed += 1
+                error = f'Неизвестное действие: {action}'
+    except Exception as e:
+        error = str(e)
+    
+    if error is None:
+        user_cache.bump_version(request.user.id)
+        if action in ('enter_learning', 'delete'):
+            mark_counters_stale(request.user.id)
+        successful, failed, errors = processed, 0, []
+    else:
+        successful, failed = 0, processed
+        errors = [{'word_id': word_id, 'error': error} for word_id in word_ids]
     
     response_data = {
         'action': action,
@@ -253,17 +253,62 @@ CSRF_TRUSTED_ORIGINS = [
     'http://127.0.0.1:8000',
 ]
 
-# Кэширование для улучшения производительности
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+# Кэширование для улучшения производительности.
+# Кэш общий для всех воркеров gunicorn и для фоновых воркеров (run_workers):
+# файловый по умолчанию, Redis — если задан REDIS_URL; CACHE_BACKEND=locmem —
+# только для локальной отладки. Файловый кэш работает, пока у web и воркеров
+# один CACHE_DIR (в docker-compose — общий том backend_cache); если они на
+# разных машинах, нужен Redis.
+REDIS_URL = os.getenv('REDIS_URL', '')
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'redis' if REDIS_URL else 'file')
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
         }
     }
+elif CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000,
+            }
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', '/tmp/anki_cards_cache'),
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            }
+        }
+    }
+
+# Лимиты запросов к провайдерам генерации изображений (на процесс):
+# число параллельных запросов в пакетной генерации и запросов в минуту
+# (token bucket, apps/core/llm/rate_limit.py). Подбираются под tier аккаунта.
+LLM_RATE_LIMITS = {
+    'openai_image': {
+        'concurrency': int(os.getenv('OPENAI_IMAGE_CONCURRENCY', '4')),
+        'requests_per_minute': int(os.getenv('OPENAI_IMAGE_RPM', '20')),
+    },
+    'gemini_image': {
+        'concurrency': int(os.getenv('GEMINI_IMAGE_CONCURRENCY', '4')),
+        'requests_per_minute': int(os.getenv('GEMINI_IMAGE_RPM', '60')),
+    },
 }
 
+# Кэш синтеза речи (apps/cards/tts_cache.py): при превышении размера
+# вытесняются давно не использованные файлы, на которые нет ссылок
+# (периодически, manage.py prune_tts_cache).
+TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_MB', '2048')) * 1024 * 1024
+
 # Оптимизация базы данных
 DATABASES['default']['CONN_MAX_AGE'] = 600  # Переиспользование соединений до 10 минут
 
@@ -15,6 +15,15 @@ from apps.cards.token_utils import get_or_create_token
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Изолирует тесты друг от друга по содержимому кэша."""
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def user(db):
     """Базовый тестовый пользователь."""
@@ -5,6 +5,15 @@ import { logger } from '@/utils/logger';
 import { TIMEOUTS } from '@/utils/timeouts';
 import { updateWordMedia } from './media.service';
 
+interface GenerationJob {
+  job_id: string;
+  status: 'pending' | 'running' | 'completed' | 'failed';
+  progress: number;
+  deck_id: number | null;
+  file_id?: string;
+  error?: string;
+}
+
 /**
  * Deck Service — CRUD for decks, word management, merge/invert operations.
  * Media generation → media.service.ts
@@ -105,12 +114,25 @@ class DeckService {
       audio_count: Object.keys(data.audio_files || {}).length,
     });
 
-    const response = await api.post<{ file_id: string; deck_id?: number }>(
-      API_ENDPOINTS.CARDS_GENERATE,
-      data,
-      { timeout: TIMEOUTS.API_LONG }
-    );
-    return response.data;
+    // The backend saves words/deck right away and builds the .apkg in a
+    // background job; poll the job until the file is ready.
+    const response = await api.post<GenerationJob>(API_ENDPOINTS.CARDS_GENERATE, data);
+    const jobUrl = `${API_ENDPOINTS.CARDS_GENERATE}jobs/${response.data.job_id}/`;
+    const deadline = Date.now() + TIMEOUTS.API_LONG;
+
+    let job = response.data;
+    while (job.status === 'pending' || job.status === 'running') {
+      if (Date.now() > deadline) {
+        throw new Error('Card generation timed out');
+      }
+      await new Promise((resolve) => setTimeout(resolve, TIMEOUTS.UI_RESET));
+      job = (await api.get<GenerationJob>(jobUrl)).data;
+    }
+
+    if (job.status !== 'completed' || !job.file_id) {
+      throw new Error(job.error || 'Card generation failed');
+    }
+    return { file_id: job.file_id, deck_id: job.deck_id ?? undefined };
   }
 
   async analyzeWords(data: {